@@ -48,13 +48,38 @@ def cli():
 	type=bool,
 	default=False,
 )
-def evaluate(config, qa_data_path, corpus_data_path, project_dir, skip_validation):
+@click.option(
+	"--shard_size",
+	help="Run the QA data shard by shard with this number of rows. Default is None.",
+	type=int,
+	default=None,
+)
+@click.option(
+	"--result_cache",
+	help="Reuse the module results of the former trials or not. Default is True.",
+	type=bool,
+	default=True,
+)
+def evaluate(
+	config,
+	qa_data_path,
+	corpus_data_path,
+	project_dir,
+	skip_validation,
+	shard_size,
+	result_cache,
+):
 	if not config.endswith(".yaml") and not config.endswith(".yml"):
 		raise ValueError(f"Config file {config} is not a yaml or yml file.")
 	if not os.path.exists(config):
 		raise ValueError(f"Config file {config} does not exist.")
 	evaluator = Evaluator(qa_data_path, corpus_data_path, project_dir=project_dir)
-	evaluator.start_trial(config, skip_validation=skip_validation)
+	evaluator.start_trial(
+		config,
+		skip_validation=skip_validation,
+		shard_size=shard_size,
+		result_cache=result_cache,
+	)
 
 
 @click.command()
@@ -162,14 +187,20 @@ def extract_best_config(trial_path: str, output_path: str):
 
 @click.command()
 @click.option("--trial_path", help="Path to trial directory.", type=str)
-def restart_evaluate(trial_path):
+@click.option(
+	"--result_cache",
+	help="Reuse the module results of the former trials or not. Default is True.",
+	type=bool,
+	default=True,
+)
+def restart_evaluate(trial_path, result_cache):
 	if not os.path.exists(trial_path):
 		raise ValueError(f"trial_path {trial_path} does not exist.")
 	project_dir = str(pathlib.PurePath(trial_path).parent)
 	qa_data_path = os.path.join(project_dir, "data", "qa.parquet")
 	corpus_data_path = os.path.join(project_dir, "data", "corpus.parquet")
 	evaluator = Evaluator(qa_data_path, corpus_data_path, project_dir)
-	evaluator.restart_trial(trial_path)
+	evaluator.restart_trial(trial_path, result_cache=result_cache)
 
 
 @click.command()
@@ -194,6 +225,26 @@ def validate(config, qa_data_path, corpus_data_path):
 	validator.validate(config)
 
 
+@click.command()
+@click.option("--project_dir", help="Path to project directory.", type=str)
+@click.option(
+	"--bm25_tokenizer",
+	help="The tokenizer name of the BM25 index. Default is porter_stemmer.",
+	type=str,
+	default="porter_stemmer",
+)
+def compact_bm25(project_dir, bm25_tokenizer):
+	from autorag.nodes.lexicalretrieval.bm25 import bm25_compact
+	from autorag.nodes.retrieval.base import get_bm25_index_dir_name
+
+	index_dir = os.path.join(
+		project_dir, "resources", get_bm25_index_dir_name(bm25_tokenizer)
+	)
+	if not os.path.exists(index_dir):
+		raise ValueError(f"BM25 index {index_dir} does not exist.")
+	bm25_compact(index_dir)
+
+
 cli.add_command(evaluate, "evaluate")
 cli.add_command(run_api, "run_api")
 cli.add_command(run_web, "run_web")
@@ -201,6 +252,7 @@ cli.add_command(run_dashboard, "dashboard")
 cli.add_command(extract_best_config, "extract_best_config")
 cli.add_command(restart_evaluate, "restart_evaluate")
 cli.add_command(validate, "validate")
+cli.add_command(compact_bm25, "compact_bm25")
 
 if __name__ == "__main__":
 	cli()
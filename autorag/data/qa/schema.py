@@ -2,6 +2,7 @@ import logging
 from typing import Callable, Optional, Dict, Awaitable, Any, Tuple, List
 import uuid
 import pandas as pd
+from autorag.utils.corpus import CorpusIndex
 from autorag.utils.util import process_batch, get_event_loop, fetch_contents
 
 from autorag.support import get_support_modules
@@ -167,8 +168,9 @@ class QA:
 		Make retrieval_gt_contents column from retrieval_gt column.
 		:return: The QA instance that has a retrieval_gt_contents column.
 		"""
+		corpus_index = CorpusIndex(self.linked_corpus.data)
 		self.data["retrieval_gt_contents"] = self.data["retrieval_gt"].apply(
-			lambda x: fetch_contents(self.linked_corpus.data, x)
+			lambda x: fetch_contents(corpus_index, x)
 		)
 		return self
 
@@ -203,11 +205,12 @@ class QA:
 		    Must have valid `linked_raw` and `raw_id`, `raw_start_idx`, `raw_end_idx` columns.
 		:return: The QA instance that updated linked corpus.
 		"""
+		corpus_index = CorpusIndex(self.linked_corpus.data)
 		self.data["evidence_path"] = (
 			self.data["retrieval_gt"]
 			.apply(
 				lambda x: fetch_contents(
-					self.linked_corpus.data,
+					corpus_index,
 					x,
 					column_name="path",
 				)
@@ -218,7 +221,7 @@ class QA:
 			lambda x: list(
 				map(
 					lambda lst: list(map(lambda x: x.get("page", -1), lst)),
-					fetch_contents(self.linked_corpus.data, x, column_name="metadata"),
+					fetch_contents(corpus_index, x, column_name="metadata"),
 				)
 			)
 		)
@@ -228,7 +231,7 @@ class QA:
 				self.data["retrieval_gt"]
 				.apply(
 					lambda x: fetch_contents(
-						self.linked_corpus.data,
+						corpus_index,
 						x,
 						column_name="start_end_idx",
 					)
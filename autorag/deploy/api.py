@@ -12,6 +12,7 @@ from pydantic import BaseModel, ValidationError
 from autorag.deploy.base import BaseRunner
 from autorag.nodes.generator.base import BaseGenerator
 from autorag.nodes.promptmaker.base import BasePromptMaker
+from autorag.utils import acquire_corpus
 from autorag.utils.util import fetch_contents, to_list
 
 logger = logging.getLogger("AutoRAG")
@@ -68,9 +69,8 @@ class ApiRunner(BaseRunner):
 		self.app = Quart(__name__)
 
 		data_dir = os.path.join(project_dir, "data")
-		self.corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
+		self.corpus_index = acquire_corpus(os.path.join(data_dir, "corpus.parquet"))
+		self.corpus_df = self.corpus_index.corpus_df
 		self.__add_api_route()
 
 	def __add_api_route(self):
@@ -260,19 +260,19 @@ class ApiRunner(BaseRunner):
 		else:
 			retrieved_ids: List[str] = df["retrieved_ids"].tolist()[0]
 			scores = df["retrieve_scores"].tolist()[0]
-		contents = fetch_contents(self.corpus_df, [retrieved_ids])[0]
+		contents = fetch_contents(self.corpus_index, [retrieved_ids])[0]
 		if "path" in self.corpus_df.columns:
-			paths = fetch_contents(self.corpus_df, [retrieved_ids], column_name="path")[
-				0
-			]
+			paths = fetch_contents(
+				self.corpus_index, [retrieved_ids], column_name="path"
+			)[0]
 		else:
 			paths = [None] * len(retrieved_ids)
 		metadatas = fetch_contents(
-			self.corpus_df, [retrieved_ids], column_name="metadata"
+			self.corpus_index, [retrieved_ids], column_name="metadata"
 		)[0]
 		if "start_end_idx" in self.corpus_df.columns:
 			start_end_indices = fetch_contents(
-				self.corpus_df, [retrieved_ids], column_name="start_end_idx"
+				self.corpus_index, [retrieved_ids], column_name="start_end_idx"
 			)[0]
 		else:
 			start_end_indices = [None] * len(retrieved_ids)
@@ -12,6 +12,7 @@ from langchain_openai.embeddings import OpenAIEmbeddings
 from llama_index.embeddings.openai_like import OpenAILikeEmbedding
 
 from autorag import LazyInit
+from autorag.embedding.onnx import OnnxEmbedding
 from autorag.embedding.vllm import VllmEmbedding
 
 logger = logging.getLogger("AutoRAG")
@@ -42,6 +43,7 @@ embedding_models = {
 	# openai like
 	"openai_like": LazyInit(OpenAILikeEmbedding),
 	"vllm": LazyInit(VllmEmbedding),
+	"onnx_baai_bge_small": LazyInit(OnnxEmbedding, model_name="BAAI/bge-small-en-v1.5"),
 }
 
 try:
@@ -109,6 +111,7 @@ class EmbeddingModel:
 				"ollama",
 				"vllm",
 				"openai_like",
+				"onnx",
 			]:
 				raise ValueError(
 					f"Embedding model type '{target['type']}' is not supported"
@@ -136,6 +139,7 @@ class EmbeddingModel:
 			"ollama": OllamaEmbedding,
 			"openai_like": OpenAILikeEmbedding,
 			"vllm": VllmEmbedding,
+			"onnx": OnnxEmbedding,
 		}
 
 		embedding_class = embedding_map.get(model_type)
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+from llama_index.core.embeddings.mock_embed_model import MockEmbedding
+
+logger = logging.getLogger("AutoRAG")
+
+EMBEDDING_CACHE_DIR_ENV = "AUTORAG_EMBEDDING_CACHE_DIR"
+EMBEDDING_CACHE_MAX_ENTRIES = 1_000_000
+# the attributes that identify the embedding model, besides its class
+_MODEL_IDENTITY_ATTRIBUTES = [
+	"model_name",
+	"model",
+	"api_base",
+	"dimensions",
+	"quantize",
+	"pooling",
+]
+
+
+def embedding_model_identity(embedding_model: Any) -> Optional[str]:
+	"""
+	Get the identity string of the embedding model, which is the cache namespace of its embeddings.
+	It returns None for the mock embedding models,
+	because their embeddings are random and must not be cached.
+	"""
+	if isinstance(embedding_model, MockEmbedding):
+		return None
+	model_class = type(embedding_model)
+	identity = {"class": f"{model_class.__module__}.{model_class.__qualname__}"}
+	for attribute in _MODEL_IDENTITY_ATTRIBUTES:
+		value = getattr(embedding_model, attribute, None)
+		if value is not None:
+			identity[attribute] = str(value)
+	return json.dumps(identity, sort_keys=True)
+
+
+def text_hash(text: str) -> bytes:
+	return hashlib.sha1(text.encode("utf-8")).hexdigest().encode("ascii")
+
+
+def _grow_memmap(
+	path: str, array: Optional[np.ndarray], capacity: int, dtype, row_shape: tuple
+) -> np.memmap:
+	"""
+	Make the memory-mapped npy file of the capacity, which has the rows of the array at the front.
+	"""
+	tmp_path = path + ".tmp"
+	grown = np.lib.format.open_memmap(
+		tmp_path, mode="w+", dtype=dtype, shape=(capacity, *row_shape)
+	)
+	if array is not None and len(array) > 0:
+		grown[: len(array)] = array
+	grown.flush()
+	del grown
+	os.replace(tmp_path, path)
+	return np.load(path, mmap_mode="r+")
+
+
+class EmbeddingStore:
+	"""
+	The on-disk embedding store of one embedding model.
+	The vectors, the keys and the last used ticks are saved at the memory-mapped npy files,
+	so saving the new embeddings only writes their rows.
+	The least recently used embeddings are evicted when the store is full.
+	Only one process should write to the same store at once,
+	so the other processes open the store as read-only.
+	"""
+
+	def __init__(
+		self, store_dir: str, max_entries: int, dtype: str, read_only: bool = False
+	):
+		self.store_dir = store_dir
+		self.max_entries = max_entries
+		self.dtype = np.dtype(dtype)
+		self.read_only = read_only
+		os.makedirs(store_dir, exist_ok=True)
+		self.meta_path = os.path.join(store_dir, "meta.json")
+		self.vectors_path = os.path.join(store_dir, "vectors.npy")
+		self.keys_path = os.path.join(store_dir, "keys.npy")
+		self.last_used_path = os.path.join(store_dir, "last_used.npy")
+
+		self.dim: Optional[int] = None
+		self.size = 0
+		self.tick = 0
+		self.vectors: Optional[np.memmap] = None
+		self.keys: Optional[np.memmap] = None
+		self.last_used: Optional[np.memmap] = None
+		self._rows: Dict[bytes, int] = {}
+		if os.path.exists(self.meta_path):
+			self._load()
+
+	def _load(self):
+		with open(self.meta_path) as f:
+			meta = json.load(f)
+		if np.dtype(meta["dtype"]) != self.dtype:
+			logger.warning(
+				f"The embedding cache at {self.store_dir} is {meta['dtype']}, not {self.dtype}. "
+				"It is cleared."
+			)
+			return
+		self.dim, self.size, self.tick = meta["dim"], meta["size"], meta["tick"]
+		mmap_mode = "r" if self.read_only else "r+"
+		self.vectors = np.load(self.vectors_path, mmap_mode=mmap_mode)
+		self.keys = np.load(self.keys_path, mmap_mode=mmap_mode)
+		self.last_used = np.load(self.last_used_path, mmap_mode=mmap_mode)
+		self._rows = dict(zip(self.keys[: self.size].tolist(), range(self.size)))
+
+	def _save(self):
+		# only the changed pages of the memory-mapped files are written
+		self.vectors.flush()
+		self.keys.flush()
+		self.last_used.flush()
+		meta = {
+			"dim": self.dim,
+			"size": self.size,
+			"tick": self.tick,
+			"dtype": self.dtype.name,
+		}
+		with open(self.meta_path + ".tmp", "w") as f:
+			json.dump(meta, f)
+		os.replace(self.meta_path + ".tmp", self.meta_path)
+
+	def _reserve(self, capacity: int):
+		old_capacity = 0 if self.vectors is None else len(self.vectors)
+		if capacity <= old_capacity:
+			return
+		capacity = min(max(capacity, 2 * old_capacity), self.max_entries)
+		# the full store evicts the rows instead of growing
+		if capacity <= old_capacity:
+			return
+		vectors, keys, last_used = self.vectors, self.keys, self.last_used
+		self.vectors, self.keys, self.last_used = None, None, None
+		self.vectors = _grow_memmap(
+			self.vectors_path, vectors, capacity, self.dtype, (self.dim,)
+		)
+		self.keys = _grow_memmap(self.keys_path, keys, capacity, "S40", ())
+		self.last_used = _grow_memmap(
+			self.last_used_path, last_used, capacity, np.int64, ()
+		)
+
+	def get(self, keys: List[bytes]) -> np.ndarray:
+		"""
+		Find the rows of the keys. The missing key is -1.
+		The found keys become the most recently used, unless the store is read-only.
+		"""
+		rows = np.fromiter(
+			(self._rows.get(key, -1) for key in keys), dtype=np.int64, count=len(keys)
+		)
+		if not self.read_only and (rows >= 0).any():
+			self.tick += 1
+			self.last_used[rows[rows >= 0]] = self.tick
+		return rows
+
+	def put(self, keys: List[bytes], vectors: np.ndarray):
+		"""
+		Save the new embeddings. The keys must not be in the store already.
+		The read-only store does not save them.
+		"""
+		if len(keys) == 0 or self.read_only:
+			return
+		if self.dim is None:
+			self.dim = vectors.shape[1]
+		elif vectors.shape[1] != self.dim:
+			raise ValueError(
+				f"The embedding dimension {vectors.shape[1]} is different from "
+				f"the cached embedding dimension {self.dim}."
+			)
+		keys, vectors = keys[-self.max_entries :], vectors[-self.max_entries :]
+		self._reserve(self.size + len(keys))
+		old_size = self.size
+		rows = np.arange(old_size, min(old_size + len(keys), len(self.vectors)))
+		self.size += len(rows)
+		evict_count = len(keys) - len(rows)
+		if evict_count > 0:
+			evicted = np.argpartition(self.last_used[:old_size], evict_count - 1)[
+				:evict_count
+			]
+			for key in self.keys[evicted].tolist():
+				self._rows.pop(key, None)
+			# the evicted keys are cleared before their vectors are overwritten,
+			# so the old key never points to the new vector on the disk
+			self.keys[evicted] = b""
+			self.keys.flush()
+			rows = np.concatenate([rows, evicted])
+
+		self.tick += 1
+		self.vectors[rows] = vectors
+		self.vectors.flush()
+		self.keys[rows] = keys
+		self.last_used[rows] = self.tick
+		self._rows.update(zip(keys, rows.tolist()))
+		self._save()
+
+
+class EmbeddingCache:
+	"""
+	The content-addressed embedding cache.
+	Embeddings are keyed by the embedding model identity and the hash of the text,
+	so the unchanged text is never embedded again across modules, parameters and trials.
+	"""
+
+	def __init__(
+		self,
+		cache_dir: str,
+		max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+		dtype: str = "float32",
+		read_only: bool = False,
+	):
+		"""
+		:param cache_dir: The directory to save the embedding cache.
+		:param max_entries: The maximum number of embeddings per embedding model.
+		    The least recently used embeddings are evicted when it is full.
+		    Default is 1,000,000.
+		:param dtype: The dtype of the saved embeddings. 'float32' or 'float16'.
+		    Default is 'float32'.
+		:param read_only: Whether to only read the cached embeddings.
+		    The read-only cache does not save the new embeddings.
+		    It is used when the other process writes to the same cache directory.
+		    Default is False.
+		"""
+		if max_entries <= 0:
+			raise ValueError("max_entries must be positive.")
+		self.cache_dir = cache_dir
+		self.max_entries = max_entries
+		self.dtype = dtype
+		self.read_only = read_only
+		self._stores: Dict[str, EmbeddingStore] = {}
+		self._lock = threading.Lock()
+
+	def _get_store(self, model_identity: str) -> EmbeddingStore:
+		name = hashlib.sha1(model_identity.encode("utf-8")).hexdigest()[:16]
+		if name not in self._stores:
+			self._stores[name] = EmbeddingStore(
+				os.path.join(self.cache_dir, name),
+				self.max_entries,
+				self.dtype,
+				self.read_only,
+			)
+		return self._stores[name]
+
+	def embed(
+		self, embedding_model, texts: List[str], show_progress: bool = False
+	) -> np.ndarray:
+		"""
+		Embed the texts with the cache.
+		Only the texts that are not in the cache are embedded by the embedding model.
+
+		:param embedding_model: The llama index embedding model instance.
+		:param texts: The texts to embed.
+		:param show_progress: Whether to show the progress bar of the embedding model.
+		:return: The embedding matrix in the order of the texts.
+		"""
+		model_identity = embedding_model_identity(embedding_model)
+		if model_identity is None:
+			return np.asarray(
+				embedding_model.get_text_embedding_batch(
+					texts, show_progress=show_progress
+				)
+			)
+		unique_texts = list(dict.fromkeys(texts))
+		keys = list(map(text_hash, unique_texts))
+		with self._lock:
+			store = self._get_store(model_identity)
+			rows = store.get(keys)
+			found = np.flatnonzero(rows >= 0)
+			missing = np.flatnonzero(rows < 0)
+			# read the cached embeddings first, because saving new ones can evict them
+			found_vectors = (
+				np.asarray(store.vectors[rows[found]], dtype=np.float32)
+				if len(found) > 0
+				else None
+			)
+			dim = store.dim
+		# the embedding model runs without the lock, so the other threads embed at once
+		new_vectors = None
+		if len(missing) > 0:
+			new_vectors = np.asarray(
+				embedding_model.get_text_embedding_batch(
+					[unique_texts[i] for i in missing], show_progress=show_progress
+				),
+				dtype=np.float32,
+			)
+			dim = new_vectors.shape[1]
+			with self._lock:
+				missing_keys = [keys[i] for i in missing]
+				# the other thread can save the same texts while embedding
+				still_missing = np.flatnonzero(store.get(missing_keys) < 0)
+				store.put(
+					[missing_keys[i] for i in still_missing],
+					new_vectors[still_missing].astype(store.dtype),
+				)
+			new_vectors = new_vectors.astype(store.dtype).astype(np.float32)
+		if dim is None:
+			return np.empty((len(texts), 0), dtype=np.float32)
+		vectors = np.empty((len(unique_texts), dim), dtype=np.float32)
+		if found_vectors is not None:
+			vectors[found] = found_vectors
+		if new_vectors is not None:
+			vectors[missing] = new_vectors
+		positions = dict(zip(unique_texts, range(len(unique_texts))))
+		return vectors[[positions[text] for text in texts]]
+
+
+# (cache directory, read-only) -> embedding cache
+_embedding_caches: Dict[Tuple[str, bool], EmbeddingCache] = {}
+_active_embedding_cache_dirs: List[Tuple[str, bool]] = []
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+	"""
+	Get the embedding cache of the current process.
+	It is the innermost :func:`use_embedding_cache`,
+	or the directory of the AUTORAG_EMBEDDING_CACHE_DIR environment variable.
+	It returns None when the embedding cache is not used.
+	"""
+	with _embedding_cache_lock:
+		if _active_embedding_cache_dirs:
+			cache_dir, read_only = _active_embedding_cache_dirs[-1]
+		else:
+			cache_dir, read_only = os.getenv(EMBEDDING_CACHE_DIR_ENV, None), False
+		if not cache_dir:
+			return None
+		key = (os.path.realpath(cache_dir), read_only)
+		if key not in _embedding_caches:
+			_embedding_caches[key] = EmbeddingCache(key[0], read_only=read_only)
+		return _embedding_caches[key]
+
+
+@contextmanager
+def use_embedding_cache(cache_dir: str, read_only: bool = False):
+	"""
+	Use the embedding cache at the directory while the context is open.
+	The evaluator uses the project resources directory during the trial,
+	so the repeated trials never embed the unchanged text again.
+
+	:param cache_dir: The embedding cache directory.
+	:param read_only: Whether to only read the cached embeddings. Default is False.
+	"""
+	with _embedding_cache_lock:
+		_active_embedding_cache_dirs.append((cache_dir, read_only))
+	try:
+		yield
+	finally:
+		with _embedding_cache_lock:
+			_active_embedding_cache_dirs.remove((cache_dir, read_only))
+
+
+def embed_texts(
+	embedding_model, texts: List[str], show_progress: bool = False
+) -> List[List[float]]:
+	"""
+	Embed the texts with the embedding model.
+	When the embedding cache is used, the cached embeddings are reused.
+
+	:param embedding_model: The llama index embedding model instance.
+	:param texts: The texts to embed.
+	:param show_progress: Whether to show the progress bar of the embedding model.
+	:return: The list of embeddings.
+	"""
+	cache = get_embedding_cache()
+	if cache is None or embedding_model_identity(embedding_model) is None:
+		return embedding_model.get_text_embedding_batch(
+			texts, show_progress=show_progress
+		)
+	return cache.embed(embedding_model, texts, show_progress=show_progress).tolist()
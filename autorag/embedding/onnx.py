@@ -0,0 +1,138 @@
+import json
+import logging
+from typing import Any, List, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.callbacks import CallbackManager
+
+from autorag.utils.onnx_backend import OnnxTransformer, get_onnx_cache_dir
+
+logger = logging.getLogger("AutoRAG")
+
+POOLING_METHODS = ["cls", "mean"]
+
+
+def detect_pooling(model_name: str) -> str:
+	"""
+	Find the pooling method of the sentence transformers model from its pooling config.
+	It is 'mean' when the config can't be found.
+	"""
+	try:
+		from huggingface_hub import hf_hub_download
+
+		config_path = hf_hub_download(model_name, "1_Pooling/config.json")
+		with open(config_path) as f:
+			config = json.load(f)
+	except Exception:
+		return "mean"
+	return "cls" if config.get("pooling_mode_cls_token", False) else "mean"
+
+
+class OnnxEmbedding(BaseEmbedding):
+	"""
+	The huggingface embedding model that runs with onnxruntime on CPU.
+	The model is exported to ONNX once, and the int8 dynamic quantization is optionally applied.
+	The embeddings are pooled and normalized like the llama index HuggingFaceEmbedding.
+	"""
+
+	cache_dir: Optional[str] = Field(
+		default=None,
+		description="The directory to save the ONNX model. "
+		"Default is the AUTORAG_ONNX_CACHE_DIR environment variable or ~/.cache/autorag/onnx.",
+	)
+	quantize: bool = Field(
+		default=False, description="Whether to apply the int8 dynamic quantization."
+	)
+	session_pool_size: int = Field(
+		default=1, description="The number of onnxruntime sessions."
+	)
+	max_length: int = Field(default=512, description="The maximum token length.")
+	pooling: Optional[str] = Field(
+		default=None,
+		description="'cls' or 'mean'. Default is the pooling of the sentence transformers config.",
+	)
+	normalize: bool = Field(
+		default=True, description="Whether to normalize the embeddings."
+	)
+
+	_model: Any = PrivateAttr()
+
+	def __init__(
+		self,
+		model_name: str = "BAAI/bge-small-en-v1.5",
+		embed_batch_size: int = 64,
+		cache_dir: Optional[str] = None,
+		quantize: bool = False,
+		session_pool_size: int = 1,
+		max_length: int = 512,
+		pooling: Optional[str] = None,
+		normalize: bool = True,
+		callback_manager: Optional[CallbackManager] = None,
+		**kwargs,
+	) -> None:
+		pooling = pooling or detect_pooling(model_name)
+		if pooling not in POOLING_METHODS:
+			raise ValueError(f"pooling must be one of {POOLING_METHODS}, got {pooling}")
+		super().__init__(
+			model_name=model_name,
+			embed_batch_size=embed_batch_size,
+			cache_dir=cache_dir,
+			quantize=quantize,
+			session_pool_size=session_pool_size,
+			max_length=max_length,
+			pooling=pooling,
+			normalize=normalize,
+			callback_manager=callback_manager or CallbackManager([]),
+			**kwargs,
+		)
+		self._model = OnnxTransformer(
+			model_name,
+			"feature_extraction",
+			cache_dir or get_onnx_cache_dir(),
+			quantize=quantize,
+			session_pool_size=session_pool_size,
+			max_length=max_length,
+		)
+
+	@classmethod
+	def class_name(cls) -> str:
+		return "OnnxEmbedding"
+
+	def _embed(self, texts: List[str]) -> List[List[float]]:
+		encodings = self._model.tokenizer(
+			texts,
+			padding=True,
+			truncation=True,
+			max_length=self.max_length,
+			return_tensors="np",
+		)
+		hidden_states = self._model.run(encodings)
+		if self.pooling == "cls":
+			embeddings = hidden_states[:, 0]
+		else:
+			mask = encodings["attention_mask"][:, :, np.newaxis].astype(np.float32)
+			embeddings = (hidden_states * mask).sum(axis=1) / np.clip(
+				mask.sum(axis=1), 1e-9, None
+			)
+		if self.normalize:
+			embeddings = embeddings / np.clip(
+				np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None
+			)
+		return embeddings.tolist()
+
+	def _get_query_embedding(self, query: str) -> List[float]:
+		return self._embed([query])[0]
+
+	async def _aget_query_embedding(self, query: str) -> List[float]:
+		return self._get_query_embedding(query)
+
+	def _get_text_embedding(self, text: str) -> List[float]:
+		return self._embed([text])[0]
+
+	async def _aget_text_embedding(self, text: str) -> List[float]:
+		return self._get_text_embedding(text)
+
+	def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+		return self._embed(texts)
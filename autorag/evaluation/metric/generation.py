@@ -1,10 +1,13 @@
 import asyncio
 import itertools
 import os
-from typing import List, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Callable, Any, Dict, Tuple
 
 import evaluate
 import nltk
+import numpy as np
 import pandas as pd
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
@@ -15,6 +18,7 @@ from rouge_score.rouge_scorer import RougeScorer
 from sacrebleu.metrics.bleu import BLEU
 
 from autorag.embedding.base import embedding_models
+from autorag.embedding.cache import embed_texts
 from autorag.evaluation.metric.deepeval_prompt import FaithfulnessTemplate
 from autorag.evaluation.metric.util import (
 	autorag_metric_loop,
@@ -34,6 +38,70 @@ from autorag.utils.util import (
 )
 
 
+# the metric objects that are loaded once per process
+_generation_metric_instances: Dict[Any, Any] = {}
+_generation_metric_instances_lock = threading.Lock()
+
+
+def _get_metric_instance(key: Any, factory: Callable[[], Any]) -> Any:
+	with _generation_metric_instances_lock:
+		if key not in _generation_metric_instances:
+			_generation_metric_instances[key] = factory()
+		return _generation_metric_instances[key]
+
+
+def _load_meteor_score() -> Callable:
+	def factory():
+		# the same resources that huggingface evaluate meteor downloads
+		for resource in ["wordnet", "punkt", "punkt_tab", "omw-1.4"]:
+			nltk.download(resource, quiet=True)
+		from nltk.translate import meteor_score
+
+		return meteor_score.single_meteor_score
+
+	return _get_metric_instance("meteor", factory)
+
+
+def _meteor_chunk(
+	pairs: List[Tuple[List[str], List[str]]], alpha: float, beta: float, gamma: float
+) -> List[float]:
+	# runs in the worker process, so wordnet is loaded once per worker
+	single_meteor_score = _load_meteor_score()
+	return [
+		single_meteor_score(reference, hypothesis, alpha=alpha, beta=beta, gamma=gamma)
+		for reference, hypothesis in pairs
+	]
+
+
+def _bleu_chunk(
+	rows: List[Tuple[str, List[str]]], bleu_params: Tuple[Tuple[str, Any], ...]
+) -> List[float]:
+	# runs in the worker process, so the BLEU instance is created once per worker
+	bleu_instance = _get_metric_instance(
+		("bleu", bleu_params), lambda: BLEU(**dict(bleu_params))
+	)
+	return [bleu_instance.sentence_score(pred, gt).score for pred, gt in rows]
+
+
+def _score_chunks(
+	func: Callable[..., List[float]],
+	items: List[Any],
+	num_workers: Optional[int],
+	*args,
+) -> List[float]:
+	"""
+	Score the items with the chunk scoring function.
+	When num_workers is more than one, the items are split evenly to the worker processes.
+	"""
+	if not num_workers or num_workers <= 1 or len(items) <= 1:
+		return func(items, *args)
+	chunk_size = -(-len(items) // num_workers)
+	chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+	with ProcessPoolExecutor(max_workers=num_workers) as executor:
+		scores = executor.map(func, chunks, *[itertools.repeat(arg) for arg in args])
+		return list(itertools.chain.from_iterable(scores))
+
+
 @convert_inputs_to_list
 def huggingface_evaluate(
 	instance, key: str, metric_inputs: List[MetricInput], **kwargs
@@ -189,6 +257,7 @@ def bleu(
 	max_ngram_order: int = 4,
 	trg_lang: str = "",
 	effective_order: bool = True,
+	num_workers: Optional[int] = None,
 	**kwargs,
 ) -> List[float]:
 	"""
@@ -202,26 +271,24 @@ def bleu(
 	:param trg_lang: An optional language code to raise potential tokenizer warnings.
 	:param effective_order: If `True`, stop including n-gram orders for which precision is 0. This should be
 	`True`, if sentence-level BLEU will be computed.
+	:param num_workers: The number of worker processes to score the inputs.
+	    Default is None, which scores in the current process.
 	"""
-	bleu_instance = BLEU(
-		tokenize=tokenize,
-		smooth_method=smooth_method,
-		smooth_value=smooth_value,
-		max_ngram_order=max_ngram_order,
-		trg_lang=trg_lang,
-		effective_order=effective_order,
-		**kwargs,
-	)
-
-	result = list(
-		map(
-			lambda x: bleu_instance.sentence_score(
-				x.generated_texts, x.generation_gt
-			).score,
-			metric_inputs,
+	bleu_params = tuple(
+		sorted(
+			dict(
+				tokenize=tokenize,
+				smooth_method=smooth_method,
+				smooth_value=smooth_value,
+				max_ngram_order=max_ngram_order,
+				trg_lang=trg_lang,
+				effective_order=effective_order,
+				**kwargs,
+			).items()
 		)
 	)
-	return result
+	rows = [(x.generated_texts, list(x.generation_gt)) for x in metric_inputs]
+	return _score_chunks(_bleu_chunk, rows, num_workers, bleu_params)
 
 
 @autorag_metric_loop(fields_to_check=["generation_gt", "generated_texts"])
@@ -230,9 +297,13 @@ def meteor(
 	alpha: float = 0.9,
 	beta: float = 3.0,
 	gamma: float = 0.5,
+	num_workers: Optional[int] = None,
 ) -> List[float]:
 	"""
 	Compute meteor score for generation.
+	It gives the same score as huggingface evaluate meteor.
+	Every prediction and reference is tokenized once,
+	and the score of a metric input is the max score of its references.
 
 	:param metric_inputs: A list of MetricInput schema (Required Field -> "generation_gt", "generated_texts")
 	:param alpha: Parameter for controlling relative weights of precision and recall.
@@ -242,20 +313,30 @@ def meteor(
 	    Default is 3.0.
 	:param gamma: Relative weight assigned to fragmentation penalty.
 	    Default is 0.5.
+	:param num_workers: The number of worker processes to score the inputs.
+	    Default is None, which scores in the current process.
 	:return: A list of computed metric scores.
 	"""
-	nltk.download("punkt", quiet=True)
-	meteor_instance = evaluate.load("meteor")
-	result = huggingface_evaluate(
-		meteor_instance,
-		"meteor",
-		metric_inputs,
-		alpha=alpha,
-		beta=beta,
-		gamma=gamma,
+	_load_meteor_score()
+	tokenized = {}
+
+	def word_tokenize(text: str) -> List[str]:
+		if text not in tokenized:
+			tokenized[text] = nltk.word_tokenize(text)
+		return tokenized[text]
+
+	gt_lengths = [len(x.generation_gt) for x in metric_inputs]
+	pairs = [
+		(word_tokenize(gt), word_tokenize(x.generated_texts))
+		for x in metric_inputs
+		for gt in x.generation_gt
+	]
+	scores = np.asarray(
+		_score_chunks(_meteor_chunk, pairs, num_workers, alpha, beta, gamma),
+		dtype=np.float64,
 	)
-	del meteor_instance
-	return result
+	offsets = np.concatenate([[0], np.cumsum(gt_lengths)[:-1]]).astype(int)
+	return np.maximum.reduceat(scores, offsets).tolist()
 
 
 @autorag_metric_loop(fields_to_check=["generation_gt", "generated_texts"])
@@ -340,8 +421,8 @@ def sem_score(
 			generations, openai_embedding_max_length, embedding_model.model_name
 		)
 
-	embedded_pred: List[List[float]] = embedding_model.get_text_embedding_batch(
-		generations, show_progress=True
+	embedded_pred: List[List[float]] = embed_texts(
+		embedding_model, generations, show_progress=True
 	)
 	gt_lengths = list(map(len, generation_gt))
 	flatten_gt = list(itertools.chain.from_iterable(generation_gt))
@@ -349,9 +430,7 @@ def sem_score(
 		flatten_gt = openai_truncate_by_token(
 			flatten_gt, openai_embedding_max_length, embedding_model.model_name
 		)
-	embedded_gt_flatten = embedding_model.get_text_embedding_batch(
-		flatten_gt, show_progress=True
-	)
+	embedded_gt_flatten = embed_texts(embedding_model, flatten_gt, show_progress=True)
 	# re-group embedded_gt_flatten with gt_lengths
 	iterator = iter(embedded_gt_flatten)
 	embedded_gt: List[List[List[float]]] = [
@@ -1,11 +1,243 @@
+import functools
 import itertools
 import math
+from typing import List, Optional, Dict
+
+import numpy as np
+import pandas as pd
 
-from autorag.evaluation.metric.util import autorag_metric
 from autorag.schema.metricinput import MetricInput
+from autorag.utils.util import convert_inputs_to_list
+
+
+RETRIEVAL_METRIC_FIELDS = ["retrieval_gt", "retrieved_ids"]
+
+
+class RetrievalMetricEngine:
+	"""
+	The columnar retrieval metric engine.
+	It encodes the retrieved ids and the retrieval gt ids of every metric input to integers once,
+	finds the (query, gt group, retrieved position) hits with numpy,
+	and computes every retrieval metric from the hits without the Python loop of each metric input.
+	The scores are the same as the retrieval metric functions that compute each metric input.
+	"""
+
+	def __init__(self, metric_inputs: List[MetricInput]):
+		"""
+		:param metric_inputs: The list of MetricInput schema for AutoRAG metric.
+		    The metric input that does not have valid retrieval_gt and retrieved_ids gets None score.
+		"""
+		self.size = len(metric_inputs)
+		self.valid = np.fromiter(
+			(
+				metric_input.is_fields_notnone(fields_to_check=RETRIEVAL_METRIC_FIELDS)
+				for metric_input in metric_inputs
+			),
+			dtype=bool,
+			count=self.size,
+		)
+		valid_inputs = [
+			metric_input
+			for metric_input, is_valid in zip(metric_inputs, self.valid)
+			if is_valid
+		]
+		query_count = len(valid_inputs)
+
+		pred_lists = [list(metric_input.retrieved_ids) for metric_input in valid_inputs]
+		gt_groups = [
+			[list(group) for group in metric_input.retrieval_gt]
+			for metric_input in valid_inputs
+		]
+		self.pred_length = np.fromiter(map(len, pred_lists), int, count=query_count)
+		self.group_count = np.fromiter(map(len, gt_groups), int, count=query_count)
+		group_lengths = [len(group) for groups in gt_groups for group in groups]
+		self.gt_length = np.bincount(
+			np.repeat(np.arange(query_count), self.group_count),
+			weights=group_lengths,
+			minlength=query_count,
+		).astype(int)
+
+		# flatten and encode the ids to the integer codes
+		pred_query = np.repeat(np.arange(query_count), self.pred_length)
+		pred_position = np.arange(len(pred_query)) - np.repeat(
+			np.cumsum(self.pred_length) - self.pred_length, self.pred_length
+		)
+		group_query = np.repeat(np.arange(query_count), self.group_count)
+		group_index = np.arange(len(group_query)) - np.repeat(
+			np.cumsum(self.group_count) - self.group_count, self.group_count
+		)
+		gt_query = np.repeat(group_query, group_lengths)
+		gt_group = np.repeat(group_index, group_lengths)
+		flatten_ids = np.empty(len(pred_query) + len(gt_query), dtype=object)
+		flatten_ids[:] = list(
+			itertools.chain(
+				itertools.chain.from_iterable(pred_lists),
+				itertools.chain.from_iterable(itertools.chain.from_iterable(gt_groups)),
+			)
+		)
+		codes, unique_ids = pd.factorize(flatten_ids)
+		vocab_size = max(len(unique_ids), 1)
+		pred_key = pred_query * vocab_size + codes[: len(pred_query)]
+		gt_key = gt_query * vocab_size + codes[len(pred_query) :]
+
+		# the same id in a query is retrieved more than once, only the first one is counted for precision
+		self.pred_first = ~pd.Series(pred_key).duplicated().to_numpy()
+
+		# join the retrieved ids with the gt ids of the same query
+		gt_order = np.argsort(gt_key, kind="stable")
+		sorted_gt_key = gt_key[gt_order]
+		lower = np.searchsorted(sorted_gt_key, pred_key, side="left")
+		upper = np.searchsorted(sorted_gt_key, pred_key, side="right")
+		match_count = upper - lower
+		pred_index = np.repeat(np.arange(len(pred_key)), match_count)
+		gt_index = gt_order[
+			np.repeat(lower, match_count)
+			+ np.arange(len(pred_index))
+			- np.repeat(np.cumsum(match_count) - match_count, match_count)
+		]
+		# unique (query, group, position) hits, sorted by query, group and position
+		hits = np.unique(
+			np.stack(
+				[pred_query[pred_index], gt_group[gt_index], pred_position[pred_index]],
+				axis=1,
+			),
+			axis=0,
+		).reshape(-1, 3)
+		self.hit_query, self.hit_group, self.hit_position = hits.T
+
+		self.pred_query = pred_query
+		self.pred_position = pred_position
+		# the retrieved id is relevant when it is in any gt group
+		self.relevant = np.zeros(len(pred_key), dtype=bool)
+		self.relevant[pred_index] = True
+		self.query_count = query_count
+		self._cache: Dict[str, np.ndarray] = {}
+
+	def _to_list(self, values: np.ndarray) -> List[Optional[float]]:
+		result: List[Optional[float]] = [None] * self.size
+		for i, value in zip(np.flatnonzero(self.valid), values.tolist()):
+			result[i] = value
+		return result
+
+	def _query_sum(self, query: np.ndarray, values: np.ndarray) -> np.ndarray:
+		# bincount adds the values in order, the same as the Python sum
+		return np.bincount(query, weights=values, minlength=self.query_count)
+
+	def recall(self) -> np.ndarray:
+		if "recall" not in self._cache:
+			group_hit = np.unique(
+				self.hit_query * (self.group_count.max(initial=0) + 1) + self.hit_group
+			)
+			hit_count = np.bincount(
+				group_hit // (self.group_count.max(initial=0) + 1),
+				minlength=self.query_count,
+			)
+			self._cache["recall"] = hit_count / self.group_count
+		return self._cache["recall"]
+
+	def precision(self) -> np.ndarray:
+		if "precision" not in self._cache:
+			hit_count = np.bincount(
+				self.pred_query[self.relevant & self.pred_first],
+				minlength=self.query_count,
+			)
+			self._cache["precision"] = hit_count / self.pred_length
+		return self._cache["precision"]
+
+	def f1(self) -> np.ndarray:
+		recall, precision = self.recall(), self.precision()
+		denominator = recall + precision
+		with np.errstate(divide="ignore", invalid="ignore"):
+			f1 = 2 * (recall * precision) / denominator
+		return np.where(denominator == 0, 0.0, f1)
+
+	def ndcg(self) -> np.ndarray:
+		max_length = int(self.pred_length.max(initial=0))
+		discount = np.array([1 / math.log2(i + 2) for i in range(max_length)])
+		dcg_matrix = np.zeros((self.query_count, max_length))
+		dcg_matrix[self.pred_query, self.pred_position] = np.where(
+			self.relevant, discount[self.pred_position], 0.0
+		)
+		# cumsum adds the values in order, the same as the Python sum
+		dcg = (
+			np.cumsum(dcg_matrix, axis=1)[:, -1]
+			if max_length > 0
+			else np.zeros(self.query_count)
+		)
+		ideal_discount = np.concatenate([[0.0], np.cumsum(discount)])
+		idcg = ideal_discount[np.minimum(self.gt_length, self.pred_length)]
+		with np.errstate(divide="ignore", invalid="ignore"):
+			ndcg = dcg / idcg
+		return np.where(idcg > 0, ndcg, 0.0)
+
+	def mrr(self) -> np.ndarray:
+		# the first hit of each (query, group)
+		first = np.ones(len(self.hit_query), dtype=bool)
+		first[1:] = (self.hit_query[1:] != self.hit_query[:-1]) | (
+			self.hit_group[1:] != self.hit_group[:-1]
+		)
+		reciprocal_rank = 1.0 / (self.hit_position[first] + 1)
+		return (
+			self._query_sum(self.hit_query[first], reciprocal_rank) / self.group_count
+		)
+
+	def map(self) -> np.ndarray:
+		group_key = (
+			self.hit_query * (self.group_count.max(initial=0) + 1) + self.hit_group
+		)
+		starts = np.ones(len(group_key), dtype=bool)
+		starts[1:] = group_key[1:] != group_key[:-1]
+		start_index = np.flatnonzero(starts)
+		group_id = np.cumsum(starts) - 1
+		# the number of hits until the position in the group
+		hit_rank = np.arange(len(group_key)) - start_index[group_id] + 1
+		precision = hit_rank / (self.hit_position + 1)
+		precision_sum = np.bincount(
+			group_id, weights=precision, minlength=len(start_index)
+		)
+		hit_count = np.bincount(group_id, minlength=len(start_index))
+		average_precision = precision_sum / hit_count
+		return (
+			self._query_sum(self.hit_query[start_index], average_precision)
+			/ self.group_count
+		)
+
+	def compute(self, metric_name: str) -> List[Optional[float]]:
+		"""
+		Compute the retrieval metric of every metric input.
+
+		:param metric_name: The retrieval metric name, such as 'retrieval_recall'.
+		:return: The list of metric scores. The invalid metric input gets None.
+		"""
+		method_name = metric_name.removeprefix("retrieval_")
+		if method_name not in RETRIEVAL_METRIC_ENGINE_METHODS:
+			raise ValueError(
+				f"{metric_name} is not supported by the retrieval metric engine."
+			)
+		if self.query_count == 0:
+			return [None] * self.size
+		return self._to_list(getattr(self, method_name)())
+
+
+RETRIEVAL_METRIC_ENGINE_METHODS = ["recall", "precision", "f1", "ndcg", "mrr", "map"]
+
+
+def autorag_retrieval_metric(func):
+	"""
+	The decorator of the retrieval metric function.
+	The decorated function computes the list of metric inputs at once with the RetrievalMetricEngine.
+	The original function, which computes one metric input, is still available with `__wrapped__`.
+	"""
+
+	@functools.wraps(func)
+	@convert_inputs_to_list
+	def wrapper(metric_inputs: List[MetricInput]) -> List[Optional[float]]:
+		return RetrievalMetricEngine(metric_inputs).compute(func.__name__)
+
+	return wrapper
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_f1(metric_input: MetricInput):
 	"""
 	Compute f1 score for retrieval.
@@ -21,7 +253,7 @@ def retrieval_f1(metric_input: MetricInput):
 		return 2 * (recall_score * precision_score) / (recall_score + precision_score)
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_recall(metric_input: MetricInput) -> float:
 	gt, pred = metric_input.retrieval_gt, metric_input.retrieved_ids
 
@@ -32,7 +264,7 @@ def retrieval_recall(metric_input: MetricInput) -> float:
 	return recall
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_precision(metric_input: MetricInput) -> float:
 	gt, pred = metric_input.retrieval_gt, metric_input.retrieved_ids
 
@@ -43,7 +275,7 @@ def retrieval_precision(metric_input: MetricInput) -> float:
 	return precision
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_ndcg(metric_input: MetricInput) -> float:
 	gt, pred = metric_input.retrieval_gt, metric_input.retrieved_ids
 
@@ -70,7 +302,7 @@ def retrieval_ndcg(metric_input: MetricInput) -> float:
 	return ndcg
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_mrr(metric_input: MetricInput) -> float:
 	"""
 	Reciprocal Rank (RR) is the reciprocal of the rank of the first relevant item.
@@ -90,7 +322,7 @@ def retrieval_mrr(metric_input: MetricInput) -> float:
 	return sum(rr_list) / len(gt_sets) if rr_list else 0.0
 
 
-@autorag_metric(fields_to_check=["retrieval_gt", "retrieved_ids"])
+@autorag_retrieval_metric
 def retrieval_map(metric_input: MetricInput) -> float:
 	"""
 	Mean Average Precision (MAP) is the mean of Average Precision (AP) for all queries.
@@ -3,14 +3,19 @@ This file contains the retrieval contents metric,
 which means calculate the metric based on the contents of the retrieved items.
 """
 
+import functools
 import itertools
 from collections import Counter
+from typing import List, Dict, Optional
 
 import numpy as np
+import pandas as pd
+from scipy import sparse
 
-from autorag.evaluation.metric.util import autorag_metric
 from autorag.schema.metricinput import MetricInput
-from autorag.utils.util import normalize_string
+from autorag.utils.util import normalize_string, convert_inputs_to_list
+
+RETRIEVAL_CONTENTS_METRIC_FIELDS = ["retrieved_contents", "retrieval_gt_contents"]
 
 
 def single_token_f1(ground_truth: str, prediction: str):
@@ -26,7 +31,164 @@ def single_token_f1(ground_truth: str, prediction: str):
 	return precision, recall, f1
 
 
-@autorag_metric(fields_to_check=["retrieved_contents", "retrieval_gt_contents"])
+class TokenOverlapEngine:
+	"""
+	The token overlap kernel of the retrieval contents metrics.
+	Each distinct passage and ground truth is normalized and tokenized once.
+	The n-th occurrence of a token in a text is one binary feature (with the query index),
+	so the sparse product of the retrieved passages and the ground truths gives
+	the common token count of `single_token_f1` for every (passage, ground truth) pair in the same query.
+	Token precision, recall, and f1 are computed together from the common token counts.
+	"""
+
+	def __init__(self, metric_inputs: List[MetricInput]):
+		"""
+		:param metric_inputs: The list of MetricInput schema for AutoRAG metric.
+		    The metric input that does not have valid retrieved_contents and retrieval_gt_contents gets None score.
+		"""
+		self.size = len(metric_inputs)
+		self.valid = np.fromiter(
+			(
+				metric_input.is_fields_notnone(
+					fields_to_check=RETRIEVAL_CONTENTS_METRIC_FIELDS
+				)
+				for metric_input in metric_inputs
+			),
+			dtype=bool,
+			count=self.size,
+		)
+		valid_inputs = [
+			metric_input
+			for metric_input, is_valid in zip(metric_inputs, self.valid)
+			if is_valid
+		]
+		pred_texts = [list(x.retrieved_contents) for x in valid_inputs]
+		gt_texts = [
+			list(itertools.chain.from_iterable(x.retrieval_gt_contents))
+			for x in valid_inputs
+		]
+		self.pred_count = np.fromiter(map(len, pred_texts), int, len(valid_inputs))
+		self.gt_count = np.fromiter(map(len, gt_texts), int, len(valid_inputs))
+
+		pred_texts = list(itertools.chain.from_iterable(pred_texts))
+		gt_texts = list(itertools.chain.from_iterable(gt_texts))
+		self.pred_matrix, self.pred_length = self._bag_of_tokens(
+			pred_texts, self.pred_count
+		)
+		self.gt_matrix, self.gt_length = self._bag_of_tokens(gt_texts, self.gt_count)
+		self._scores: Optional[Dict[str, np.ndarray]] = None
+
+	def _bag_of_tokens(self, texts: List[str], counts: np.ndarray):
+		tokens_cache = {}
+		text_tokens = []
+		for text in texts:
+			if text not in tokens_cache:
+				tokens_cache[text] = normalize_string(text).split()
+			text_tokens.append(tokens_cache[text])
+		lengths = np.fromiter(map(len, text_tokens), int, len(text_tokens))
+		token_rows = np.repeat(np.arange(len(text_tokens)), lengths)
+		token_queries = np.repeat(np.repeat(np.arange(len(counts)), counts), lengths)
+		tokens = list(itertools.chain.from_iterable(text_tokens))
+		return (token_rows, token_queries, tokens), lengths
+
+	def _overlap(self) -> sparse.coo_matrix:
+		pred_rows, pred_queries, pred_tokens = self.pred_matrix
+		gt_rows, gt_queries, gt_tokens = self.gt_matrix
+		token_codes, _ = pd.factorize(np.asarray(pred_tokens + gt_tokens, dtype=object))
+		token_size = max(int(token_codes.max(initial=0)) + 1, 1)
+		rows = np.concatenate([pred_rows, gt_rows + len(self.pred_length)])
+		queries = np.concatenate([pred_queries, gt_queries])
+		keys = queries.astype(np.int64) * token_size + token_codes
+		# the occurrence number of the token in the text
+		occurrences = (
+			pd.DataFrame({"row": rows, "key": keys})
+			.groupby(["row", "key"], sort=False)
+			.cumcount()
+			.to_numpy()
+		)
+		features, _ = pd.factorize(
+			keys * (int(occurrences.max(initial=0)) + 1) + occurrences
+		)
+		feature_size = max(int(features.max(initial=0)) + 1, 1)
+		pred_size = len(pred_rows)
+		pred_bag = sparse.csr_matrix(
+			(np.ones(pred_size, dtype=np.int64), (pred_rows, features[:pred_size])),
+			shape=(len(self.pred_length), feature_size),
+		)
+		gt_bag = sparse.csr_matrix(
+			(
+				np.ones(len(gt_rows), dtype=np.int64),
+				(gt_rows, features[pred_size:]),
+			),
+			shape=(len(self.gt_length), feature_size),
+		)
+		return (pred_bag @ gt_bag.T).tocoo()
+
+	def scores(self) -> Dict[str, np.ndarray]:
+		"""
+		Compute the token precision, recall and f1 of the valid metric inputs together.
+
+		:return: The dictionary of 'precision', 'recall' and 'f1'.
+		    Each value is the score array of the valid metric inputs.
+		"""
+		if self._scores is not None:
+			return self._scores
+		overlap = self._overlap()
+		pred_row, gt_row, common = overlap.row, overlap.col, overlap.data
+		precision = 1.0 * common / self.pred_length[pred_row]
+		recall = 1.0 * common / self.gt_length[gt_row]
+		f1 = (2 * precision * recall) / (precision + recall)
+
+		pred_offsets = np.concatenate([[0], np.cumsum(self.pred_count)])
+		self._scores = {}
+		for name, values in [("precision", precision), ("recall", recall), ("f1", f1)]:
+			# the pair without the common token is zero
+			best = np.zeros(len(self.pred_length))
+			np.maximum.at(best, pred_row, values)
+			self._scores[name] = np.array(
+				[
+					best[start:end].mean()
+					for start, end in zip(pred_offsets[:-1], pred_offsets[1:])
+				]
+			)
+		return self._scores
+
+	def compute(self, metric_name: str) -> List[Optional[float]]:
+		"""
+		Compute the retrieval contents metric of every metric input.
+
+		:param metric_name: The metric name, such as 'retrieval_token_f1'.
+		:return: The list of metric scores. The invalid metric input gets None.
+		"""
+		score_name = metric_name.removeprefix("retrieval_token_")
+		if score_name not in ["precision", "recall", "f1"]:
+			raise ValueError(
+				f"{metric_name} is not supported by the token overlap engine."
+			)
+		result: List[Optional[float]] = [None] * self.size
+		if not self.valid.any():
+			return result
+		for i, value in zip(np.flatnonzero(self.valid), self.scores()[score_name]):
+			result[i] = value
+		return result
+
+
+def autorag_retrieval_contents_metric(func):
+	"""
+	The decorator of the retrieval contents metric function.
+	The decorated function computes the list of metric inputs at once with the TokenOverlapEngine.
+	The original function, which computes one metric input, is still available with `__wrapped__`.
+	"""
+
+	@functools.wraps(func)
+	@convert_inputs_to_list
+	def wrapper(metric_inputs: List[MetricInput]) -> List[Optional[float]]:
+		return TokenOverlapEngine(metric_inputs).compute(func.__name__)
+
+	return wrapper
+
+
+@autorag_retrieval_contents_metric
 def retrieval_token_f1(metric_input: MetricInput):
 	pred = metric_input.retrieved_contents
 	gt = itertools.chain.from_iterable(metric_input.retrieval_gt_contents)
@@ -39,7 +201,7 @@ def retrieval_token_f1(metric_input: MetricInput):
 	return result_np.max(axis=1).mean()
 
 
-@autorag_metric(fields_to_check=["retrieved_contents", "retrieval_gt_contents"])
+@autorag_retrieval_contents_metric
 def retrieval_token_precision(metric_input: MetricInput):
 	pred = metric_input.retrieved_contents
 	gt = itertools.chain.from_iterable(metric_input.retrieval_gt_contents)
@@ -52,7 +214,7 @@ def retrieval_token_precision(metric_input: MetricInput):
 	return result_np.max(axis=1).mean()
 
 
-@autorag_metric(fields_to_check=["retrieved_contents", "retrieval_gt_contents"])
+@autorag_retrieval_contents_metric
 def retrieval_token_recall(metric_input: MetricInput):
 	pred = metric_input.retrieved_contents
 	gt = itertools.chain.from_iterable(metric_input.retrieval_gt_contents)
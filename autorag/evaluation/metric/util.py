@@ -23,6 +23,42 @@ def calculate_inner_product(a, b):
 	return np.dot(a, b)
 
 
+def calculate_similarity_matrix(
+	query_embeddings, content_embeddings, similarity_metric: str = "cosine"
+) -> np.ndarray:
+	"""
+	Calculate the similarity scores between every query embedding and every content embedding at once.
+	The embeddings are stacked to float32 matrices, and the scores are computed with one matrix product.
+
+	:param query_embeddings: The query embeddings. (Q x d) matrix or a list of embeddings.
+	:param content_embeddings: The content embeddings. (C x d) matrix or a list of embeddings.
+	:param similarity_metric: The similarity metric to use ('cosine', 'ip', or 'l2').
+	    The score of 'l2' is 1 - l2 distance, so the higher score is more similar at every metric.
+	    Default is 'cosine'.
+	:return: The (Q x C) float32 score matrix.
+	"""
+	if similarity_metric not in ["cosine", "ip", "l2"]:
+		raise ValueError(
+			f"similarity_metric must be 'cosine', 'ip', or 'l2', but got {similarity_metric}"
+		)
+	query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+	content_matrix = np.asarray(content_embeddings, dtype=np.float32)
+	dim = query_matrix.shape[-1] if query_matrix.size > 0 else content_matrix.shape[-1]
+	query_matrix = query_matrix.reshape(-1, dim)
+	content_matrix = content_matrix.reshape(-1, dim)
+
+	scores = query_matrix @ content_matrix.T
+	if similarity_metric == "ip":
+		return scores
+	query_norms = np.einsum("ij,ij->i", query_matrix, query_matrix)
+	content_norms = np.einsum("ij,ij->i", content_matrix, content_matrix)
+	if similarity_metric == "l2":
+		squared = query_norms[:, None] + content_norms[None, :] - 2 * scores
+		return 1 - np.sqrt(np.maximum(squared, 0))
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return scores / np.sqrt(query_norms[:, None] * content_norms[None, :])
+
+
 def autorag_metric(fields_to_check: List[str]):
 	def decorator_autorag_metric(func):
 		@functools.wraps(func)
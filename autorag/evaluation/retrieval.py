@@ -1,6 +1,6 @@
 import functools
 import warnings
-from typing import List, Callable, Any, Tuple, Union, Dict
+from typing import List, Callable, Any, Tuple, Union, Dict, Optional
 
 import pandas as pd
 
@@ -12,6 +12,7 @@ from autorag.evaluation.metric import (
 	retrieval_mrr,
 	retrieval_map,
 )
+from autorag.evaluation.metric.retrieval import RetrievalMetricEngine
 from autorag.evaluation.util import cast_metrics
 from autorag.schema.metricinput import MetricInput
 
@@ -28,6 +29,42 @@ RETRIEVAL_METRIC_FUNC_DICT = {
 }
 
 
+def compute_retrieval_metrics(
+	metric_inputs: List[MetricInput],
+	metrics: Union[List[str], List[Dict]],
+) -> Dict[str, List[Optional[float]]]:
+	"""
+	Compute the retrieval metrics of the metric inputs.
+	Every metric is computed from one RetrievalMetricEngine,
+	so the ids are encoded and matched with the retrieval gt only once.
+	The unsupported metric is ignored with a warning.
+
+	:param metric_inputs: The list of MetricInput schema for AutoRAG metric.
+	:param metrics: The retrieval metric names or dictionaries.
+	:return: The dictionary of the metric name and its scores.
+	"""
+	engine = None
+	metric_scores = {}
+	metric_names, metric_params = cast_metrics(metrics)
+	for metric_name, metric_param in zip(metric_names, metric_params):
+		if metric_name not in RETRIEVAL_METRIC_FUNC_DICT:
+			warnings.warn(
+				f"metric {metric_name} is not in supported metrics: {RETRIEVAL_METRIC_FUNC_DICT.keys()}"
+				f"{metric_name} will be ignored."
+			)
+			continue
+		if metric_param:
+			metric_func = RETRIEVAL_METRIC_FUNC_DICT[metric_name]
+			metric_scores[metric_name] = metric_func(
+				metric_inputs=metric_inputs, **metric_param
+			)
+			continue
+		if engine is None:
+			engine = RetrievalMetricEngine(metric_inputs)
+		metric_scores[metric_name] = engine.compute(metric_name)
+	return metric_scores
+
+
 def evaluate_retrieval(
 	metric_inputs: List[MetricInput],
 	metrics: Union[List[str], List[Dict]],
@@ -52,21 +89,7 @@ def evaluate_retrieval(
 			for metric_input, pred_id in zip(metric_inputs, pred_ids):
 				metric_input.retrieved_ids = pred_id
 
-			metric_scores = {}
-			metric_names, metric_params = cast_metrics(metrics)
-
-			for metric_name, metric_param in zip(metric_names, metric_params):
-				if metric_name in RETRIEVAL_METRIC_FUNC_DICT:
-					metric_func = RETRIEVAL_METRIC_FUNC_DICT[metric_name]
-					metric_scores[metric_name] = metric_func(
-						metric_inputs=metric_inputs, **metric_param
-					)
-				else:
-					warnings.warn(
-						f"metric {metric_name} is not in supported metrics: {RETRIEVAL_METRIC_FUNC_DICT.keys()}"
-						f"{metric_name} will be ignored."
-					)
-
+			metric_scores = compute_retrieval_metrics(metric_inputs, metrics)
 			metric_result_df = pd.DataFrame(metric_scores)
 			execution_result_df = pd.DataFrame(
 				{
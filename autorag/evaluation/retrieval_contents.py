@@ -8,6 +8,7 @@ from autorag.evaluation.metric import (
 	retrieval_token_precision,
 	retrieval_token_recall,
 )
+from autorag.evaluation.metric.retrieval_contents import TokenOverlapEngine
 from autorag.schema.metricinput import MetricInput
 
 
@@ -38,16 +39,15 @@ def evaluate_retrieval_contents(metric_inputs: List[MetricInput], metrics: List[
 				metric_input.retrieved_contents = content
 
 			metrics_scores = {}
+			# every token metric is computed from the same token overlap
+			engine = TokenOverlapEngine(metric_inputs)
 			for metric in metrics:
 				if metric not in metric_funcs:
 					raise ValueError(
 						f"metric {metric} is not in supported metrics: {metric_funcs.keys()}"
 					)
 				else:
-					metric_func = metric_funcs[metric]
-					# Extract each required field from all payloads
-					metric_scores = metric_func(metric_inputs=metric_inputs)
-					metrics_scores[metric] = metric_scores
+					metrics_scores[metric] = engine.compute(metric)
 
 			metric_result_df = pd.DataFrame(metrics_scores)
 			execution_result_df = pd.DataFrame(
@@ -3,15 +3,24 @@ import json
 import logging
 import os
 import shutil
+from contextlib import nullcontext
 from datetime import datetime
 from itertools import chain
 from typing import List, Dict, Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 
-from autorag.node_line import run_node_line
-from autorag.nodes.retrieval.base import get_bm25_pkl_name
+from autorag.node_line import (
+	run_node_line,
+	run_node_line_sharded,
+	make_qa_shards,
+	validate_sharded_nodes,
+	SHARDS_DIR_NAME,
+)
+from autorag.nodes.retrieval.base import get_bm25_index_dir_name
 from autorag.nodes.lexicalretrieval.bm25 import bm25_ingest
 from autorag.nodes.semanticretrieval.vectordb import (
 	vectordb_ingest_api,
@@ -19,6 +28,7 @@ from autorag.nodes.semanticretrieval.vectordb import (
 	filter_exist_ids_from_retrieval_gt,
 	vectordb_ingest_huggingface,
 )
+from autorag.embedding.cache import use_embedding_cache
 from autorag.schema import Node
 from autorag.schema.node import (
 	module_type_exists,
@@ -26,10 +36,12 @@ from autorag.schema.node import (
 	extract_values_from_nodes_strategy,
 )
 from autorag.utils import (
+	hold_corpus,
 	cast_qa_dataset,
 	cast_corpus_dataset,
 	validate_qa_from_corpus_dataset,
 )
+from autorag.utils.result_cache import use_result_cache
 from autorag.utils.util import (
 	load_summary_file,
 	explode,
@@ -40,6 +52,15 @@ from autorag.vectordb import load_all_vectordb_from_yaml
 
 logger = logging.getLogger("AutoRAG")
 
+# the number of QA rows that are cast and validated at once
+QA_BATCH_SIZE = 1000
+QA_COLUMN_TYPES = {
+	"qid": pa.string(),
+	"query": pa.string(),
+	"retrieval_gt": pa.list_(pa.list_(pa.string())),
+	"generation_gt": pa.list_(pa.string()),
+}
+
 
 def _cleanup_vectordb_collections(yaml_path: str):
 	"""
@@ -177,33 +198,88 @@ class Evaluator:
 			)
 		self.qa_data_path = qa_data_path
 		self.corpus_data_path = corpus_data_path
-		self.qa_data = pd.read_parquet(qa_data_path, engine="pyarrow")
+		# the QA data is loaded at the first use, so the sharded trial never holds the whole QA data
+		self._qa_data: Optional[pd.DataFrame] = None
 		self.corpus_data = pd.read_parquet(corpus_data_path, engine="pyarrow")
-		self.qa_data = cast_qa_dataset(self.qa_data)
 		self.corpus_data = cast_corpus_dataset(self.corpus_data)
 		self.project_dir = project_dir if project_dir is not None else os.getcwd()
 		if not os.path.exists(self.project_dir):
 			os.makedirs(self.project_dir)
-
-		validate_qa_from_corpus_dataset(self.qa_data, self.corpus_data)
+		# the embeddings of the trials are cached here, so unchanged texts are never embedded again
+		self.embedding_cache_dir = os.path.join(
+			self.project_dir, "resources", "embedding_cache"
+		)
+		# the module results of the trials are cached here, so unchanged module runs are never repeated
+		self.result_cache_dir = os.path.join(self.project_dir, "resources", "cache")
 
 		# copy dataset to the project directory
 		if not os.path.exists(os.path.join(self.project_dir, "data")):
 			os.makedirs(os.path.join(self.project_dir, "data"))
 		qa_path_in_project = os.path.join(self.project_dir, "data", "qa.parquet")
-		if not os.path.exists(qa_path_in_project):
-			self.qa_data.to_parquet(qa_path_in_project, index=False)
+		self.__validate_and_copy_qa_data(
+			qa_path_in_project if not os.path.exists(qa_path_in_project) else None
+		)
 		corpus_path_in_project = os.path.join(
 			self.project_dir, "data", "corpus.parquet"
 		)
 		if not os.path.exists(corpus_path_in_project):
 			self.corpus_data.to_parquet(corpus_path_in_project, index=False)
 
+	@property
+	def qa_data(self) -> pd.DataFrame:
+		if self._qa_data is None:
+			self._qa_data = cast_qa_dataset(
+				pd.read_parquet(self.qa_data_path, engine="pyarrow")
+			)
+		return self._qa_data
+
+	def __validate_and_copy_qa_data(self, save_path: Optional[str]):
+		"""
+		Cast and validate the QA data batch by batch, and save the cast QA data to save_path.
+		Only one batch of the QA data is in the memory at once.
+
+		:param save_path: The path to save the cast QA data.
+			If None, the QA data is only validated.
+		"""
+		qa_file = pq.ParquetFile(self.qa_data_path)
+		schema = pa.schema(
+			list(
+				map(
+					lambda field: field.with_type(
+						QA_COLUMN_TYPES.get(field.name, field.type)
+					),
+					qa_file.schema_arrow.remove_metadata(),
+				)
+			)
+		)
+		writer = None
+		tmp_path = f"{save_path}.tmp"
+		try:
+			for batch in qa_file.iter_batches(batch_size=QA_BATCH_SIZE):
+				qa_df = cast_qa_dataset(batch.to_pandas())
+				validate_qa_from_corpus_dataset(qa_df, self.corpus_data)
+				if save_path is None:
+					continue
+				table = pa.Table.from_pandas(qa_df, schema=schema, preserve_index=False)
+				if writer is None:
+					writer = pq.ParquetWriter(tmp_path, table.schema)
+				writer.write_table(table)
+		except BaseException:
+			if writer is not None:
+				writer.close()
+				os.remove(tmp_path)
+			raise
+		if writer is not None:
+			writer.close()
+			os.replace(tmp_path, save_path)
+
 	def start_trial(
 		self,
 		yaml_path: str,
 		skip_validation: bool = False,
 		full_ingest: bool = True,
+		shard_size: Optional[int] = None,
+		result_cache: bool = True,
 	):
 		"""
 		Start AutoRAG trial.
@@ -217,8 +293,22 @@ class Evaluator:
 			Default is False.
 		:param full_ingest: If True, it checks the whole corpus data from corpus.parquet that exists in the Vector DB.
 			If your corpus is huge and don't want to check the whole vector DB, please set it to False.
+		:param shard_size: If set, the QA data is split to the shards of this number of rows,
+			and every node runs shard by shard. The memory usage is bounded by the shard size, not the QA data size.
+			The hybrid retrieval node and the node with the search strategy are not supported with it.
+			Default is None, which runs the whole QA data at once.
+		:param result_cache: If True, the module results are cached at the resources/cache folder,
+			and the unchanged module runs of the former trials are loaded from it.
+			The 'api' modules are cached only when the node strategy sets `cache: all`.
+			Default is True.
 		:return: None
 		"""
+		if shard_size is not None:
+			# fail before the validation and the trial directory
+			validate_sharded_nodes(
+				list(chain.from_iterable(self._load_node_lines(yaml_path).values()))
+			)
+
 		# Make Resources directory
 		os.makedirs(os.path.join(self.project_dir, "resources"), exist_ok=True)
 
@@ -298,21 +388,42 @@ class Evaluator:
 			]
 		)
 
-		for i, (node_line_name, node_line) in enumerate(node_lines.items()):
-			node_line_dir = os.path.join(self.project_dir, trial_name, node_line_name)
-			os.makedirs(node_line_dir, exist_ok=False)
-			if i == 0:
-				previous_result = self.qa_data
-			logger.info(f"Running node line {node_line_name}...")
-			previous_result = run_node_line(
-				node_line,
-				node_line_dir,
-				previous_result,
-			)
+		# load the corpus once for the whole trial, and share it with every module
+		with (
+			hold_corpus(os.path.join(self.project_dir, "data", "corpus.parquet")),
+			use_embedding_cache(self.embedding_cache_dir),
+			use_result_cache(self.result_cache_dir) if result_cache else nullcontext(),
+		):
+			if shard_size is not None:
+				shard_dirs = make_qa_shards(self.project_dir, shard_size)
+			for i, (node_line_name, node_line) in enumerate(node_lines.items()):
+				node_line_dir = os.path.join(
+					self.project_dir, trial_name, node_line_name
+				)
+				os.makedirs(node_line_dir, exist_ok=False)
+				if i == 0:
+					previous_result = self.qa_data if shard_size is None else None
+				logger.info(f"Running node line {node_line_name}...")
+				if shard_size is None:
+					previous_result = run_node_line(
+						node_line,
+						node_line_dir,
+						previous_result,
+					)
+				else:
+					# the previous result is the list of the result paths of each shard
+					previous_result = run_node_line_sharded(
+						node_line,
+						node_line_dir,
+						shard_dirs,
+						previous_result,
+					)
 
-			trial_summary_df = self._append_node_line_summary(
-				node_line_name, node_line_dir, trial_summary_df
-			)
+				trial_summary_df = self._append_node_line_summary(
+					node_line_name, node_line_dir, trial_summary_df
+				)
+			if shard_size is not None:
+				shutil.rmtree(os.path.join(self.project_dir, SHARDS_DIR_NAME))
 
 		trial_summary_df.to_csv(
 			os.path.join(self.project_dir, trial_name, "summary.csv"), index=False
@@ -342,7 +453,9 @@ class Evaluator:
 				bm25_tokenizer_list = ["porter_stemmer"]
 			for bm25_tokenizer in bm25_tokenizer_list:
 				bm25_dir = os.path.join(
-					self.project_dir, "resources", get_bm25_pkl_name(bm25_tokenizer)
+					self.project_dir,
+					"resources",
+					get_bm25_index_dir_name(bm25_tokenizer),
 				)
 				if not os.path.exists(os.path.dirname(bm25_dir)):
 					os.makedirs(os.path.dirname(bm25_dir))
@@ -387,7 +500,7 @@ class Evaluator:
 			)
 		return node_line_dict
 
-	def restart_trial(self, trial_path: str):
+	def restart_trial(self, trial_path: str, result_cache: bool = True):
 		logger.info(ascii_art)
 		os.environ["PROJECT_DIR"] = self.project_dir
 		# Check if trial_path exists
@@ -435,57 +548,63 @@ class Evaluator:
 			node_line_names, node_names, trial_path, conflict_node_name
 		)
 
-		# Run Node
-		if remain_nodes:
-			conflict_line_dir = os.path.join(trial_path, conflict_line_name)
-			summary_lst = []
-			# Get already run node summary and append to summary_lst
-			for completed_node_name in completed_node_names:
-				summary_lst = self._append_node_summary(
-					conflict_line_dir, completed_node_name, summary_lst
-				)
-			for node in remain_nodes:
-				previous_result = node.run(previous_result, conflict_line_dir)
-				summary_lst = self._append_node_summary(
-					conflict_line_dir, node.node_type, summary_lst
+		# load the corpus once for the rest of the trial, and share it with every module
+		with (
+			hold_corpus(os.path.join(self.project_dir, "data", "corpus.parquet")),
+			use_embedding_cache(self.embedding_cache_dir),
+			use_result_cache(self.result_cache_dir) if result_cache else nullcontext(),
+		):
+			# Run Node
+			if remain_nodes:
+				conflict_line_dir = os.path.join(trial_path, conflict_line_name)
+				summary_lst = []
+				# Get already run node summary and append to summary_lst
+				for completed_node_name in completed_node_names:
+					summary_lst = self._append_node_summary(
+						conflict_line_dir, completed_node_name, summary_lst
+					)
+				for node in remain_nodes:
+					previous_result = node.run(previous_result, conflict_line_dir)
+					summary_lst = self._append_node_summary(
+						conflict_line_dir, node.node_type, summary_lst
+					)
+				pd.DataFrame(summary_lst).to_csv(
+					os.path.join(conflict_line_dir, "summary.csv"), index=False
 				)
-			pd.DataFrame(summary_lst).to_csv(
-				os.path.join(conflict_line_dir, "summary.csv"), index=False
-			)
 
-		# Run node line
-		trial_summary_df = pd.DataFrame(
-			columns=[
-				"node_line_name",
-				"node_type",
-				"best_module_filename",
-				"best_module_name",
-				"best_module_params",
-				"best_execution_time",
+			# Run node line
+			trial_summary_df = pd.DataFrame(
+				columns=[
+					"node_line_name",
+					"node_type",
+					"best_module_filename",
+					"best_module_name",
+					"best_module_params",
+					"best_execution_time",
+				]
+			)
+			completed_line_names = node_line_names[
+				: node_line_names.index(conflict_line_name)
 			]
-		)
-		completed_line_names = node_line_names[
-			: node_line_names.index(conflict_line_name)
-		]
-		# Get already run node line's summary and append to trial_summary_df
-		if completed_line_names:
-			for line_name in completed_line_names:
-				node_line_dir = os.path.join(trial_path, line_name)
-				trial_summary_df = self._append_node_line_summary(
-					line_name, node_line_dir, trial_summary_df
-				)
-		if remain_lines:
-			for node_line_name, node_line in zip(remain_line_names, remain_lines):
-				node_line_dir = os.path.join(trial_path, node_line_name)
-				if not os.path.exists(node_line_dir):
-					os.makedirs(node_line_dir)
-				logger.info(f"Running node line {node_line_name}...")
-				previous_result = run_node_line(
-					node_line, node_line_dir, previous_result
-				)
-				trial_summary_df = self._append_node_line_summary(
-					node_line_name, node_line_dir, trial_summary_df
-				)
+			# Get already run node line's summary and append to trial_summary_df
+			if completed_line_names:
+				for line_name in completed_line_names:
+					node_line_dir = os.path.join(trial_path, line_name)
+					trial_summary_df = self._append_node_line_summary(
+						line_name, node_line_dir, trial_summary_df
+					)
+			if remain_lines:
+				for node_line_name, node_line in zip(remain_line_names, remain_lines):
+					node_line_dir = os.path.join(trial_path, node_line_name)
+					if not os.path.exists(node_line_dir):
+						os.makedirs(node_line_dir)
+					logger.info(f"Running node line {node_line_name}...")
+					previous_result = run_node_line(
+						node_line, node_line_dir, previous_result
+					)
+					trial_summary_df = self._append_node_line_summary(
+						node_line_name, node_line_dir, trial_summary_df
+					)
 		trial_summary_df.to_csv(os.path.join(trial_path, "summary.csv"), index=False)
 
 		logger.info("Evaluation complete.")
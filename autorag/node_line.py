@@ -1,12 +1,37 @@
+import copy
+import logging
 import os
 import pathlib
-from typing import Dict, List, Optional
+import shutil
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from autorag.schema import Node
+from autorag.strategy import filter_by_threshold, select_best
+from autorag.utils import cast_qa_dataset
+from autorag.utils.result_cache import get_result_cache, use_result_cache
 from autorag.utils.util import load_summary_file
 
+logger = logging.getLogger("AutoRAG")
+
+SHARDS_DIR_NAME = ".shards"
+SEARCH_SUMMARY_FILE_NAME = "search_summary.csv"
+# the summary columns that are not the metrics
+_SUMMARY_INFO_COLUMNS = [
+	"filename",
+	"module_name",
+	"module_params",
+	"execution_time",
+	"is_best",
+	"evaluated_fraction",
+]
+# the token usage columns of the summary, which are filtered by 'token_threshold'
+_SUMMARY_TOKEN_COLUMNS = ["average_output_token", "average_prompt_token"]
+
 
 def make_node_lines(node_line_dict: Dict) -> List[Node]:
 	"""
@@ -63,3 +88,488 @@ def run_node_line(
 		os.path.join(node_line_dir, "summary.csv"), index=False
 	)
 	return previous_result
+
+
+def run_node_search(
+	node: Node, previous_result: pd.DataFrame, node_line_dir: str
+) -> pd.DataFrame:
+	"""
+	Run the node with the successive halving search over the module combinations.
+	Every combination runs on the small QA sample first,
+	and only the top 1/eta combinations by the node strategy are promoted to the eta times larger sample.
+	The survivors run on the whole QA data at last, and the best module is selected among them.
+	The node summary has the survivors only, like the node without the search.
+	The search summary at 'search_summary.csv' has every combination with the 'evaluated_fraction' column,
+	and the pruned combinations have the metrics of the largest sample they ran on.
+
+	The search is set at the node strategy like below.
+
+	.. Code:: yaml
+
+	    strategy:
+	      metrics: [retrieval_f1, retrieval_recall]
+	      search:
+	        method: successive_halving
+	        min_fraction: 0.1  # the fraction of the first QA sample
+	        eta: 3  # the pruning rate and the growth rate of the sample
+	        seed: 42
+
+	:param node: The node to run.
+	:param previous_result: The previous result dataframe. Its rows must be aligned to the QA data.
+	:param node_line_dir: This node line's directory.
+	:return: The best result dataframe of the node.
+	"""
+	search = node.strategy["search"]
+	method = search.get("method", "successive_halving")
+	if method != "successive_halving":
+		raise ValueError(
+			f"search method must be 'successive_halving', but got {method}"
+		)
+	eta = search.get("eta", 3)
+	min_fraction = search.get("min_fraction", 0.1)
+	if eta <= 1:
+		raise ValueError("eta must be larger than 1.")
+	if not 0 < min_fraction <= 1:
+		raise ValueError("min_fraction must be in (0, 1].")
+	strategies = dict(filter(lambda x: x[0] != "search", node.strategy.items()))
+	modules, module_params = node.get_param_combinations()
+
+	project_dir = pathlib.PurePath(node_line_dir).parent.parent
+	node_line_path = os.path.relpath(node_line_dir, project_dir)
+	qa_length = len(previous_result)
+	sample_order = np.random.default_rng(search.get("seed", 42)).permutation(qa_length)
+	qa_table = pq.read_table(os.path.join(project_dir, "data", "qa.parquet"))
+
+	candidates = list(range(len(modules)))
+	evaluated_fractions = [1.0] * len(modules)
+	pruned_summaries: Dict[int, pd.Series] = {}
+	fraction, rung = min_fraction, 0
+	while len(candidates) > 1 and fraction < 1:
+		sample_size = max(1, int(np.ceil(qa_length * fraction)))
+		if sample_size >= qa_length:
+			break
+		logger.info(
+			f"Running {len(candidates)} combinations of node {node.node_type} "
+			f"on {sample_size}/{qa_length} QA rows..."
+		)
+		rows = np.sort(sample_order[:sample_size])
+		sample_dir = os.path.join(
+			project_dir, SHARDS_DIR_NAME, f"search_{node.node_type}_{rung}"
+		)
+		if os.path.exists(sample_dir):
+			shutil.rmtree(sample_dir)
+		_make_shard_project(str(project_dir), sample_dir, qa_table.take(rows))
+		sample_node_line_dir = os.path.join(sample_dir, node_line_path)
+		os.makedirs(sample_node_line_dir)
+		node.run_node(
+			modules=list(map(lambda x: modules[x], candidates)),
+			module_params=list(map(lambda x: module_params[x], candidates)),
+			previous_result=previous_result.iloc[rows].reset_index(drop=True),
+			node_line_dir=sample_node_line_dir,
+			strategies=strategies,
+		)
+		summary_df = load_summary_file(
+			os.path.join(sample_node_line_dir, node.node_type, "summary.csv")
+		)
+		shutil.rmtree(sample_dir)
+
+		survivors = select_top_modules(
+			summary_df, strategies, max(1, len(candidates) // eta)
+		)
+		for position, index in enumerate(candidates):
+			if position not in survivors:
+				pruned_summaries[index] = summary_df.iloc[position]
+				evaluated_fractions[index] = sample_size / qa_length
+		candidates = list(map(lambda x: candidates[x], sorted(survivors)))
+		fraction *= eta
+		rung += 1
+	shards_dir = os.path.join(project_dir, SHARDS_DIR_NAME)
+	if os.path.isdir(shards_dir) and not os.listdir(shards_dir):
+		os.rmdir(shards_dir)
+
+	best_result = node.run_node(
+		modules=list(map(lambda x: modules[x], candidates)),
+		module_params=list(map(lambda x: module_params[x], candidates)),
+		previous_result=previous_result,
+		node_line_dir=node_line_dir,
+		strategies=strategies,
+	)
+
+	# record the fraction of the QA data that each combination is evaluated on.
+	# The node summary keeps only the survivors, so it has a result file at every row.
+	node_dir = os.path.join(node_line_dir, node.node_type)
+	summary_df = load_summary_file(os.path.join(node_dir, "summary.csv"))
+	summary_df["evaluated_fraction"] = 1.0
+	if pruned_summaries:
+		pruned_df = pd.DataFrame(list(pruned_summaries.values())).reset_index(drop=True)
+		pruned_df["filename"] = None
+		pruned_df["is_best"] = False
+		pruned_df["evaluated_fraction"] = list(
+			map(lambda x: evaluated_fractions[x], pruned_summaries.keys())
+		)
+		summary_df = pd.concat([summary_df, pruned_df], ignore_index=True)
+	summary_df.to_csv(os.path.join(node_dir, SEARCH_SUMMARY_FILE_NAME), index=False)
+	return best_result
+
+
+def make_qa_shards(project_dir: str, shard_size: int) -> List[str]:
+	"""
+	Split the QA data of the project to the shard projects of `shard_size` rows.
+	Each shard project has its QA shard at data/qa.parquet,
+	and links the corpus data and the resources of the project,
+	so the nodes can run at the shard project like the original project.
+
+	:param project_dir: The project directory.
+	:param shard_size: The number of QA rows of each shard.
+	:return: The list of the shard project directories.
+	"""
+	if shard_size <= 0:
+		raise ValueError("shard_size must be positive.")
+	shards_dir = os.path.join(project_dir, SHARDS_DIR_NAME)
+	if os.path.exists(shards_dir):
+		shutil.rmtree(shards_dir)
+
+	qa_file = pq.ParquetFile(os.path.join(project_dir, "data", "qa.parquet"))
+	shard_dirs = []
+	for i, batch in enumerate(qa_file.iter_batches(batch_size=shard_size)):
+		shard_dir = os.path.join(shards_dir, f"shard_{i:05d}")
+		_make_shard_project(project_dir, shard_dir, pa.Table.from_batches([batch]))
+		shard_dirs.append(shard_dir)
+	return shard_dirs
+
+
+def _make_shard_project(project_dir: str, shard_dir: str, qa_table: pa.Table):
+	os.makedirs(os.path.join(shard_dir, "data"))
+	pq.write_table(qa_table, os.path.join(shard_dir, "data", "qa.parquet"))
+	os.symlink(
+		os.path.realpath(os.path.join(project_dir, "data", "corpus.parquet")),
+		os.path.join(shard_dir, "data", "corpus.parquet"),
+	)
+	resources_dir = os.path.join(project_dir, "resources")
+	os.makedirs(resources_dir, exist_ok=True)
+	os.symlink(
+		os.path.realpath(resources_dir),
+		os.path.join(shard_dir, "resources"),
+		target_is_directory=True,
+	)
+
+
+# the nodes that tune the module params at each run, so the modules of the shards are not the same
+_UNSHARDABLE_NODE_TYPES = ["hybrid_retrieval"]
+
+
+def validate_sharded_nodes(nodes: List[Node]):
+	"""
+	Check that every node can run shard by shard.
+	The hybrid retrieval node searches its fusion weight at each run,
+	so each shard would select its own weight instead of the weight of the whole QA data.
+	The node with the successive halving search prunes the combinations with the QA samples,
+	so each shard would prune its own combinations.
+
+	:param nodes: A list of nodes.
+	"""
+	for node in nodes:
+		if node.node_type in _UNSHARDABLE_NODE_TYPES:
+			raise ValueError(
+				f"The {node.node_type} node does not support the sharded trial, "
+				f"because it searches the module params at each shard. "
+				f"Run the trial without shard_size."
+			)
+		if node.strategy.get("search") is not None:
+			raise ValueError(
+				f"The search strategy of the {node.node_type} node does not support the sharded trial. "
+				f"Remove the search strategy or run the trial without shard_size."
+			)
+
+
+def run_node_line_sharded(
+	nodes: List[Node],
+	node_line_dir: str,
+	shard_dirs: List[str],
+	shard_results: Optional[List[str]] = None,
+) -> List[str]:
+	"""
+	Run the whole node line shard by shard, so the memory usage is bounded by the shard size.
+	Each node runs every module at each shard project from :func:`make_qa_shards`,
+	and the best module is selected with the summary of all shards.
+	The module results of the shards are written to the node directory of the node line,
+	so the trial directory is the same as :func:`run_node_line`.
+
+	:param nodes: A list of nodes.
+	:param node_line_dir: This node line's directory.
+	:param shard_dirs: The shard project directories.
+	:param shard_results: The parquet paths of the previous node line result of each shard.
+	    If None, it uses the QA data of each shard.
+	:return: The parquet paths of the final result of each shard.
+	"""
+	# the unchanged module runs are loaded from the result cache when the best module runs again
+	result_cache = get_result_cache()
+	cache_dir = (
+		result_cache.cache_dir
+		if result_cache is not None
+		else os.path.join(os.path.dirname(shard_dirs[0]), "cache")
+	)
+	validate_sharded_nodes(nodes)
+	summary_lst = []
+	with use_result_cache(cache_dir):
+		for node in nodes:
+			shard_results = _run_node_sharded(
+				node, node_line_dir, shard_dirs, shard_results
+			)
+			node_summary_df = load_summary_file(
+				os.path.join(node_line_dir, node.node_type, "summary.csv")
+			)
+			best_node_row = node_summary_df.loc[node_summary_df["is_best"]]
+			summary_lst.append(
+				{
+					"node_type": node.node_type,
+					"best_module_filename": best_node_row["filename"].values[0],
+					"best_module_name": best_node_row["module_name"].values[0],
+					"best_module_params": best_node_row["module_params"].values[0],
+					"best_execution_time": best_node_row["execution_time"].values[0],
+				}
+			)
+
+	pd.DataFrame(summary_lst).to_csv(
+		os.path.join(node_line_dir, "summary.csv"), index=False
+	)
+	return shard_results
+
+
+def _load_shard_result(shard_dir: str, shard_result: Optional[str]) -> pd.DataFrame:
+	if shard_result is None:
+		return cast_qa_dataset(
+			pd.read_parquet(os.path.join(shard_dir, "data", "qa.parquet"))
+		)
+	return pd.read_parquet(shard_result, engine="pyarrow")
+
+
+def _run_node_sharded(
+	node: Node,
+	node_line_dir: str,
+	shard_dirs: List[str],
+	shard_results: Optional[List[str]],
+) -> List[str]:
+	project_dir = pathlib.PurePath(node_line_dir).parent.parent
+	node_line_path = os.path.relpath(node_line_dir, project_dir)
+	node_dir = os.path.join(node_line_dir, node.node_type)
+	os.makedirs(node_dir, exist_ok=True)
+	if shard_results is None:
+		shard_results = [None] * len(shard_dirs)
+	modules, module_params = node.get_param_combinations()
+
+	shard_summaries, shard_sizes, shard_best_results = [], [], []
+	for i, (shard_dir, shard_result) in enumerate(zip(shard_dirs, shard_results)):
+		logger.info(
+			f"Running node {node.node_type} at shard {i + 1}/{len(shard_dirs)}..."
+		)
+		previous_result = _load_shard_result(shard_dir, shard_result)
+		shard_node_line_dir = os.path.join(shard_dir, node_line_path)
+		os.makedirs(shard_node_line_dir, exist_ok=True)
+		# the node can change the module params, so every shard runs with its own copy
+		best_result = node.run_node(
+			modules=modules,
+			module_params=copy.deepcopy(module_params),
+			previous_result=previous_result,
+			node_line_dir=shard_node_line_dir,
+			strategies=node.strategy,
+		)
+		shard_summaries.append(
+			load_summary_file(
+				os.path.join(shard_node_line_dir, node.node_type, "summary.csv")
+			)
+		)
+		shard_sizes.append(len(previous_result))
+		best_result_path = os.path.join(
+			shard_node_line_dir, f"{node.node_type}_best.parquet"
+		)
+		best_result.to_parquet(best_result_path, index=False)
+		shard_best_results.append(best_result_path)
+		del previous_result, best_result
+
+	summary_df, best_index = _merge_shard_summaries(
+		shard_summaries, shard_sizes, node.strategy
+	)
+	for filename in summary_df["filename"].tolist():
+		_merge_parquet_files(
+			list(
+				map(
+					lambda shard_dir: os.path.join(
+						shard_dir, node_line_path, node.node_type, filename
+					),
+					shard_dirs,
+				)
+			),
+			os.path.join(node_dir, filename),
+		)
+
+	if len(modules) > 1:
+		# run the selected module again at every shard, so the next node gets its result.
+		# The module result is loaded from the result cache, so only the node post-processing runs.
+		shard_best_results = []
+		for shard_dir, shard_result in zip(shard_dirs, shard_results):
+			previous_result = _load_shard_result(shard_dir, shard_result)
+			shard_node_line_dir = os.path.join(shard_dir, f"{node_line_path}_selected")
+			os.makedirs(shard_node_line_dir, exist_ok=True)
+			best_result = node.run_node(
+				modules=[modules[best_index]],
+				module_params=[copy.deepcopy(module_params[best_index])],
+				previous_result=previous_result,
+				node_line_dir=shard_node_line_dir,
+				strategies=node.strategy,
+			)
+			best_result_path = os.path.join(
+				shard_dir, node_line_path, f"{node.node_type}_best.parquet"
+			)
+			best_result.to_parquet(best_result_path, index=False)
+			shard_best_results.append(best_result_path)
+			del previous_result, best_result
+
+	best_filename = summary_df["filename"].iloc[best_index]
+	_merge_parquet_files(
+		shard_best_results,
+		os.path.join(node_dir, f"best_{os.path.splitext(best_filename)[0]}.parquet"),
+	)
+	summary_df.to_csv(os.path.join(node_dir, "summary.csv"), index=False)
+	return shard_best_results
+
+
+def _merge_shard_summaries(
+	shard_summaries: List[pd.DataFrame], shard_sizes: List[int], strategies: Dict
+) -> Tuple[pd.DataFrame, int]:
+	"""
+	Merge the node summaries of the shards to the summary of the whole QA data,
+	and select the best module with it.
+	The execution time and the metrics are the average weighted by the shard sizes,
+	so they are the same as the average of the whole QA data.
+	The metric of the module that is not evaluated at any shard is NaN.
+	The rows of the shards are matched by the module name and the module params,
+	and every shard must have the same modules.
+	"""
+	summary_df = shard_summaries[0].copy()
+	module_keys = _summary_module_keys(summary_df)
+	if len(set(module_keys)) != len(module_keys):
+		raise ValueError("The modules of the shard summary must be unique.")
+	aligned_summaries = []
+	for i, shard_summary in enumerate(shard_summaries):
+		shard_keys = _summary_module_keys(shard_summary)
+		if sorted(shard_keys) != sorted(module_keys):
+			raise ValueError(
+				f"The modules of shard {i} are different from the modules of shard 0."
+			)
+		aligned_summaries.append(
+			shard_summary.set_axis(shard_keys, axis=0).loc[module_keys]
+		)
+	metric_columns = _summary_metric_columns(summary_df)
+	weights = np.asarray(shard_sizes, dtype=float)
+	token_columns = [
+		column for column in _SUMMARY_TOKEN_COLUMNS if column in summary_df.columns
+	]
+	for column in ["execution_time"] + token_columns + metric_columns:
+		values = np.stack(
+			list(map(lambda x: x[column].to_numpy(dtype=float), aligned_summaries))
+		)
+		summary_df[column] = (values * weights[:, None]).sum(axis=0) / weights.sum()
+
+	best_index = select_top_modules(summary_df, strategies, 1)[0]
+	summary_df["is_best"] = summary_df.index == best_index
+	return summary_df, best_index
+
+
+def _summary_module_keys(summary_df: pd.DataFrame) -> List[str]:
+	return list(
+		map(
+			lambda x: f"{x[0]}{x[1]}",
+			zip(summary_df["module_name"], summary_df["module_params"]),
+		)
+	)
+
+
+def _summary_metric_columns(summary_df: pd.DataFrame) -> List[str]:
+	return [
+		column
+		for column in summary_df.columns
+		if column not in _SUMMARY_INFO_COLUMNS + _SUMMARY_TOKEN_COLUMNS
+		and pd.api.types.is_numeric_dtype(summary_df[column])
+	]
+
+
+def select_top_modules(
+	summary_df: pd.DataFrame, strategies: Dict, top_k: int
+) -> List[int]:
+	"""
+	Select the top modules from the node summary with the node strategies.
+	The modules over the speed threshold are filtered first,
+	and the best module among the rest is selected one by one with the node's selection strategy.
+	When every module is over the threshold, every module is kept.
+
+	:param summary_df: The node summary dataframe.
+	:param strategies: The node strategies. It uses 'speed_threshold' and 'strategy'.
+	:param top_k: The number of the modules to select.
+	:return: The row positions of the selected modules in the order of selection.
+	"""
+	metric_columns = _summary_metric_columns(summary_df)
+	candidates = list(range(len(summary_df)))
+	if strategies.get("speed_threshold") is not None:
+		_, filtered = filter_by_threshold(
+			candidates,
+			summary_df["execution_time"].iloc[candidates].tolist(),
+			strategies["speed_threshold"],
+			candidates,
+		)
+		candidates = list(filtered) if filtered else candidates
+	token_columns = [
+		column for column in _SUMMARY_TOKEN_COLUMNS if column in summary_df.columns
+	]
+	if strategies.get("token_threshold") is not None and token_columns:
+		_, filtered = filter_by_threshold(
+			candidates,
+			summary_df[token_columns[0]].iloc[candidates].tolist(),
+			strategies["token_threshold"],
+			candidates,
+		)
+		candidates = list(filtered) if filtered else candidates
+	if not metric_columns:
+		return candidates[:top_k]
+	evaluated = [
+		index
+		for index in candidates
+		if not summary_df[metric_columns].iloc[index].isna().any()
+	]
+	candidates = evaluated if evaluated else candidates
+
+	selected = []
+	while candidates and len(selected) < top_k:
+		_, best_index = select_best(
+			list(
+				map(lambda index: summary_df[metric_columns].iloc[[index]], candidates)
+			),
+			metric_columns,
+			candidates,
+			strategies.get("strategy", "mean"),
+		)
+		selected.append(best_index)
+		candidates.remove(best_index)
+	return selected
+
+
+def _merge_parquet_files(paths: List[str], save_path: str):
+	"""
+	Write the parquet files to one parquet file, one file at a time.
+	The missing files are skipped.
+	"""
+	writer = None
+	try:
+		for path in paths:
+			if not os.path.exists(path):
+				continue
+			table = pq.read_table(path)
+			if writer is None:
+				writer = pq.ParquetWriter(save_path, table.schema)
+			elif not table.schema.equals(writer.schema):
+				table = table.select(writer.schema.names).cast(writer.schema)
+			writer.write_table(table)
+			del table
+	finally:
+		if writer is not None:
+			writer.close()
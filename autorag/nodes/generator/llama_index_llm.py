@@ -21,6 +21,8 @@ logger = logging.getLogger("AutoRAG")
 
 
 class LlamaIndexLLM(BaseGenerator):
+	resource_tag = "api"
+
 	def __init__(self, project_dir: str, llm: str, batch: int = 16, *args, **kwargs):
 		"""
 		Initialize the Llama Index LLM module.
@@ -69,6 +69,8 @@ MAX_TOKEN_DICT = {  # model name : token limit
 
 
 class OpenAILLM(BaseGenerator):
+	resource_tag = "api"
+
 	def __init__(self, project_dir, llm: str, batch: int = 16, *args, **kwargs):
 		super().__init__(project_dir, llm, *args, **kwargs)
 		assert batch > 0, "batch size must be greater than 0."
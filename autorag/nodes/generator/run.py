@@ -7,7 +7,7 @@ import pandas as pd
 from autorag.evaluation import evaluate_generation
 from autorag.evaluation.util import cast_metrics
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
 from autorag.utils.util import to_list
 
 
@@ -44,16 +44,12 @@ def run_generator_node(
 	if "generation_gt" not in qa_data.columns:
 		raise ValueError("You must have 'generation_gt' column in qa.parquet.")
 
-	results, execution_times = zip(
-		*map(
-			lambda x: measure_speed(
-				x[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**x[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
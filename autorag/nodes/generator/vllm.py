@@ -10,6 +10,8 @@ from autorag.utils.util import pop_params, to_list, is_chat_prompt
 
 
 class Vllm(BaseGenerator):
+	resource_tag = "gpu"
+
 	def __init__(self, project_dir: str, llm: str, **kwargs):
 		super().__init__(project_dir, llm, **kwargs)
 		try:
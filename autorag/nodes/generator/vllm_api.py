@@ -15,6 +15,8 @@ DEFAULT_MAX_TOKENS = 4096  # Default token limit
 
 
 class VllmAPI(BaseGenerator):
+	resource_tag = "api"
+
 	def __init__(
 		self,
 		project_dir,
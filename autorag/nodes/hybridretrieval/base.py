@@ -1,11 +1,17 @@
 import abc
+import itertools
+from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
 from autorag.nodes.retrieval.base import BaseRetrieval
 from autorag.utils import result_to_dataframe
 from autorag.utils.util import pop_params, fetch_contents
 
+# the maximum number of fused scores that are computed at once in the weight sweep
+FUSION_CHUNK_ELEMENTS = 16_000_000
+
 
 class HybridRetrieval(BaseRetrieval, metaclass=abc.ABCMeta):
 	def __init__(self, project_dir: str, *args, **kwargs):
@@ -16,7 +22,7 @@ class HybridRetrieval(BaseRetrieval, metaclass=abc.ABCMeta):
 		previous_info = self.cast_to_run(previous_result, *args, **kwargs)
 		_pure_params = pop_params(self._pure, kwargs)
 		ids, scores = self._pure(previous_info, **_pure_params)
-		contents = fetch_contents(self.corpus_df, ids)
+		contents = fetch_contents(self.corpus_index, ids)
 		return contents, ids, scores
 
 	def cast_to_run(self, previous_result: pd.DataFrame, *args, **kwargs):
@@ -56,3 +62,157 @@ def hybrid_cast(
 		"retrieved_ids_semantic": ids_semantic,
 		"retrieved_ids_lexical": ids_lexical,
 	}
+
+
+def _flatten_rows(lists: List[List]) -> Tuple[np.ndarray, np.ndarray, List]:
+	"""
+	Flatten the 2-d list to the row index, the position in the row and the flatten values.
+	"""
+	lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+	rows = np.repeat(np.arange(len(lists), dtype=np.int64), lengths)
+	positions = np.arange(len(rows), dtype=np.int64) - np.repeat(
+		np.cumsum(lengths) - lengths, lengths
+	)
+	return rows, positions, list(itertools.chain.from_iterable(lists))
+
+
+def pad_scores(scores: List[List[float]]) -> np.ndarray:
+	"""
+	Make the 2-d score list to the 2-d numpy array.
+	The short rows are padded with NaN.
+	"""
+	rows, positions, flatten_scores = _flatten_rows(scores)
+	width = int(positions.max()) + 1 if len(positions) > 0 else 0
+	padded = np.full((len(scores), width), np.nan, dtype=np.float64)
+	padded[rows, positions] = np.asarray(flatten_scores, dtype=np.float64)
+	return padded
+
+
+def align_candidates(
+	ids: Tuple[List[List[str]], ...], values: Tuple[np.ndarray, ...]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Align the values of each retrieval result to the union of the retrieved ids of each row.
+	The candidate order is the order of the first appearance, from the first retrieval result to the last.
+	When an id is duplicated in one retrieval result, the last value is used.
+
+	:param ids: The tuple of 2-d retrieved id lists.
+	:param values: The tuple of the padded value arrays of each retrieval result.
+	    Each array has the same shape as its ids (padded to the longest row).
+	:return: The candidate ids array of shape (row count, max candidate count), padded with None,
+	    the aligned values of shape (retrieval result count, row count, max candidate count),
+	    and the boolean array that is False at the padding of the candidates.
+	    The value of the candidate that is not retrieved by the retrieval result is NaN.
+	"""
+	row_count = len(ids[0])
+	flatten = [_flatten_rows(id_lists) for id_lists in ids]
+	rows = np.concatenate([x[0] for x in flatten])
+	positions = np.concatenate([x[1] for x in flatten])
+	results = np.repeat(
+		np.arange(len(ids), dtype=np.int64), [len(x[0]) for x in flatten]
+	)
+	flatten_ids = np.empty(len(rows), dtype=object)
+	flatten_ids[:] = list(itertools.chain.from_iterable(x[2] for x in flatten))
+	id_codes, unique_ids = pd.factorize(flatten_ids)
+
+	# row-major, and the retrieval result order and the position order in the row
+	order = np.argsort(rows, kind="stable")
+	rows, positions, results = rows[order], positions[order], results[order]
+	id_codes = id_codes[order]
+	# the factorize codes follow the first appearance, so the candidates of a row have consecutive codes
+	candidate_codes, _ = pd.factorize(rows * max(len(unique_ids), 1) + id_codes)
+	row_counts = np.bincount(rows, minlength=row_count)
+	row_starts = np.cumsum(row_counts) - row_counts
+	non_empty = row_counts > 0
+	columns = candidate_codes - np.repeat(
+		candidate_codes[row_starts[non_empty]], row_counts[non_empty]
+	)
+
+	width = int(columns.max()) + 1 if len(columns) > 0 else 0
+	candidate_ids = np.full((row_count, width), None, dtype=object)
+	candidate_ids[rows, columns] = unique_ids[id_codes]
+	is_candidate = np.zeros((row_count, width), dtype=bool)
+	is_candidate[rows, columns] = True
+
+	aligned = np.full((len(ids), row_count, width), np.nan, dtype=np.float64)
+	# keep the last value of the duplicated id
+	keys = (results * row_count + rows) * max(width, 1) + columns
+	_, last = np.unique(keys[::-1], return_index=True)
+	keep = len(keys) - 1 - last
+	for result_index, value in enumerate(values):
+		selected = keep[results[keep] == result_index]
+		aligned[result_index, rows[selected], columns[selected]] = value[
+			rows[selected], positions[selected]
+		]
+	return candidate_ids, aligned, is_candidate
+
+
+def descending_argsort(values: np.ndarray) -> np.ndarray:
+	"""
+	Sort the 1-d values in descending order, the same as `pd.Series.sort_values(ascending=False)`.
+	Pandas sorts the reversed values with the quicksort and reverses the result,
+	so the order of the tie follows the numpy quicksort instead of the value positions.
+	NaN goes last.
+
+	:param values: The 1-d value array.
+	:return: The positions of the values sorted in descending order.
+	"""
+	is_nan = np.isnan(values)
+	positions = np.arange(len(values))
+	non_nan_positions = positions[~is_nan][::-1]
+	order = non_nan_positions[values[~is_nan][::-1].argsort(kind="quicksort")][::-1]
+	return np.concatenate([order, positions[is_nan]])
+
+
+def fused_top_k(
+	fused_scores: np.ndarray, is_candidate: np.ndarray, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Select top_k candidates of each row by the fused score.
+	The tie is ordered the same as the pandas descending sort of the candidates, like the per-query fusion.
+
+	:param fused_scores: The fused scores of shape (weight count, row count, candidate count).
+	:param is_candidate: The boolean array of shape (row count, candidate count).
+	    The padding of the candidates is False.
+	:param top_k: The number of passages to be retrieved.
+	:return: The candidate positions of shape (weight count, row count, top_k) sorted by the fused score,
+	    and its fused scores. The empty slot of the positions is -1 and its score is 0.
+	"""
+	fused_scores = np.where(is_candidate[None], fused_scores, np.nan)
+	# descending sort, and NaN (not a candidate) goes last
+	order = np.argsort(-fused_scores, axis=-1, kind="stable")
+	sorted_scores = np.take_along_axis(fused_scores, order, axis=-1)
+	# only the rows with the tied scores depend on the tie order, so only they are sorted again
+	has_tie = (sorted_scores[..., 1:] == sorted_scores[..., :-1]).any(axis=-1)
+	for weight_index, row in zip(*np.nonzero(has_tie)):
+		candidate_count = int(is_candidate[row].sum())
+		order[weight_index, row, :candidate_count] = descending_argsort(
+			fused_scores[weight_index, row, :candidate_count]
+		)
+	order = order[..., :top_k]
+	top_scores = np.take_along_axis(fused_scores, order, axis=-1)
+	ranking = np.where(np.isnan(top_scores), -1, order)
+	return ranking, np.nan_to_num(top_scores, nan=0.0)
+
+
+def fusion_to_lists(
+	candidate_ids: np.ndarray, ranking: np.ndarray, fused_scores: np.ndarray
+) -> Tuple[List[List[str]], List[List[float]]]:
+	"""
+	Convert the fused ranking of one weight to the 2-d id and score lists.
+
+	:param candidate_ids: The candidate ids array of shape (row count, candidate count).
+	:param ranking: The candidate positions of shape (row count, top_k), sorted by the fused score.
+	    The empty slot is -1.
+	:param fused_scores: The fused scores of shape (row count, top_k).
+	:return: The 2-d list of the retrieved ids and the 2-d list of its scores.
+	"""
+	id_result = np.take_along_axis(
+		candidate_ids, np.maximum(ranking, 0), axis=-1
+	).tolist()
+	score_result = fused_scores.tolist()
+	lengths = (ranking >= 0).sum(axis=-1)
+	for row in np.flatnonzero(lengths < ranking.shape[-1]):
+		id_result[row] = id_result[row][: lengths[row]]
+		score_result[row] = score_result[row][: lengths[row]]
+	return id_result, score_result
@@ -4,38 +4,47 @@ from typing import Tuple, List, Union
 import numpy as np
 import pandas as pd
 
-from autorag.nodes.hybridretrieval.base import HybridRetrieval
-from autorag.nodes.hybridretrieval.run import evaluate_retrieval_node
-from autorag.strategy import select_best
+from autorag.nodes.hybridretrieval.base import (
+	HybridRetrieval,
+	FUSION_CHUNK_ELEMENTS,
+	pad_scores,
+	align_candidates,
+	fused_top_k,
+	fusion_to_lists,
+)
+from autorag.nodes.hybridretrieval.run import select_best_fusion_weight
+
+# The normalize functions normalize the last axis, so they work for one score list
+# and for the padded 2-d score array (the padding is NaN) as well.
 
 
 def normalize_mm(scores: List[str], fixed_min_value: float = 0):
-	arr = np.array(scores)
-	max_value = np.max(arr)
-	min_value = np.min(arr)
+	arr = np.array(scores, dtype=np.float64)
+	max_value = np.nanmax(arr, axis=-1, keepdims=True)
+	min_value = np.nanmin(arr, axis=-1, keepdims=True)
 	norm_score = (arr - min_value) / (max_value - min_value)
 	return norm_score
 
 
 def normalize_tmm(scores: List[str], fixed_min_value: float):
-	arr = np.array(scores)
-	max_value = np.max(arr)
+	arr = np.array(scores, dtype=np.float64)
+	max_value = np.nanmax(arr, axis=-1, keepdims=True)
 	norm_score = (arr - fixed_min_value) / (max_value - fixed_min_value)
 	return norm_score
 
 
 def normalize_z(scores: List[str], fixed_min_value: float = 0):
-	arr = np.array(scores)
-	mean_value = np.mean(arr)
-	std_value = np.std(arr)
+	arr = np.array(scores, dtype=np.float64)
+	mean_value = np.nanmean(arr, axis=-1, keepdims=True)
+	std_value = np.nanstd(arr, axis=-1, keepdims=True)
 	norm_score = (arr - mean_value) / std_value
 	return norm_score
 
 
 def normalize_dbsf(scores: List[str], fixed_min_value: float = 0):
-	arr = np.array(scores)
-	mean_value = np.mean(arr)
-	std_value = np.std(arr)
+	arr = np.array(scores, dtype=np.float64)
+	mean_value = np.nanmean(arr, axis=-1, keepdims=True)
+	std_value = np.nanstd(arr, axis=-1, keepdims=True)
 	min_value = mean_value - 3 * std_value
 	max_value = mean_value + 3 * std_value
 	norm_score = (arr - min_value) / (max_value - min_value)
@@ -90,31 +99,29 @@ class HybridCC(HybridRetrieval):
 			weight_range[0], weight_range[1], test_weight_size
 		).tolist()
 
-		result_list = []
-		instance = cls(project_dir, *args, **kwargs)
-		for weight_value in weight_candidates:
-			result_df = instance.pure(previous_result, weight=weight_value, **kwargs)
-			result_list.append(result_df)
-
 		if strategies.get("metrics") is None:
 			raise ValueError("You must at least one metrics for retrieval evaluation.")
-		result_list = list(
-			map(
-				lambda x: evaluate_retrieval_node(
-					x,
-					input_metrics,
-					strategies.get("metrics"),
-				),
-				result_list,
-			)
-		)
 
-		# select best result
-		best_result_df, best_weight = select_best(
-			result_list,
-			strategies.get("metrics"),
-			metadatas=weight_candidates,
-			strategy_name=strategies.get("strategy", "normalize_mean"),
+		instance = cls(project_dir, *args, **kwargs)
+		info = instance.cast_to_run(previous_result)
+		# fuse with every weight at once
+		candidate_ids, rankings, fused_scores = hybrid_cc_sweep(
+			(info["retrieved_ids_semantic"], info["retrieved_ids_lexical"]),
+			(info["retrieve_scores_semantic"], info["retrieve_scores_lexical"]),
+			kwargs["top_k"],
+			weight_candidates,
+			kwargs.get("normalize_method", "mm"),
+			kwargs.get("semantic_theoretical_min_value", -1.0),
+			kwargs.get("lexical_theoretical_min_value", 0.0),
+		)
+		best_result_df, best_weight = select_best_fusion_weight(
+			candidate_ids,
+			rankings,
+			fused_scores,
+			weight_candidates,
+			input_metrics,
+			strategies,
+			instance.corpus_index,
 		)
 		return {
 			"best_result": best_result_df,
@@ -170,33 +177,74 @@ def hybrid_cc(
 	assert weight >= 0, "The weight must be greater than 0."
 	assert weight <= 1, "The weight must be less than 1."
 
-	df = pd.DataFrame(
-		{
-			"semantic_ids": ids[0],
-			"lexical_ids": ids[1],
-			"semantic_score": scores[0],
-			"lexical_score": scores[1],
-		}
+	candidate_ids, rankings, fused_scores = hybrid_cc_sweep(
+		ids,
+		scores,
+		top_k,
+		[weight],
+		normalize_method,
+		semantic_theoretical_min_value,
+		lexical_theoretical_min_value,
 	)
+	return fusion_to_lists(candidate_ids, rankings[0], fused_scores[0])
 
-	def cc_pure_apply(row):
-		return fuse_per_query(
-			row["semantic_ids"],
-			row["lexical_ids"],
-			row["semantic_score"],
-			row["lexical_score"],
-			normalize_method=normalize_method,
-			weight=weight,
-			top_k=top_k,
-			semantic_theoretical_min_value=semantic_theoretical_min_value,
-			lexical_theoretical_min_value=lexical_theoretical_min_value,
-		)
 
-	# fixed weight
-	df[["cc_id", "cc_score"]] = df.apply(
-		lambda row: cc_pure_apply(row), axis=1, result_type="expand"
+def hybrid_cc_sweep(
+	ids: Tuple,
+	scores: Tuple,
+	top_k: int,
+	weights: List[float],
+	normalize_method: str = "mm",
+	semantic_theoretical_min_value: float = -1.0,
+	lexical_theoretical_min_value: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Hybrid CC with every weight at once.
+	The scores of every row are normalized once to the padded arrays,
+	and the fused scores of every weight are computed by one broadcast operation.
+	It is the same as running `hybrid_cc` for each weight.
+
+	:param ids: The tuple of semantic and lexical ids.
+	:param scores: The tuple of semantic and lexical scores.
+	:param top_k: The number of passages to be retrieved.
+	:param weights: The list of the weight values.
+	:param normalize_method: The normalization method to use. Default is mm.
+	:param semantic_theoretical_min_value: This value used by `tmm` normalization method. Default is -1.
+	:param lexical_theoretical_min_value: This value used by `tmm` normalization method. Default is 0.
+	:return: The candidate ids array of shape (row count, candidate count),
+	    the ranking of shape (weight count, row count, top_k), which is the candidate position sorted by the fused score,
+	    and the fused scores of the same shape. The empty slot of the ranking is -1.
+	"""
+	normalize_func = normalize_method_dict[normalize_method]
+	with np.errstate(divide="ignore", invalid="ignore"):
+		norm_semantic_scores = normalize_func(
+			pad_scores(scores[0]), semantic_theoretical_min_value
+		)
+		norm_lexical_scores = normalize_func(
+			pad_scores(scores[1]), lexical_theoretical_min_value
+		)
+	candidate_ids, aligned, is_candidate = align_candidates(
+		(ids[0], ids[1]), (norm_semantic_scores, norm_lexical_scores)
 	)
-	return df["cc_id"].tolist(), df["cc_score"].tolist()
+	# the candidate that is not retrieved by one module has zero score
+	aligned = np.nan_to_num(aligned, nan=0.0, posinf=np.inf, neginf=-np.inf)
+
+	weights = np.asarray(weights, dtype=np.float64)
+	row_count, width = candidate_ids.shape
+	top_k = min(top_k, width)
+	rankings = np.full((len(weights), row_count, top_k), -1, dtype=np.int64)
+	fused_scores = np.zeros((len(weights), row_count, top_k), dtype=np.float64)
+	chunk_size = max(1, FUSION_CHUNK_ELEMENTS // max(1, len(weights) * width))
+	for start in range(0, row_count, chunk_size):
+		end = min(start + chunk_size, row_count)
+		fused = (
+			aligned[0, None, start:end] * weights[:, None, None]
+			+ aligned[1, None, start:end] * (1.0 - weights)[:, None, None]
+		)
+		rankings[:, start:end], fused_scores[:, start:end] = fused_top_k(
+			fused, is_candidate[start:end], top_k
+		)
+	return candidate_ids, rankings, fused_scores
 
 
 def fuse_per_query(
@@ -4,9 +4,15 @@ from typing import List, Tuple, Union
 import numpy as np
 import pandas as pd
 
-from autorag.nodes.hybridretrieval.base import HybridRetrieval
-from autorag.nodes.hybridretrieval.run import evaluate_retrieval_node
-from autorag.strategy import select_best
+from autorag.nodes.hybridretrieval.base import (
+	HybridRetrieval,
+	FUSION_CHUNK_ELEMENTS,
+	pad_scores,
+	align_candidates,
+	fused_top_k,
+	fusion_to_lists,
+)
+from autorag.nodes.hybridretrieval.run import select_best_fusion_weight
 
 
 class HybridRRF(HybridRetrieval):
@@ -39,31 +45,26 @@ class HybridRRF(HybridRetrieval):
 			weight_range[0], weight_range[1], test_weight_size
 		).tolist()
 
-		result_list = []
-		instance = cls(project_dir, *args, **kwargs)
-		for weight_value in weight_candidates:
-			result_df = instance.pure(previous_result, weight=weight_value, **kwargs)
-			result_list.append(result_df)
-
 		if strategies.get("metrics") is None:
 			raise ValueError("You must at least one metrics for retrieval evaluation.")
-		result_list = list(
-			map(
-				lambda x: evaluate_retrieval_node(
-					x,
-					input_metrics,
-					strategies.get("metrics"),
-				),
-				result_list,
-			)
-		)
 
-		# select best result
-		best_result_df, best_weight = select_best(
-			result_list,
-			strategies.get("metrics"),
-			metadatas=weight_candidates,
-			strategy_name=strategies.get("strategy", "normalize_mean"),
+		instance = cls(project_dir, *args, **kwargs)
+		info = instance.cast_to_run(previous_result)
+		# fuse with every weight at once
+		candidate_ids, rankings, fused_scores = hybrid_rrf_sweep(
+			(info["retrieved_ids_semantic"], info["retrieved_ids_lexical"]),
+			(info["retrieve_scores_semantic"], info["retrieve_scores_lexical"]),
+			kwargs["top_k"],
+			list(map(int, weight_candidates)),
+		)
+		best_result_df, best_weight = select_best_fusion_weight(
+			candidate_ids,
+			rankings,
+			fused_scores,
+			weight_candidates,
+			input_metrics,
+			strategies,
+			instance.corpus_index,
 		)
 		return {
 			"best_result": best_result_df,
@@ -112,19 +113,73 @@ def hybrid_rrf(
 	else:
 		weight = int(weight)
 
-	id_df = pd.DataFrame({f"id_{i}": id_list for i, id_list in enumerate(ids)})
-	score_df = pd.DataFrame(
-		{f"score_{i}": score_list for i, score_list in enumerate(scores)}
+	candidate_ids, rankings, fused_scores = hybrid_rrf_sweep(
+		ids, scores, top_k, [weight]
 	)
-	df = pd.concat([id_df, score_df], axis=1)
+	return fusion_to_lists(candidate_ids, rankings[0], fused_scores[0])
 
-	def rrf_pure_apply(row):
-		ids_tuple = tuple(row[[f"id_{i}" for i in range(len(ids))]].values)
-		scores_tuple = tuple(row[[f"score_{i}" for i in range(len(scores))]].values)
-		return pd.Series(rrf_pure(ids_tuple, scores_tuple, weight, top_k))
 
-	df[["rrf_id", "rrf_score"]] = df.apply(rrf_pure_apply, axis=1)
-	return df["rrf_id"].tolist(), df["rrf_score"].tolist()
+def hybrid_rrf_sweep(
+	ids: Tuple, scores: Tuple, top_k: int, weights: List[int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Hybrid RRF with every weight (rrf_k) at once, for any number of retrieval results.
+	The ranks of every row are computed once on the padded arrays,
+	and the RRF scores of every weight are computed by one broadcast operation.
+	It is the same as running `hybrid_rrf` for each weight.
+
+	:param ids: The tuple of ids that you want to fuse.
+	:param scores: The tuple of scores that you want to fuse.
+	:param top_k: The number of passages to be retrieved.
+	:param weights: The list of rrf_k values.
+	:return: The candidate ids array of shape (row count, candidate count),
+	    the ranking of shape (weight count, row count, top_k), which is the candidate position sorted by the RRF score,
+	    and the RRF scores of the same shape. The empty slot of the ranking is -1.
+	"""
+	candidate_ids, aligned, is_candidate = align_candidates(
+		tuple(ids), tuple(map(pad_scores, scores))
+	)
+	ranks = rank_min_descending(aligned)
+
+	weights = np.asarray(weights, dtype=np.float64)
+	row_count, width = candidate_ids.shape
+	top_k = min(top_k, width)
+	rankings = np.full((len(weights), row_count, top_k), -1, dtype=np.int64)
+	fused_scores = np.zeros((len(weights), row_count, top_k), dtype=np.float64)
+	chunk_size = max(1, FUSION_CHUNK_ELEMENTS // max(1, len(weights) * width))
+	for start in range(0, row_count, chunk_size):
+		end = min(start + chunk_size, row_count)
+		fused = np.zeros((len(weights), end - start, width), dtype=np.float64)
+		# summed in the retrieval result order, the same as rrf_calculate
+		for result_ranks in ranks[:, start:end]:
+			with np.errstate(divide="ignore"):
+				reciprocal = 1 / (result_ranks[None] + weights[:, None, None])
+			fused += np.where(result_ranks[None] > 0, reciprocal, 0.0)
+		rankings[:, start:end], fused_scores[:, start:end] = fused_top_k(
+			fused, is_candidate[start:end], top_k
+		)
+	return candidate_ids, rankings, fused_scores
+
+
+def rank_min_descending(values: np.ndarray) -> np.ndarray:
+	"""
+	Rank the values of the last axis in descending order.
+	The tie gets the minimum rank, the same as `pd.DataFrame.rank(ascending=False, method="min")`.
+
+	:param values: The value array. NaN is not ranked.
+	:return: The rank array of the same shape. The rank starts from 1, and the rank of NaN is 0.
+	"""
+	order = np.argsort(-values, axis=-1, kind="stable")
+	sorted_values = np.take_along_axis(values, order, axis=-1)
+	positions = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+	is_new = np.ones(values.shape, dtype=bool)
+	is_new[..., 1:] = sorted_values[..., 1:] != sorted_values[..., :-1]
+	# the rank of the tie is the position of its first value
+	sorted_ranks = np.maximum.accumulate(np.where(is_new, positions, 0), axis=-1) + 1
+	ranks = np.empty(values.shape, dtype=np.float64)
+	np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+	ranks[np.isnan(values)] = 0.0
+	return ranks
 
 
 def rrf_pure(
@@ -1,15 +1,23 @@
+import dataclasses
 import os
 import pathlib
-from typing import List, Dict, Union
+import warnings
+from typing import List, Dict, Union, Tuple
 
+import numpy as np
 import pandas as pd
 
 from autorag.evaluation import evaluate_retrieval
-from autorag.evaluation.retrieval import RETRIEVAL_METRIC_FUNC_DICT
+from autorag.evaluation.retrieval import (
+	RETRIEVAL_METRIC_FUNC_DICT,
+	compute_retrieval_metrics,
+)
+from autorag.nodes.hybridretrieval.base import fusion_to_lists
 from autorag.nodes.retrieval.run_util import save_and_summary, find_best
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed
-from autorag.utils.util import apply_recursive, to_list
+from autorag.strategy import measure_speed, select_best
+from autorag.utils.corpus import CorpusIndex
+from autorag.utils.util import apply_recursive, to_list, fetch_contents
 
 
 def run_hybrid_retrieval_node(
@@ -135,3 +143,94 @@ def evaluate_retrieval_node(
 		)
 
 	return evaluate_this_module(result_df)
+
+
+def select_best_fusion_weight(
+	candidate_ids: np.ndarray,
+	rankings: np.ndarray,
+	fused_scores: np.ndarray,
+	weight_candidates: List[float],
+	input_metrics: List[MetricInput],
+	strategies: Dict,
+	corpus_index: CorpusIndex,
+) -> Tuple[pd.DataFrame, float]:
+	"""
+	Select the best weight of the hybrid retrieval from the fused rankings of every weight.
+	The retrieval metrics of a row only depend on its retrieved ids,
+	so each distinct (row, ranking) pair is evaluated once, and the metrics are shared by every weight that has it.
+	It is the same as evaluating the result of each weight with `evaluate_retrieval_node` and selecting the best.
+
+	:param candidate_ids: The candidate ids array of shape (row count, candidate count).
+	:param rankings: The candidate positions sorted by the fused score of shape (weight count, row count, top_k).
+	    The empty slot is -1.
+	:param fused_scores: The fused scores of the same shape as the rankings.
+	:param weight_candidates: The weight value of each ranking.
+	:param input_metrics: List of metric input schema for AutoRAG.
+	:param strategies: The strategies of the node. It must have 'metrics'.
+	:param corpus_index: The corpus index to fetch the contents of the best result.
+	:return: The best result dataframe with the metric columns and the best weight.
+	"""
+	weight_count, row_count, top_k = rankings.shape
+	metrics = strategies.get("metrics")
+	evaluated_rows = min(row_count, len(input_metrics))
+
+	# find the distinct (row, ranking) pairs
+	keys = np.concatenate(
+		[
+			np.broadcast_to(
+				np.arange(row_count, dtype=np.int64)[None, :, None],
+				(weight_count, row_count, 1),
+			),
+			rankings,
+		],
+		axis=-1,
+	).reshape(-1, top_k + 1)
+	unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+	inverse = inverse.reshape(weight_count, row_count)
+	unique_rows = unique_keys[:, 0]
+
+	unique_metric_inputs = []
+	for row, ranking in zip(unique_rows, unique_keys[:, 1:]):
+		if row >= evaluated_rows:
+			continue
+		unique_metric_inputs.append(
+			dataclasses.replace(
+				input_metrics[row],
+				retrieved_ids=candidate_ids[row, ranking[ranking >= 0]].tolist(),
+			)
+		)
+
+	metric_columns = {}
+	with warnings.catch_warnings():
+		warnings.simplefilter("ignore")
+		metric_scores = compute_retrieval_metrics(unique_metric_inputs, metrics)
+	for metric_name, scores in metric_scores.items():
+		values = np.full(len(unique_keys), np.nan, dtype=np.float64)
+		values[unique_rows < evaluated_rows] = np.asarray(scores, dtype=np.float64)
+		metric_columns[metric_name] = values[inverse]
+
+	metric_results = [
+		pd.DataFrame(
+			{name: values[weight_index] for name, values in metric_columns.items()}
+		)
+		for weight_index in range(weight_count)
+	]
+	_, best_index = select_best(
+		metric_results,
+		metrics,
+		metadatas=list(range(weight_count)),
+		strategy_name=strategies.get("strategy", "normalize_mean"),
+	)
+
+	ids, scores = fusion_to_lists(
+		candidate_ids, rankings[best_index], fused_scores[best_index]
+	)
+	best_result_df = pd.DataFrame(
+		{
+			"retrieved_contents": fetch_contents(corpus_index, ids),
+			"retrieved_ids": ids,
+			"retrieve_scores": scores,
+		}
+	)
+	best_result_df = evaluate_retrieval_node(best_result_df, input_metrics, metrics)
+	return best_result_df, weight_candidates[best_index]
@@ -1,29 +1,54 @@
-import asyncio
+import itertools
+import logging
 import os
 import pickle
 import re
-from typing import List, Dict, Tuple, Callable, Union, Iterable, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Callable, Union, Iterable, Optional, Any
 
-import numpy as np
 import pandas as pd
 from llama_index.core.indices.keyword_table.utils import simple_extract_keywords
 from nltk import PorterStemmer
-from rank_bm25 import BM25Okapi
 from transformers import AutoTokenizer, PreTrainedTokenizerBase
 
+from autorag.nodes.lexicalretrieval.bm25_index import BM25Index, SegmentedBM25Index
 from autorag.nodes.retrieval.base import (
 	evenly_distribute_passages,
 	BaseRetrieval,
 	get_bm25_pkl_name,
+	get_bm25_index_dir_name,
 )
 from autorag.utils import validate_corpus_dataset, fetch_contents
 from autorag.utils.util import (
-	get_event_loop,
 	normalize_string,
 	result_to_dataframe,
 	pop_params,
+	reconstruct_list,
 )
 
+logger = logging.getLogger("AutoRAG")
+
+# the trailing small segments are merged when the index has more segments than this
+BM25_MAX_SEGMENTS = 16
+# the number of texts that one worker process tokenizes at once
+BM25_TOKENIZE_CHUNK_SIZE = 10_000
+# the number of tokenized queries that are kept in the query cache
+BM25_QUERY_CACHE_SIZE = 10_000
+
+# analyzer name -> analyzer instance, which is created once per process
+_bm25_analyzers: Dict[str, Any] = {}
+_bm25_analyzers_lock = threading.Lock()
+
+
+def _get_analyzer(name: str, factory: Callable[[], Any]) -> Any:
+	with _bm25_analyzers_lock:
+		if name not in _bm25_analyzers:
+			_bm25_analyzers[name] = factory()
+		return _bm25_analyzers[name]
+
 
 def tokenize_ko_kiwi(texts: List[str]) -> List[List[str]]:
 	try:
@@ -35,7 +60,7 @@ def tokenize_ko_kiwi(texts: List[str]) -> List[List[str]]:
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
 	texts = list(map(lambda x: x.strip().lower(), texts))
-	kiwi = Kiwi()
+	kiwi = _get_analyzer("kiwi", Kiwi)
 	tokenized_list: Iterable[List[Token]] = kiwi.tokenize(texts)
 
 	def extract_form_safe(x):
@@ -59,7 +84,7 @@ def tokenize_ko_kkma(texts: List[str]) -> List[List[str]]:
 			"Please install konlpy by running 'pip install konlpy'. "
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
-	tokenizer = Kkma()
+	tokenizer = _get_analyzer("kkma", Kkma)
 	tokenized_list: List[List[str]] = list(map(lambda x: tokenizer.morphs(x), texts))
 	return tokenized_list
 
@@ -73,7 +98,7 @@ def tokenize_ko_okt(texts: List[str]) -> List[List[str]]:
 			"Please install konlpy by running 'pip install konlpy'. "
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
-	tokenizer = Okt()
+	tokenizer = _get_analyzer("okt", Okt)
 	tokenized_list: List[List[str]] = list(map(lambda x: tokenizer.morphs(x), texts))
 	return tokenized_list
 
@@ -84,7 +109,7 @@ def tokenize_porter_stemmer(texts: List[str]) -> List[List[str]]:
 		words = list(simple_extract_keywords(text))
 		return [stemmer.stem(word) for word in words]
 
-	stemmer = PorterStemmer()
+	stemmer = _get_analyzer("porter_stemmer", PorterStemmer)
 	tokenized_list: List[List[str]] = list(
 		map(lambda x: tokenize_remove_stopword(x, stemmer), texts)
 	)
@@ -117,7 +142,9 @@ def tokenize_ja_sudachipy(texts: List[str]) -> List[List[str]]:
 		)
 
 	# Initialize SudachiPy with the default tokenizer
-	tokenizer_obj = dictionary.Dictionary(dict="core").create()
+	tokenizer_obj = _get_analyzer(
+		"sudachipy", lambda: dictionary.Dictionary(dict="core").create()
+	)
 
 	# Choose the tokenizer mode: NORMAL, SEARCH, A
 	mode = tokenizer.Tokenizer.SplitMode.A
@@ -160,25 +187,12 @@ class BM25(BaseRetrieval):
 		bm25_tokenizer = kwargs.get("bm25_tokenizer", None)
 		if bm25_tokenizer is None:
 			bm25_tokenizer = "porter_stemmer"
-		bm25_path = os.path.join(self.resources_dir, get_bm25_pkl_name(bm25_tokenizer))
-
-		assert bm25_path is not None, (
-			"bm25_path must be specified for using bm25 retrieval."
-		)
-		assert os.path.exists(bm25_path), (
-			f"bm25_path {bm25_path} does not exist. Please ingest first."
-		)
-
-		self.bm25_corpus = load_bm25_corpus(bm25_path)
-		assert "tokens" and "passage_id" in list(self.bm25_corpus.keys()), (
-			"bm25_corpus must contain tokens and passage_id. Please check you ingested bm25 corpus correctly."
-		)
-		self.tokenizer = select_bm25_tokenizer(bm25_tokenizer)
-		assert self.bm25_corpus["tokenizer_name"] == bm25_tokenizer, (
-			f"The bm25 corpus tokenizer is {self.bm25_corpus['tokenizer_name']}, but your input is {bm25_tokenizer}. "
-			f"You need to ingest again. Delete bm25 pkl file and re-ingest it."
+		self.tokenizer = get_bm25_tokenizer_service(bm25_tokenizer)
+		self.bm25_instance = load_bm25_index(self.resources_dir, bm25_tokenizer)
+		assert self.bm25_instance.tokenizer_name == bm25_tokenizer, (
+			f"The bm25 corpus tokenizer is {self.bm25_instance.tokenizer_name}, but your input is {bm25_tokenizer}. "
+			f"You need to ingest again. Delete bm25 index directory and re-ingest it."
 		)
-		self.bm25_instance = BM25Okapi(self.bm25_corpus["tokens"])
 
 	@result_to_dataframe(
 		[
@@ -191,7 +205,7 @@ class BM25(BaseRetrieval):
 		queries = self.cast_to_run(previous_result)
 		pure_params = pop_params(self._pure, kwargs)
 		ids, scores = self._pure(queries, *args, **pure_params)
-		contents = fetch_contents(self.corpus_df, ids)
+		contents = fetch_contents(self.corpus_index, ids)
 		return contents, ids, scores
 
 	def _pure(
@@ -199,6 +213,8 @@ class BM25(BaseRetrieval):
 		queries: List[List[str]],
 		top_k: int,
 		ids: Optional[List[List[str]]] = None,
+		query_fusion: Optional[str] = None,
+		rrf_k: int = 60,
 	) -> Tuple[List[List[str]], List[List[float]]]:
 		"""
 		BM25 retrieval function.
@@ -210,6 +226,10 @@ class BM25(BaseRetrieval):
 		:param ids: The optional list of ids that you want to retrieve.
 		    You don't need to specify this in the general use cases.
 		    Default is None.
+		:param query_fusion: The fusion method of the scores of the queries in the same row.
+		    It can be 'max', 'sum' or 'rrf'.
+		    Default is None, which distributes top_k evenly to the result of each query.
+		:param rrf_k: The rank constant of the 'rrf' query fusion. Default is 60.
 		:return: The 2-d list contains a list of passage ids that retrieved from bm25 and 2-d list of its scores.
 		    It will be a length of queries. And each element has a length of top_k.
 		"""
@@ -221,7 +241,6 @@ class BM25(BaseRetrieval):
 						id_list,
 						self.tokenizer,
 						self.bm25_instance,
-						self.bm25_corpus,
 					),
 					queries,
 					ids,
@@ -229,147 +248,226 @@ class BM25(BaseRetrieval):
 			)
 			return ids, score_result
 
-		# run async bm25_pure function
-		tasks = [
-			bm25_pure(
-				input_queries,
-				top_k,
-				self.tokenizer,
-				self.bm25_instance,
-				self.bm25_corpus,
-			)
-			for input_queries in queries
-		]
-		loop = get_event_loop()
-		results = loop.run_until_complete(asyncio.gather(*tasks))
-		id_result = list(map(lambda x: x[0], results))
-		score_result = list(map(lambda x: x[1], results))
-		return id_result, score_result
+		return bm25_pure(
+			queries,
+			top_k,
+			self.tokenizer,
+			self.bm25_instance,
+			query_fusion=query_fusion,
+			rrf_k=rrf_k,
+		)
 
 
-async def bm25_pure(
-	queries: List[str], top_k: int, tokenizer, bm25_api: BM25Okapi, bm25_corpus: Dict
-) -> Tuple[List[str], List[float]]:
+def bm25_pure(
+	queries: List[List[str]],
+	top_k: int,
+	tokenizer,
+	bm25_index: Union[BM25Index, SegmentedBM25Index],
+	query_fusion: Optional[str] = None,
+	rrf_k: int = 60,
+) -> Tuple[List[List[str]], List[List[float]]]:
 	"""
-	Async BM25 retrieval function.
-	Its usage is for async retrieval of bm25 row by row.
+	BM25 retrieval function.
+	It tokenizes and scores all queries of all rows at once with the sparse BM25 index.
 
-	:param queries: A list of query strings.
+	:param queries: 2-d list of query strings.
+	    Each element of the list is a query strings of each row.
 	:param top_k: The number of passages to be retrieved.
 	:param tokenizer: A tokenizer that will be used to tokenize queries.
-	:param bm25_api: A bm25 api instance that will be used to retrieve passages.
-	:param bm25_corpus: A dictionary containing the bm25 corpus, which is doc_id from corpus and tokenized corpus.
-	    Its data structure looks like this:
-
-	    .. Code:: python
-
-	        {
-	            "tokens": [], # 2d list of tokens
-	            "passage_id": [], # 2d list of passage_id. Type must be str.
-	        }
-	:return: The tuple contains a list of passage ids that retrieved from bm25 and its scores.
+	:param bm25_index: A BM25 index instance that will be used to retrieve passages.
+	:param query_fusion: The fusion method of the scores of the queries in the same row.
+	    'max', 'sum' or 'rrf' fuses the scores of the queries and retrieves top_k passages by the fused score.
+	    Default is None, which retrieves top_k passages for each query and distributes top_k evenly.
+	:param rrf_k: The rank constant of the 'rrf' query fusion. Default is 60.
+	:return: The 2-d list of passage ids that retrieved from bm25 and 2-d list of its scores.
 	"""
-	# I don't make queries operation to async, because queries length might be small, so it will occur overhead.
-	tokenized_queries = tokenize(queries, tokenizer)
-	id_result = []
-	score_result = []
-	for query in tokenized_queries:
-		scores = bm25_api.get_scores(query)
-		sorted_scores = sorted(scores, reverse=True)
-		top_n_index = np.argsort(scores)[::-1][:top_k]
-		ids = [bm25_corpus["passage_id"][i] for i in top_n_index]
-		id_result.append(ids)
-		score_result.append(sorted_scores[:top_k])
-
-	# make a total result to top_k
-	id_result, score_result = evenly_distribute_passages(id_result, score_result, top_k)
-	# sort id_result and score_result by score
-	result = [
-		(_id, score)
-		for score, _id in sorted(
-			zip(score_result, id_result), key=lambda pair: pair[0], reverse=True
+	query_lengths = list(map(len, queries))
+	flatten_queries = list(itertools.chain.from_iterable(queries))
+	tokenized_queries = tokenize(flatten_queries, tokenizer)
+	if query_fusion is not None:
+		return bm25_index.fused_top_k(
+			tokenized_queries, query_lengths, top_k, fusion=query_fusion, rrf_k=rrf_k
 		)
-	]
-	id_result, score_result = zip(*result)
-	return list(id_result), list(score_result)
+
+	flatten_ids, flatten_scores = bm25_index.top_k(tokenized_queries, top_k)
+	row_ids = reconstruct_list(flatten_ids, query_lengths)
+	row_scores = reconstruct_list(flatten_scores, query_lengths)
+
+	id_result, score_result = [], []
+	for ids, scores in zip(row_ids, row_scores):
+		# make a total result to top_k
+		ids, scores = evenly_distribute_passages(ids, scores, top_k)
+		# sort ids and scores by score
+		result = [
+			(_id, score)
+			for score, _id in sorted(
+				zip(scores, ids), key=lambda pair: pair[0], reverse=True
+			)
+		]
+		ids, scores = zip(*result)
+		id_result.append(list(ids))
+		score_result.append(list(scores))
+	return id_result, score_result
 
 
 def get_bm25_scores(
 	queries: List[str],
 	ids: List[str],
 	tokenizer,
-	bm25_api: BM25Okapi,
-	bm25_corpus: Dict,
+	bm25_index: Union[BM25Index, SegmentedBM25Index],
 ) -> List[float]:
 	if len(ids) == 0 or not bool(ids):
 		return []
 	tokenized_queries = tokenize(queries, tokenizer)
-	result_dict = {id_: [] for id_ in ids}
-	for query in tokenized_queries:
-		scores = bm25_api.get_scores(query)
-		for i, id_ in enumerate(ids):
-			result_dict[id_].append(scores[bm25_corpus["passage_id"].index(id_)])
-	result_df = pd.DataFrame(result_dict)
-	return result_df.max(axis=0).tolist()
+	scores = bm25_index.get_passage_scores(tokenized_queries, ids)
+	return scores.max(axis=0).tolist()
 
 
 def tokenize(queries: List[str], tokenizer) -> List[List[int]]:
-	if isinstance(tokenizer, PreTrainedTokenizerBase):
+	if isinstance(tokenizer, BM25TokenizerService):
+		tokenized_queries = tokenizer.tokenize_queries(queries)
+	elif isinstance(tokenizer, PreTrainedTokenizerBase):
 		tokenized_queries = tokenizer(queries).input_ids
 	else:
 		tokenized_queries = tokenizer(queries)
 	return tokenized_queries
 
 
+def load_bm25_index(resources_dir: str, bm25_tokenizer: str) -> SegmentedBM25Index:
+	"""
+	Open the BM25 index of the given tokenizer from the resources directory.
+	The index directory is memory-mapped.
+	If there is only the legacy bm25 pickle file, it builds the index in memory from the pickle.
+
+	:param resources_dir: The resources directory of the project.
+	:param bm25_tokenizer: The tokenizer name that is used to the BM25.
+	:return: The SegmentedBM25Index instance.
+	"""
+	index_dir = os.path.join(resources_dir, get_bm25_index_dir_name(bm25_tokenizer))
+	if os.path.exists(index_dir):
+		return SegmentedBM25Index.load(index_dir)
+
+	bm25_path = os.path.join(resources_dir, get_bm25_pkl_name(bm25_tokenizer))
+	assert os.path.exists(bm25_path), (
+		f"bm25 index {index_dir} does not exist. Please ingest first."
+	)
+	logger.warning(
+		f"Loading legacy bm25 pickle file {bm25_path}. "
+		f"Ingest the corpus again to make the memory-mapped bm25 index at {index_dir}."
+	)
+	return SegmentedBM25Index([load_legacy_bm25_index(bm25_path)])
+
+
+def load_legacy_bm25_index(bm25_path: str) -> BM25Index:
+	"""
+	Build the BM25 index in memory from the legacy bm25 pickle file.
+	"""
+	bm25_corpus = load_bm25_corpus(bm25_path)
+	assert "tokens" and "passage_id" in list(bm25_corpus.keys()), (
+		"bm25_corpus must contain tokens and passage_id. Please check you ingested bm25 corpus correctly."
+	)
+	return BM25Index.from_tokens(
+		bm25_corpus["tokens"],
+		bm25_corpus["passage_id"],
+		tokenizer_name=bm25_corpus["tokenizer_name"],
+	)
+
+
 def bm25_ingest(
-	corpus_path: str, corpus_data: pd.DataFrame, bm25_tokenizer: str = "porter_stemmer"
+	index_dir: str,
+	corpus_data: pd.DataFrame,
+	bm25_tokenizer: str = "porter_stemmer",
+	num_workers: Optional[int] = None,
 ):
-	if not corpus_path.endswith(".pkl"):
-		raise ValueError(f"Corpus path {corpus_path} is not a pickle file.")
+	"""
+	Ingest the corpus data to the BM25 index directory.
+	The passages that already exist in the index (same doc_id) are skipped.
+	The new passages are written as a new segment, so the existing segments are not rewritten.
+	When there are more than BM25_MAX_SEGMENTS segments, the small trailing segments are merged.
+	If there is a legacy bm25 pickle file (index_dir + '.pkl') and no index directory,
+	the pickle is converted to the index directory first.
+
+	:param index_dir: The BM25 index directory path.
+	:param corpus_data: The corpus dataframe to ingest.
+	:param bm25_tokenizer: The tokenizer name that is used to the BM25.
+	    Default is porter_stemmer.
+	:param num_workers: The number of processes that tokenize the corpus.
+	    Default is None, which uses every CPU when the corpus is larger than BM25_TOKENIZE_CHUNK_SIZE.
+	"""
+	if index_dir.endswith(".pkl"):
+		raise ValueError(
+			f"BM25 index path {index_dir} must be a directory, not a pickle file."
+		)
 	validate_corpus_dataset(corpus_data)
-	ids = corpus_data["doc_id"].tolist()
 
-	# Initialize bm25_corpus
-	bm25_corpus = pd.DataFrame()
+	bm25_index = None
+	legacy_path = f"{index_dir.rstrip(os.sep)}.pkl"
+	if os.path.exists(index_dir):
+		bm25_index = SegmentedBM25Index.load(index_dir)
+	elif os.path.exists(legacy_path) and os.path.getsize(legacy_path) > 0:
+		bm25_index = SegmentedBM25Index([load_legacy_bm25_index(legacy_path)])
 
-	# Load the BM25 corpus if it exists and get the passage ids
-	if os.path.exists(corpus_path) and os.path.getsize(corpus_path) > 0:
-		with open(corpus_path, "rb") as r:
-			corpus = pickle.load(r)
-			bm25_corpus = pd.DataFrame.from_dict(corpus)
-		duplicated_passage_rows = bm25_corpus[bm25_corpus["passage_id"].isin(ids)]
+	# skip the passages that already exist in the BM25 index
+	if bm25_index is not None:
 		new_passage = corpus_data[
-			~corpus_data["doc_id"].isin(duplicated_passage_rows["passage_id"])
+			~corpus_data["doc_id"].isin(
+				bm25_index.live_passage_ids().to_numpy(zero_copy_only=False)
+			)
 		]
 	else:
 		new_passage = corpus_data
 
-	if not new_passage.empty:
-		tokenizer = select_bm25_tokenizer(bm25_tokenizer)
-		if isinstance(tokenizer, PreTrainedTokenizerBase):
-			tokenized_corpus = tokenizer(new_passage["contents"].tolist()).input_ids
-		else:
-			tokenized_corpus = tokenizer(new_passage["contents"].tolist())
-		new_bm25_corpus = pd.DataFrame(
-			{
-				"tokens": tokenized_corpus,
-				"passage_id": new_passage["doc_id"].tolist(),
-			}
-		)
+	if new_passage.empty:
+		if bm25_index is not None and not os.path.exists(index_dir):
+			bm25_index.save(index_dir)
+		return
+
+	tokenizer = get_bm25_tokenizer_service(bm25_tokenizer)
+	tokenized_corpus = tokenizer.tokenize_corpus(
+		new_passage["contents"].tolist(), num_workers=num_workers
+	)
+	corpus_stats = tokenizer.stats()["corpus"]
+	logger.info(
+		f"Tokenized {corpus_stats['texts']} passages with {bm25_tokenizer} "
+		f"({corpus_stats['texts_per_second']:.1f} passages/sec)."
+	)
+	new_segment = BM25Index.from_tokens(
+		tokenized_corpus,
+		new_passage["doc_id"].tolist(),
+		tokenizer_name=bm25_tokenizer,
+	)
+	if bm25_index is None:
+		bm25_index = SegmentedBM25Index([new_segment])
+	else:
+		bm25_index = bm25_index.append(new_segment)
+	if len(bm25_index.segments) > BM25_MAX_SEGMENTS:
+		segment_sizes = list(map(lambda x: x.corpus_size, bm25_index.segments))
+		# keep the first large segment, and merge the small segments behind it
+		start = 1 if segment_sizes[0] > sum(segment_sizes[1:]) else 0
+		bm25_index = bm25_index.compact(start=start)
+	bm25_index.commit(index_dir)
+
+
+def bm25_delete(index_dir: str, doc_ids: List[str]):
+	"""
+	Delete the passages from the BM25 index directory.
+	The passages are marked as tombstones and removed from the segments at the next compaction.
+
+	:param index_dir: The BM25 index directory path.
+	:param doc_ids: The doc_ids of the passages to delete.
+	"""
+	bm25_index = SegmentedBM25Index.load(index_dir)
+	bm25_index.delete(doc_ids).commit(index_dir)
 
-		if not bm25_corpus.empty:
-			bm25_corpus_updated = pd.concat(
-				[bm25_corpus, new_bm25_corpus], ignore_index=True
-			)
-			bm25_dict = bm25_corpus_updated.to_dict("list")
-		else:
-			bm25_dict = new_bm25_corpus.to_dict("list")
 
-		# add tokenizer name to bm25_dict
-		bm25_dict["tokenizer_name"] = bm25_tokenizer
+def bm25_compact(index_dir: str):
+	"""
+	Merge every segment of the BM25 index directory into one segment, without the deleted passages.
 
-		with open(corpus_path, "wb") as w:
-			pickle.dump(bm25_dict, w)
+	:param index_dir: The BM25 index directory path.
+	"""
+	bm25_index = SegmentedBM25Index.load(index_dir)
+	bm25_index.compact().commit(index_dir)
 
 
 def select_bm25_tokenizer(
@@ -379,3 +477,163 @@ def select_bm25_tokenizer(
 		return BM25_TOKENIZER[bm25_tokenizer]
 
 	return AutoTokenizer.from_pretrained(bm25_tokenizer, use_fast=False)
+
+
+class BM25TokenizerService:
+	"""
+	The tokenizer service of one BM25 tokenizer.
+	The tokenizer (and its analyzer) is created once and reused for every call.
+	The corpus is tokenized in chunks by a process pool,
+	and the tokenized queries are kept in the LRU cache, because the same queries are retrieved many times
+	while the parameter combinations of the trial are evaluated.
+	"""
+
+	def __init__(
+		self,
+		bm25_tokenizer: str,
+		query_cache_size: int = BM25_QUERY_CACHE_SIZE,
+		chunk_size: int = BM25_TOKENIZE_CHUNK_SIZE,
+	):
+		"""
+		:param bm25_tokenizer: The tokenizer name that is used to the BM25.
+		:param query_cache_size: The number of tokenized queries to keep. Default is BM25_QUERY_CACHE_SIZE.
+		:param chunk_size: The number of texts that one worker tokenizes at once.
+		    Default is BM25_TOKENIZE_CHUNK_SIZE.
+		"""
+		self.bm25_tokenizer = bm25_tokenizer
+		self.tokenizer = select_bm25_tokenizer(bm25_tokenizer)
+		self.query_cache_size = query_cache_size
+		self.chunk_size = chunk_size
+		self._query_cache: "OrderedDict[str, List[Union[int, str]]]" = OrderedDict()
+		self._lock = threading.Lock()
+		self._stats = {
+			"query": {"texts": 0, "seconds": 0.0, "cache_hits": 0, "cache_misses": 0},
+			"corpus": {"texts": 0, "seconds": 0.0, "workers": 1},
+		}
+
+	def tokenize_queries(self, queries: List[str]) -> List[List[Union[int, str]]]:
+		"""
+		Tokenize the queries. Only the queries that are not in the query cache are tokenized.
+
+		:param queries: The list of query strings.
+		:return: The tokenized queries.
+		"""
+		start_time = time.perf_counter()
+		result: List[Optional[List[Union[int, str]]]] = [None] * len(queries)
+		missing: Dict[str, List[int]] = {}
+		with self._lock:
+			for i, query in enumerate(queries):
+				tokens = self._query_cache.get(query)
+				if tokens is None:
+					missing.setdefault(query, []).append(i)
+				else:
+					self._query_cache.move_to_end(query)
+					result[i] = tokens
+
+		if missing:
+			missing_queries = list(missing.keys())
+			tokenized = tokenize(missing_queries, self.tokenizer)
+			with self._lock:
+				for query, tokens in zip(missing_queries, tokenized):
+					for i in missing[query]:
+						result[i] = tokens
+					self._query_cache[query] = tokens
+					self._query_cache.move_to_end(query)
+				while len(self._query_cache) > self.query_cache_size:
+					self._query_cache.popitem(last=False)
+
+		with self._lock:
+			stats = self._stats["query"]
+			stats["texts"] += len(queries)
+			stats["seconds"] += time.perf_counter() - start_time
+			stats["cache_misses"] += sum(map(len, missing.values()))
+			stats["cache_hits"] += len(queries) - sum(map(len, missing.values()))
+		return result
+
+	def tokenize_corpus(
+		self, texts: List[str], num_workers: Optional[int] = None
+	) -> List[List[Union[int, str]]]:
+		"""
+		Tokenize the corpus texts. The texts are split to chunks, and each chunk is tokenized by a worker process.
+		The tokenized corpus is not cached.
+
+		:param texts: The list of passage contents.
+		:param num_workers: The number of worker processes.
+		    Default is None, which uses every CPU.
+		    When there is only one chunk or one worker, the texts are tokenized in this process.
+		:return: The tokenized texts in the same order.
+		"""
+		start_time = time.perf_counter()
+		chunks = [
+			texts[i : i + self.chunk_size]
+			for i in range(0, len(texts), self.chunk_size)
+		]
+		if num_workers is None:
+			num_workers = os.cpu_count() or 1
+		num_workers = max(1, min(num_workers, len(chunks)))
+
+		if num_workers == 1:
+			tokenized = tokenize(texts, self.tokenizer)
+		else:
+			with ProcessPoolExecutor(max_workers=num_workers) as executor:
+				tokenized_chunks = executor.map(
+					_tokenize_chunk, itertools.repeat(self.bm25_tokenizer), chunks
+				)
+				tokenized = list(itertools.chain.from_iterable(tokenized_chunks))
+
+		with self._lock:
+			stats = self._stats["corpus"]
+			stats["texts"] += len(texts)
+			stats["seconds"] += time.perf_counter() - start_time
+			stats["workers"] = num_workers
+		return tokenized
+
+	def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+		"""
+		The throughput stats of the query and corpus tokenization.
+		Use it to size the number of workers.
+
+		:return: The dictionary of 'query' and 'corpus' stats.
+		    Each has the number of texts, the elapsed seconds and texts_per_second.
+		    The query stats also have the cache hits and misses,
+		    and the corpus stats have the number of workers of the last call.
+		"""
+		with self._lock:
+			result = {key: dict(value) for key, value in self._stats.items()}
+		for value in result.values():
+			value["texts_per_second"] = (
+				value["texts"] / value["seconds"] if value["seconds"] > 0 else 0.0
+			)
+		return result
+
+	def clear_query_cache(self):
+		with self._lock:
+			self._query_cache.clear()
+
+
+# tokenizer name -> BM25TokenizerService of this process
+_bm25_tokenizer_services: Dict[str, BM25TokenizerService] = {}
+_bm25_tokenizer_services_lock = threading.Lock()
+
+
+def get_bm25_tokenizer_service(bm25_tokenizer: str) -> BM25TokenizerService:
+	"""
+	Get the process-wide tokenizer service of the BM25 tokenizer.
+	Every BM25 module that uses the same tokenizer shares the tokenizer and its query cache.
+
+	:param bm25_tokenizer: The tokenizer name that is used to the BM25.
+	:return: The BM25TokenizerService instance.
+	"""
+	with _bm25_tokenizer_services_lock:
+		if bm25_tokenizer not in _bm25_tokenizer_services:
+			_bm25_tokenizer_services[bm25_tokenizer] = BM25TokenizerService(
+				bm25_tokenizer
+			)
+		return _bm25_tokenizer_services[bm25_tokenizer]
+
+
+def _tokenize_chunk(
+	bm25_tokenizer: str, texts: List[str]
+) -> List[List[Union[int, str]]]:
+	# runs in the worker process, so the tokenizer is created once per worker
+	return tokenize(texts, get_bm25_tokenizer_service(bm25_tokenizer).tokenizer)
@@ -0,0 +1,1361 @@
+import bisect
+import json
+import os
+import shutil
+from typing import List, Tuple, Union, Optional, Sequence, Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy import sparse
+
+BM25_INDEX_FORMAT_VERSION = 1
+BM25_INDEX_META_FILE = "meta.json"
+SEGMENTED_BM25_INDEX_FORMAT_VERSION = 2
+BM25_SEGMENTS_DIR = "segments"
+
+
+class _ArrowSequence(Sequence):
+	"""
+	Read-only sequence view of an Arrow array.
+	It is used to run binary search over the memory-mapped vocabulary without converting it to a Python list.
+	"""
+
+	def __init__(self, array: Union[pa.Array, pa.ChunkedArray]):
+		self.array = array
+
+	def __len__(self):
+		return len(self.array)
+
+	def __getitem__(self, item):
+		return self.array[item].as_py()
+
+
+class _BM25Retriever:
+	"""
+	The top_k retrieval of the BM25 indexes.
+	The subclass implements `get_scores`, `get_passage_ids`, `corpus_size` and `selectable_mask`.
+	"""
+
+	corpus_size: int
+
+	def get_scores(
+		self, tokenized_queries: List[List[Union[str, int]]]
+	) -> sparse.csr_matrix:
+		raise NotImplementedError
+
+	def get_passage_ids(self, indices: np.ndarray) -> List[str]:
+		raise NotImplementedError
+
+	def selectable_mask(self) -> Optional[np.ndarray]:
+		"""
+		The boolean mask of the documents that can be retrieved.
+		None means every document can be retrieved.
+		"""
+		return None
+
+	def _selectable_count(self, mask: Optional[np.ndarray]) -> int:
+		return self.corpus_size if mask is None else int(mask.sum())
+
+	def top_k(
+		self,
+		tokenized_queries: List[List[Union[str, int]]],
+		top_k: int,
+		batch_size: int = 1024,
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		"""
+		Retrieve top_k passages for each query.
+		The result is sorted by score in descending order.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:param top_k: The number of passages to retrieve for each query.
+		:param batch_size: The number of queries that is scored in one matrix product.
+		    Default is 1024.
+		:return: The 2-d list of passage ids and the 2-d list of its scores.
+		"""
+		indices, values = self._top_k_indices(tokenized_queries, top_k, batch_size)
+		return (
+			list(map(self.get_passage_ids, indices)),
+			list(map(lambda x: x.tolist(), values)),
+		)
+
+	def _top_k_indices(
+		self,
+		tokenized_queries: List[List[Union[str, int]]],
+		top_k: int,
+		batch_size: int = 1024,
+	) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+		mask = self.selectable_mask()
+		top_k = min(top_k, self._selectable_count(mask))
+		index_result, value_result = [], []
+		for start in range(0, len(tokenized_queries), batch_size):
+			scores = self.get_scores(tokenized_queries[start : start + batch_size])
+			for indices, values in _select_csr_top_k(
+				scores, top_k, self.corpus_size, mask
+			):
+				index_result.append(indices)
+				value_result.append(values)
+		return index_result, value_result
+
+	def fused_top_k(
+		self,
+		tokenized_queries: List[List[Union[str, int]]],
+		query_lengths: List[int],
+		top_k: int,
+		fusion: str = "max",
+		rrf_k: int = 60,
+		batch_size: int = 1024,
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		"""
+		Retrieve top_k passages for each group of queries (e.g. the expanded queries of one row).
+		The scores of the queries in a group are fused to one score per passage.
+
+		:param tokenized_queries: 2-d list of tokenized queries. The queries of the same group are adjacent.
+		:param query_lengths: The number of queries of each group.
+		:param top_k: The number of passages to retrieve for each group.
+		:param fusion: The fusion method of the query scores.
+		    'max': The maximum BM25 score of the queries.
+		    'sum': The sum of the BM25 scores of the queries.
+		    'rrf': The reciprocal rank fusion of the top_k result of each query.
+		    Default is 'max'.
+		:param rrf_k: The rank constant of the reciprocal rank fusion. Default is 60.
+		:param batch_size: The maximum number of queries that is scored in one matrix product.
+		    A group is never split. Default is 1024.
+		:return: The 2-d list of passage ids and the 2-d list of its fused scores of each group.
+		"""
+		if fusion not in ["max", "sum", "rrf"]:
+			raise ValueError(f"fusion must be 'max', 'sum' or 'rrf', but got {fusion}")
+		assert sum(query_lengths) == len(tokenized_queries), (
+			"The sum of query_lengths must be the number of tokenized_queries."
+		)
+		mask = self.selectable_mask()
+		selectable_count = self._selectable_count(mask)
+		query_lengths = np.asarray(query_lengths, dtype=np.int64)
+		query_offsets = np.concatenate([[0], np.cumsum(query_lengths)])
+
+		id_result, score_result = [], []
+		group_start = 0
+		while group_start < len(query_lengths):
+			# take the groups until the batch is full, at least one group
+			group_end = group_start + max(
+				1,
+				int(
+					np.searchsorted(
+						query_offsets[group_start + 1 :],
+						query_offsets[group_start] + batch_size,
+						side="right",
+					)
+				),
+			)
+			batch_lengths = query_lengths[group_start:group_end]
+			batch_queries = tokenized_queries[
+				query_offsets[group_start] : query_offsets[group_end]
+			]
+			batch_groups = np.repeat(np.arange(len(batch_lengths)), batch_lengths)
+			if fusion == "rrf":
+				indices, _ = self._top_k_indices(
+					batch_queries, top_k, batch_size=len(batch_queries)
+				)
+				fused = _reciprocal_rank_fusion(
+					indices, batch_groups, len(batch_lengths), self.corpus_size, rrf_k
+				)
+			else:
+				fused = _fuse_query_scores(
+					self.get_scores(batch_queries), batch_groups, batch_lengths, fusion
+				)
+			for indices, values in _select_csr_top_k(
+				fused, min(top_k, selectable_count), self.corpus_size, mask
+			):
+				id_result.append(self.get_passage_ids(indices))
+				score_result.append(values.tolist())
+			group_start = group_end
+		return id_result, score_result
+
+
+class BM25Index(_BM25Retriever):
+	"""
+	Sparse matrix BM25 index.
+	It follows the BM25Okapi scoring from rank_bm25, including the epsilon floor for negative idf values.
+
+	The index keeps the raw postings as a CSR term-document matrix of shape (vocabulary size, corpus size).
+	At the query time, only the postings of the query tokens are gathered and weighted by the idf and the
+	document length norm, so the score of a query batch is just one sparse matrix product.
+
+	The index can be saved to the directory with :meth:`save` and opened with memory-mapping by :meth:`load`.
+	The directory contains the files below.
+
+	- meta.json: The format version, tokenizer name and corpus statistics.
+	- vocab.arrow: The sorted vocabulary (Arrow IPC file).
+	- passage_ids.arrow: The passage id of each document (Arrow IPC file).
+	- indptr.npy, doc_indices.npy, term_freqs.npy: The CSR postings.
+	- doc_len.npy: The token count of each document.
+	"""
+
+	def __init__(
+		self,
+		vocab: Sequence,
+		indptr: np.ndarray,
+		doc_indices: np.ndarray,
+		term_freqs: np.ndarray,
+		doc_len: np.ndarray,
+		passage_ids: Union[pa.Array, pa.ChunkedArray],
+		average_idf: float,
+		tokenizer_name: Optional[str] = None,
+		k1: float = 1.5,
+		b: float = 0.75,
+		epsilon: float = 0.25,
+	):
+		"""
+		:param vocab: The sorted vocabulary. The position of the token is the row of the postings.
+		:param indptr: The CSR index pointer of the postings. Its length must be vocabulary size + 1.
+		:param doc_indices: The document index of each posting.
+		:param term_freqs: The term frequency of each posting.
+		:param doc_len: The token count of each document.
+		:param passage_ids: The passage id of each document.
+		:param average_idf: The average of the raw idf values. It is used for the epsilon floor.
+		:param tokenizer_name: The tokenizer name that is used to build the index.
+		:param k1: The k1 parameter of BM25Okapi. Default is 1.5.
+		:param b: The b parameter of BM25Okapi. Default is 0.75.
+		:param epsilon: The epsilon floor of the negative idf. Default is 0.25.
+		"""
+		self.vocab = vocab
+		self.indptr = indptr
+		self.doc_indices = doc_indices
+		self.term_freqs = term_freqs
+		self.doc_len = doc_len
+		self.passage_ids = passage_ids
+		self.average_idf = average_idf
+		self.tokenizer_name = tokenizer_name
+		self.k1 = k1
+		self.b = b
+		self.epsilon = epsilon
+		self.total_doc_len = int(doc_len.sum())
+		self.avgdl = self.total_doc_len / len(doc_len) if len(doc_len) > 0 else 0.0
+		self._passage_rows = None
+
+	@property
+	def corpus_size(self) -> int:
+		return len(self.doc_len)
+
+	@classmethod
+	def from_tokens(
+		cls,
+		tokens: List[List[Union[str, int]]],
+		passage_ids: List[str],
+		tokenizer_name: Optional[str] = None,
+		k1: float = 1.5,
+		b: float = 0.75,
+		epsilon: float = 0.25,
+	) -> "BM25Index":
+		"""
+		Build BM25 index from the tokenized corpus.
+
+		:param tokens: 2-d list of tokens. Each element is the tokenized passage.
+		:param passage_ids: The passage ids of each tokenized passage.
+		:param tokenizer_name: The tokenizer name that is used to tokenize the corpus.
+		:param k1: The k1 parameter of BM25Okapi. Default is 1.5.
+		:param b: The b parameter of BM25Okapi. Default is 0.75.
+		:param epsilon: The epsilon floor of the negative idf. Default is 0.25.
+		:return: The BM25Index instance.
+		"""
+		assert len(tokens) == len(passage_ids), (
+			"tokens and passage_ids must have same length."
+		)
+		vocab = sorted(set(token for doc_tokens in tokens for token in doc_tokens))
+		term_to_idx = {token: idx for idx, token in enumerate(vocab)}
+		if len(vocab) > 0 and not isinstance(vocab[0], str):
+			vocab = np.asarray(vocab, dtype=np.int64)
+		term_ids = np.fromiter(
+			(term_to_idx[token] for doc_tokens in tokens for token in doc_tokens),
+			dtype=np.int64,
+		)
+		doc_len = np.asarray(list(map(len, tokens)), dtype=np.int64)
+		doc_ids = np.repeat(np.arange(len(tokens), dtype=np.int64), doc_len)
+		# duplicated (term, doc) entries are summed, which becomes the term frequency
+		postings = sparse.coo_matrix(
+			(np.ones(len(term_ids), dtype=np.float64), (term_ids, doc_ids)),
+			shape=(len(vocab), len(tokens)),
+		).tocsr()
+		postings.sum_duplicates()
+		postings.sort_indices()
+
+		return cls(
+			vocab=vocab,
+			indptr=postings.indptr.astype(np.int64),
+			doc_indices=postings.indices.astype(np.int64),
+			term_freqs=postings.data.astype(np.int32),
+			doc_len=doc_len,
+			passage_ids=pa.array(list(passage_ids), type=pa.string()),
+			average_idf=_average_idf(np.diff(postings.indptr), len(tokens)),
+			tokenizer_name=tokenizer_name,
+			k1=k1,
+			b=b,
+			epsilon=epsilon,
+		)
+
+	@classmethod
+	def merge(cls, indexes: List["BM25Index"]) -> "BM25Index":
+		"""
+		Merge several indexes into one index.
+		The documents are concatenated in the given order, and the vocabulary is the union of all vocabularies.
+
+		:param indexes: The list of BM25Index instances.
+		    All indexes must use the same tokenizer and BM25 parameters.
+		:return: The merged BM25Index instance.
+		"""
+		assert len(indexes) > 0, "indexes must not be empty."
+		base = indexes[0]
+		assert all(index.tokenizer_name == base.tokenizer_name for index in indexes), (
+			"All BM25 indexes must use the same tokenizer."
+		)
+		vocab_arrays = list(map(lambda index: index.vocab_array(), indexes))
+		merged_vocab = pc.unique(
+			pa.concat_arrays(
+				list(filter(lambda x: len(x) > 0, vocab_arrays)) or vocab_arrays[:1]
+			)
+		)
+		merged_vocab = merged_vocab.take(pc.array_sort_indices(merged_vocab))
+
+		term_ids, doc_ids, term_freqs = [], [], []
+		doc_offset = 0
+		for index, vocab_array in zip(indexes, vocab_arrays):
+			mapping = pc.index_in(vocab_array, value_set=merged_vocab).to_numpy(
+				zero_copy_only=False
+			)
+			term_ids.append(np.repeat(mapping, np.diff(np.asarray(index.indptr))))
+			doc_ids.append(np.asarray(index.doc_indices) + doc_offset)
+			term_freqs.append(np.asarray(index.term_freqs))
+			doc_offset += index.corpus_size
+
+		corpus_size = doc_offset
+		postings = sparse.coo_matrix(
+			(
+				np.concatenate(term_freqs),
+				(np.concatenate(term_ids), np.concatenate(doc_ids)),
+			),
+			shape=(len(merged_vocab), corpus_size),
+		).tocsr()
+		postings.sort_indices()
+
+		return cls(
+			vocab=_vocab_from_arrow(merged_vocab),
+			indptr=postings.indptr.astype(np.int64),
+			doc_indices=postings.indices.astype(np.int64),
+			term_freqs=postings.data.astype(np.int32),
+			doc_len=np.concatenate(
+				list(map(lambda index: np.asarray(index.doc_len), indexes))
+			).astype(np.int64),
+			passage_ids=pa.concat_arrays(
+				list(map(lambda index: _combine_chunks(index.passage_ids), indexes))
+			),
+			average_idf=_average_idf(np.diff(postings.indptr), corpus_size),
+			tokenizer_name=base.tokenizer_name,
+			k1=base.k1,
+			b=base.b,
+			epsilon=base.epsilon,
+		)
+
+	def vocab_array(self) -> pa.Array:
+		"""
+		Get the vocabulary as an Arrow array.
+		"""
+		if isinstance(self.vocab, _ArrowSequence):
+			return _combine_chunks(self.vocab.array)
+		if isinstance(self.vocab, np.ndarray):
+			return pa.array(self.vocab, type=pa.int64())
+		return pa.array(self.vocab, type=pa.string())
+
+	def filter_documents(self, keep_mask: np.ndarray) -> "BM25Index":
+		"""
+		Make a new index that only contains the documents of keep_mask.
+		The terms that do not appear in the kept documents are removed from the vocabulary,
+		so the result is the same as building the index from the kept documents.
+
+		:param keep_mask: The boolean mask of shape (corpus size,).
+		:return: The filtered BM25Index instance.
+		"""
+		keep_mask = np.asarray(keep_mask, dtype=bool)
+		if keep_mask.all():
+			return self
+		new_doc_indices = np.cumsum(keep_mask) - 1
+		doc_indices = np.asarray(self.doc_indices)
+		term_ids = np.repeat(
+			np.arange(len(self.vocab), dtype=np.int64), np.diff(np.asarray(self.indptr))
+		)
+		kept = keep_mask[doc_indices]
+		# the postings stay sorted by (term, document) after the filtering
+		used_terms, term_ids = np.unique(term_ids[kept], return_inverse=True)
+		indptr = np.concatenate(
+			[[0], np.cumsum(np.bincount(term_ids, minlength=len(used_terms)))]
+		).astype(np.int64)
+		corpus_size = int(keep_mask.sum())
+		return BM25Index(
+			vocab=_vocab_from_arrow(
+				self.vocab_array().take(pa.array(used_terms, type=pa.int64()))
+			),
+			indptr=indptr,
+			doc_indices=new_doc_indices[doc_indices[kept]].astype(np.int64),
+			term_freqs=np.asarray(self.term_freqs)[kept],
+			doc_len=np.asarray(self.doc_len)[keep_mask],
+			passage_ids=_combine_chunks(self.passage_ids).filter(pa.array(keep_mask)),
+			average_idf=_average_idf(np.diff(indptr), corpus_size),
+			tokenizer_name=self.tokenizer_name,
+			k1=self.k1,
+			b=self.b,
+			epsilon=self.epsilon,
+		)
+
+	def save(self, index_dir: str):
+		"""
+		Save the index to the directory.
+		The files are written to the temporary directory first and moved to the index_dir,
+		so the readers never see a half-written index.
+
+		:param index_dir: The directory path to save the index.
+		"""
+		tmp_dir = f"{index_dir}.tmp"
+		if os.path.exists(tmp_dir):
+			shutil.rmtree(tmp_dir)
+		os.makedirs(tmp_dir)
+
+		_write_arrow_column(
+			os.path.join(tmp_dir, "vocab.arrow"), "token", self.vocab_array()
+		)
+		_write_arrow_column(
+			os.path.join(tmp_dir, "passage_ids.arrow"), "passage_id", self.passage_ids
+		)
+		np.save(os.path.join(tmp_dir, "indptr.npy"), np.asarray(self.indptr))
+		np.save(os.path.join(tmp_dir, "doc_indices.npy"), np.asarray(self.doc_indices))
+		np.save(os.path.join(tmp_dir, "term_freqs.npy"), np.asarray(self.term_freqs))
+		np.save(os.path.join(tmp_dir, "doc_len.npy"), np.asarray(self.doc_len))
+		meta = {
+			"format_version": BM25_INDEX_FORMAT_VERSION,
+			"tokenizer_name": self.tokenizer_name,
+			"corpus_size": self.corpus_size,
+			"vocab_size": len(self.vocab),
+			"average_idf": self.average_idf,
+			"k1": self.k1,
+			"b": self.b,
+			"epsilon": self.epsilon,
+		}
+		with open(os.path.join(tmp_dir, BM25_INDEX_META_FILE), "w") as f:
+			json.dump(meta, f, indent=4)
+
+		_replace_dir(tmp_dir, index_dir)
+
+	@classmethod
+	def load(cls, index_dir: str, mmap: bool = True) -> "BM25Index":
+		"""
+		Open the index that is saved by :meth:`save`.
+
+		:param index_dir: The directory path of the index.
+		:param mmap: If True, the postings, vocabulary and passage ids are memory-mapped.
+		    Several processes that open the same index share the page cache.
+		    Default is True.
+		:return: The BM25Index instance.
+		"""
+		meta = read_bm25_index_meta(index_dir)
+		if meta.get("format_version") != BM25_INDEX_FORMAT_VERSION:
+			raise ValueError(
+				f"BM25 index format version {meta.get('format_version')} at {index_dir} is not supported. "
+				f"Delete the directory and ingest again."
+			)
+		mmap_mode = "r" if mmap else None
+
+		def load_array(filename: str) -> np.ndarray:
+			return np.load(os.path.join(index_dir, filename), mmap_mode=mmap_mode)
+
+		vocab = _read_arrow_column(os.path.join(index_dir, "vocab.arrow"), mmap)
+		if pa.types.is_integer(vocab.type):
+			vocab = vocab.to_numpy()
+		else:
+			vocab = _ArrowSequence(vocab)
+		return cls(
+			vocab=vocab,
+			indptr=load_array("indptr.npy"),
+			doc_indices=load_array("doc_indices.npy"),
+			term_freqs=load_array("term_freqs.npy"),
+			doc_len=load_array("doc_len.npy"),
+			passage_ids=_read_arrow_column(
+				os.path.join(index_dir, "passage_ids.arrow"), mmap
+			),
+			average_idf=meta["average_idf"],
+			tokenizer_name=meta.get("tokenizer_name"),
+			k1=meta["k1"],
+			b=meta["b"],
+			epsilon=meta["epsilon"],
+		)
+
+	def get_passage_ids(self, indices: np.ndarray) -> List[str]:
+		"""
+		Get passage ids from the document indices.
+		"""
+		if len(indices) == 0:
+			return []
+		return self.passage_ids.take(pa.array(indices, type=pa.int64())).to_pylist()
+
+	def lookup_terms(self, tokens: List[Union[str, int]]) -> np.ndarray:
+		"""
+		Find the vocabulary index of each token with binary search.
+
+		:param tokens: The list of tokens.
+		:return: The vocabulary indices. The tokens that are not in the vocabulary are -1.
+		"""
+		if len(self.vocab) == 0 or len(tokens) == 0:
+			return np.full(len(tokens), -1, dtype=np.int64)
+		if isinstance(self.vocab, np.ndarray):
+			if not all(isinstance(token, (int, np.integer)) for token in tokens):
+				return np.full(len(tokens), -1, dtype=np.int64)
+			tokens = np.asarray(tokens, dtype=np.int64)
+			positions = np.searchsorted(self.vocab, tokens)
+			positions = np.minimum(positions, len(self.vocab) - 1)
+			return np.where(self.vocab[positions] == tokens, positions, -1)
+
+		def find(token) -> int:
+			if not isinstance(token, str):
+				return -1
+			position = bisect.bisect_left(self.vocab, token)
+			if position < len(self.vocab) and self.vocab[position] == token:
+				return position
+			return -1
+
+		return np.asarray(list(map(find, tokens)), dtype=np.int64)
+
+	def doc_freq(self, term_indices: np.ndarray) -> np.ndarray:
+		"""
+		Get the document frequency of the given vocabulary indices.
+		The index -1 (token that is not in the vocabulary) has zero document frequency.
+		"""
+		term_indices = np.asarray(term_indices, dtype=np.int64)
+		found = term_indices >= 0
+		safe_indices = np.where(found, term_indices, 0)
+		if len(self.vocab) == 0:
+			return np.zeros(len(term_indices), dtype=np.int64)
+		doc_freq = np.asarray(self.indptr[safe_indices + 1]) - np.asarray(
+			self.indptr[safe_indices]
+		)
+		return np.where(found, doc_freq, 0)
+
+	def idf(self, term_indices: np.ndarray) -> np.ndarray:
+		"""
+		Calculate the idf values of the given vocabulary indices.
+		"""
+		return _bm25_idf(
+			self.doc_freq(term_indices),
+			self.corpus_size,
+			self.epsilon * self.average_idf,
+		)
+
+	def encode_queries(
+		self, tokenized_queries: List[List[Union[str, int]]]
+	) -> Tuple[sparse.csr_matrix, np.ndarray]:
+		"""
+		Encode tokenized queries to the sparse query-term matrix.
+		Tokens that are not in the vocabulary are ignored, and duplicated tokens are counted.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:return: The query-term count matrix of shape (query count, matched term count),
+		    and the vocabulary index of each matched term.
+		"""
+		flatten_tokens = [token for query in tokenized_queries for token in query]
+		query_rows = np.repeat(
+			np.arange(len(tokenized_queries), dtype=np.int64),
+			list(map(len, tokenized_queries)),
+		)
+		term_indices = self.lookup_terms(flatten_tokens)
+		matched = term_indices >= 0
+		unique_terms, columns = np.unique(term_indices[matched], return_inverse=True)
+		query_matrix = sparse.coo_matrix(
+			(np.ones(len(columns), dtype=np.float64), (query_rows[matched], columns)),
+			shape=(len(tokenized_queries), len(unique_terms)),
+		).tocsr()
+		query_matrix.sum_duplicates()
+		return query_matrix, unique_terms
+
+	def weighted_postings(
+		self,
+		term_indices: np.ndarray,
+		idf: Optional[np.ndarray] = None,
+		avgdl: Optional[float] = None,
+	) -> sparse.csr_matrix:
+		"""
+		Gather the postings of the given terms and weight them with BM25.
+		Only the postings of the given terms are read from the (memory-mapped) index.
+
+		:param term_indices: The vocabulary indices.
+		:param idf: The idf value of each term.
+		    Default is None, which uses the idf of this index.
+		    The segmented index passes the idf of the whole corpus.
+		:param avgdl: The average document length.
+		    Default is None, which uses the average document length of this index.
+		:return: The CSR matrix of shape (term count, corpus size).
+		    Each value is idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avgdl)).
+		"""
+		starts = np.asarray(self.indptr[term_indices], dtype=np.int64)
+		ends = np.asarray(self.indptr[term_indices + 1], dtype=np.int64)
+		lengths = ends - starts
+		sub_indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+		positions = np.repeat(starts - sub_indptr[:-1], lengths) + np.arange(
+			sub_indptr[-1], dtype=np.int64
+		)
+		doc_indices = np.asarray(self.doc_indices[positions])
+		term_freqs = np.asarray(self.term_freqs[positions], dtype=np.float64)
+		doc_len = np.asarray(self.doc_len[doc_indices], dtype=np.float64)
+
+		if idf is None:
+			idf = self.idf(term_indices)
+		if avgdl is None:
+			avgdl = self.avgdl
+		length_norm = self.k1 * (1 - self.b + self.b * doc_len / max(avgdl, 1e-12))
+		weights = (
+			np.repeat(idf, lengths)
+			* term_freqs
+			* (self.k1 + 1)
+			/ (term_freqs + length_norm)
+		)
+		return sparse.csr_matrix(
+			(weights, doc_indices, sub_indptr),
+			shape=(len(term_indices), self.corpus_size),
+		)
+
+	def weighted_documents(
+		self,
+		term_indices: np.ndarray,
+		doc_indices: np.ndarray,
+		idf: Optional[np.ndarray] = None,
+		avgdl: Optional[float] = None,
+	) -> np.ndarray:
+		"""
+		Calculate the BM25 weights of the given terms for the given documents only.
+		The term frequency of each document is found by the binary search in the sorted postings of the term,
+		so the cost depends on the number of the terms and documents, not the corpus size.
+
+		:param term_indices: The vocabulary indices.
+		:param doc_indices: The document indices.
+		:param idf: The idf value of each term.
+		    Default is None, which uses the idf of this index.
+		:param avgdl: The average document length.
+		    Default is None, which uses the average document length of this index.
+		:return: The dense weight matrix of shape (term count, document count).
+		"""
+		doc_indices = np.asarray(doc_indices, dtype=np.int64)
+		term_freqs = np.zeros((len(term_indices), len(doc_indices)), dtype=np.float64)
+		for row, term_index in enumerate(term_indices):
+			start, end = int(self.indptr[term_index]), int(self.indptr[term_index + 1])
+			if start == end or len(doc_indices) == 0:
+				continue
+			postings = np.asarray(self.doc_indices[start:end])
+			positions = np.minimum(
+				np.searchsorted(postings, doc_indices), end - start - 1
+			)
+			found = postings[positions] == doc_indices
+			term_freqs[row, found] = self.term_freqs[start + positions[found]]
+
+		if idf is None:
+			idf = self.idf(term_indices)
+		if avgdl is None:
+			avgdl = self.avgdl
+		doc_len = np.asarray(self.doc_len[doc_indices], dtype=np.float64)
+		length_norm = self.k1 * (1 - self.b + self.b * doc_len / max(avgdl, 1e-12))
+		return (
+			np.asarray(idf, dtype=np.float64)[:, None]
+			* term_freqs
+			* (self.k1 + 1)
+			/ (term_freqs + length_norm[None, :])
+		)
+
+	def get_scores(
+		self, tokenized_queries: List[List[Union[str, int]]]
+	) -> sparse.csr_matrix:
+		"""
+		Calculate BM25 scores of every passage for the query batch.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:return: The sparse score matrix of shape (query count, corpus size).
+		    The passages that do not match any query token are not stored.
+		"""
+		query_matrix, term_indices = self.encode_queries(tokenized_queries)
+		return (query_matrix @ self.weighted_postings(term_indices)).tocsr()
+
+	def get_passage_scores(
+		self,
+		tokenized_queries: List[List[Union[str, int]]],
+		passage_ids: Optional[List[str]] = None,
+	) -> np.ndarray:
+		"""
+		Calculate the dense BM25 score matrix.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:param passage_ids: The passage ids to get scores.
+		    Only the postings of the given passages are scored.
+		    Default is None, which returns the scores of the whole corpus.
+		:return: The dense score matrix of shape (query count, passage count).
+		"""
+		if passage_ids is None:
+			return self.get_scores(tokenized_queries).toarray()
+		if self._passage_rows is None:
+			self._passage_rows = _PassageRowLookup(self.passage_ids)
+		doc_indices = self._passage_rows.get_rows(passage_ids)
+		query_matrix, term_indices = self.encode_queries(tokenized_queries)
+		return np.asarray(
+			query_matrix @ self.weighted_documents(term_indices, doc_indices)
+		)
+
+
+class SegmentedBM25Index(_BM25Retriever):
+	"""
+	Append-only BM25 index that is made of immutable :class:`BM25Index` segments.
+
+	New passages are written as a new small segment, so the ingestion cost only depends on the new passages.
+	Deleted passages are marked as tombstones and hidden from the results.
+	The queries are scored with the corpus statistics (document count, average document length and idf)
+	of all segments, so the scores are the same as a single index built from every segment.
+	Like Lucene, the statistics still count the deleted passages until the segments are compacted
+	by :meth:`compact`, which rewrites the segments without the deleted passages.
+
+	The index directory contains the files below.
+
+	- meta.json: The format version, tokenizer name, segment names, tombstone file name and corpus statistics.
+	- segments/<segment name>/: Each segment, saved by :meth:`BM25Index.save`.
+	- tombstones_<generation>.npy: The (global) document indices of the deleted passages.
+
+	The meta.json is replaced at last when the index is committed, so the readers never see a half-written index.
+	The index directory of a single :class:`BM25Index` is opened as an index with one segment.
+	"""
+
+	def __init__(
+		self,
+		segments: List[BM25Index],
+		segment_names: Optional[List[str]] = None,
+		deleted: Optional[np.ndarray] = None,
+		generation: Optional[int] = None,
+		average_idf: Optional[float] = None,
+	):
+		"""
+		:param segments: The list of segments. The document index continues in the order of the segments.
+		:param segment_names: The directory name of each segment.
+		    Default is None, which names the segments with the generation.
+		:param deleted: The boolean mask of the deleted documents, of shape (corpus size,).
+		    Default is None, which means there is no deleted document.
+		:param generation: The generation of the index. It increases on every change of the index.
+		    Default is None, which is the number of segments - 1.
+		:param average_idf: The average of the raw idf values of the whole corpus.
+		    Default is None, which calculates it from the vocabularies of the segments.
+		"""
+		assert len(segments) > 0, "segments must not be empty."
+		base = segments[0]
+		assert all(
+			segment.tokenizer_name == base.tokenizer_name for segment in segments
+		), "All BM25 segments must use the same tokenizer."
+		self.segments = segments
+		self.segment_names = segment_names or list(
+			map(_segment_name, range(len(segments)))
+		)
+		assert len(self.segment_names) == len(segments), (
+			"segment_names and segments must have same length."
+		)
+		self.generation = len(segments) - 1 if generation is None else generation
+		self.tokenizer_name = base.tokenizer_name
+		self.k1 = base.k1
+		self.b = base.b
+		self.epsilon = base.epsilon
+
+		self.offsets = np.concatenate(
+			[[0], np.cumsum(list(map(lambda x: x.corpus_size, segments)))]
+		).astype(np.int64)
+		self.corpus_size = int(self.offsets[-1])
+		total_doc_len = sum(map(lambda x: x.total_doc_len, segments))
+		self.avgdl = total_doc_len / self.corpus_size if self.corpus_size > 0 else 0.0
+		self.deleted = (
+			np.zeros(self.corpus_size, dtype=bool)
+			if deleted is None
+			else np.asarray(deleted, dtype=bool)
+		)
+		assert len(self.deleted) == self.corpus_size, (
+			"deleted mask must have the same length with the corpus size."
+		)
+		self.passage_ids = pa.chunked_array(
+			[
+				chunk
+				for segment in segments
+				for chunk in _as_chunked(segment.passage_ids).chunks
+			],
+			type=pa.string(),
+		)
+		if average_idf is None:
+			average_idf = self._corpus_average_idf()
+		self.average_idf = average_idf
+		self._passage_rows = None
+
+	@property
+	def live_mask(self) -> np.ndarray:
+		return ~self.deleted
+
+	@property
+	def live_count(self) -> int:
+		return self.corpus_size - int(self.deleted.sum())
+
+	def _corpus_average_idf(self) -> float:
+		if len(self.segments) == 1:
+			return self.segments[0].average_idf
+		# the document frequency of the same token is summed over the segments
+		segments = list(filter(lambda x: len(x.vocab) > 0, self.segments))
+		if len(segments) == 0:
+			return 0.0
+		table = pa.table(
+			{
+				"token": pa.chunked_array(
+					list(map(lambda x: x.vocab_array(), segments))
+				),
+				"doc_freq": np.concatenate(
+					list(map(lambda x: np.diff(np.asarray(x.indptr)), segments))
+				),
+			}
+		)
+		doc_freq = table.group_by("token").aggregate([("doc_freq", "sum")])
+		return _average_idf(
+			doc_freq.column("doc_freq_sum").to_numpy(), self.corpus_size
+		)
+
+	@classmethod
+	def load(cls, index_dir: str, mmap: bool = True) -> "SegmentedBM25Index":
+		"""
+		Open the index that is saved by :meth:`save` or :meth:`commit`.
+		The index directory of a single :class:`BM25Index` is opened as an index with one segment.
+
+		:param index_dir: The directory path of the index.
+		:param mmap: If True, the segments are memory-mapped. Default is True.
+		:return: The SegmentedBM25Index instance.
+		"""
+		meta = read_bm25_index_meta(index_dir)
+		if meta.get("format_version") == BM25_INDEX_FORMAT_VERSION:
+			return cls([BM25Index.load(index_dir, mmap=mmap)])
+		if meta.get("format_version") != SEGMENTED_BM25_INDEX_FORMAT_VERSION:
+			raise ValueError(
+				f"BM25 index format version {meta.get('format_version')} at {index_dir} is not supported. "
+				f"Delete the directory and ingest again."
+			)
+		segments = list(
+			map(
+				lambda name: BM25Index.load(
+					os.path.join(index_dir, BM25_SEGMENTS_DIR, name), mmap=mmap
+				),
+				meta["segments"],
+			)
+		)
+		corpus_size = sum(map(lambda x: x.corpus_size, segments))
+		deleted = np.zeros(corpus_size, dtype=bool)
+		if meta.get("tombstones") is not None:
+			deleted[np.load(os.path.join(index_dir, meta["tombstones"]))] = True
+		return cls(
+			segments,
+			segment_names=meta["segments"],
+			deleted=deleted,
+			generation=meta["generation"],
+			average_idf=meta["average_idf"],
+		)
+
+	def save(self, index_dir: str):
+		"""
+		Save the whole index to the directory.
+		The files are written to the temporary directory first and moved to the index_dir.
+
+		:param index_dir: The directory path to save the index.
+		"""
+		tmp_dir = f"{index_dir}.tmp"
+		if os.path.exists(tmp_dir):
+			shutil.rmtree(tmp_dir)
+		os.makedirs(os.path.join(tmp_dir, BM25_SEGMENTS_DIR))
+		for segment, name in zip(self.segments, self.segment_names):
+			segment.save(os.path.join(tmp_dir, BM25_SEGMENTS_DIR, name))
+		self._write_meta(tmp_dir)
+		_replace_dir(tmp_dir, index_dir)
+
+	def commit(self, index_dir: str):
+		"""
+		Write the changes of the index to the index directory that is saved before.
+		Only the new segments and the tombstones are written, and the meta.json is replaced at last.
+		The segments and tombstone files that are not used anymore are removed after the commit.
+		If the index directory does not exist or is a single :class:`BM25Index`, it saves the whole index.
+
+		:param index_dir: The directory path of the index.
+		"""
+		meta_path = os.path.join(index_dir, BM25_INDEX_META_FILE)
+		if (
+			not os.path.exists(meta_path)
+			or read_bm25_index_meta(index_dir).get("format_version")
+			!= SEGMENTED_BM25_INDEX_FORMAT_VERSION
+		):
+			self.save(index_dir)
+			return
+
+		segments_dir = os.path.join(index_dir, BM25_SEGMENTS_DIR)
+		for segment, name in zip(self.segments, self.segment_names):
+			if not os.path.exists(os.path.join(segments_dir, name)):
+				segment.save(os.path.join(segments_dir, name))
+		self._write_meta(index_dir)
+
+		# remove the files of the previous generations
+		tombstone_file = _tombstone_file_name(self.generation)
+		for filename in os.listdir(index_dir):
+			if filename.startswith("tombstones_") and filename != tombstone_file:
+				os.remove(os.path.join(index_dir, filename))
+		for name in os.listdir(segments_dir):
+			if name not in self.segment_names:
+				shutil.rmtree(os.path.join(segments_dir, name))
+
+	def _write_meta(self, index_dir: str):
+		tombstones = None
+		if self.deleted.any():
+			tombstones = _tombstone_file_name(self.generation)
+			np.save(os.path.join(index_dir, tombstones), np.flatnonzero(self.deleted))
+		meta = {
+			"format_version": SEGMENTED_BM25_INDEX_FORMAT_VERSION,
+			"tokenizer_name": self.tokenizer_name,
+			"generation": self.generation,
+			"segments": self.segment_names,
+			"tombstones": tombstones,
+			"corpus_size": self.corpus_size,
+			"deleted_count": self.corpus_size - self.live_count,
+			"average_idf": self.average_idf,
+			"k1": self.k1,
+			"b": self.b,
+			"epsilon": self.epsilon,
+		}
+		tmp_path = os.path.join(index_dir, f"{BM25_INDEX_META_FILE}.tmp")
+		with open(tmp_path, "w") as f:
+			json.dump(meta, f, indent=4)
+		os.replace(tmp_path, os.path.join(index_dir, BM25_INDEX_META_FILE))
+
+	def append(self, segment: BM25Index) -> "SegmentedBM25Index":
+		"""
+		Add the new segment at the end of the index.
+
+		:param segment: The new BM25Index segment.
+		:return: The new SegmentedBM25Index instance. Call :meth:`commit` to write it.
+		"""
+		generation = self.generation + 1
+		return SegmentedBM25Index(
+			self.segments + [segment],
+			segment_names=self.segment_names + [_segment_name(generation)],
+			deleted=np.concatenate(
+				[self.deleted, np.zeros(segment.corpus_size, dtype=bool)]
+			),
+			generation=generation,
+		)
+
+	def delete(self, passage_ids: List[str]) -> "SegmentedBM25Index":
+		"""
+		Mark the passages as deleted.
+		The passage ids that are not in the index are ignored.
+
+		:param passage_ids: The passage ids to delete.
+		:return: The new SegmentedBM25Index instance. Call :meth:`commit` to write it.
+		"""
+		deleted = self.deleted | pc.is_in(
+			self.passage_ids, value_set=pa.array(list(passage_ids), type=pa.string())
+		).to_numpy(zero_copy_only=False)
+		return SegmentedBM25Index(
+			self.segments,
+			segment_names=self.segment_names,
+			deleted=deleted,
+			generation=self.generation + 1,
+			average_idf=self.average_idf,
+		)
+
+	def compact(self, start: int = 0) -> "SegmentedBM25Index":
+		"""
+		Merge the segments from the start position into one segment without the deleted passages.
+
+		:param start: The position of the first segment to merge. Default is 0, which merges every segment.
+		:return: The new SegmentedBM25Index instance. Call :meth:`commit` to write it.
+		"""
+		tail = [
+			segment.filter_documents(
+				self.live_mask[self.offsets[idx] : self.offsets[idx + 1]]
+			)
+			for idx, segment in enumerate(self.segments[start:], start=start)
+		]
+		tail = list(filter(lambda x: x.corpus_size > 0, tail))
+		if len(tail) == 0 and start == 0:
+			tail = [
+				BM25Index.from_tokens(
+					[],
+					[],
+					tokenizer_name=self.tokenizer_name,
+					k1=self.k1,
+					b=self.b,
+					epsilon=self.epsilon,
+				)
+			]
+		generation = self.generation + 1
+		merged = [BM25Index.merge(tail)] if len(tail) > 0 else []
+		return SegmentedBM25Index(
+			self.segments[:start] + merged,
+			segment_names=self.segment_names[:start]
+			+ list(map(lambda _: _segment_name(generation), merged)),
+			deleted=np.concatenate(
+				[
+					self.deleted[: self.offsets[start]],
+					np.zeros(sum(map(lambda x: x.corpus_size, merged)), dtype=bool),
+				]
+			),
+			generation=generation,
+		)
+
+	def selectable_mask(self) -> Optional[np.ndarray]:
+		return self.live_mask if self.deleted.any() else None
+
+	def live_passage_ids(self) -> pa.Array:
+		"""
+		Get the passage ids that are not deleted.
+		"""
+		return _combine_chunks(self.passage_ids).filter(pa.array(self.live_mask))
+
+	def get_passage_ids(self, indices: np.ndarray) -> List[str]:
+		"""
+		Get passage ids from the (global) document indices.
+		"""
+		if len(indices) == 0:
+			return []
+		return self.passage_ids.take(pa.array(indices, type=pa.int64())).to_pylist()
+
+	def get_scores(
+		self, tokenized_queries: List[List[Union[str, int]]]
+	) -> sparse.csr_matrix:
+		"""
+		Calculate BM25 scores of every passage for the query batch.
+		Each segment is scored with the corpus statistics of the whole index.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:return: The sparse score matrix of shape (query count, corpus size).
+		    The passages that do not match any query token are not stored.
+		"""
+		query_matrix, term_indices, idf = self.encode_queries(tokenized_queries)
+		blocks = []
+		for segment, indices in zip(self.segments, term_indices):
+			matched = indices >= 0
+			postings = segment.weighted_postings(
+				indices[matched], idf[matched], self.avgdl
+			)
+			blocks.append(query_matrix[:, matched] @ postings)
+		return sparse.hstack(blocks, format="csr")
+
+	def encode_queries(
+		self, tokenized_queries: List[List[Union[str, int]]]
+	) -> Tuple[sparse.csr_matrix, List[np.ndarray], np.ndarray]:
+		"""
+		Encode tokenized queries to the sparse query-token matrix.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:return: The query-token count matrix of shape (query count, unique token count),
+		    the vocabulary index of each token in each segment (-1 if the segment does not have it),
+		    and the idf of each token in the whole corpus.
+		"""
+		flatten_tokens = [token for query in tokenized_queries for token in query]
+		# sorted like the vocabulary, so the scores are summed in the same order as BM25Index
+		unique_tokens = sorted(set(flatten_tokens))
+		token_to_column = {token: idx for idx, token in enumerate(unique_tokens)}
+		query_rows = np.repeat(
+			np.arange(len(tokenized_queries), dtype=np.int64),
+			list(map(len, tokenized_queries)),
+		)
+		columns = np.fromiter(
+			map(lambda token: token_to_column[token], flatten_tokens),
+			dtype=np.int64,
+			count=len(flatten_tokens),
+		)
+		query_matrix = sparse.coo_matrix(
+			(np.ones(len(columns), dtype=np.float64), (query_rows, columns)),
+			shape=(len(tokenized_queries), len(unique_tokens)),
+		).tocsr()
+		query_matrix.sum_duplicates()
+
+		term_indices = list(
+			map(lambda segment: segment.lookup_terms(unique_tokens), self.segments)
+		)
+		doc_freq = sum(
+			map(
+				lambda segment, indices: segment.doc_freq(indices),
+				self.segments,
+				term_indices,
+			)
+		)
+		idf = _bm25_idf(doc_freq, self.corpus_size, self.epsilon * self.average_idf)
+		return query_matrix, term_indices, idf
+
+	def get_passage_scores(
+		self,
+		tokenized_queries: List[List[Union[str, int]]],
+		passage_ids: Optional[List[str]] = None,
+	) -> np.ndarray:
+		"""
+		Calculate the dense BM25 score matrix.
+
+		:param tokenized_queries: 2-d list of tokenized queries.
+		:param passage_ids: The passage ids to get scores. The deleted passages can't be used.
+		    Only the postings of the given passages are scored.
+		    Default is None, which returns the scores of the whole corpus.
+		    The scores of the deleted passages are zero.
+		:return: The dense score matrix of shape (query count, passage count).
+		"""
+		if passage_ids is None:
+			scores = self.get_scores(tokenized_queries).toarray()
+			scores[:, self.deleted] = 0.0
+			return scores
+		if self._passage_rows is None:
+			self._passage_rows = _PassageRowLookup(self.passage_ids, self.live_mask)
+		doc_indices = self._passage_rows.get_rows(passage_ids)
+		segment_ids = np.searchsorted(self.offsets, doc_indices, side="right") - 1
+
+		query_matrix, term_indices, idf = self.encode_queries(tokenized_queries)
+		scores = np.zeros((len(tokenized_queries), len(doc_indices)), dtype=np.float64)
+		for segment_id in np.unique(segment_ids):
+			segment = self.segments[segment_id]
+			columns = np.flatnonzero(segment_ids == segment_id)
+			indices = term_indices[segment_id]
+			matched = indices >= 0
+			weights = segment.weighted_documents(
+				indices[matched],
+				doc_indices[columns] - self.offsets[segment_id],
+				idf[matched],
+				self.avgdl,
+			)
+			scores[:, columns] = query_matrix[:, matched] @ weights
+		return scores
+
+
+def read_bm25_index_meta(index_dir: str) -> dict:
+	"""
+	Read the meta.json of the BM25 index directory.
+	"""
+	meta_path = os.path.join(index_dir, BM25_INDEX_META_FILE)
+	if not os.path.exists(meta_path):
+		raise FileNotFoundError(f"BM25 index meta file {meta_path} does not exist.")
+	with open(meta_path, "r") as f:
+		return json.load(f)
+
+
+def _bm25_idf(doc_freq: np.ndarray, corpus_size: int, idf_floor: float) -> np.ndarray:
+	idf = np.log(corpus_size - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+	return np.where(idf < 0, idf_floor, idf)
+
+
+def _average_idf(doc_freq: np.ndarray, corpus_size: int) -> float:
+	if len(doc_freq) == 0:
+		return 0.0
+	idf = np.log(corpus_size - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+	return float(idf.mean())
+
+
+def _select_top_k(
+	indices: np.ndarray,
+	values: np.ndarray,
+	top_k: int,
+	corpus_size: int,
+	live_mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Select the top_k documents of one row of the sparse score matrix.
+	The documents that are not stored in the row have zero score,
+	and the ties are broken by the larger document index first, the same as the argsort of the dense scores.
+
+	:param indices: The document indices of the stored scores.
+	:param values: The stored scores.
+	:param top_k: The number of documents to select.
+	:param corpus_size: The number of documents.
+	:param live_mask: The boolean mask of the documents that can be selected.
+	    Default is None, which means every document can be selected.
+	:return: The selected document indices and its scores, sorted by score in descending order.
+	"""
+	candidates = np.arange(corpus_size)
+	if live_mask is not None:
+		live = live_mask[indices]
+		indices, values = indices[live], values[live]
+		candidates = candidates[live_mask]
+	if len(values) > 0 and values.min() < 0:
+		# unmatched passages (score 0) can outrank negative scores, so go dense
+		dense = np.zeros(corpus_size, dtype=np.float64)
+		dense[indices] = values
+		indices, values = candidates, dense[candidates]
+	elif len(values) < top_k:
+		# pad with unmatched passages, the same as argsort of the dense scores
+		unmatched = np.setdiff1d(candidates, indices, assume_unique=True)[::-1][
+			: top_k - len(values)
+		]
+		indices = np.concatenate([indices, unmatched])
+		values = np.concatenate([values, np.zeros(len(unmatched))])
+
+	if len(values) > top_k:
+		selected = np.argpartition(-values, top_k - 1)[:top_k]
+		indices, values = indices[selected], values[selected]
+	order = np.lexsort((-indices, -values))
+	return indices[order], values[order]
+
+
+class _PassageRowLookup:
+	"""
+	The hash index from the passage id to the document index.
+	It is built once, so each lookup costs O(1) per passage id instead of the scan of the whole corpus.
+	"""
+
+	def __init__(
+		self,
+		passage_ids: Union[pa.Array, pa.ChunkedArray],
+		mask: Optional[np.ndarray] = None,
+	):
+		rows = np.arange(len(passage_ids), dtype=np.int64)
+		passage_ids = _combine_chunks(passage_ids)
+		if mask is not None:
+			rows = rows[mask]
+			passage_ids = passage_ids.filter(pa.array(mask))
+		passage_ids = pd.Series(passage_ids.to_numpy(zero_copy_only=False))
+		# the first document is used for the duplicated passage id
+		first = ~passage_ids.duplicated(keep="first").to_numpy()
+		self.index = pd.Index(passage_ids[first].to_numpy())
+		self.rows = rows[first]
+
+	def get_rows(self, passage_ids: List[str]) -> np.ndarray:
+		positions = self.index.get_indexer(list(passage_ids))
+		if (positions < 0).any():
+			raise ValueError("Some passage ids are not in the BM25 index.")
+		return self.rows[positions]
+
+
+def _select_csr_top_k(
+	scores: sparse.csr_matrix,
+	top_k: int,
+	corpus_size: int,
+	live_mask: Optional[np.ndarray] = None,
+) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+	for row_idx in range(scores.shape[0]):
+		row = slice(scores.indptr[row_idx], scores.indptr[row_idx + 1])
+		yield _select_top_k(
+			scores.indices[row], scores.data[row], top_k, corpus_size, live_mask
+		)
+
+
+def _fuse_query_scores(
+	scores: sparse.csr_matrix,
+	query_groups: np.ndarray,
+	group_lengths: np.ndarray,
+	fusion: str,
+) -> sparse.csr_matrix:
+	"""
+	Fuse the score rows of the queries in the same group.
+
+	:param scores: The sparse score matrix of shape (query count, corpus size).
+	:param query_groups: The group index of each query.
+	:param group_lengths: The number of queries of each group.
+	:param fusion: 'max' or 'sum'.
+	:return: The sparse fused score matrix of shape (group count, corpus size).
+	"""
+	shape = (len(group_lengths), scores.shape[1])
+	scores = scores.tocoo()
+	groups = query_groups[scores.row]
+	if fusion == "sum":
+		fused = sparse.csr_matrix((scores.data, (groups, scores.col)), shape=shape)
+		fused.sum_duplicates()
+		fused.eliminate_zeros()
+		return fused
+
+	order = np.lexsort((scores.col, groups))
+	groups, columns, values = groups[order], scores.col[order], scores.data[order]
+	if len(values) == 0:
+		return sparse.csr_matrix(shape, dtype=np.float64)
+	starts = np.flatnonzero(
+		np.concatenate(
+			[[True], (groups[1:] != groups[:-1]) | (columns[1:] != columns[:-1])]
+		)
+	)
+	fused = np.maximum.reduceat(values, starts)
+	# the query that does not match the passage has zero score
+	match_counts = np.diff(np.concatenate([starts, [len(values)]]))
+	unmatched = match_counts < group_lengths[groups[starts]]
+	fused = np.where(unmatched, np.maximum(fused, 0.0), fused)
+	fused = sparse.csr_matrix((fused, (groups[starts], columns[starts])), shape=shape)
+	fused.eliminate_zeros()
+	return fused
+
+
+def _reciprocal_rank_fusion(
+	indices: List[np.ndarray],
+	query_groups: np.ndarray,
+	group_count: int,
+	corpus_size: int,
+	rrf_k: int,
+) -> sparse.csr_matrix:
+	"""
+	Fuse the ranked document lists of the queries in the same group by 1 / (rrf_k + rank).
+
+	:return: The sparse fused score matrix of shape (group count, corpus size).
+	"""
+	lengths = np.asarray(list(map(len, indices)), dtype=np.int64)
+	if lengths.sum() == 0:
+		return sparse.csr_matrix((group_count, corpus_size), dtype=np.float64)
+	offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+	ranks = np.arange(lengths.sum()) - offsets + 1
+	fused = sparse.csr_matrix(
+		(
+			1.0 / (rrf_k + ranks),
+			(np.repeat(query_groups, lengths), np.concatenate(indices)),
+		),
+		shape=(group_count, corpus_size),
+	)
+	fused.sum_duplicates()
+	return fused
+
+
+def _vocab_from_arrow(vocab: pa.Array) -> Sequence:
+	if pa.types.is_integer(vocab.type):
+		return vocab.to_numpy()
+	return vocab.to_pylist()
+
+
+def _replace_dir(src_dir: str, dst_dir: str):
+	old_dir = f"{dst_dir}.old"
+	if os.path.exists(dst_dir):
+		if os.path.exists(old_dir):
+			shutil.rmtree(old_dir)
+		os.replace(dst_dir, old_dir)
+	os.replace(src_dir, dst_dir)
+	if os.path.exists(old_dir):
+		shutil.rmtree(old_dir)
+
+
+def _segment_name(generation: int) -> str:
+	return f"seg_{generation:06d}"
+
+
+def _tombstone_file_name(generation: int) -> str:
+	return f"tombstones_{generation:06d}.npy"
+
+
+def _as_chunked(values: Union[pa.Array, pa.ChunkedArray]) -> pa.ChunkedArray:
+	if isinstance(values, pa.Array):
+		return pa.chunked_array([values], type=values.type)
+	return values
+
+
+def _combine_chunks(values: Union[pa.Array, pa.ChunkedArray]) -> pa.Array:
+	if isinstance(values, pa.ChunkedArray):
+		return values.combine_chunks()
+	return values
+
+
+def _write_arrow_column(path: str, column_name: str, values):
+	if isinstance(values, np.ndarray):
+		values = pa.array(values, type=pa.int64())
+	elif not isinstance(values, (pa.Array, pa.ChunkedArray)):
+		values = pa.array(values, type=pa.string())
+	table = pa.table({column_name: values})
+	with pa.OSFile(path, "wb") as sink:
+		with pa.ipc.new_file(sink, table.schema) as writer:
+			writer.write_table(table)
+
+
+def _read_arrow_column(path: str, mmap: bool = True) -> pa.ChunkedArray:
+	source = pa.memory_map(path, "r") if mmap else pa.OSFile(path, "rb")
+	table = pa.ipc.open_file(source).read_all()
+	return table.column(0)
@@ -8,7 +8,7 @@ from autorag.evaluation import evaluate_retrieval
 from autorag.evaluation.retrieval import RETRIEVAL_METRIC_FUNC_DICT
 from autorag.nodes.retrieval.run_util import save_and_summary, find_best
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed
+from autorag.strategy import run_modules
 from autorag.utils.util import apply_recursive, to_list
 
 
@@ -52,16 +52,12 @@ def run_lexical_retrieval_node(
 		os.makedirs(save_dir)
 
 	# Run the modules
-	lexical_results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	lexical_results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	lexical_times = list(map(lambda x: x / len(lexical_results[0]), execution_times))
 
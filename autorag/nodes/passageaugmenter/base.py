@@ -8,8 +8,8 @@ from autorag.schema import BaseModule
 from autorag.utils import (
 	validate_qa_dataset,
 	sort_by_scores,
-	validate_corpus_dataset,
-	cast_corpus_dataset,
+	acquire_corpus,
+	release_corpus,
 )
 from autorag.utils.cast import cast_retrieved_ids
 from autorag.utils.util import select_top_k
@@ -23,17 +23,16 @@ class BasePassageAugmenter(BaseModule, metaclass=abc.ABCMeta):
 			f"Initialize passage augmenter node - {self.__class__.__name__} module..."
 		)
 		data_dir = os.path.join(project_dir, "data")
-		corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
+		self.corpus_index = acquire_corpus(
+			os.path.join(data_dir, "corpus.parquet"), cast=True
 		)
-		validate_corpus_dataset(corpus_df)
-		corpus_df = cast_corpus_dataset(corpus_df)
-		self.corpus_df = corpus_df
+		self.corpus_df = self.corpus_index.corpus_df
 
 	def __del__(self):
 		logger.info(
 			f"Initialize passage augmenter node - {self.__class__.__name__} module..."
 		)
+		release_corpus(getattr(self, "corpus_index", None))
 
 	def cast_to_run(self, previous_result: pd.DataFrame, *args, **kwargs):
 		logger.info(
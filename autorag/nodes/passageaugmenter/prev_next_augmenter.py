@@ -1,11 +1,12 @@
-from typing import List, Union
+import os
+from typing import List, Union, Optional
 
-import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_similarity_matrix
 from autorag.nodes.passageaugmenter.base import BasePassageAugmenter
+from autorag.utils import CorpusIndex
 from autorag.utils.util import (
 	filter_dict_keys,
 	fetch_contents,
@@ -13,6 +14,7 @@ from autorag.utils.util import (
 	result_to_dataframe,
 	empty_cuda_cache,
 )
+from autorag.vectordb import load_vectordb_from_yaml
 
 
 class PrevNextPassageAugmenter(BasePassageAugmenter):
@@ -20,6 +22,7 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		self,
 		project_dir: str,
 		embedding_model: Union[str, dict] = "openai",
+		vectordb: Optional[str] = None,
 		*args,
 		**kwargs,
 	):
@@ -29,6 +32,10 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		:param project_dir:
 		:param embedding_model: The embedding model name to use for calculating cosine similarity
 			Default is openai (text-embedding-ada-002)
+		:param vectordb: The optional vectordb name that the corpus is ingested.
+			If it is given, the passage embeddings are fetched from the vectordb instead of embedding them again,
+			and the queries are embedded with the embedding model of the vectordb.
+			Default is None.
 		:param kwargs:
 		"""
 		super().__init__(project_dir, *args, **kwargs)
@@ -37,11 +44,25 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 			filter_dict_keys, keys=["prev_id", "next_id"]
 		)
 		self.slim_corpus_df = slim_corpus_df
+		self.slim_corpus_index = CorpusIndex(slim_corpus_df)
 
 		# init embedding model
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		self.vector_store = (
+			load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			if vectordb is not None
+			else None
+		)
+		if self.vector_store is not None:
+			self.embedding_model = self.vector_store.embedding
+		else:
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
+		del self.vector_store
 		del self.embedding_model
 		empty_cuda_cache()
 		super().__del__()
@@ -70,20 +91,22 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		augmented_ids = self._pure(ids, num_passages, mode)
 
 		# fetch contents from corpus to use augmented ids
-		augmented_contents = fetch_contents(self.corpus_df, augmented_ids)
+		augmented_contents = fetch_contents(self.corpus_index, augmented_ids)
 
 		query_embeddings, contents_embeddings = embedding_query_content(
-			queries, augmented_contents, self.embedding_model, batch=128
+			queries,
+			augmented_contents,
+			self.embedding_model,
+			batch=128,
+			ids_list=augmented_ids,
+			vector_store=self.vector_store,
 		)
 
 		# get scores from calculated cosine similarity
 		augmented_scores = [
-			np.array(
-				[
-					calculate_cosine_similarity(query_embedding, x)
-					for x in content_embeddings
-				]
-			).tolist()
+			calculate_similarity_matrix([query_embedding], content_embeddings)[
+				0
+			].tolist()
 			for query_embedding, content_embeddings in zip(
 				query_embeddings, contents_embeddings
 			)
@@ -118,7 +141,7 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		augmented_ids = [
 			(
 				lambda ids: prev_next_augmenter_pure(
-					ids, self.slim_corpus_df, mode, num_passages
+					ids, self.slim_corpus_index, mode, num_passages
 				)
 			)(ids)
 			for ids in ids_list
@@ -128,17 +151,19 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 
 
 def prev_next_augmenter_pure(
-	ids: List[str], corpus_df: pd.DataFrame, mode: str, num_passages: int
+	ids: List[str],
+	corpus_data: Union[pd.DataFrame, CorpusIndex],
+	mode: str,
+	num_passages: int,
 ):
+	if not isinstance(corpus_data, CorpusIndex):
+		corpus_data = CorpusIndex(corpus_data)
+
 	def fetch_id_sequence(start_id, key):
 		sequence = []
 		current_id = start_id
 		for _ in range(num_passages):
-			current_id = (
-				corpus_df.loc[corpus_df["doc_id"] == current_id]["metadata"]
-				.values[0]
-				.get(key)
-			)
+			current_id = corpus_data.fetch_one(current_id, "metadata").get(key)
 			if current_id is None:
 				break
 			sequence.append(current_id)
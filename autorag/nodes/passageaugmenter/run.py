@@ -7,7 +7,7 @@ import pandas as pd
 
 from autorag.nodes.retrieval.run_util import evaluate_retrieval_node
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
 from autorag.utils.util import apply_recursive, to_list
 
 logger = logging.getLogger("AutoRAG")
@@ -29,16 +29,12 @@ def run_passage_augmenter_node(
 	retrieval_gt = qa_df["retrieval_gt"].tolist()
 	retrieval_gt = apply_recursive(lambda x: str(x), to_list(retrieval_gt))
 
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 	metric_inputs = [
@@ -10,6 +10,8 @@ from autorag.utils.util import pop_params, result_to_dataframe, empty_cuda_cache
 
 
 class LongLLMLingua(BasePassageCompressor):
+	resource_tag = "gpu"
+
 	def __init__(
 		self, project_dir: str, model_name: str = "NousResearch/Llama-2-7b-hf", **kwargs
 	):
@@ -9,8 +9,10 @@ from autorag.evaluation.metric import (
 	retrieval_token_precision,
 	retrieval_token_f1,
 )
+from autorag.evaluation.metric.retrieval_contents import TokenOverlapEngine
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
+from autorag.utils import acquire_corpus, release_corpus
 from autorag.utils.util import fetch_contents
 
 
@@ -46,32 +48,27 @@ def run_passage_compressor_node(
 
 	# make retrieval contents gt
 	qa_data = pd.read_parquet(os.path.join(data_dir, "qa.parquet"), engine="pyarrow")
-	corpus_data = pd.read_parquet(
-		os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-	)
+	corpus_index = acquire_corpus(os.path.join(data_dir, "corpus.parquet"))
 	# check qa_data have retrieval_gt
 	assert all(len(x[0]) > 0 for x in qa_data["retrieval_gt"].tolist()), (
 		"Can't use passage compressor if you don't have retrieval gt values in QA dataset."
 	)
 
 	# run modules
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	results = list(results)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
 	retrieval_gt_contents = list(
-		map(lambda x: fetch_contents(corpus_data, x), qa_data["retrieval_gt"].tolist())
+		map(lambda x: fetch_contents(corpus_index, x), qa_data["retrieval_gt"].tolist())
 	)
+	release_corpus(corpus_index)
 
 	metric_inputs = [
 		MetricInput(retrieval_gt_contents=ret_cont_gt)
@@ -171,16 +168,7 @@ def evaluate_passage_compressor_node(
 	metrics = list(filter(lambda x: x in metric_funcs.keys(), metrics))
 	if len(metrics) <= 0:
 		raise ValueError(f"metrics must be one of {metric_funcs.keys()}")
-	metrics_scores = dict(
-		map(
-			lambda metric: (
-				metric,
-				metric_funcs[metric](
-					metric_inputs=metric_inputs,
-				),
-			),
-			metrics,
-		)
-	)
+	engine = TokenOverlapEngine(metric_inputs)
+	metrics_scores = dict(map(lambda metric: (metric, engine.compute(metric)), metrics))
 	result_df = pd.concat([result_df, pd.DataFrame(metrics_scores)], axis=1)
 	return result_df
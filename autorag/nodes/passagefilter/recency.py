@@ -7,7 +7,12 @@ from typing import List, Tuple, Union
 import pandas as pd
 
 from autorag.nodes.passagefilter.base import BasePassageFilter
-from autorag.utils import fetch_contents, result_to_dataframe
+from autorag.utils import (
+	fetch_contents,
+	result_to_dataframe,
+	acquire_corpus,
+	release_corpus,
+)
 
 logger = logging.getLogger("AutoRAG")
 
@@ -15,14 +20,19 @@ logger = logging.getLogger("AutoRAG")
 class RecencyFilter(BasePassageFilter):
 	def __init__(self, project_dir: Union[str, Path], *args, **kwargs):
 		super().__init__(project_dir, *args, **kwargs)
-		self.corpus_df = pd.read_parquet(
-			os.path.join(project_dir, "data", "corpus.parquet"), engine="pyarrow"
+		self.corpus_index = acquire_corpus(
+			os.path.join(project_dir, "data", "corpus.parquet")
 		)
+		self.corpus_df = self.corpus_index.corpus_df
+
+	def __del__(self):
+		release_corpus(getattr(self, "corpus_index", None))
+		super().__del__()
 
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		_, contents, scores, ids = self.cast_to_run(previous_result, *args, **kwargs)
-		metadatas = fetch_contents(self.corpus_df, ids, column_name="metadata")
+		metadatas = fetch_contents(self.corpus_index, ids, column_name="metadata")
 		times = [
 			[time["last_modified_datetime"] for time in time_list]
 			for time_list in metadatas
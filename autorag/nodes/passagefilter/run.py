@@ -6,7 +6,7 @@ import pandas as pd
 
 from autorag.nodes.retrieval.run_util import evaluate_retrieval_node
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
 from autorag.utils.util import to_list, apply_recursive
 
 
@@ -48,16 +48,12 @@ def run_passage_filter_node(
 		)
 	]
 
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
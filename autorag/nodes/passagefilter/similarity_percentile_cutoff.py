@@ -1,17 +1,18 @@
+import os
 from pathlib import Path
 from typing import List, Tuple, Union
 
-import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_similarity_matrix
 from autorag.nodes.passagefilter.base import BasePassageFilter
 from autorag.nodes.passagefilter.similarity_threshold_cutoff import (
 	embedding_query_content,
 )
 from autorag.utils import result_to_dataframe
 from autorag.utils.util import empty_cuda_cache, pop_params
+from autorag.vectordb import load_vectordb_from_yaml
 
 
 class SimilarityPercentileCutoff(BasePassageFilter):
@@ -22,13 +23,32 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		:param project_dir: The project directory to use for initializing the module
 		:param embedding_model: The embedding model string to use for calculating similarity
 		        Default is "openai" which is OpenAI text-embedding-ada-002 embedding model.
+		:param vectordb: The optional vectordb name that the corpus is ingested.
+		        If it is given, the passage embeddings are fetched from the vectordb instead of embedding them again,
+		        and the queries are embedded with the embedding model of the vectordb.
+		        Default is None.
 		"""
 		super().__init__(project_dir, *args, **kwargs)
-		embedding_model = kwargs.pop("embedding_model", "openai")
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		vectordb = kwargs.pop("vectordb", None)
+		self.vector_store = (
+			load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			if vectordb is not None
+			else None
+		)
+		if self.vector_store is not None:
+			kwargs.pop("embedding_model", None)
+			self.embedding_model = self.vector_store.embedding
+		else:
+			embedding_model = kwargs.pop("embedding_model", "openai")
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
 		super().__del__()
+		del self.vector_store
 		del self.embedding_model
 
 		empty_cuda_cache()
@@ -64,7 +84,12 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		:return: Tuple of lists containing the filtered contents, ids, and scores
 		"""
 		query_embeddings, content_embeddings = embedding_query_content(
-			queries, contents_list, self.embedding_model, batch
+			queries,
+			contents_list,
+			self.embedding_model,
+			batch,
+			ids_list=ids_list,
+			vector_store=self.vector_store,
 		)
 
 		results = list(
@@ -111,14 +136,9 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		if num_top_k == 0:
 			num_top_k = 1
 
-		similarities = np.array(
-			list(
-				map(
-					lambda x: calculate_cosine_similarity(query_embedding, x),
-					content_embeddings,
-				)
-			)
-		).tolist()
+		similarities = calculate_similarity_matrix(
+			[query_embedding], content_embeddings
+		)[0].tolist()
 
 		content_id_score_similarity = list(
 			zip(ids_list, content_list, scores_list, similarities)
@@ -1,10 +1,11 @@
+import os
 from typing import List, Tuple
 
 import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_similarity_matrix
 from autorag.nodes.passagefilter.base import BasePassageFilter
 from autorag.utils.util import (
 	embedding_query_content,
@@ -12,6 +13,7 @@ from autorag.utils.util import (
 	result_to_dataframe,
 	pop_params,
 )
+from autorag.vectordb import load_vectordb_from_yaml
 
 
 class SimilarityThresholdCutoff(BasePassageFilter):
@@ -22,12 +24,30 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		:param project_dir: The project directory to use for initializing the module
 		:param embedding_model: The embedding model string to use for calculating similarity
 		        Default is "openai" which is OpenAI text-embedding-ada-002 embedding model.
+		:param vectordb: The optional vectordb name that the corpus is ingested.
+		        If it is given, the passage embeddings are fetched from the vectordb instead of embedding them again,
+		        and the queries are embedded with the embedding model of the vectordb.
+		        Default is None.
 		"""
 		super().__init__(project_dir, *args, **kwargs)
-		embedding_model = kwargs.get("embedding_model", "openai")
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		vectordb = kwargs.get("vectordb", None)
+		self.vector_store = (
+			load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			if vectordb is not None
+			else None
+		)
+		if self.vector_store is not None:
+			self.embedding_model = self.vector_store.embedding
+		else:
+			embedding_model = kwargs.get("embedding_model", "openai")
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
+		del self.vector_store
 		del self.embedding_model
 		empty_cuda_cache()
 		super().__del__()
@@ -63,7 +83,12 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		:return: Tuple of lists containing the filtered contents, ids, and scores
 		"""
 		query_embeddings, content_embeddings = embedding_query_content(
-			queries, contents_list, self.embedding_model, batch
+			queries,
+			contents_list,
+			self.embedding_model,
+			batch,
+			ids_list=ids_list,
+			vector_store=self.vector_store,
 		)
 
 		remain_indices = list(
@@ -98,14 +123,9 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		:return: Indices to remain at the contents
 		"""
 
-		similarities = np.array(
-			list(
-				map(
-					lambda x: calculate_cosine_similarity(query_embedding, x),
-					content_embeddings,
-				)
-			)
-		)
+		similarities = calculate_similarity_matrix(
+			[query_embedding], content_embeddings
+		)[0]
 		result = np.where(similarities >= threshold)[0].tolist()
 		if len(result) > 0:
 			return result
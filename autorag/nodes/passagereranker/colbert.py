@@ -1,9 +1,24 @@
-from typing import List, Tuple
+import os
+from typing import List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.colbert_index import (
+	ColbertTokenIndex,
+	normalize_token_embeddings,
+)
+from autorag.nodes.passagereranker.cross_encoder import (
+	get_token_lengths,
+	run_cross_encoder,
+)
+from autorag.utils.onnx_backend import (
+	OnnxTransformer,
+	validate_backend,
+	get_onnx_cache_dir,
+	_model_dir_name,
+)
 from autorag.utils.util import (
 	flatten_apply,
 	sort_by_scores,
@@ -15,10 +30,15 @@ from autorag.utils.util import (
 
 
 class ColbertReranker(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
 		model_name: str = "colbert-ir/colbertv2.0",
+		backend: str = "torch",
+		quantize: bool = False,
+		session_pool_size: int = 1,
 		*args,
 		**kwargs,
 	):
@@ -29,9 +49,37 @@ class ColbertReranker(BasePassageReranker):
 		:param model_name: The model name for Colbert rerank.
 			You can choose a colbert model for reranking.
 			The default is "colbert-ir/colbertv2.0".
+		:param backend: The execution backend of the model. 'torch' or 'onnx'.
+			The 'onnx' backend exports the model to ONNX once under the project resources directory,
+			and runs it with onnxruntime on CPU.
+			Default is 'torch'.
+		:param quantize: Whether to apply the int8 dynamic quantization to the ONNX model.
+			It is only used with the 'onnx' backend. Default is False.
+		:param session_pool_size: The number of onnxruntime sessions.
+			It is only used with the 'onnx' backend. Default is 1.
 		:param kwargs: Extra parameter for the model.
 		"""
 		super().__init__(project_dir)
+		# the token embeddings of the int8 model are different, so it has its own index
+		self.index_dir = os.path.join(
+			str(project_dir),
+			"resources",
+			"colbert_index",
+			_model_dir_name(model_name)
+			+ ("-int8" if backend == "onnx" and quantize else ""),
+		)
+		self._token_index: Optional[ColbertTokenIndex] = None
+		if validate_backend(backend):
+			self.device = "cpu"
+			self.model = OnnxTransformer(
+				model_name,
+				"feature_extraction",
+				get_onnx_cache_dir(project_dir),
+				quantize=quantize,
+				session_pool_size=session_pool_size,
+			)
+			self.tokenizer = self.model.tokenizer
+			return
 		try:
 			import torch
 			from transformers import AutoModel, AutoTokenizer
@@ -56,7 +104,9 @@ class ColbertReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		use_index = kwargs.pop("use_index", False)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, use_index, max_tokens)
 
 	def _pure(
 		self,
@@ -65,6 +115,8 @@ class ColbertReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		use_index: bool = False,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents with Colbert rerank models.
@@ -77,9 +129,32 @@ class ColbertReranker(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
 			Default is 64.
+		:param use_index: Whether to use the precomputed token embeddings of the passages.
+			The token embeddings are saved by doc_id at the project resources directory,
+			and only the passages that are not in the index are encoded.
+			The padding tokens are not used for the scores with the index.
+			Default is False.
+		:param max_tokens: The maximum padded token count of a batch when encoding with the index.
+			Default is None, which means only batch limits the batch.
 
 		:return: Tuple of lists containing the reranked contents, ids, and scores
 		"""
+		if use_index:
+			scores_list = self._index_scores(
+				queries, contents_list, ids_list, batch, max_tokens
+			)
+			df = pd.DataFrame(
+				{"contents": contents_list, "ids": ids_list, "scores": scores_list}
+			)
+			df[["contents", "ids", "scores"]] = df.apply(
+				sort_by_scores, axis=1, result_type="expand"
+			)
+			results = select_top_k(df, ["contents", "ids", "scores"], top_k)
+			return (
+				results["contents"].tolist(),
+				results["ids"].tolist(),
+				results["scores"].tolist(),
+			)
 
 		# get query and content embeddings
 		query_embedding_list = get_colbert_embedding_batch(
@@ -119,10 +194,167 @@ class ColbertReranker(BasePassageReranker):
 			results["scores"].tolist(),
 		)
 
+	def get_token_index(self) -> ColbertTokenIndex:
+		"""
+		Get the token embedding index of the passages. It is loaded on the first use.
+		"""
+		if self._token_index is None:
+			self._token_index = ColbertTokenIndex(self.index_dir)
+		return self._token_index
+
+	def build_index(
+		self,
+		doc_ids: List[str],
+		contents: List[str],
+		batch: int = 64,
+		max_tokens: Optional[int] = None,
+	):
+		"""
+		Encode the passages that are not in the token embedding index, and add them to the index.
+		You can build the index of the whole corpus before the reranking.
+
+		:param doc_ids: The doc ids of the passages.
+		:param contents: The contents of the passages.
+		:param batch: The batch size of encoding. Default is 64.
+		:param max_tokens: The maximum padded token count of a batch. Default is None.
+		"""
+		index = self.get_token_index()
+		missing = index.missing(doc_ids, contents)
+		if len(missing) == 0:
+			return
+		missing_contents = list(map(lambda x: contents[x], missing))
+		embeddings = get_colbert_token_embeddings(
+			missing_contents,
+			self.model,
+			self.tokenizer,
+			batch,
+			max_tokens=max_tokens,
+			device=self.device,
+		)
+		index.add(
+			list(map(lambda x: doc_ids[x], missing)), missing_contents, embeddings
+		)
+
+	def _index_scores(
+		self,
+		queries: List[str],
+		contents_list: List[List[str]],
+		ids_list: List[List[str]],
+		batch: int,
+		max_tokens: Optional[int] = None,
+	) -> List[List[float]]:
+		# encode the passages that are not in the index once, even if they are retrieved many times
+		unique_passages = dict(
+			zip(
+				[doc_id for ids in ids_list for doc_id in ids],
+				[content for contents in contents_list for content in contents],
+			)
+		)
+		self.build_index(
+			list(unique_passages.keys()),
+			list(unique_passages.values()),
+			batch,
+			max_tokens,
+		)
+		query_embeddings = get_colbert_token_embeddings(
+			queries,
+			self.model,
+			self.tokenizer,
+			batch,
+			max_tokens=max_tokens,
+			device=self.device,
+		)
+		index = self.get_token_index()
+		return list(
+			map(
+				lambda x: index.max_sim(x[0], x[1]),
+				zip(query_embeddings, ids_list),
+			)
+		)
+
+
+def get_colbert_token_embeddings(
+	input_strings: List[str],
+	model,
+	tokenizer,
+	batch_size: int,
+	max_tokens: Optional[int] = None,
+	device=None,
+) -> List[np.ndarray]:
+	"""
+	Get the normalized token embeddings of each string without the padding tokens.
+	The strings are encoded in the length-bucketed batches,
+	so the embeddings do not depend on the other strings in the batch.
+
+	:param input_strings: The strings to encode.
+	:param model: The ColBERT model. The torch model or the OnnxTransformer.
+	:param tokenizer: The tokenizer of the model.
+	:param batch_size: The maximum number of strings in a batch.
+	:param max_tokens: The maximum padded token count of a batch. Default is None.
+	:param device: The device of the model.
+	:return: The token embedding matrix ([token_length, embedding_dim]) of each string.
+	"""
+	max_length = model.config.max_position_embeddings
+
+	def run_batch(batch_strings: List[str]) -> List[np.ndarray]:
+		if isinstance(model, OnnxTransformer):
+			encoding = tokenizer(
+				batch_strings,
+				return_tensors="np",
+				padding=True,
+				truncation=True,
+				max_length=max_length,
+			)
+			hidden_states = model.run(encoding)
+			attention_mask = encoding["attention_mask"]
+		else:
+			encoding = tokenizer(
+				batch_strings,
+				return_tensors="pt",
+				padding=True,
+				truncation=True,
+				max_length=max_length,
+			).to(model.device)
+			hidden_states = model(**encoding).last_hidden_state.float().cpu().numpy()
+			attention_mask = encoding["attention_mask"].cpu().numpy()
+		return list(
+			map(
+				lambda x: normalize_token_embeddings(x[0][x[1].astype(bool)]),
+				zip(hidden_states, attention_mask),
+			)
+		)
+
+	return run_cross_encoder(
+		input_strings,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_strings, tokenizer, max_length),
+		max_tokens=max_tokens,
+		device=device,
+	)
+
 
 def get_colbert_embedding_batch(
 	input_strings: List[str], model, tokenizer, batch_size: int
 ) -> List[np.array]:
+	if isinstance(model, OnnxTransformer):
+		encoding = tokenizer(
+			input_strings,
+			return_tensors="np",
+			padding=True,
+			truncation=True,
+			max_length=model.config.max_position_embeddings,
+		)
+		total_array = np.concatenate(
+			[
+				model.run(
+					{key: value[i : i + batch_size] for key, value in encoding.items()}
+				)
+				for i in range(0, len(input_strings), batch_size)
+			],
+			axis=0,
+		)  # shape [batch_size, token_length, embedding_dim]
+		return list(map(lambda x: x[np.newaxis], total_array))
 	try:
 		import torch
 	except ImportError:
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("AutoRAG")
+
+
+def content_hash(content: str) -> bytes:
+	return hashlib.sha1(content.encode("utf-8")).hexdigest().encode("ascii")
+
+
+def segment_name(sequence: int) -> str:
+	return f"seg_{sequence:08d}"
+
+
+def normalize_token_embeddings(embeddings: np.ndarray) -> np.ndarray:
+	"""
+	Normalize each token embedding to the unit length, so the dot product is the cosine similarity.
+	"""
+	embeddings = np.asarray(embeddings, dtype=np.float32)
+	norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+	return embeddings / np.clip(norms, 1e-12, None)
+
+
+class ColbertTokenIndex:
+	"""
+	The on-disk index of the ColBERT token embeddings of the passages, keyed by doc_id.
+	Each passage has the matrix of its normalized token embeddings (without padding tokens).
+	The matrices are saved as float16 in the memory-mapped segments,
+	and the new passages are added as a new segment.
+	A passage is encoded again when its content is changed.
+	"""
+
+	def __init__(self, index_dir: str, dtype: str = "float16"):
+		"""
+		:param index_dir: The directory of the index.
+		:param dtype: The dtype of the saved embeddings. 'float16' or 'float32'.
+			Default is 'float16'.
+		"""
+		self.index_dir = index_dir
+		self.dtype = np.dtype(dtype)
+		self._lock = threading.Lock()
+		# the token embeddings and the offsets of each segment
+		self._segments: List[Tuple[np.ndarray, np.ndarray]] = []
+		# doc_id -> (segment index, position in the segment, content hash)
+		self._rows: Dict[str, Tuple[int, int, bytes]] = {}
+		os.makedirs(index_dir, exist_ok=True)
+		# the segments are numbered in the order they are added, so the newer segment is loaded later
+		sequences = sorted(
+			map(
+				lambda x: int(x[len("seg_") :]),
+				filter(
+					lambda x: x.startswith("seg_") and x[len("seg_") :].isdigit(),
+					os.listdir(index_dir),
+				),
+			)
+		)
+		for sequence in sequences:
+			self._load_segment(os.path.join(index_dir, segment_name(sequence)))
+		self._next_sequence = sequences[-1] + 1 if sequences else 0
+
+	def __len__(self) -> int:
+		return len(self._rows)
+
+	def _load_segment(self, segment_dir: str):
+		embeddings = np.load(os.path.join(segment_dir, "embeddings.npy"), mmap_mode="r")
+		offsets = np.load(os.path.join(segment_dir, "offsets.npy"))
+		doc_ids = np.load(os.path.join(segment_dir, "doc_ids.npy")).tolist()
+		hashes = np.load(os.path.join(segment_dir, "hashes.npy")).tolist()
+		segment_index = len(self._segments)
+		self._segments.append((embeddings, offsets))
+		# the later segment has the newer embeddings
+		self._rows.update(
+			zip(
+				doc_ids,
+				map(lambda x: (segment_index, x[0], x[1]), enumerate(hashes)),
+			)
+		)
+
+	def missing(self, doc_ids: List[str], contents: List[str]) -> List[int]:
+		"""
+		Find the passages that are not in the index, or whose content is changed.
+
+		:param doc_ids: The doc ids of the passages.
+		:param contents: The contents of the passages.
+		:return: The positions of the missing passages in doc_ids.
+		"""
+		return [
+			i
+			for i, (doc_id, content) in enumerate(zip(doc_ids, contents))
+			if doc_id not in self._rows
+			or self._rows[doc_id][2] != content_hash(content)
+		]
+
+	def add(
+		self, doc_ids: List[str], contents: List[str], embeddings: List[np.ndarray]
+	):
+		"""
+		Add the token embeddings of the passages as a new segment.
+
+		:param doc_ids: The doc ids of the passages.
+		:param contents: The contents of the passages.
+		:param embeddings: The token embedding matrix ([token_length, embedding_dim]) of each passage.
+		"""
+		if not (len(doc_ids) == len(contents) == len(embeddings)):
+			raise ValueError(
+				"doc_ids, contents and embeddings must have the same length."
+			)
+		if len(doc_ids) == 0:
+			return
+		# keep the last one when the doc id is duplicated
+		positions = list(dict(zip(doc_ids, range(len(doc_ids)))).values())
+		offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+		offsets[1:] = np.cumsum(list(map(lambda x: len(embeddings[x]), positions)))
+		token_embeddings = np.concatenate(
+			list(map(lambda x: normalize_token_embeddings(embeddings[x]), positions)),
+			axis=0,
+		).astype(self.dtype)
+
+		logger.info(
+			f"Adding {len(positions)} passages to the ColBERT index at {self.index_dir}..."
+		)
+		tmp_dir = os.path.join(self.index_dir, f"tmp_{uuid.uuid4().hex}")
+		os.makedirs(tmp_dir)
+		np.save(os.path.join(tmp_dir, "embeddings.npy"), token_embeddings)
+		np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+		np.save(
+			os.path.join(tmp_dir, "doc_ids.npy"),
+			np.array(list(map(lambda x: doc_ids[x], positions)), dtype=str),
+		)
+		np.save(
+			os.path.join(tmp_dir, "hashes.npy"),
+			np.array(
+				list(map(lambda x: content_hash(contents[x]), positions)), dtype="S40"
+			),
+		)
+		with self._lock:
+			while True:
+				segment_dir = os.path.join(
+					self.index_dir, segment_name(self._next_sequence)
+				)
+				self._next_sequence += 1
+				try:
+					os.rename(tmp_dir, segment_dir)
+					break
+				except OSError:
+					# the other index instance added the segment of this sequence first
+					if os.path.exists(segment_dir):
+						continue
+					shutil.rmtree(tmp_dir, ignore_errors=True)
+					raise
+			self._load_segment(segment_dir)
+
+	def get(self, doc_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Get the token embeddings of the passages.
+
+		:param doc_ids: The doc ids of the passages. They must be in the index.
+		:return: The concatenated token embeddings of the passages (float32),
+			and the start offset of each passage in it.
+		"""
+		matrices = []
+		for doc_id in doc_ids:
+			if doc_id not in self._rows:
+				raise ValueError(f"doc_id {doc_id} is not in the ColBERT index.")
+			segment_index, position, _ = self._rows[doc_id]
+			embeddings, offsets = self._segments[segment_index]
+			matrices.append(embeddings[offsets[position] : offsets[position + 1]])
+		starts = np.zeros(len(matrices), dtype=np.int64)
+		if len(matrices) > 1:
+			starts[1:] = np.cumsum(list(map(len, matrices[:-1])))
+		return np.concatenate(matrices, axis=0).astype(np.float32), starts
+
+	def max_sim(self, query_embedding: np.ndarray, doc_ids: List[str]) -> List[float]:
+		"""
+		Compute the ColBERT MaxSim scores of the passages at once.
+		The score is the mean of the maximum cosine similarity of each query token to the passage tokens.
+
+		:param query_embedding: The token embeddings of the query. [token_length, embedding_dim]
+		:param doc_ids: The doc ids of the passages. They must be in the index.
+		:return: The score of each passage.
+		"""
+		if len(doc_ids) == 0:
+			return []
+		passage_embeddings, starts = self.get(doc_ids)
+		query_embedding = normalize_token_embeddings(
+			query_embedding.reshape(-1, query_embedding.shape[-1])
+		)
+		sim_matrix = query_embedding @ passage_embeddings.T
+		max_sim = np.maximum.reduceat(sim_matrix, starts, axis=1)
+		return max_sim.mean(axis=0).tolist()
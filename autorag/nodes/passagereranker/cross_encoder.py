@@ -0,0 +1,173 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+
+def _normalize_text(input_text: Any):
+	# The single text can be wrapped as a list, and the (query, passage) pair can be a list.
+	if isinstance(input_text, (list, tuple)):
+		if len(input_text) == 1:
+			return input_text[0]
+		return tuple(input_text)
+	return input_text
+
+
+def get_token_lengths(
+	input_texts: List[Any], tokenizer=None, max_length: int = 512
+) -> List[int]:
+	"""
+	Get the token length of each input text, which is used to sort and pack the batches.
+	The input text can be a string or a (query, passage) pair.
+
+	:param input_texts: The list of input texts or input text pairs.
+	:param tokenizer: The huggingface tokenizer or the `tokenizers` tokenizer.
+	    When it is None, the length is estimated from the number of characters.
+	:param max_length: The maximum token length. The longer inputs are truncated by the model.
+	    Default is 512.
+	:return: The list of the token lengths.
+	"""
+	texts = list(map(_normalize_text, input_texts))
+	if len(texts) == 0:
+		return []
+	if tokenizer is not None and callable(tokenizer):
+		encodings = tokenizer(texts, truncation=True, max_length=max_length)
+		return list(map(len, encodings["input_ids"]))
+	if tokenizer is not None and hasattr(tokenizer, "encode_batch"):
+		encodings = tokenizer.encode_batch(texts)
+		return list(map(lambda x: min(sum(x.attention_mask), max_length), encodings))
+
+	def char_length(text) -> int:
+		if isinstance(text, tuple):
+			return sum(map(char_length, text))
+		return len(str(text))
+
+	# a token has about four characters
+	return list(map(lambda x: min(max(1, char_length(x) // 4), max_length), texts))
+
+
+def pack_length_batches(
+	lengths: List[int], batch_size: int, max_tokens: Optional[int] = None
+) -> List[List[int]]:
+	"""
+	Sort the inputs by the token length and pack them to the batches.
+	The inputs in the same batch have similar lengths, so the padding is small.
+	The padded size of the batch (the number of inputs * the longest length)
+	does not exceed max_tokens, unless the batch has only one input.
+
+	:param lengths: The token length of each input.
+	:param batch_size: The maximum number of inputs in the batch.
+	:param max_tokens: The maximum padded token count of the batch.
+	    When it is None, only batch_size limits the batch.
+	:return: The list of batches, which are the lists of input indices.
+	"""
+	if batch_size <= 0:
+		raise ValueError("batch_size must be positive.")
+	if max_tokens is not None and max_tokens <= 0:
+		raise ValueError("max_tokens must be positive.")
+	order = np.argsort(-np.asarray(lengths, dtype=np.int64), kind="stable")
+	batches: List[List[int]] = []
+	batch: List[int] = []
+	batch_length = 0
+	for index in order.tolist():
+		length = max(1, lengths[index])
+		too_many_tokens = (
+			max_tokens is not None
+			and (len(batch) + 1) * max(batch_length, length) > max_tokens
+		)
+		if batch and (len(batch) >= batch_size or too_many_tokens):
+			batches.append(batch)
+			batch, batch_length = [], 0
+		batch.append(index)
+		batch_length = max(batch_length, length)
+	if batch:
+		batches.append(batch)
+	return batches
+
+
+def _is_cpu_device(device) -> bool:
+	if device is not None:
+		return str(device).startswith("cpu")
+	try:
+		import torch
+	except ImportError:
+		return True
+	return not torch.cuda.is_available()
+
+
+@contextmanager
+def inference_context(device=None, num_threads: Optional[int] = None):
+	"""
+	Run the local model with `torch.inference_mode`.
+	When num_threads is given on CPU, the torch thread count is set to it while the context is open.
+	The torch thread count is global to the process, so it is never changed in the worker thread
+	(like the thread pool of the node scheduler), where the other modules run at the same time.
+	It does nothing when torch is not installed.
+
+	:param device: The device of the model. When it is None, it is CPU if CUDA is not available.
+	:param num_threads: The number of CPU threads.
+	    Default is None, which keeps the torch thread count of the process.
+	"""
+	try:
+		import torch
+	except ImportError:
+		yield
+		return
+	previous_num_threads = None
+	if (
+		num_threads is not None
+		and threading.current_thread() is threading.main_thread()
+		and _is_cpu_device(device)
+	):
+		previous_num_threads = torch.get_num_threads()
+		torch.set_num_threads(num_threads)
+	try:
+		with torch.inference_mode():
+			yield
+	finally:
+		if previous_num_threads is not None:
+			torch.set_num_threads(previous_num_threads)
+
+
+def run_cross_encoder(
+	input_texts: List[Any],
+	run_batch: Callable[[List[Any]], List[Any]],
+	batch_size: int,
+	lengths: Optional[List[int]] = None,
+	max_tokens: Optional[int] = None,
+	device=None,
+	num_threads: Optional[int] = None,
+) -> List[Any]:
+	"""
+	Run the local reranker model on the inputs with the length-bucketed batches.
+	The inputs are sorted by the token length, packed to the batches under the token budget,
+	and the results are scattered back to the order of the inputs.
+	It is used by every local reranker, with the function that runs the model on one batch.
+
+	:param input_texts: The flattened inputs of the model, like (query, passage) pairs.
+	:param run_batch: The function that gets the batch of inputs and returns the score of each input.
+	:param batch_size: The maximum number of inputs in the batch.
+	:param lengths: The token length of each input. Default is the estimation from the characters.
+	:param max_tokens: The maximum padded token count of the batch.
+	    When it is None, only batch_size limits the batch.
+	:param device: The device of the model.
+	:param num_threads: The number of CPU threads on CPU.
+	    Default is None, which keeps the torch thread count of the process.
+	:return: The list of the results in the order of the inputs.
+	"""
+	if lengths is None:
+		lengths = get_token_lengths(input_texts)
+	if len(lengths) != len(input_texts):
+		raise ValueError("The length of lengths must be same as input_texts.")
+	results: List[Any] = [None] * len(input_texts)
+	with inference_context(device, num_threads):
+		for batch in pack_length_batches(lengths, batch_size, max_tokens):
+			batch_results = list(run_batch(list(map(lambda x: input_texts[x], batch))))
+			if len(batch_results) != len(batch):
+				raise ValueError(
+					f"The model returned {len(batch_results)} results for {len(batch)} inputs."
+				)
+			for index, result in zip(batch, batch_results):
+				results[index] = result
+	return results
@@ -1,10 +1,13 @@
-from typing import List, Tuple, Iterable
+from typing import List, Tuple, Iterable, Optional
 
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
 from autorag.utils.util import (
-	make_batch,
 	sort_by_scores,
 	flatten_apply,
 	select_top_k,
@@ -15,6 +18,8 @@ from autorag.utils.util import (
 
 
 class FlagEmbeddingReranker(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self, project_dir, model_name: str = "BAAI/bge-reranker-large", *args, **kwargs
 	):
@@ -48,7 +53,8 @@ class FlagEmbeddingReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -57,6 +63,7 @@ class FlagEmbeddingReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using BAAI normal-Reranker model.
@@ -67,6 +74,9 @@ class FlagEmbeddingReranker(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
 			Default is 64.
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: Tuple of lists containing the reranked contents, ids, and scores
 		"""
 		nested_list = [
@@ -74,7 +84,11 @@ class FlagEmbeddingReranker(BasePassageReranker):
 			for query, content_list in zip(queries, contents_list)
 		]
 		rerank_scores = flatten_apply(
-			flag_embedding_run_model, nested_list, model=self.model, batch_size=batch
+			flag_embedding_run_model,
+			nested_list,
+			model=self.model,
+			batch_size=batch,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -96,18 +110,25 @@ class FlagEmbeddingReranker(BasePassageReranker):
 		)
 
 
-def flag_embedding_run_model(input_texts, model, batch_size: int):
+def flag_embedding_run_model(
+	input_texts, model, batch_size: int, max_tokens: Optional[int] = None
+):
 	try:
-		import torch
+		import torch  # noqa: F401
 	except ImportError:
 		raise ImportError("FlagEmbeddingReranker requires PyTorch to be installed.")
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-	for batch_texts in batch_input_texts:
-		with torch.no_grad():
-			pred_scores = model.compute_score(sentence_pairs=batch_texts)
+
+	def run_batch(batch_texts):
+		pred_scores = model.compute_score(sentence_pairs=batch_texts)
 		if not isinstance(pred_scores, Iterable):
-			results.append(pred_scores)
-		else:
-			results.extend(pred_scores)
-	return results
+			return [pred_scores]
+		return pred_scores
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_texts, getattr(model, "tokenizer", None)),
+		max_tokens=max_tokens,
+		device=getattr(model, "device", None),
+	)
@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import pandas as pd
 
@@ -15,6 +15,8 @@ from autorag.utils.util import (
 
 
 class FlagEmbeddingLLMReranker(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir,
@@ -51,7 +53,8 @@ class FlagEmbeddingLLMReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -60,6 +63,7 @@ class FlagEmbeddingLLMReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using BAAI LLM-based-Reranker model.
@@ -70,6 +74,9 @@ class FlagEmbeddingLLMReranker(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
 			Default is 64.
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
@@ -79,7 +86,11 @@ class FlagEmbeddingLLMReranker(BasePassageReranker):
 			for query, content_list in zip(queries, contents_list)
 		]
 		rerank_scores = flatten_apply(
-			flag_embedding_run_model, nested_list, model=self.model, batch_size=batch
+			flag_embedding_run_model,
+			nested_list,
+			model=self.model,
+			batch_size=batch,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
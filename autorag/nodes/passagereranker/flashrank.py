@@ -8,15 +8,18 @@ import zipfile
 import requests
 from tqdm import tqdm
 import collections
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
 from autorag.utils import result_to_dataframe
 from autorag.utils.util import (
 	flatten_apply,
 	sort_by_scores,
 	select_top_k,
-	make_batch,
 	empty_cuda_cache,
 )
 
@@ -159,7 +162,8 @@ class FlashRankReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -168,6 +172,7 @@ class FlashRankReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents with FlashRank rerank models.
@@ -177,6 +182,9 @@ class FlashRankReranker(BasePassageReranker):
 		:param ids_list: The list of lists of ids retrieved from the initial ranking
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: Tuple of lists containing the reranked contents, ids, and scores
 		"""
 		nested_list = [
@@ -190,6 +198,7 @@ class FlashRankReranker(BasePassageReranker):
 			session=self.session,
 			batch_size=batch,
 			tokenizer=self.tokenizer,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -211,11 +220,14 @@ class FlashRankReranker(BasePassageReranker):
 		)
 
 
-def flashrank_run_model(input_texts, tokenizer, session, batch_size: int):
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-
-	for batch_texts in tqdm(batch_input_texts):
+def flashrank_run_model(
+	input_texts,
+	tokenizer,
+	session,
+	batch_size: int,
+	max_tokens: Optional[int] = None,
+):
+	def run_batch(batch_texts):
 		input_text = tokenizer.encode_batch(batch_texts)
 		input_ids = np.array([e.ids for e in input_text])
 		token_type_ids = np.array([e.type_ids for e in input_text])
@@ -241,5 +253,13 @@ def flashrank_run_model(input_texts, tokenizer, session, batch_size: int):
 		else:
 			exp_logits = np.exp(logits)
 			scores = exp_logits[:, 1] / np.sum(exp_logits, axis=1)
-		results.extend(scores)
-	return results
+		return scores
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_texts, tokenizer),
+		max_tokens=max_tokens,
+		device="cpu",
+	)
@@ -1,11 +1,19 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import numpy as np
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
+from autorag.utils.onnx_backend import (
+	OnnxTransformer,
+	validate_backend,
+	get_onnx_cache_dir,
+)
 from autorag.utils.util import (
-	make_batch,
 	sort_by_scores,
 	flatten_apply,
 	select_top_k,
@@ -15,15 +23,49 @@ from autorag.utils.util import (
 
 
 class KoReranker(BasePassageReranker):
-	def __init__(self, project_dir: str, *args, **kwargs):
+	resource_tag = "gpu"
+
+	def __init__(
+		self,
+		project_dir: str,
+		backend: str = "torch",
+		quantize: bool = False,
+		session_pool_size: int = 1,
+		*args,
+		**kwargs,
+	):
+		"""
+		Initialize the ko-reranker module.
+
+		:param project_dir: The project directory.
+		:param backend: The execution backend of the model. 'torch' or 'onnx'.
+			The 'onnx' backend exports the model to ONNX once under the project resources directory,
+			and runs it with onnxruntime on CPU.
+			Default is 'torch'.
+		:param quantize: Whether to apply the int8 dynamic quantization to the ONNX model.
+			It is only used with the 'onnx' backend. Default is False.
+		:param session_pool_size: The number of onnxruntime sessions.
+			It is only used with the 'onnx' backend. Default is 1.
+		"""
 		super().__init__(project_dir)
+		model_path = "Dongjin-kr/ko-reranker"
+		if validate_backend(backend):
+			self.model = OnnxTransformer(
+				model_path,
+				"sequence_classification",
+				get_onnx_cache_dir(project_dir),
+				quantize=quantize,
+				session_pool_size=session_pool_size,
+			)
+			self.tokenizer = self.model.tokenizer
+			self.device = "cpu"
+			return
 		try:
 			import torch
 			from transformers import AutoModelForSequenceClassification, AutoTokenizer
 		except ImportError:
 			raise ImportError("For using KoReranker, please install torch first.")
 
-		model_path = "Dongjin-kr/ko-reranker"
 		self.tokenizer = AutoTokenizer.from_pretrained(model_path)
 		self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
 		self.model.eval()
@@ -41,7 +83,8 @@ class KoReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -50,6 +93,7 @@ class KoReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using ko-reranker.
@@ -61,6 +105,9 @@ class KoReranker(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
 		    Default is 64.
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: Tuple of lists containing the reranked contents, ids, and scores
 		"""
 		nested_list = [
@@ -74,6 +121,7 @@ class KoReranker(BasePassageReranker):
 			batch_size=batch,
 			tokenizer=self.tokenizer,
 			device=self.device,
+			max_tokens=max_tokens,
 		)
 
 		rerank_scores = list(
@@ -101,14 +149,17 @@ class KoReranker(BasePassageReranker):
 		)
 
 
-def koreranker_run_model(input_texts, model, tokenizer, device, batch_size: int):
-	try:
-		import torch
-	except ImportError:
-		raise ImportError("For using KoReranker, please install torch first.")
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-	for batch_texts in batch_input_texts:
+def koreranker_run_model(
+	input_texts,
+	model,
+	tokenizer,
+	device,
+	batch_size: int,
+	max_tokens: Optional[int] = None,
+):
+	def run_batch(batch_texts):
+		if isinstance(model, OnnxTransformer):
+			return model(batch_texts).reshape(-1)
 		inputs = tokenizer(
 			batch_texts,
 			padding=True,
@@ -117,17 +168,23 @@ def koreranker_run_model(input_texts, model, tokenizer, device, batch_size: int)
 			max_length=512,
 		)
 		inputs = inputs.to(device)
-		with torch.no_grad():
-			scores = (
-				model(**inputs, return_dict=True)
-				.logits.view(
-					-1,
-				)
-				.float()
+		scores = (
+			model(**inputs, return_dict=True)
+			.logits.view(
+				-1,
 			)
-			scores_np = scores.cpu().numpy()
-			results.extend(scores_np)
-	return results
+			.float()
+		)
+		return scores.cpu().numpy()
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_texts, tokenizer),
+		max_tokens=max_tokens,
+		device=device,
+	)
 
 
 def exp_normalize(x):
@@ -14,6 +14,8 @@ from autorag.utils.util import (
 
 
 class MixedbreadAIReranker(BasePassageReranker):
+	resource_tag = "api"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -1,11 +1,14 @@
 from itertools import chain
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
 from autorag.utils.util import (
-	make_batch,
 	sort_by_scores,
 	flatten_apply,
 	select_top_k,
@@ -39,6 +42,8 @@ prediction_tokens = {
 
 
 class MonoT5(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -92,7 +97,8 @@ class MonoT5(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.get("top_k", 3)
 		batch = kwargs.get("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.get("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -101,6 +107,7 @@ class MonoT5(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using MonoT5.
@@ -111,6 +118,9 @@ class MonoT5(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
 		# Retrieve the tokens used by the model to represent false and true predictions
@@ -129,6 +139,7 @@ class MonoT5(BasePassageReranker):
 			device=self.device,
 			token_false_id=self.token_false_id,
 			token_true_id=self.token_true_id,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -158,14 +169,14 @@ def monot5_run_model(
 	device,
 	token_false_id,
 	token_true_id,
+	max_tokens: Optional[int] = None,
 ):
 	try:
 		import torch
 	except ImportError:
 		raise ImportError("For using MonoT5 Reranker, please install torch first.")
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-	for batch_texts in batch_input_texts:
+
+	def run_batch(batch_texts):
 		flattened_batch_texts = list(chain.from_iterable(batch_texts))
 		input_encodings = tokenizer(
 			flattened_batch_texts,
@@ -174,17 +185,24 @@ def monot5_run_model(
 			max_length=512,
 			return_tensors="pt",
 		).to(device)
-		with torch.no_grad():
-			outputs = model.generate(
-				input_ids=input_encodings["input_ids"],
-				attention_mask=input_encodings["attention_mask"],
-				output_scores=True,
-				return_dict_in_generate=True,
-			)
+		outputs = model.generate(
+			input_ids=input_encodings["input_ids"],
+			attention_mask=input_encodings["attention_mask"],
+			output_scores=True,
+			return_dict_in_generate=True,
+		)
 
 		# Extract logits for the 'false' and 'true' tokens from the model's output
 		logits = outputs.scores[-1][:, [token_false_id, token_true_id]]
 		# Calculate the softmax probability of the 'true' token
 		probs = torch.nn.functional.softmax(logits, dim=-1)[:, 1]
-		results.extend(probs.tolist())
-	return results
+		return probs.tolist()
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_texts, tokenizer),
+		max_tokens=max_tokens,
+		device=device,
+	)
@@ -1,14 +1,15 @@
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, List, Tuple, Optional
 
 import numpy as np
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
-
-
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
 from autorag.utils.util import (
-	make_batch,
 	sort_by_scores,
 	flatten_apply,
 	select_top_k,
@@ -19,6 +20,8 @@ from autorag.utils.util import (
 
 
 class OpenVINOReranker(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -109,7 +112,8 @@ class OpenVINOReranker(BasePassageReranker):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.get("top_k", 3)
 		batch = kwargs.get("batch", 64)
-		return self._pure(queries, contents, ids, top_k, batch)
+		max_tokens = kwargs.get("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -118,6 +122,7 @@ class OpenVINOReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using MonoT5.
@@ -128,6 +133,9 @@ class OpenVINOReranker(BasePassageReranker):
 		:param top_k: The number of passages to be retrieved
 
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
 		# Retrieve the tokens used by the model to represent false and true predictions
@@ -143,6 +151,7 @@ class OpenVINOReranker(BasePassageReranker):
 			model=self.model,
 			batch_size=batch,
 			tokenizer=self.tokenizer,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -169,10 +178,9 @@ def openvino_run_model(
 	model,
 	batch_size: int,
 	tokenizer,
+	max_tokens: Optional[int] = None,
 ):
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-	for batch_texts in batch_input_texts:
+	def run_batch(batch_texts):
 		input_tensors = tokenizer(
 			batch_texts,
 			padding=True,
@@ -186,6 +194,12 @@ def openvino_run_model(
 		else:
 			scores = outputs[0].flatten()
 
-		scores = list(map(float, (1 / (1 + np.exp(-np.array(scores))))))
-		results.extend(scores)
-	return results
+		return list(map(float, (1 / (1 + np.exp(-np.array(scores))))))
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_texts, tokenizer),
+		max_tokens=max_tokens,
+	)
@@ -21,6 +21,8 @@ from autorag.utils.util import (
 
 
 class RankGPT(BasePassageReranker):
+	resource_tag = "api"
+
 	def __init__(
 		self, project_dir: str, llm: Optional[Union[str, LLM]] = None, **kwargs
 	):
@@ -1,18 +1,62 @@
+import json
 import logging
 import os
 import pathlib
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 import pandas as pd
 
 from autorag.nodes.retrieval.run_util import evaluate_retrieval_node
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
 from autorag.utils.util import apply_recursive, to_list
 
 logger = logging.getLogger("AutoRAG")
 
 
+def share_top_k_runs(
+	modules: List, module_params: List[Dict]
+) -> Tuple[List, List[Dict], List[int]]:
+	"""
+	Group the module combinations that differ only in top_k.
+	The reranker sorts every passage by its score and truncates the sorted list to top_k,
+	so the combination with the largest top_k scores the passages once,
+	and the other combinations of the group are its truncated results.
+
+	:param modules: Passage reranker modules.
+	:param module_params: Passage reranker module parameters.
+	:return: The modules and the module parameters to run,
+	    and the index of the run that each combination uses.
+	"""
+	run_modules_list, run_params, run_indices = [], [], []
+	groups: Dict[Tuple, int] = {}
+	for module, module_param in zip(modules, module_params):
+		if "top_k" in module_param:
+			scoring_params = {k: v for k, v in module_param.items() if k != "top_k"}
+			key = (module, json.dumps(scoring_params, sort_keys=True, default=str))
+		else:
+			# the combination without top_k never shares its run
+			key = (module, len(run_params))
+		if key not in groups:
+			groups[key] = len(run_params)
+			run_modules_list.append(module)
+			run_params.append(dict(module_param))
+		elif module_param["top_k"] > run_params[groups[key]]["top_k"]:
+			run_params[groups[key]]["top_k"] = module_param["top_k"]
+		run_indices.append(groups[key])
+	return run_modules_list, run_params, run_indices
+
+
+def truncate_top_k(result: pd.DataFrame, top_k: int) -> pd.DataFrame:
+	"""
+	Truncate the passage reranker result to top_k passages of each query.
+	"""
+	result = result.copy()
+	for column in ["retrieved_contents", "retrieved_ids", "retrieve_scores"]:
+		result[column] = list(map(lambda x: x[:top_k], result[column]))
+	return result
+
+
 def run_passage_reranker_node(
 	modules: List,
 	module_params: List[Dict],
@@ -51,17 +95,34 @@ def run_passage_reranker_node(
 		)
 	]
 
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
+	# the combinations that differ only in top_k share one scoring run
+	shared_modules, shared_params, run_indices = share_top_k_runs(
+		modules, module_params
+	)
+	if len(shared_modules) < len(modules):
+		logger.info(
+			f"Running {len(shared_modules)} reranker runs "
+			f"for {len(modules)} module combinations that differ only in top_k."
+		)
+	shared_results, shared_times = run_modules(
+		shared_modules,
+		shared_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
+	)
+	results = list(
+		map(
+			lambda x: (
+				shared_results[x[0]]
+				if shared_params[x[0]].get("top_k") == x[1].get("top_k")
+				else truncate_top_k(shared_results[x[0]], x[1]["top_k"])
 			),
-			zip(modules, module_params),
+			zip(run_indices, module_params),
 		)
 	)
+	# the truncated combination takes the time of the scoring run it derives from
+	execution_times = list(map(lambda x: shared_times[x], run_indices))
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
 	# run metrics before filtering
@@ -1,11 +1,20 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
+import numpy as np
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
+from autorag.utils.onnx_backend import (
+	OnnxTransformer,
+	validate_backend,
+	get_onnx_cache_dir,
+)
 from autorag.utils.util import (
 	flatten_apply,
-	make_batch,
 	select_top_k,
 	sort_by_scores,
 	pop_params,
@@ -15,10 +24,15 @@ from autorag.utils.util import (
 
 
 class SentenceTransformerReranker(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
 		model_name: str = "cross-encoder/ms-marco-MiniLM-L-2-v2",
+		backend: str = "torch",
+		quantize: bool = False,
+		session_pool_size: int = 1,
 		*args,
 		**kwargs,
 	):
@@ -28,9 +42,27 @@ class SentenceTransformerReranker(BasePassageReranker):
 		:param project_dir: The project directory
 		:param model_name: The name of the Sentence Transformer model to use for reranking
 		Default is "cross-encoder/ms-marco-MiniLM-L-2-v2"
+		:param backend: The execution backend of the model. 'torch' or 'onnx'.
+			The 'onnx' backend exports the model to ONNX once under the project resources directory,
+			and runs it with onnxruntime on CPU.
+			Default is 'torch'.
+		:param quantize: Whether to apply the int8 dynamic quantization to the ONNX model.
+			It is only used with the 'onnx' backend. Default is False.
+		:param session_pool_size: The number of onnxruntime sessions.
+			It is only used with the 'onnx' backend. Default is 1.
 		:param kwargs: The CrossEncoder parameters
 		"""
 		super().__init__(project_dir, *args, **kwargs)
+		if validate_backend(backend):
+			self.device = "cpu"
+			self.model = OnnxCrossEncoder(
+				model_name,
+				cache_dir=get_onnx_cache_dir(project_dir),
+				quantize=quantize,
+				session_pool_size=session_pool_size,
+				max_length=kwargs.get("max_length", None) or 512,
+			)
+			return
 		try:
 			import torch
 			from sentence_transformers import CrossEncoder
@@ -55,6 +87,7 @@ class SentenceTransformerReranker(BasePassageReranker):
 		:param previous_result: The previous result
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch
 		:return: pd DataFrame containing the reranked contents, ids, and scores
 		"""
 		queries, contents_list, scores_list, ids_list = self.cast_to_run(
@@ -62,7 +95,8 @@ class SentenceTransformerReranker(BasePassageReranker):
 		)
 		top_k = kwargs.get("top_k", 1)
 		batch = kwargs.get("batch", 64)
-		return self._pure(queries, contents_list, ids_list, top_k, batch)
+		max_tokens = kwargs.get("max_tokens", None)
+		return self._pure(queries, contents_list, ids_list, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -71,6 +105,7 @@ class SentenceTransformerReranker(BasePassageReranker):
 		ids_list: List[List[str]],
 		top_k: int,
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using a Sentence Transformer model.
@@ -80,6 +115,9 @@ class SentenceTransformerReranker(BasePassageReranker):
 		:param ids_list: The list of lists of ids retrieved from the initial ranking
 		:param top_k: The number of passages to be retrieved
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
@@ -92,6 +130,7 @@ class SentenceTransformerReranker(BasePassageReranker):
 			nested_list,
 			model=self.model,
 			batch_size=batch,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -113,17 +152,35 @@ class SentenceTransformerReranker(BasePassageReranker):
 		)
 
 
-def sentence_transformer_run_model(input_texts, model, batch_size: int):
-	try:
-		import torch
-	except ImportError:
-		raise ImportError(
-			"You have to install AutoRAG[gpu] to use SentenceTransformerReranker"
-		)
-	batch_input_texts = make_batch(input_texts, batch_size)
-	results = []
-	for batch_texts in batch_input_texts:
-		with torch.no_grad():
-			pred_scores = model.predict(batch_texts)
-		results.extend(pred_scores.tolist())
-	return results
+class OnnxCrossEncoder(OnnxTransformer):
+	"""
+	The sentence transformers CrossEncoder that runs with the onnx backend.
+	"""
+
+	def __init__(self, model_name: str, cache_dir: str, **kwargs):
+		super().__init__(model_name, "sequence_classification", cache_dir, **kwargs)
+
+	def predict(self, sentences: List[List[str]], *args, **kwargs) -> np.ndarray:
+		logits = self(sentences)
+		# CrossEncoder applies the sigmoid to the single label model by default
+		if logits.shape[1] == 1:
+			return 1 / (1 + np.exp(-logits[:, 0]))
+		return logits
+
+
+def sentence_transformer_run_model(
+	input_texts, model, batch_size: int, max_tokens: Optional[int] = None
+):
+	def run_batch(batch_texts):
+		return model.predict(batch_texts, batch_size=len(batch_texts)).tolist()
+
+	return run_cross_encoder(
+		input_texts,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(
+			input_texts, model.tokenizer, getattr(model, "max_length", None) or 512
+		),
+		max_tokens=max_tokens,
+		device=getattr(model, "device", None),
+	)
@@ -1,15 +1,18 @@
 from itertools import chain
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import (
+	run_cross_encoder,
+	get_token_lengths,
+)
 from autorag.nodes.passagereranker.tart.modeling_enc_t5 import (
 	EncT5ForSequenceClassification,
 )
 from autorag.nodes.passagereranker.tart.tokenization_enc_t5 import EncT5Tokenizer
 from autorag.utils.util import (
-	make_batch,
 	sort_by_scores,
 	flatten_apply,
 	select_top_k,
@@ -19,6 +22,8 @@ from autorag.utils.util import (
 
 
 class Tart(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(self, project_dir: str, *args, **kwargs):
 		super().__init__(project_dir)
 		try:
@@ -45,7 +50,8 @@ class Tart(BasePassageReranker):
 		top_k = kwargs.pop("top_k")
 		instruction = kwargs.pop("instruction", "Find passage to answer given question")
 		batch = kwargs.pop("batch", 64)
-		return self._pure(queries, contents, ids, top_k, instruction, batch)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, instruction, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -55,6 +61,7 @@ class Tart(BasePassageReranker):
 		top_k: int,
 		instruction: str = "Find passage to answer given question",
 		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using Tart.
@@ -71,6 +78,9 @@ class Tart(BasePassageReranker):
 				The default instruction from the TART paper is being used.
 				If you want to use a different instruction, you can change the instruction through this parameter
 		:param batch: The number of queries to be processed in a batch
+		:param max_tokens: The maximum padded token count of a batch.
+		    The passages are sorted by the token length and packed to the batches under it.
+		    Default is None, which means only batch limits the batch size.
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
 		nested_list = [
@@ -86,6 +96,7 @@ class Tart(BasePassageReranker):
 			tokenizer=self.tokenizer,
 			device=self.device,
 			contents_list=contents_list,
+			max_tokens=max_tokens,
 		)
 
 		df = pd.DataFrame(
@@ -108,10 +119,15 @@ class Tart(BasePassageReranker):
 
 
 def tart_run_model(
-	input_texts, contents_list, model, batch_size: int, tokenizer, device
+	input_texts,
+	contents_list,
+	model,
+	batch_size: int,
+	tokenizer,
+	device,
+	max_tokens: Optional[int] = None,
 ):
 	try:
-		import torch
 		import torch.nn.functional as F
 	except ImportError:
 		raise ImportError(
@@ -119,21 +135,24 @@ def tart_run_model(
 		)
 	flattened_texts = list(chain.from_iterable(input_texts))
 	flattened_contents = list(chain.from_iterable(contents_list))
-	batch_input_texts = make_batch(flattened_texts, batch_size)
-	batch_contents_list = make_batch(flattened_contents, batch_size)
-	results = []
-	for batch_texts, batch_contents in zip(batch_input_texts, batch_contents_list):
+	input_pairs = list(zip(flattened_texts, flattened_contents))
+
+	def run_batch(batch_pairs):
 		feature = tokenizer(
-			batch_texts,
-			batch_contents,
+			list(map(lambda x: x[0], batch_pairs)),
+			list(map(lambda x: x[1], batch_pairs)),
 			padding=True,
 			truncation=True,
 			return_tensors="pt",
 		).to(device)
-		with torch.no_grad():
-			pred_scores = model(**feature).logits
-			normalized_scores = [
-				float(score[1]) for score in F.softmax(pred_scores, dim=1)
-			]
-		results.extend(normalized_scores)
-	return results
+		pred_scores = model(**feature).logits
+		return [float(score[1]) for score in F.softmax(pred_scores, dim=1)]
+
+	return run_cross_encoder(
+		input_pairs,
+		run_batch,
+		batch_size,
+		lengths=get_token_lengths(input_pairs, tokenizer),
+		max_tokens=max_tokens,
+		device=device,
+	)
@@ -5,20 +5,30 @@ from typing import List, Tuple
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
-from autorag.utils import result_to_dataframe, fetch_contents
+from autorag.utils import (
+	result_to_dataframe,
+	fetch_contents,
+	acquire_corpus,
+	release_corpus,
+)
 
 
 class TimeReranker(BasePassageReranker):
 	def __init__(self, project_dir: str, *args, **kwargs):
 		super().__init__(project_dir, *args, **kwargs)
-		self.corpus_df = pd.read_parquet(
-			os.path.join(project_dir, "data", "corpus.parquet"), engine="pyarrow"
+		self.corpus_index = acquire_corpus(
+			os.path.join(project_dir, "data", "corpus.parquet")
 		)
+		self.corpus_df = self.corpus_index.corpus_df
+
+	def __del__(self):
+		release_corpus(getattr(self, "corpus_index", None))
+		super().__del__()
 
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		_, contents, scores, ids = self.cast_to_run(previous_result)
-		metadatas = fetch_contents(self.corpus_df, ids, column_name="metadata")
+		metadatas = fetch_contents(self.corpus_index, ids, column_name="metadata")
 		times = [
 			[time["last_modified_datetime"] for time in time_list]
 			for time_list in metadatas
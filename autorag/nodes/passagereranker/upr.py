@@ -1,16 +1,24 @@
 import logging
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.passagereranker.cross_encoder import run_cross_encoder
 from autorag.utils import result_to_dataframe
-from autorag.utils.util import select_top_k, sort_by_scores, empty_cuda_cache
+from autorag.utils.util import (
+	select_top_k,
+	sort_by_scores,
+	empty_cuda_cache,
+	flatten_apply,
+)
 
 logger = logging.getLogger("AutoRAG")
 
 
 class Upr(BasePassageReranker):
+	resource_tag = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -49,7 +57,9 @@ class Upr(BasePassageReranker):
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		queries, contents, _, ids = self.cast_to_run(previous_result)
 		top_k = kwargs.pop("top_k")
-		return self._pure(queries, contents, ids, top_k)
+		batch = kwargs.pop("batch", 64)
+		max_tokens = kwargs.pop("max_tokens", None)
+		return self._pure(queries, contents, ids, top_k, batch, max_tokens)
 
 	def _pure(
 		self,
@@ -57,6 +67,8 @@ class Upr(BasePassageReranker):
 		contents_list: List[List[str]],
 		ids_list: List[List[str]],
 		top_k: int,
+		batch: int = 64,
+		max_tokens: Optional[int] = None,
 	) -> Tuple[List[List[str]], List[List[str]], List[List[float]]]:
 		"""
 		Rerank a list of contents based on their relevance to a query using UPR.
@@ -68,22 +80,23 @@ class Upr(BasePassageReranker):
 		:param contents_list: The list of lists of contents to rerank
 		:param ids_list: The list of lists of ids retrieved from the initial ranking
 		:param top_k: The number of passages to be retrieved
+		:param batch: The number of (passage, query) pairs to be processed in a batch.
+			The pairs of every query are batched together.
+			Default is 64.
+		:param max_tokens: The maximum padded token count of a batch.
+			Default is None, which means only batch limits the batch size.
 
 		:return: tuple of lists containing the reranked contents, ids, and scores
 		"""
 		df = pd.DataFrame(
 			{
-				"query": queries,
 				"contents": contents_list,
 				"ids": ids_list,
 			}
 		)
 
-		df["scores"] = df.apply(
-			lambda row: self.scorer.compute(
-				query=row["query"], contents=row["contents"]
-			),
-			axis=1,
+		df["scores"] = self.scorer.compute_batch(
+			queries, contents_list, batch_size=batch, max_tokens=max_tokens
 		)
 		df[["contents", "ids", "scores"]] = df.apply(
 			lambda x: sort_by_scores(x, reverse=False), axis=1, result_type="expand"
@@ -154,6 +167,104 @@ class UPRScorer:
 		avg_nll = torch.sum(nll, dim=1)
 		return avg_nll.tolist()
 
+	def compute_batch(
+		self,
+		queries: List[str],
+		contents_list: List[List[str]],
+		batch_size: int = 64,
+		max_tokens: Optional[int] = None,
+	) -> List[List[float]]:
+		"""
+		Compute the negative log-likelihood of each query given its passages, like :meth:`compute`.
+		The (passage, query) pairs of all queries are flattened,
+		sorted by the token length and computed in the large padded batches.
+
+		:param queries: The list of queries.
+		:param contents_list: The list of passages of each query.
+		:param batch_size: The maximum number of (passage, query) pairs in a batch.
+		:param max_tokens: The maximum padded token count (passage and query) of a batch.
+		:return: The list of the scores of each query's passages.
+		"""
+		nested_list = [
+			list(map(lambda x: (query, x), contents))
+			for query, contents in zip(queries, contents_list)
+		]
+		return flatten_apply(
+			self._run_model, nested_list, batch_size=batch_size, max_tokens=max_tokens
+		)
+
+	def _run_model(
+		self, input_pairs, batch_size: int, max_tokens: Optional[int] = None
+	) -> List[float]:
+		try:
+			import torch
+		except ImportError:
+			raise ImportError(
+				"torch is not installed. Please install torch to use UPRReranker."
+			)
+		unique_queries = list(dict.fromkeys(map(lambda x: x[0], input_pairs)))
+		query_token_ids = dict(
+			zip(
+				unique_queries,
+				self.tokenizer(unique_queries, max_length=128, truncation=True)[
+					"input_ids"
+				],
+			)
+		)
+		prompts = list(
+			map(
+				lambda x: f"{self.prefix_prompt} {x[1]} {self.suffix_prompt}",
+				input_pairs,
+			)
+		)
+		prompt_token_ids = self.tokenizer(prompts, max_length=512, truncation=True)[
+			"input_ids"
+		]
+		label_ids = list(map(lambda x: query_token_ids[x[0]], input_pairs))
+		lengths = list(
+			map(lambda x: len(x[0]) + len(x[1]), zip(prompt_token_ids, label_ids))
+		)
+
+		def run_batch(batch_indices: List[int]) -> List[float]:
+			prompt_token_outputs = self.tokenizer.pad(
+				{"input_ids": list(map(lambda x: prompt_token_ids[x], batch_indices))},
+				padding="longest",
+				pad_to_multiple_of=8,
+				return_tensors="pt",
+			)
+			batch_label_ids = list(map(lambda x: label_ids[x], batch_indices))
+			label_length = max(map(len, batch_label_ids))
+			# the padded label positions come after the query tokens,
+			# so they don't change the decoder outputs of the query tokens
+			labels = torch.tensor(
+				list(
+					map(
+						lambda x: x + [-100] * (label_length - len(x)),
+						batch_label_ids,
+					)
+				)
+			).to(self.device)
+			label_mask = labels != -100
+			logits = self.model(
+				input_ids=prompt_token_outputs["input_ids"].to(self.device),
+				attention_mask=prompt_token_outputs["attention_mask"].to(self.device),
+				labels=labels,
+			).logits
+			log_softmax = torch.nn.functional.log_softmax(logits, dim=-1)
+			nll = -log_softmax.gather(
+				2, labels.masked_fill(~label_mask, 0).unsqueeze(2)
+			).squeeze(2)
+			return torch.sum(nll * label_mask, dim=1).tolist()
+
+		return run_cross_encoder(
+			list(range(len(input_pairs))),
+			run_batch,
+			batch_size,
+			lengths=lengths,
+			max_tokens=max_tokens,
+			device=self.device,
+		)
+
 	def __del__(self):
 		del self.model
 		del self.tokenizer
@@ -9,7 +9,12 @@ import tokenlog
 from autorag.evaluation import evaluate_generation
 from autorag.evaluation.util import cast_metrics
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import (
+	SCHEDULER_STRATEGY_KEYS,
+	run_modules,
+	filter_by_threshold,
+	select_best,
+)
 from autorag.support import get_support_modules
 from autorag.utils import validate_qa_dataset
 from autorag.utils.util import make_combinations, explode, split_dataframe, to_list
@@ -51,16 +56,12 @@ def run_prompt_maker_node(
 	project_dir = pathlib.PurePath(node_line_dir).parent.parent
 
 	# run modules
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
@@ -98,7 +99,13 @@ def run_prompt_maker_node(
 	# Run evaluation when there are more than one module.
 	if len(modules) > 1:
 		# pop general keys from strategies (e.g. metrics, speed_threshold)
-		general_key = ["metrics", "speed_threshold", "token_threshold", "tokenizer"]
+		general_key = [
+			"metrics",
+			"speed_threshold",
+			"token_threshold",
+			"tokenizer",
+			*SCHEDULER_STRATEGY_KEYS,
+		]
 		general_strategy = dict(
 			filter(lambda x: x[0] in general_key, strategies.items())
 		)
@@ -5,7 +5,12 @@ from typing import List, Dict
 import pandas as pd
 
 from autorag.nodes.promptmaker.base import BasePromptMaker
-from autorag.utils import result_to_dataframe, fetch_contents
+from autorag.utils import (
+	result_to_dataframe,
+	fetch_contents,
+	acquire_corpus,
+	release_corpus,
+)
 
 logger = logging.getLogger("AutoRAG")
 
@@ -15,9 +20,12 @@ class WindowReplacement(BasePromptMaker):
 		super().__init__(project_dir, *args, **kwargs)
 		# load corpus
 		data_dir = os.path.join(project_dir, "data")
-		self.corpus_data = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
+		self.corpus_index = acquire_corpus(os.path.join(data_dir, "corpus.parquet"))
+		self.corpus_data = self.corpus_index.corpus_df
+
+	def __del__(self):
+		release_corpus(getattr(self, "corpus_index", None))
+		super().__del__()
 
 	@result_to_dataframe(["prompts"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
@@ -27,7 +35,7 @@ class WindowReplacement(BasePromptMaker):
 		retrieved_ids = previous_result["retrieved_ids"].tolist()
 		# get metadata from corpus
 		retrieved_metadata = fetch_contents(
-			self.corpus_data, retrieved_ids, column_name="metadata"
+			self.corpus_index, retrieved_ids, column_name="metadata"
 		)
 		return self._pure(prompt, query, retrieved_contents, retrieved_metadata)
 
@@ -8,7 +8,12 @@ import pandas as pd
 
 from autorag.evaluation import evaluate_retrieval
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import (
+	SCHEDULER_STRATEGY_KEYS,
+	run_modules,
+	filter_by_threshold,
+	select_best,
+)
 from autorag.support import get_support_modules
 from autorag.utils.cast import cast_retrieve_infos
 from autorag.utils.util import make_combinations, explode
@@ -47,16 +52,12 @@ def run_query_expansion_node(
 	project_dir = pathlib.PurePath(node_line_dir).parent.parent
 
 	# run query expansion
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
 
@@ -86,7 +87,12 @@ def run_query_expansion_node(
 	# Run evaluation when there are more than one module.
 	if len(modules) > 1:
 		# pop general keys from strategies (e.g. metrics, speed_threshold)
-		general_key = ["metrics", "speed_threshold", "strategy"]
+		general_key = [
+			"metrics",
+			"speed_threshold",
+			"strategy",
+			*SCHEDULER_STRATEGY_KEYS,
+		]
 		general_strategy = dict(
 			filter(lambda x: x[0] in general_key, strategies.items())
 		)
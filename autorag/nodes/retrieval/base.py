@@ -7,7 +7,13 @@ import pandas as pd
 
 from autorag.schema import BaseModule
 from autorag.support import get_support_modules
-from autorag.utils import fetch_contents, result_to_dataframe, validate_qa_dataset
+from autorag.utils import (
+	fetch_contents,
+	result_to_dataframe,
+	validate_qa_dataset,
+	acquire_corpus,
+	release_corpus,
+)
 from autorag.utils.util import pop_params
 
 logger = logging.getLogger("AutoRAG")
@@ -20,12 +26,12 @@ class BaseRetrieval(BaseModule, metaclass=abc.ABCMeta):
 		self.resources_dir = os.path.join(project_dir, "resources")
 		data_dir = os.path.join(project_dir, "data")
 		# fetch data from corpus_data
-		self.corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
+		self.corpus_index = acquire_corpus(os.path.join(data_dir, "corpus.parquet"))
+		self.corpus_df = self.corpus_index.corpus_df
 
 	def __del__(self):
 		logger.info(f"Deleting retrieval node - {self.__class__.__name__} module...")
+		release_corpus(getattr(self, "corpus_index", None))
 
 	def cast_to_run(self, previous_result: pd.DataFrame, *args, **kwargs):
 		logger.info(f"Running retrieval node - {self.__class__.__name__} module...")
@@ -88,7 +94,7 @@ class HybridRetrieval(BaseRetrieval, metaclass=abc.ABCMeta):
 				"With specifying ids or scores, you must use HybridRRF.run_evaluator instead."
 			)
 		ids, scores = self._pure(ids=ids, scores=scores, **_pure_params)
-		contents = fetch_contents(self.corpus_df, ids)
+		contents = fetch_contents(self.corpus_index, ids)
 		return contents, ids, scores
 
 
@@ -125,3 +131,8 @@ def evenly_distribute_passages(
 def get_bm25_pkl_name(bm25_tokenizer: str):
 	bm25_tokenizer = bm25_tokenizer.replace("/", "")
 	return f"bm25_{bm25_tokenizer}.pkl"
+
+
+def get_bm25_index_dir_name(bm25_tokenizer: str):
+	bm25_tokenizer = bm25_tokenizer.replace("/", "")
+	return f"bm25_{bm25_tokenizer}"
@@ -6,7 +6,7 @@ import pandas as pd
 
 from autorag.evaluation import evaluate_retrieval
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import run_modules, filter_by_threshold, select_best
 
 
 def evaluate_retrieval_node(
@@ -56,16 +56,12 @@ def run(
 	:return: First, it returns list of result dataframe.
 	Second, it returns list of execution times.
 	"""
-	result, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(input_modules, input_module_params),
-		)
+	result, execution_times = run_modules(
+		input_modules,
+		input_module_params,
+		strategies,
+		project_dir=project_dir,
+		previous_result=previous_result,
 	)
 	average_times = list(map(lambda x: x / len(result[0]), execution_times))
 
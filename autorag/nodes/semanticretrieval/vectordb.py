@@ -3,16 +3,11 @@ import logging
 import os
 from typing import List, Tuple, Optional
 
-import numpy as np
 import pandas as pd
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
-from autorag.evaluation.metric.util import (
-	calculate_l2_distance,
-	calculate_inner_product,
-	calculate_cosine_similarity,
-)
+from autorag.evaluation.metric.util import calculate_similarity_matrix
 from autorag.nodes.retrieval.base import evenly_distribute_passages, BaseRetrieval
 from autorag.utils import (
 	validate_corpus_dataset,
@@ -76,7 +71,7 @@ class VectorDB(BaseRetrieval):
 		queries = self.cast_to_run(previous_result)
 		pure_params = pop_params(self._pure, kwargs)
 		ids, scores = self._pure(queries, **pure_params)
-		contents = fetch_contents(self.corpus_df, ids)
+		contents = fetch_contents(self.corpus_index, ids)
 		return contents, ids, scores
 
 	def _pure(
@@ -321,19 +316,9 @@ def get_id_scores(  # To find the uncalculated score when fuse the scores for th
 	:param similarity_metric: The similarity metric to use ('l2', 'ip', or 'cosine').
 	:return: A list of the highest similarity scores for each content embedding.
 	"""
-	metric_func_dict = {
-		"l2": lambda x, y: 1 - calculate_l2_distance(x, y),
-		"ip": calculate_inner_product,
-		"cosine": calculate_cosine_similarity,
-	}
-	metric_func = metric_func_dict[similarity_metric]
-
-	result = []
-	for content_embedding in content_embeddings:
-		scores = []
-		for query_embedding in query_embeddings:
-			scores.append(
-				metric_func(np.array(query_embedding), np.array(content_embedding))
-			)
-		result.append(max(scores))
-	return result
+	if len(content_embeddings) == 0:
+		return []
+	scores = calculate_similarity_matrix(
+		query_embeddings, content_embeddings, similarity_metric=similarity_metric
+	)
+	return scores.max(axis=0).tolist()
@@ -6,6 +6,10 @@ import pandas as pd
 
 
 class BaseModule(metaclass=ABCMeta):
+	# The resource that the module mainly uses: 'cpu', 'gpu', or 'api'.
+	# The node scheduler does not run more modules of the same resource at once than its limit.
+	resource_tag: str = "cpu"
+
 	@abstractmethod
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		pass
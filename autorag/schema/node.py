@@ -53,6 +53,10 @@ class Node:
 
 	def run(self, previous_result: pd.DataFrame, node_line_dir: str) -> pd.DataFrame:
 		logger.info(f"Running node {self.node_type}...")
+		if self.strategy.get("search") is not None:
+			from autorag.node_line import run_node_search  # resolve circular import
+
+			return run_node_search(self, previous_result, node_line_dir)
 		input_modules, input_params = self.get_param_combinations()
 		return self.run_node(
 			modules=input_modules,
@@ -1,10 +1,32 @@
 import functools
+import logging
 import time
-from typing import List, Iterable, Tuple, Any, Optional, Callable
+from collections import defaultdict
+from concurrent.futures import (
+	ThreadPoolExecutor,
+	ProcessPoolExecutor,
+	wait,
+	FIRST_COMPLETED,
+)
+from typing import List, Iterable, Tuple, Any, Optional, Callable, Dict
 
 import numpy as np
 import pandas as pd
 
+from autorag.utils.result_cache import get_result_cache
+
+logger = logging.getLogger("AutoRAG")
+
+# the strategy keys of the node scheduler and the module search,
+# which are not the parameters of the evaluation modules
+SCHEDULER_STRATEGY_KEYS = [
+	"max_workers",
+	"executor",
+	"resource_limits",
+	"search",
+	"cache",
+]
+
 
 def measure_speed(func, *args, **kwargs):
 	"""
@@ -16,6 +38,137 @@ def measure_speed(func, *args, **kwargs):
 	return result, end_time - start_time
 
 
+def _measure_module(module, module_param: Dict, kwargs: Dict, embedding_cache_dir):
+	if embedding_cache_dir is None:
+		return measure_speed(module.run_evaluator, **kwargs, **module_param)
+	from autorag.embedding.cache import use_embedding_cache
+
+	# the worker processes only read the cache, because the store has a single writer
+	with use_embedding_cache(embedding_cache_dir, read_only=True):
+		return measure_speed(module.run_evaluator, **kwargs, **module_param)
+
+
+def run_modules(
+	modules: List, module_params: List[Dict], strategies: Dict, **kwargs
+) -> Tuple[List, List[float]]:
+	"""
+	Run every module and module parameter combination of the node with `run_evaluator`,
+	and measure the execution time of each combination.
+	When the strategy sets 'max_workers' more than 1, the combinations run at once on the worker pool.
+	Each module has the resource tag ('cpu', 'gpu', or 'api'),
+	and the combinations of the same resource never run more than its limit at once.
+	By default, only one 'gpu' module runs at once,
+	and only one 'cpu' module runs at once on the thread pool.
+	The execution time is measured in the worker, so it is the time of the combination itself.
+	When the module result cache is used, the cached combinations are loaded instead of running again,
+	with their execution time of the first run.
+	The 'api' modules are not cached by default, because their results are not deterministic.
+
+	:param modules: The module classes to run.
+	:param module_params: The module parameters of each module.
+	:param strategies: The node strategies. It uses the keys below.
+	    'max_workers': The number of the workers. Default is 1, which runs the combinations sequentially.
+	    'executor': 'thread' or 'process'. Default is 'thread'.
+	    'resource_limits': The maximum number of the running modules for each resource tag.
+	    'cache': True to use the module result cache for the modules except 'api' modules,
+	    'all' to use it for every module, and False not to use it. Default is True.
+	:param kwargs: The keyword arguments of `run_evaluator`, like project_dir and previous_result.
+	:return: The list of results and the list of execution times in the order of the modules.
+	"""
+	max_workers = strategies.get("max_workers", 1)
+	executor_type = strategies.get("executor", "thread")
+	if executor_type not in ["thread", "process"]:
+		raise ValueError(
+			f"executor must be 'thread' or 'process', but got {executor_type}"
+		)
+	cache_mode = strategies.get("cache", True)
+	if cache_mode not in [True, False, "all"]:
+		raise ValueError(f"cache must be True, False or 'all', but got {cache_mode}")
+	tags = list(map(lambda module: getattr(module, "resource_tag", "cpu"), modules))
+	outputs = [None] * len(modules)
+	result_cache = get_result_cache() if cache_mode is not False else None
+	cache_keys = [None] * len(modules)
+	if result_cache is not None and {"project_dir", "previous_result"} <= kwargs.keys():
+		cache_keys = result_cache.keys(
+			modules, module_params, kwargs["project_dir"], kwargs["previous_result"]
+		)
+		if cache_mode != "all":
+			# the results of the api modules (LLM, reranker API) change at every call
+			cache_keys = list(
+				map(lambda x: None if x[1] == "api" else x[0], zip(cache_keys, tags))
+			)
+		for index, key in enumerate(cache_keys):
+			if key is not None:
+				outputs[index] = result_cache.get(key)
+				if outputs[index] is not None:
+					logger.info(
+						f"Loaded the cached result of {modules[index].__name__} "
+						f"with {module_params[index]}."
+					)
+
+	def save_output(index: int, output: Tuple[Any, float]):
+		outputs[index] = output
+		if cache_keys[index] is not None:
+			result_cache.put(cache_keys[index], *output)
+
+	pending = [index for index in range(len(modules)) if outputs[index] is None]
+	if max_workers <= 1 or len(pending) <= 1:
+		for index in pending:
+			save_output(
+				index,
+				_measure_module(modules[index], module_params[index], kwargs, None),
+			)
+		return list(map(lambda x: x[0], outputs)), list(map(lambda x: x[1], outputs))
+
+	limits = {
+		"gpu": 1,
+		"cpu": 1 if executor_type == "thread" else max_workers,
+		"api": max_workers,
+		**strategies.get("resource_limits", {}),
+	}
+	if any(limit < 1 for limit in limits.values()):
+		raise ValueError("resource_limits must be at least 1.")
+
+	embedding_cache_dir = None
+	if executor_type == "process":
+		# the worker process does not share the embedding cache context of this process
+		from autorag.embedding.cache import get_embedding_cache
+
+		embedding_cache = get_embedding_cache()
+		if embedding_cache is not None:
+			embedding_cache_dir = embedding_cache.cache_dir
+	executor_class = (
+		ThreadPoolExecutor if executor_type == "thread" else ProcessPoolExecutor
+	)
+
+	running = {}
+	running_counts = defaultdict(int)
+	with executor_class(max_workers=max_workers) as executor:
+		while pending or running:
+			for index in list(pending):
+				if len(running) >= max_workers:
+					break
+				tag = tags[index]
+				if running_counts[tag] >= limits.get(tag, max_workers):
+					continue
+				future = executor.submit(
+					_measure_module,
+					modules[index],
+					module_params[index],
+					kwargs,
+					embedding_cache_dir,
+				)
+				running[future] = index
+				running_counts[tag] += 1
+				pending.remove(index)
+			done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+			for future in done:
+				index = running.pop(future)
+				running_counts[tags[index]] -= 1
+				save_output(index, future.result())
+	return list(map(lambda x: x[0], outputs)), list(map(lambda x: x[1], outputs))
+
+
 def avoid_empty_result(return_index: List[int]):
 	"""
 	Decorator for avoiding empty results from the function.
@@ -5,4 +5,5 @@ from .preprocess import (
 	cast_corpus_dataset,
 	validate_qa_from_corpus_dataset,
 )
+from .corpus import CorpusIndex, acquire_corpus, release_corpus, hold_corpus
 from .util import fetch_contents, result_to_dataframe, sort_by_scores
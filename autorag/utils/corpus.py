@@ -0,0 +1,178 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Any, Dict, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class CorpusIndex:
+	"""
+	The doc_id lookup index of the corpus dataframe.
+	It builds the hash index of the doc_id column once,
+	and resolves the (nested) doc_id lists to the values of any corpus column with one vectorized `take`.
+	When there are duplicated doc_ids, the first row is used.
+	"""
+
+	def __init__(self, corpus_df: pd.DataFrame, id_column_name: str = "doc_id"):
+		"""
+		:param corpus_df: The corpus dataframe.
+		:param id_column_name: The id column name of the corpus dataframe. Default is doc_id.
+		"""
+		self.corpus_df = corpus_df
+		self.id_column_name = id_column_name
+		doc_ids = corpus_df[id_column_name]
+		first_rows = ~doc_ids.duplicated(keep="first").to_numpy()
+		self._id_index = pd.Index(doc_ids.to_numpy()[first_rows])
+		self._rows = np.flatnonzero(first_rows)
+		self._columns: Dict[str, np.ndarray] = {}
+
+	def __len__(self):
+		return len(self.corpus_df)
+
+	def __contains__(self, id_) -> bool:
+		return id_ in self._id_index
+
+	def column(self, column_name: str) -> np.ndarray:
+		"""
+		Get the values of the corpus column as a numpy array. The array is cached.
+		"""
+		if column_name not in self._columns:
+			self._columns[column_name] = self.corpus_df[column_name].to_numpy()
+		return self._columns[column_name]
+
+	def get_rows(self, ids: List[str]) -> np.ndarray:
+		"""
+		Find the row positions of the doc_ids.
+		The blank string ("") or the value that is not a string is -1.
+
+		:param ids: The list of doc_ids.
+		:return: The row position of each doc_id.
+		"""
+		valid = np.fromiter(
+			map(lambda x: isinstance(x, str) and x != "", ids),
+			dtype=bool,
+			count=len(ids),
+		)
+		rows = np.full(len(ids), -1, dtype=np.int64)
+		if not valid.any():
+			return rows
+		valid_ids = [id_ for id_, is_valid in zip(ids, valid) if is_valid]
+		positions = self._id_index.get_indexer(valid_ids)
+		if (positions < 0).any():
+			missing_id = valid_ids[int(np.argmax(positions < 0))]
+			raise ValueError(f"doc_id: {missing_id} not found in corpus_data.")
+		rows[valid] = self._rows[positions]
+		return rows
+
+	def fetch_one(self, id_: str, column_name: str = "contents") -> Any:
+		"""
+		Fetch the value of the column of one doc_id.
+		It returns None when the doc_id is blank or not a string.
+		"""
+		row = self.get_rows([id_])[0]
+		if row < 0:
+			return None
+		return self.column(column_name)[row]
+
+	def fetch(
+		self, ids: List[List[str]], column_name: str = "contents"
+	) -> List[List[Any]]:
+		"""
+		Fetch the values of the column of the 2-d doc_id list.
+		The result has the same shape as the ids.
+		The blank string ("") or the value that is not a string becomes None,
+		and the empty list becomes [None].
+
+		:param ids: 2-d list of doc_ids.
+		:param column_name: The column name to fetch. Default is contents.
+		:return: 2-d list of the fetched values.
+		"""
+		# the empty list is the one None, the same as the exploded dataframe
+		ids = list(map(lambda x: list(x) if len(x) > 0 else [None], ids))
+		lengths = list(map(len, ids))
+		rows = self.get_rows([id_ for id_list in ids for id_ in id_list])
+		values = self.column(column_name)
+		flatten_values = [values[row] if row >= 0 else None for row in rows]
+		offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int)
+		return [
+			flatten_values[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+		]
+
+
+# (real path, mtime, size, cast) -> [CorpusIndex, reference count]
+_corpus_registry: Dict[Tuple[str, int, int, bool], list] = {}
+# real path -> hold count
+_held_corpus_paths: Dict[str, int] = {}
+_corpus_registry_lock = threading.RLock()
+
+
+def acquire_corpus(corpus_path: str, cast: bool = False) -> CorpusIndex:
+	"""
+	Get the shared CorpusIndex of the corpus parquet file from the process-wide corpus registry.
+	The corpus is loaded (with memory-mapping) only when it is not in the registry,
+	and the same CorpusIndex is handed out to every caller while the file is not modified.
+	Treat its corpus_df as read-only, because every caller shares it.
+	Call :func:`release_corpus` when you don't use it anymore.
+
+	:param corpus_path: The corpus parquet file path.
+	:param cast: If True, the corpus is cast by `cast_corpus_dataset`. Default is False.
+	:return: The shared CorpusIndex instance.
+	"""
+	real_path = os.path.realpath(corpus_path)
+	stat = os.stat(real_path)
+	key = (real_path, stat.st_mtime_ns, stat.st_size, cast)
+	with _corpus_registry_lock:
+		entry = _corpus_registry.get(key)
+		if entry is None:
+			corpus_df = pd.read_parquet(real_path, engine="pyarrow", memory_map=True)
+			if cast:
+				from autorag.utils.preprocess import cast_corpus_dataset
+
+				corpus_df = cast_corpus_dataset(corpus_df)
+			entry = [CorpusIndex(corpus_df), 0]
+			_corpus_registry[key] = entry
+		entry[1] += 1
+		return entry[0]
+
+
+def release_corpus(corpus_index: Optional[CorpusIndex]):
+	"""
+	Release the CorpusIndex that is got from :func:`acquire_corpus`.
+	When nobody uses the corpus and it is not held by :func:`hold_corpus`, it is removed from the registry.
+	"""
+	if corpus_index is None:
+		return
+	with _corpus_registry_lock:
+		for key, entry in list(_corpus_registry.items()):
+			if entry[0] is corpus_index:
+				entry[1] -= 1
+				if entry[1] <= 0 and key[0] not in _held_corpus_paths:
+					del _corpus_registry[key]
+				return
+
+
+@contextmanager
+def hold_corpus(corpus_path: str):
+	"""
+	Keep the corpus of the path in the registry while the context is open,
+	even when there is no module instance that uses it.
+	The evaluator holds the project corpus during the trial,
+	so the corpus is loaded only once for all modules and parameter combinations.
+
+	:param corpus_path: The corpus parquet file path.
+	"""
+	real_path = os.path.realpath(corpus_path)
+	with _corpus_registry_lock:
+		_held_corpus_paths[real_path] = _held_corpus_paths.get(real_path, 0) + 1
+	try:
+		yield
+	finally:
+		with _corpus_registry_lock:
+			_held_corpus_paths[real_path] -= 1
+			if _held_corpus_paths[real_path] <= 0:
+				del _held_corpus_paths[real_path]
+				for key, entry in list(_corpus_registry.items()):
+					if key[0] == real_path and entry[1] <= 0:
+						del _corpus_registry[key]
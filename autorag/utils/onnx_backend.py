@@ -0,0 +1,322 @@
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from autorag.utils.util import default_num_threads
+
+logger = logging.getLogger("AutoRAG")
+
+ONNX_CACHE_DIR_ENV = "AUTORAG_ONNX_CACHE_DIR"
+# the output of the exported graph for each task
+ONNX_TASK_OUTPUTS = {
+	"sequence_classification": "logits",
+	"feature_extraction": "last_hidden_state",
+}
+BACKENDS = ["torch", "onnx"]
+# onnxruntime tensor type -> numpy dtype of the inputs
+_INPUT_DTYPES = {
+	"tensor(int64)": np.int64,
+	"tensor(int32)": np.int32,
+	"tensor(float)": np.float32,
+}
+
+
+def validate_backend(backend: str) -> bool:
+	"""
+	Check the execution backend of the local model.
+
+	:param backend: 'torch' or 'onnx'.
+	:return: True when the backend is 'onnx'.
+	"""
+	if backend not in BACKENDS:
+		raise ValueError(f"backend must be one of {BACKENDS}, but got {backend}")
+	return backend == "onnx"
+
+
+def get_onnx_cache_dir(project_dir: Optional[str] = None) -> str:
+	"""
+	Get the directory to save the exported ONNX models.
+	It is the project resources directory when the project directory is given,
+	or the directory of the AUTORAG_ONNX_CACHE_DIR environment variable,
+	or ~/.cache/autorag/onnx.
+	"""
+	if project_dir is not None:
+		return os.path.join(str(project_dir), "resources", "onnx")
+	cache_dir = os.getenv(ONNX_CACHE_DIR_ENV, None)
+	if cache_dir:
+		return cache_dir
+	return os.path.join(os.path.expanduser("~"), ".cache", "autorag", "onnx")
+
+
+def export_onnx_model(
+	model, tokenizer, task: str, output_path: str, opset_version: int = 17
+):
+	"""
+	Export the huggingface transformers model to the ONNX graph.
+	The batch size and the sequence length of the graph are dynamic.
+
+	:param model: The torch transformers model.
+	:param tokenizer: The tokenizer of the model.
+	:param task: 'sequence_classification' or 'feature_extraction'.
+	:param output_path: The path to save the ONNX graph.
+	:param opset_version: The ONNX opset version. Default is 17.
+	"""
+	try:
+		import torch
+	except ImportError:
+		raise ImportError(
+			"torch is required to export the ONNX model. Please install AutoRAG[gpu]."
+		)
+	if task not in ONNX_TASK_OUTPUTS:
+		raise ValueError(
+			f"task must be one of {list(ONNX_TASK_OUTPUTS.keys())}, but got {task}"
+		)
+	output_name = ONNX_TASK_OUTPUTS[task]
+	dummy_inputs = tokenizer(
+		[["This is a query.", "This is a passage."]]
+		if task == "sequence_classification"
+		else ["This is a passage."],
+		return_tensors="pt",
+	)
+	input_names = list(dummy_inputs.keys())
+
+	class OutputWrapper(torch.nn.Module):
+		def __init__(self, wrapped_model):
+			super().__init__()
+			self.model = wrapped_model
+
+		def forward(self, *inputs):
+			return getattr(self.model(**dict(zip(input_names, inputs))), output_name)
+
+	dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+	dynamic_axes[output_name] = (
+		{0: "batch"}
+		if task == "sequence_classification"
+		else {0: "batch", 1: "sequence"}
+	)
+	os.makedirs(os.path.dirname(output_path), exist_ok=True)
+	tmp_path = output_path + ".tmp"
+	with torch.no_grad():
+		torch.onnx.export(
+			OutputWrapper(model.eval().to("cpu")),
+			tuple(dummy_inputs[name] for name in input_names),
+			tmp_path,
+			input_names=input_names,
+			output_names=[output_name],
+			dynamic_axes=dynamic_axes,
+			opset_version=opset_version,
+			dynamo=False,
+		)
+	os.replace(tmp_path, output_path)
+
+
+def quantize_onnx_model(model_path: str, output_path: str):
+	"""
+	Apply the int8 dynamic quantization to the ONNX graph.
+	The weights are int8, and the activations are quantized at runtime.
+	"""
+	try:
+		from onnxruntime.quantization import QuantType, quantize_dynamic
+	except ImportError:
+		raise ImportError(
+			"onnxruntime and onnx are required to quantize the ONNX model. "
+			"Please install them with `pip install onnxruntime onnx`."
+		)
+	tmp_path = output_path + ".tmp"
+	quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+	os.replace(tmp_path, output_path)
+
+
+class OnnxSessionPool:
+	"""
+	The pool of onnxruntime inference sessions of one ONNX graph.
+	The CPU threads are split between the sessions,
+	so the callers from the different threads run at once without oversubscribing the CPUs.
+	"""
+
+	def __init__(
+		self, model_path: str, pool_size: int = 1, num_threads: Optional[int] = None
+	):
+		"""
+		:param model_path: The path of the ONNX graph.
+		:param pool_size: The number of sessions. Default is 1.
+		:param num_threads: The total number of CPU threads of the sessions.
+			Default is the number of CPUs that this process can use.
+		"""
+		try:
+			import onnxruntime as ort
+		except ImportError:
+			raise ImportError(
+				"onnxruntime is required to use the onnx backend. "
+				"Please install it with `pip install onnxruntime`."
+			)
+		if pool_size <= 0:
+			raise ValueError("session_pool_size must be positive.")
+		threads_per_session = max(
+			1, (num_threads or default_num_threads()) // pool_size
+		)
+		self.sessions: queue.Queue = queue.Queue()
+		for _ in range(pool_size):
+			options = ort.SessionOptions()
+			options.intra_op_num_threads = threads_per_session
+			options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+			self.sessions.put(
+				ort.InferenceSession(
+					model_path, options, providers=["CPUExecutionProvider"]
+				)
+			)
+		session = self.sessions.get()
+		self.input_names = list(map(lambda x: x.name, session.get_inputs()))
+		self.input_dtypes = list(
+			map(lambda x: _INPUT_DTYPES.get(x.type, None), session.get_inputs())
+		)
+		self.sessions.put(session)
+
+	def run(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+		"""
+		Run the graph with an idle session. It waits until a session is idle.
+
+		:param inputs: The input arrays of the graph. The inputs that the graph does not use are ignored.
+		:return: The output array of the graph.
+		"""
+		feed = {
+			name: np.asarray(inputs[name], dtype=dtype)
+			for name, dtype in zip(self.input_names, self.input_dtypes)
+			if name in inputs
+		}
+		session = self.sessions.get()
+		try:
+			return session.run(None, feed)[0]
+		finally:
+			self.sessions.put(session)
+
+
+# (graph path, pool size, number of threads) -> session pool
+_session_pools: Dict[Tuple[str, int, Optional[int]], OnnxSessionPool] = {}
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool(
+	model_path: str, pool_size: int = 1, num_threads: Optional[int] = None
+) -> OnnxSessionPool:
+	"""
+	Get the session pool of the ONNX graph. The pool is loaded once per process,
+	so the module instances of the same model share the sessions.
+	"""
+	key = (os.path.realpath(model_path), pool_size, num_threads)
+	with _session_pool_lock:
+		if key not in _session_pools:
+			_session_pools[key] = OnnxSessionPool(model_path, pool_size, num_threads)
+		return _session_pools[key]
+
+
+def _model_dir_name(model_name: str) -> str:
+	return model_name.strip("/").replace("/", "--")
+
+
+class OnnxTransformer:
+	"""
+	The huggingface transformers model that runs with onnxruntime on CPU.
+	The model is exported to ONNX once and saved at the cache directory,
+	and the int8 dynamic quantization is optionally applied.
+	"""
+
+	_export_lock = threading.Lock()
+
+	def __init__(
+		self,
+		model_name: str,
+		task: str,
+		cache_dir: str,
+		quantize: bool = False,
+		session_pool_size: int = 1,
+		num_threads: Optional[int] = None,
+		max_length: int = 512,
+		model_loader=None,
+		tokenizer=None,
+	):
+		"""
+		:param model_name: The huggingface model name.
+		:param task: 'sequence_classification' or 'feature_extraction'.
+		:param cache_dir: The directory to save the ONNX graphs.
+		:param quantize: Whether to apply the int8 dynamic quantization. Default is False.
+		:param session_pool_size: The number of onnxruntime sessions. Default is 1.
+		:param num_threads: The total number of CPU threads of the sessions.
+		:param max_length: The maximum token length of the input. Default is 512.
+		:param model_loader: The function that loads the torch model to export.
+			Default is AutoModelForSequenceClassification or AutoModel by the task.
+		:param tokenizer: The tokenizer of the model. Default is AutoTokenizer.
+		"""
+		if task not in ONNX_TASK_OUTPUTS:
+			raise ValueError(
+				f"task must be one of {list(ONNX_TASK_OUTPUTS.keys())}, but got {task}"
+			)
+		from transformers import AutoConfig, AutoTokenizer
+
+		self.model_name = model_name
+		self.task = task
+		self.max_length = max_length
+		self.device = "cpu"
+		self.config = AutoConfig.from_pretrained(model_name)
+		self.tokenizer = (
+			tokenizer
+			if tokenizer is not None
+			else AutoTokenizer.from_pretrained(model_name)
+		)
+
+		model_dir = os.path.join(cache_dir, _model_dir_name(model_name), task)
+		model_path = os.path.join(model_dir, "model.onnx")
+		with OnnxTransformer._export_lock:
+			if not os.path.exists(model_path):
+				logger.info(f"Exporting {model_name} to ONNX at {model_path}...")
+				if model_loader is None:
+					from transformers import (
+						AutoModel,
+						AutoModelForSequenceClassification,
+					)
+
+					model_loader = (
+						AutoModelForSequenceClassification.from_pretrained
+						if task == "sequence_classification"
+						else AutoModel.from_pretrained
+					)
+				export_onnx_model(
+					model_loader(model_name), self.tokenizer, task, model_path
+				)
+			if quantize:
+				quantized_path = os.path.join(model_dir, "model_int8.onnx")
+				if not os.path.exists(quantized_path):
+					logger.info(f"Quantizing {model_path} to int8...")
+					quantize_onnx_model(model_path, quantized_path)
+				model_path = quantized_path
+		self.model_path = model_path
+		self.session_pool = get_session_pool(model_path, session_pool_size, num_threads)
+
+	def run(self, encodings: Dict[str, Any]) -> np.ndarray:
+		"""
+		Run the model with the tokenized inputs.
+
+		:param encodings: The tokenizer outputs like input_ids and attention_mask.
+		:return: The logits for 'sequence_classification',
+			or the last hidden states for 'feature_extraction'.
+		"""
+		return self.session_pool.run(
+			{name: np.asarray(value) for name, value in encodings.items()}
+		)
+
+	def __call__(self, input_texts: List[Any]) -> np.ndarray:
+		"""
+		Tokenize the texts or the text pairs and run the model.
+		"""
+		encodings = self.tokenizer(
+			input_texts,
+			padding=True,
+			truncation=True,
+			max_length=self.max_length,
+			return_tensors="np",
+		)
+		return self.run(encodings)
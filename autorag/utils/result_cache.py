@@ -0,0 +1,221 @@
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from autorag.utils.util import to_list
+
+logger = logging.getLogger("AutoRAG")
+
+RESULT_CACHE_DIR_ENV = "AUTORAG_RESULT_CACHE_DIR"
+# the project files that change the module result, besides the module input
+_PROJECT_DATA_FILES = [
+	os.path.join("data", "qa.parquet"),
+	os.path.join("data", "corpus.parquet"),
+	os.path.join("resources", "vectordb.yaml"),
+]
+
+# the module results can change with the AutoRAG version
+try:
+	AUTORAG_VERSION = importlib.metadata.version("AutoRAG")
+except importlib.metadata.PackageNotFoundError:
+	AUTORAG_VERSION = None
+
+# (real path, mtime, size) -> sha1 of the file
+_file_fingerprints: Dict[Tuple[str, int, int], str] = {}
+_file_fingerprint_lock = threading.Lock()
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+	"""
+	Get the sha1 hash of the file contents. It returns None when the file does not exist.
+	The hash is computed again only when the file is modified.
+	"""
+	if not os.path.exists(path):
+		return None
+	real_path = os.path.realpath(path)
+	stat = os.stat(real_path)
+	key = (real_path, stat.st_mtime_ns, stat.st_size)
+	with _file_fingerprint_lock:
+		if key not in _file_fingerprints:
+			sha1 = hashlib.sha1()
+			with open(real_path, "rb") as f:
+				for block in iter(lambda: f.read(1 << 20), b""):
+					sha1.update(block)
+			_file_fingerprints[key] = sha1.hexdigest()
+		return _file_fingerprints[key]
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> Optional[str]:
+	"""
+	Get the sha1 hash of the dataframe columns and values. The index is ignored.
+	It returns None when the dataframe can't be converted to the arrow table.
+	"""
+	try:
+		table = pa.Table.from_pandas(df, preserve_index=False)
+	except (pa.ArrowException, TypeError, ValueError):
+		return None
+	sink = pa.BufferOutputStream()
+	with pa.ipc.new_stream(sink, table.schema) as writer:
+		writer.write_table(table)
+	return hashlib.sha1(sink.getvalue()).hexdigest()
+
+
+def _restore_lists(df: pd.DataFrame) -> pd.DataFrame:
+	# parquet loads the list values as numpy arrays, but the modules return python lists
+	for column in df.columns:
+		if df[column].dtype == object:
+			df[column] = list(
+				map(
+					lambda x: to_list(x) if isinstance(x, np.ndarray) else x, df[column]
+				)
+			)
+	return df
+
+
+class ModuleResultCache:
+	"""
+	The content-addressed cache of the module results.
+	The result is keyed by the module class, the module parameters,
+	the module input (previous result), the project data (QA, corpus and vector DB config)
+	and the AutoRAG version, so the unchanged module and parameter combination never runs again across trials.
+	"""
+
+	def __init__(self, cache_dir: str):
+		"""
+		:param cache_dir: The directory to save the module results.
+		"""
+		self.cache_dir = cache_dir
+
+	def keys(
+		self,
+		modules: List,
+		module_params: List[Dict],
+		project_dir: str,
+		previous_result: pd.DataFrame,
+	) -> List[Optional[str]]:
+		"""
+		Make the cache keys of the module runs that get the same input.
+		The key is None when the run can't be cached.
+
+		:param modules: The module classes.
+		:param module_params: The module parameters of each module.
+		:param project_dir: The project directory.
+		:param previous_result: The input dataframe of the modules.
+		:return: The list of the cache keys.
+		"""
+		input_fingerprint = dataframe_fingerprint(previous_result)
+		if input_fingerprint is None:
+			return [None] * len(modules)
+		data_fingerprints = list(
+			map(
+				lambda x: file_fingerprint(os.path.join(str(project_dir), x)),
+				_PROJECT_DATA_FILES,
+			)
+		)
+
+		def make_key(module, module_param: Dict) -> str:
+			key_dict = {
+				"module": f"{module.__module__}.{module.__qualname__}",
+				"params": json.dumps(module_param, sort_keys=True, default=str),
+				"input": input_fingerprint,
+				"data": data_fingerprints,
+				"version": AUTORAG_VERSION,
+			}
+			return hashlib.sha1(
+				json.dumps(key_dict, sort_keys=True).encode("utf-8")
+			).hexdigest()
+
+		return list(map(lambda x: make_key(x[0], x[1]), zip(modules, module_params)))
+
+	def _paths(self, key: str) -> Tuple[str, str]:
+		key_dir = os.path.join(self.cache_dir, key[:2])
+		return os.path.join(key_dir, f"{key}.parquet"), os.path.join(
+			key_dir, f"{key}.json"
+		)
+
+	def get(self, key: str) -> Optional[Tuple[pd.DataFrame, float]]:
+		"""
+		Load the cached module result.
+
+		:param key: The cache key from :meth:`keys`.
+		:return: The result dataframe and its execution time, or None when it is not cached.
+		"""
+		result_path, meta_path = self._paths(key)
+		if not (os.path.exists(result_path) and os.path.exists(meta_path)):
+			return None
+		with open(meta_path) as f:
+			meta = json.load(f)
+		result = pd.read_parquet(result_path, engine="pyarrow")
+		return _restore_lists(result), meta["execution_time"]
+
+	def put(self, key: str, result: Any, execution_time: float):
+		"""
+		Save the module result. The result that is not a dataframe is not saved.
+
+		:param key: The cache key from :meth:`keys`.
+		:param result: The result of the module.
+		:param execution_time: The execution time of the module.
+		"""
+		if not isinstance(result, pd.DataFrame):
+			return
+		result_path, meta_path = self._paths(key)
+		os.makedirs(os.path.dirname(result_path), exist_ok=True)
+		try:
+			result.to_parquet(result_path + ".tmp", index=False)
+		except (pa.ArrowException, TypeError, ValueError) as e:
+			logger.debug(f"The module result is not cached: {e}")
+			if os.path.exists(result_path + ".tmp"):
+				os.remove(result_path + ".tmp")
+			return
+		os.replace(result_path + ".tmp", result_path)
+		with open(meta_path + ".tmp", "w") as f:
+			json.dump({"execution_time": execution_time}, f)
+		os.replace(meta_path + ".tmp", meta_path)
+
+
+_active_result_cache_dirs: List[str] = []
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ModuleResultCache]:
+	"""
+	Get the module result cache of the current process.
+	It is the innermost :func:`use_result_cache`,
+	or the directory of the AUTORAG_RESULT_CACHE_DIR environment variable.
+	It returns None when the result cache is not used.
+	"""
+	with _result_cache_lock:
+		if _active_result_cache_dirs:
+			cache_dir = _active_result_cache_dirs[-1]
+		else:
+			cache_dir = os.getenv(RESULT_CACHE_DIR_ENV, None)
+	if not cache_dir:
+		return None
+	return ModuleResultCache(cache_dir)
+
+
+@contextmanager
+def use_result_cache(cache_dir: str):
+	"""
+	Use the module result cache at the directory while the context is open.
+	The evaluator uses the project resources directory during the trial,
+	so the trial only runs the new module and parameter combinations.
+
+	:param cache_dir: The module result cache directory.
+	"""
+	with _result_cache_lock:
+		_active_result_cache_dirs.append(cache_dir)
+	try:
+		yield
+	finally:
+		with _result_cache_lock:
+			_active_result_cache_dirs.remove(cache_dir)
@@ -26,29 +26,40 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from pydantic import BaseModel as BM
 from pydantic.v1 import BaseModel
 
+from autorag.embedding.cache import embed_texts
+from autorag.utils.corpus import CorpusIndex
+
 logger = logging.getLogger("AutoRAG")
 
 
 def fetch_contents(
-	corpus_data: pd.DataFrame, ids: List[List[str]], column_name: str = "contents"
+	corpus_data: Union[pd.DataFrame, CorpusIndex],
+	ids: List[List[str]],
+	column_name: str = "contents",
 ) -> List[List[Any]]:
-	def fetch_contents_pure(
-		ids: List[str], corpus_data: pd.DataFrame, column_name: str
-	):
-		return list(map(lambda x: fetch_one_content(corpus_data, x, column_name), ids))
+	"""
+	Fetch the values of the corpus column from the 2-d doc_id list.
 
-	result = flatten_apply(
-		fetch_contents_pure, ids, corpus_data=corpus_data, column_name=column_name
-	)
-	return result
+	:param corpus_data: The corpus dataframe or its CorpusIndex.
+	    Pass the CorpusIndex when you fetch many times from the same corpus,
+	    so the doc_id index is built only once.
+	:param ids: 2-d list of doc_ids.
+	:param column_name: The column name to fetch. Default is contents.
+	:return: 2-d list of the fetched values.
+	"""
+	if not isinstance(corpus_data, CorpusIndex):
+		corpus_data = CorpusIndex(corpus_data)
+	return corpus_data.fetch(ids, column_name)
 
 
 def fetch_one_content(
-	corpus_data: pd.DataFrame,
+	corpus_data: Union[pd.DataFrame, CorpusIndex],
 	id_: str,
 	column_name: str = "contents",
 	id_column_name: str = "doc_id",
 ) -> Any:
+	if isinstance(corpus_data, CorpusIndex):
+		return corpus_data.fetch_one(id_, column_name)
 	if isinstance(id_, str):
 		if id_ in ["", ""]:
 			return None
@@ -529,7 +540,29 @@ def embedding_query_content(
 	contents_list: List[List[str]],
 	embedding_model: Optional[str] = None,
 	batch: int = 128,
+	ids_list: Optional[List[List[str]]] = None,
+	vector_store=None,
 ):
+	"""
+	Embed the queries and the contents.
+
+	:param queries: The list of queries.
+	:param contents_list: The list of lists of contents.
+	:param embedding_model: The embedding model instance.
+	:param batch: The embedding batch size. Default is 128.
+	:param ids_list: The list of lists of ids of the contents.
+	    It is required when the vector_store is given.
+	:param vector_store: The optional vector store instance.
+	    If it is given, the contents embeddings are fetched from the vector store with one fetch,
+	    and only the queries (and the contents that are not in the vector store) are embedded
+	    by the embedding model of the vector store.
+	:return: The query embeddings and the lists of content embeddings.
+	"""
+	if vector_store is not None:
+		assert ids_list is not None, "ids_list is required to use the vector store."
+		return embedding_query_vector_store(
+			queries, contents_list, ids_list, vector_store, batch
+		)
 	flatten_contents = list(itertools.chain.from_iterable(contents_list))
 
 	openai_embedding_limit = 8000  # all openai embedding model has 8000 max token input
@@ -541,18 +574,55 @@ def embedding_query_content(
 			flatten_contents, openai_embedding_limit, embedding_model.model_name
 		)
 
-	# Embedding using batch
+	# Embedding using batch, with the embedding cache if it is used
 	embedding_model.embed_batch_size = batch
-	query_embeddings = embedding_model.get_text_embedding_batch(queries)
+	query_embeddings = embed_texts(embedding_model, queries)
 
 	content_lengths = list(map(len, contents_list))
-	content_embeddings_flatten = embedding_model.get_text_embedding_batch(
-		flatten_contents
-	)
+	content_embeddings_flatten = embed_texts(embedding_model, flatten_contents)
 	content_embeddings = reconstruct_list(content_embeddings_flatten, content_lengths)
 	return query_embeddings, content_embeddings
 
 
+def embedding_query_vector_store(
+	queries: List[str],
+	contents_list: List[List[str]],
+	ids_list: List[List[str]],
+	vector_store,
+	batch: int = 128,
+):
+	embedding_model = vector_store.embedding
+	embedding_model.embed_batch_size = batch
+	query_embeddings = embed_texts(
+		embedding_model, vector_store.truncated_inputs(queries)
+	)
+
+	content_lengths = list(map(len, ids_list))
+	flatten_ids = list(itertools.chain.from_iterable(ids_list))
+	loop = get_event_loop()
+	content_embeddings, found = loop.run_until_complete(
+		vector_store.fetch_embeddings(flatten_ids)
+	)
+	if not found.all():
+		# embed the contents that are not ingested to the vector store
+		flatten_contents = list(itertools.chain.from_iterable(contents_list))
+		missing = np.flatnonzero(~found)
+		missing_embeddings = np.asarray(
+			embed_texts(
+				embedding_model,
+				vector_store.truncated_inputs([flatten_contents[i] for i in missing]),
+			),
+			dtype=np.float32,
+		)
+		if content_embeddings.shape[1] == 0:
+			content_embeddings = np.zeros(
+				(len(flatten_ids), missing_embeddings.shape[1]), dtype=np.float32
+			)
+		content_embeddings[missing] = missing_embeddings
+	content_embeddings = reconstruct_list(content_embeddings.tolist(), content_lengths)
+	return query_embeddings, content_embeddings
+
+
 def to_list(item):
 	"""Recursively convert collections to Python lists."""
 	if isinstance(item, np.ndarray):
@@ -699,6 +769,16 @@ def apply_recursive(func, data):
 		return func(data)
 
 
+def default_num_threads() -> int:
+	"""
+	Get the number of CPU threads for the local model inference.
+	It is the number of CPUs that this process can use.
+	"""
+	if hasattr(os, "sched_getaffinity"):
+		return max(1, len(os.sched_getaffinity(0)))
+	return max(1, os.cpu_count() or 1)
+
+
 def empty_cuda_cache():
 	try:
 		import torch
@@ -1,6 +1,7 @@
 from abc import abstractmethod
 from typing import List, Tuple, Union
 
+import numpy as np
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from autorag.utils.util import openai_truncate_by_token
@@ -49,9 +50,57 @@ class BaseVectorStore:
 	async def fetch(self, ids: List[str]) -> List[List[float]]:
 		"""
 		Fetch the embeddings of the ids.
+		The embeddings are in the order of the ids,
+		and it raises KeyError when an id is not in the vector store.
 		"""
 		pass
 
+	async def fetch_embeddings(self, ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Fetch the stored embeddings of the ids with one fetch.
+		The duplicated ids are fetched only once.
+
+		:param ids: The ids to fetch.
+		:return: The float32 embedding matrix in the order of the ids,
+		    and the boolean array whether each id is in the vector store.
+		    The embedding of the id that is not in the vector store is zero.
+		"""
+		unique_ids = list(dict.fromkeys(ids))
+		if len(unique_ids) == 0:
+			return np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=bool)
+		try:
+			fetched = await self.fetch(unique_ids)
+		except KeyError:
+			# some ids are not in the vector store, so fetch only the existing ids
+			exists = await self.is_exist(unique_ids)
+			existing_ids = [_id for _id, exist in zip(unique_ids, exists) if exist]
+			fetched_dict = (
+				dict(zip(existing_ids, await self.fetch(existing_ids)))
+				if existing_ids
+				else {}
+			)
+			fetched = [fetched_dict.get(_id) for _id in unique_ids]
+		if len(fetched) != len(unique_ids):
+			raise ValueError(
+				f"{self.__class__.__name__}.fetch returned {len(fetched)} embeddings "
+				f"for {len(unique_ids)} ids. It must return one embedding per id in the order of the ids."
+			)
+
+		found = np.array(
+			[embedding is not None and len(embedding) > 0 for embedding in fetched],
+			dtype=bool,
+		)
+		dim = len(fetched[int(np.argmax(found))]) if found.any() else 0
+		embeddings = np.zeros((len(unique_ids), dim), dtype=np.float32)
+		if found.any():
+			embeddings[found] = np.asarray(
+				[embedding for embedding, is_found in zip(fetched, found) if is_found],
+				dtype=np.float32,
+			)
+		positions = dict(zip(unique_ids, range(len(unique_ids))))
+		rows = [positions[_id] for _id in ids]
+		return embeddings[rows], found[rows]
+
 	@abstractmethod
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		"""
@@ -80,8 +80,9 @@ class Chroma(BaseVectorStore):
 			fetch_result = await self.collection.get(ids, include=["embeddings"])
 		else:
 			fetch_result = self.collection.get(ids, include=["embeddings"])
-		fetch_embeddings = fetch_result["embeddings"]
-		return fetch_embeddings
+		# chroma does not keep the order of the ids
+		id_embedding_dict = dict(zip(fetch_result["ids"], fetch_result["embeddings"]))
+		return [id_embedding_dict[_id] for _id in ids]
 
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		if isinstance(self.collection, AsyncCollection):
@@ -104,7 +104,9 @@ class Qdrant(BaseVectorStore):
 			ids=ids,
 			with_vectors=True,
 		)
-		return list(map(lambda x: x.vector, fetched_results))
+		# qdrant does not keep the order of the ids, and skips the missing ids
+		id_vector_dict = {str(result.id): result.vector for result in fetched_results}
+		return [id_vector_dict[_id] for _id in ids]
 
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		existed_result = self.client.scroll(
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+import pytest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.embeddings.mock_embed_model import MockEmbedding
+
+from autorag.embedding.cache import (
+    EmbeddingCache,
+    embed_texts,
+    embedding_model_identity,
+    get_embedding_cache,
+    use_embedding_cache,
+)
+
+
+class CountingEmbedding(BaseEmbedding):
+    embedded_texts: List[str] = []
+
+    def _embed(self, text: str) -> List[float]:
+        self.embedded_texts.append(text)
+        return [float(len(text)), float(text.count("a")), 1.0]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def test_embedding_cache():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = CountingEmbedding(model_name="counting")
+        cache = EmbeddingCache(cache_dir)
+        texts = ["banana", "apple", "banana", "cherry"]
+        embeddings = cache.embed(model, texts)
+        assert embeddings.shape == (4, 3)
+        assert embeddings[0].tolist() == [6.0, 3.0, 1.0]
+        assert np.array_equal(embeddings[0], embeddings[2])
+        assert model.embedded_texts == ["banana", "apple", "cherry"]
+
+        # the new cache instance reads the embeddings from the disk
+        model.embedded_texts = []
+        embeddings = EmbeddingCache(cache_dir).embed(model, ["cherry", "date"])
+        assert embeddings[0].tolist() == [6.0, 0.0, 1.0]
+        assert model.embedded_texts == ["date"]
+
+        # the other model does not share the embeddings
+        other_model = CountingEmbedding(model_name="other")
+        other_model.embedded_texts = []
+        cache.embed(other_model, ["banana"])
+        assert other_model.embedded_texts == ["banana"]
+
+
+class BarrierEmbedding(CountingEmbedding):
+    barrier: threading.Barrier = threading.Barrier(2, timeout=10)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        # both threads must be in the embedding model at once
+        self.barrier.wait()
+        return self._embed(text)
+
+
+def test_embedding_cache_threads():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = BarrierEmbedding(model_name="counting", embedded_texts=[])
+        cache = EmbeddingCache(cache_dir)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(
+                executor.map(lambda x: cache.embed(model, [x]), ["apple", "apple"])
+            )
+        assert results[0].tolist() == results[1].tolist() == [[5.0, 1.0, 1.0]]
+        # the text that both threads embedded is saved once
+        model.embedded_texts = []
+        assert EmbeddingCache(cache_dir).embed(model, ["apple"]).tolist() == [
+            [5.0, 1.0, 1.0]
+        ]
+        assert model.embedded_texts == []
+        store = next(iter(cache._stores.values()))
+        assert store.size == 1
+
+
+def test_embedding_cache_read_only():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = CountingEmbedding(model_name="counting", embedded_texts=[])
+        EmbeddingCache(cache_dir).embed(model, ["apple"])
+        read_only_cache = EmbeddingCache(cache_dir, read_only=True)
+        model.embedded_texts = []
+        embeddings = read_only_cache.embed(model, ["apple", "banana"])
+        assert embeddings.tolist() == [[5.0, 1.0, 1.0], [6.0, 3.0, 1.0]]
+        assert model.embedded_texts == ["banana"]
+        # the read-only cache does not save the new embeddings
+        model.embedded_texts = []
+        EmbeddingCache(cache_dir).embed(model, ["apple", "banana"])
+        assert model.embedded_texts == ["banana"]
+
+        with use_embedding_cache(cache_dir, read_only=True):
+            assert get_embedding_cache().read_only
+
+
+def test_embedding_cache_eviction():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = CountingEmbedding(model_name="counting", embedded_texts=[])
+        cache = EmbeddingCache(cache_dir, max_entries=2, dtype="float16")
+        cache.embed(model, ["a", "b"])
+        cache.embed(model, ["a"])
+        store = next(iter(cache._stores.values()))
+        keys_inode = os.stat(store.keys_path).st_ino
+        # "b" is the least recently used one
+        cache.embed(model, ["c"])
+        # the full store writes the changed rows in place
+        assert os.stat(store.keys_path).st_ino == keys_inode
+        model.embedded_texts = []
+        embeddings = cache.embed(model, ["a", "b", "c"])
+        assert model.embedded_texts == ["b"]
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == [1.0, 1.0, 1.0]
+
+    with pytest.raises(ValueError):
+        EmbeddingCache(cache_dir, max_entries=0)
+
+
+def test_embed_texts():
+    model = CountingEmbedding(model_name="counting", embedded_texts=[])
+    assert embedding_model_identity(MockEmbedding(embed_dim=3)) is None
+    assert "counting" in embedding_model_identity(model)
+    assert get_embedding_cache() is None
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        with use_embedding_cache(cache_dir):
+            assert get_embedding_cache().cache_dir == os.path.realpath(cache_dir)
+            assert embed_texts(model, ["apple", "apple"]) == [[5.0, 1.0, 1.0]] * 2
+            assert embed_texts(model, ["apple"]) == [[5.0, 1.0, 1.0]]
+        assert get_embedding_cache() is None
+    assert model.embedded_texts == ["apple"]
@@ -0,0 +1,46 @@
+import tempfile
+
+import numpy as np
+import pytest
+
+from autorag.embedding.base import EmbeddingModel
+from autorag.embedding.onnx import OnnxEmbedding
+from tests.delete_tests import is_github_action
+
+texts = [
+    "NomaDamas is Great Team",
+    "Paris is the capital of France.",
+    "Newjeans has 5 members.",
+]
+
+
+def test_load_onnx_embedding_model():
+    embedding = EmbeddingModel.load_from_dict(
+        {"type": "onnx", "model_name": "BAAI/bge-small-en-v1.5", "quantize": True}
+    )
+    assert embedding._factory is OnnxEmbedding
+    assert embedding._kwargs == {
+        "model_name": "BAAI/bge-small-en-v1.5",
+        "quantize": True,
+    }
+
+
+@pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
+def test_onnx_embedding():
+    huggingface = pytest.importorskip("llama_index.embeddings.huggingface")
+    model_name = "BAAI/bge-small-en-v1.5"
+    expected = huggingface.HuggingFaceEmbedding(model_name=model_name)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        embedding = OnnxEmbedding(model_name=model_name, cache_dir=cache_dir)
+        assert embedding.pooling == "cls"
+        # the onnx backend gives the same embeddings as the torch backend
+        assert np.allclose(
+            embedding.get_text_embedding_batch(texts),
+            expected.get_text_embedding_batch(texts),
+            atol=1e-4,
+        )
+        assert np.allclose(
+            embedding.get_query_embedding(texts[0]),
+            expected.get_query_embedding(texts[0]),
+            atol=1e-4,
+        )
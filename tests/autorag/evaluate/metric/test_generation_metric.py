@@ -211,6 +211,13 @@ def test_bleu():
         similarity_generation_metric_inputs,
         lowercase=True,
     )
+    base_test_metrics(
+        bleu,
+        [51.1507, 23.5783, 100.0],
+        similarity_generation_metric_inputs,
+        lowercase=True,
+        num_workers=2,
+    )
 
 
 def test_meteor():
@@ -222,6 +229,15 @@ def test_meteor():
         beta=0.2,
         gamma=0.6,
     )
+    base_test_metrics(
+        meteor,
+        [0.454033, 0.2985435, 0.64077828],
+        similarity_generation_metric_inputs,
+        alpha=0.85,
+        beta=0.2,
+        gamma=0.6,
+        num_workers=2,
+    )
 
 
 def test_rouge():
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from autorag.evaluation.metric.util import (
+    calculate_similarity_matrix,
+    calculate_cosine_similarity,
+    calculate_l2_distance,
+    calculate_inner_product,
+)
+
+
+def test_calculate_similarity_matrix():
+    rng = np.random.default_rng(42)
+    query_embeddings = rng.normal(size=(3, 8))
+    content_embeddings = rng.normal(size=(5, 8)).tolist()
+    pair_funcs = {
+        "cosine": calculate_cosine_similarity,
+        "ip": calculate_inner_product,
+        "l2": lambda x, y: 1 - calculate_l2_distance(x, y),
+    }
+    for metric, pair_func in pair_funcs.items():
+        scores = calculate_similarity_matrix(
+            query_embeddings, content_embeddings, similarity_metric=metric
+        )
+        assert scores.shape == (3, 5)
+        assert scores.dtype == np.float32
+        expected = [
+            [pair_func(query, np.array(content)) for content in content_embeddings]
+            for query in query_embeddings
+        ]
+        assert np.allclose(scores, expected, atol=1e-5)
+
+    assert calculate_similarity_matrix([[0.1, 0.2]], []).shape == (1, 0)
+    with pytest.raises(ValueError):
+        calculate_similarity_matrix(query_embeddings, content_embeddings, "dot")
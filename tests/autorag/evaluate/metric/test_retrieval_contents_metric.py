@@ -5,6 +5,7 @@ from autorag.evaluation.metric.retrieval_contents import (
     retrieval_token_f1,
     retrieval_token_precision,
     retrieval_token_recall,
+    TokenOverlapEngine,
 )
 from autorag.schema.metricinput import MetricInput
 
@@ -66,3 +67,30 @@ def test_retrieval_token_precision():
 def test_retrieval_token_recall():
     result_recall = retrieval_token_recall(metric_inputs=metric_inputs)
     assert result_recall == pytest.approx([0.383333, 0.777777, None, None], rel=0.001)
+
+
+def test_token_overlap_engine():
+    engine_inputs = metric_inputs + [
+        MetricInput(
+            retrieval_gt_contents=[["water water bottle", "!!"], ["The bottle"]],
+            retrieved_contents=["water bottle water", "a bottle", "?", "water"],
+        ),
+    ]
+    engine = TokenOverlapEngine(engine_inputs)
+    for metric_func in [
+        retrieval_token_f1,
+        retrieval_token_precision,
+        retrieval_token_recall,
+    ]:
+        solution = [
+            metric_func.__wrapped__(metric_input)
+            if metric_input.is_fields_notnone(
+                ["retrieved_contents", "retrieval_gt_contents"]
+            )
+            else None
+            for metric_input in engine_inputs
+        ]
+        assert engine.compute(metric_func.__name__) == solution
+
+    with pytest.raises(ValueError):
+        engine.compute("retrieval_token_unknown")
@@ -9,6 +9,7 @@ from autorag.evaluation.metric import (
     retrieval_mrr,
     retrieval_map,
 )
+from autorag.evaluation.metric.retrieval import RetrievalMetricEngine
 from autorag.schema.metricinput import MetricInput
 
 retrieval_gt = [
@@ -105,3 +106,35 @@ def test_retrieval_map():
     result = retrieval_map(metric_inputs=metric_inputs)
     for gt, res in zip(solution, result):
         assert gt == pytest.approx(res, rel=1e-4)
+
+
+def test_retrieval_metric_engine():
+    engine_inputs = metric_inputs + [
+        # duplicated retrieved ids and duplicated gt ids
+        MetricInput(
+            retrieval_gt=[["test-1", "test-1"], ["test-2"]],
+            retrieved_ids=["test-1", "test-1", "pred-1", "test-2"],
+        ),
+        MetricInput(retrieval_gt=[["test-1"]], retrieved_ids=[]),
+        MetricInput(retrieval_gt=None, retrieved_ids=["test-1"]),
+    ]
+    engine = RetrievalMetricEngine(engine_inputs)
+    for metric_func in [
+        retrieval_recall,
+        retrieval_precision,
+        retrieval_f1,
+        retrieval_ndcg,
+        retrieval_mrr,
+        retrieval_map,
+    ]:
+        solution = [
+            metric_func.__wrapped__(metric_input)
+            if metric_input.is_fields_notnone(["retrieval_gt", "retrieved_ids"])
+            else None
+            for metric_input in engine_inputs
+        ]
+        assert engine.compute(metric_func.__name__) == solution
+
+    assert RetrievalMetricEngine([]).compute("retrieval_recall") == []
+    with pytest.raises(ValueError):
+        engine.compute("retrieval_unknown")
@@ -2,7 +2,12 @@ import pandas as pd
 import pytest
 
 from autorag.nodes.hybridretrieval import HybridCC
-from autorag.nodes.hybridretrieval.hybrid_cc import fuse_per_query, hybrid_cc
+from autorag.nodes.hybridretrieval.base import fusion_to_lists
+from autorag.nodes.hybridretrieval.hybrid_cc import (
+    fuse_per_query,
+    hybrid_cc,
+    hybrid_cc_sweep,
+)
 from tests.autorag.nodes.retrieval.test_hybrid_base import (
     sample_ids_2,
     sample_scores_2,
@@ -67,6 +72,65 @@ def test_hybrid_cc_non_overlap():
     assert 0.5 in result_scores[1]
 
 
+def test_hybrid_cc_sweep():
+    weights = [0.0, 0.4, 0.7, 1.0]
+    candidate_ids, rankings, fused_scores = hybrid_cc_sweep(
+        sample_ids_4, sample_scores_4, top_k=6, weights=weights, normalize_method="z"
+    )
+    assert rankings.shape == fused_scores.shape == (len(weights), 2, 6)
+    for i, weight in enumerate(weights):
+        expected_ids, expected_scores = hybrid_cc(
+            sample_ids_4, sample_scores_4, top_k=6, weight=weight, normalize_method="z"
+        )
+        result_ids, result_scores = fusion_to_lists(
+            candidate_ids, rankings[i], fused_scores[i]
+        )
+        assert result_ids == expected_ids
+        for result_score, expected_score in zip(result_scores, expected_scores):
+            assert result_score == pytest.approx(expected_score)
+        for row in range(2):
+            expected_id, expected_score = fuse_per_query(
+                sample_ids_4[0][row],
+                sample_ids_4[1][row],
+                sample_scores_4[0][row],
+                sample_scores_4[1][row],
+                normalize_method="z",
+                weight=weight,
+                top_k=6,
+                semantic_theoretical_min_value=-1.0,
+                lexical_theoretical_min_value=0.0,
+            )
+            assert result_ids[row] == expected_id
+            assert result_scores[row] == pytest.approx(expected_score)
+
+
+def test_hybrid_cc_tie():
+    # many candidates have the same fused score
+    ids = (
+        [[f"id-{i}" for i in range(20)]],
+        [[f"id-{i}" for i in range(10, 30)]],
+    )
+    scores = ([[0.9, 0.5] * 10], [[3.0, 1.0] * 10])
+    for weight in [0.0, 0.5, 1.0]:
+        for top_k in [3, 10, 30]:
+            result_ids, result_scores = hybrid_cc(
+                ids, scores, top_k=top_k, weight=weight, normalize_method="mm"
+            )
+            expected_id, expected_score = fuse_per_query(
+                ids[0][0],
+                ids[1][0],
+                scores[0][0],
+                scores[1][0],
+                normalize_method="mm",
+                weight=weight,
+                top_k=top_k,
+                semantic_theoretical_min_value=-1.0,
+                lexical_theoretical_min_value=0.0,
+            )
+            assert result_ids[0] == expected_id
+            assert result_scores[0] == pytest.approx(expected_score)
+
+
 def test_hybrid_cc_node(pseudo_project_dir):  # noqa: F811
     retrieve_scores = [1.0, 0.5, 0.0]
     base_hybrid_weights_node_test(
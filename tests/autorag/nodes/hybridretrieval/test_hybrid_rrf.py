@@ -1,11 +1,18 @@
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 import pytest
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from autorag.nodes.hybridretrieval import HybridRRF
-from autorag.nodes.hybridretrieval.hybrid_rrf import rrf_pure, hybrid_rrf
+from autorag.nodes.hybridretrieval.base import fusion_to_lists
+from autorag.nodes.hybridretrieval.hybrid_rrf import (
+    rrf_pure,
+    hybrid_rrf,
+    hybrid_rrf_sweep,
+    rank_min_descending,
+)
 from autorag.schema.metricinput import MetricInput
 from tests.autorag.nodes.retrieval.test_hybrid_base import (
     sample_ids,
@@ -31,6 +38,63 @@ def test_rrf_pure():
     assert result_id == ["id-3", "id-1", "id-2"]
 
 
+def test_hybrid_rrf_three_retrievals():
+    ids = sample_ids + ([["id-3", "id-5"], ["id-1", "id-2", "id-2"]],)
+    scores = sample_scores + ([[2, 2], [3, 1, 9]],)
+    result_id, result_scores = hybrid_rrf(ids, scores, top_k=4, weight=2)
+    for row in range(2):
+        expected_id, expected_scores = rrf_pure(
+            tuple(x[row] for x in ids), tuple(x[row] for x in scores), 2, 4
+        )
+        assert result_scores[row] == expected_scores
+        assert result_id[row] == expected_id
+
+
+def test_hybrid_rrf_tie():
+    # the tied candidates are ordered the same as rrf_pure
+    ids = ([["d1", "d6", "d0", "d4", "d3"]], [["d5"]])
+    for first_scores in [[1, 1, 2, 2, 2], [5, 4, 3, 2, 1], [1, 1, 1, 1, 1]]:
+        scores = ([first_scores], [[1]])
+        for top_k in [1, 3, 6]:
+            result_id, result_scores = hybrid_rrf(ids, scores, top_k=top_k, weight=60)
+            expected_id, expected_scores = rrf_pure(
+                (ids[0][0], ids[1][0]), (scores[0][0], scores[1][0]), 60, top_k
+            )
+            assert result_id[0] == expected_id
+            assert result_scores[0] == expected_scores
+
+
+def test_hybrid_rrf_sweep():
+    weights = [1, 5, 60]
+    ids = (
+        sample_ids[0] + [["id-1", "id-2", "id-3", "id-4"]],
+        sample_ids[1] + [["id-4", "id-5", "id-6"]],
+    )
+    scores = (
+        sample_scores[0] + [[1, 1, 2, 2]],
+        sample_scores[1] + [[3, 3, 3]],
+    )
+    candidate_ids, rankings, fused_scores = hybrid_rrf_sweep(
+        ids, scores, top_k=3, weights=weights
+    )
+    for i, weight in enumerate(weights):
+        result_ids, result_scores = fusion_to_lists(
+            candidate_ids, rankings[i], fused_scores[i]
+        )
+        for row in range(len(ids[0])):
+            expected_id, expected_scores = rrf_pure(
+                (ids[0][row], ids[1][row]), (scores[0][row], scores[1][row]), weight, 3
+            )
+            assert result_ids[row] == expected_id
+            assert result_scores[row] == pytest.approx(expected_scores)
+
+
+def test_rank_min_descending():
+    values = np.array([[3.0, 1.0, 3.0, np.nan, 2.0]])
+    expected = pd.DataFrame(values.T).rank(ascending=False, method="min").fillna(0)
+    assert rank_min_descending(values)[0].tolist() == expected[0].tolist()
+
+
 def test_hybrid_rrf_node(pseudo_project_dir):  # noqa: F811
     modules = {
         "top_k": 3,
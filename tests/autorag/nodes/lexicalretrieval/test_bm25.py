@@ -4,18 +4,31 @@ import shutil
 import tempfile
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from autorag.nodes.lexicalretrieval import BM25
 from autorag.nodes.lexicalretrieval.bm25 import (
     bm25_ingest,
+    bm25_delete,
+    bm25_compact,
     tokenize_ko_kiwi,
     tokenize_porter_stemmer,
     tokenize_space,
     tokenize_ko_kkma,
     tokenize_ko_okt,
     tokenize_ja_sudachipy,
+    load_bm25_index,
+    BM25TokenizerService,
+    get_bm25_tokenizer_service,
+)
+from autorag.nodes.lexicalretrieval.bm25_index import (
+    BM25Index,
+    BM25_INDEX_FORMAT_VERSION,
+    SEGMENTED_BM25_INDEX_FORMAT_VERSION,
+    SegmentedBM25Index,
+    read_bm25_index_meta,
 )
 from autorag.utils.util import to_list
 from tests.autorag.nodes.retrieval.test_retrieval_base import (
@@ -26,6 +39,8 @@ from tests.autorag.nodes.retrieval.test_retrieval_base import (
     base_retrieval_test,
     base_retrieval_node_test,
     searchable_input_ids,
+    doc_id,
+    contents,
 )
 
 ko_texts = [
@@ -43,11 +58,10 @@ ja_texts = [
 
 @pytest.fixture
 def ingested_bm25_path():
-    with tempfile.NamedTemporaryFile(suffix=".pkl", mode="w+b", delete=False) as path:
-        bm25_ingest(path.name, corpus_df)
-        yield path.name
-        path.close()
-        os.unlink(path.name)
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+        index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+        bm25_ingest(index_dir, corpus_df)
+        yield index_dir
 
 
 @pytest.fixture
@@ -55,13 +69,11 @@ def bm25_instance(ingested_bm25_path):
     with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_project_dir:
         os.makedirs(os.path.join(temp_project_dir, "resources"))
         os.makedirs(os.path.join(temp_project_dir, "data"))
-        bm25_path = os.path.join(
-            temp_project_dir, "resources", "bm25_porter_stemmer.pkl"
-        )
+        bm25_path = os.path.join(temp_project_dir, "resources", "bm25_porter_stemmer")
         corpus_df.to_parquet(
             os.path.join(temp_project_dir, "data", "corpus.parquet"), index=False
         )
-        shutil.copy(ingested_bm25_path, bm25_path)
+        shutil.copytree(ingested_bm25_path, bm25_path)
         bm25 = BM25(project_dir=temp_project_dir)
         yield bm25
 
@@ -72,6 +84,20 @@ def test_bm25_retrieval(bm25_instance):
     base_retrieval_test(id_result, score_result, top_k)
 
 
+def test_bm25_retrieval_query_fusion(bm25_instance):
+    top_k = 3
+    for query_fusion in ["max", "sum", "rrf"]:
+        id_result, score_result = bm25_instance._pure(
+            queries, top_k=top_k, query_fusion=query_fusion
+        )
+        base_retrieval_test(id_result, score_result, top_k)
+        for id_list in id_result:
+            assert len(set(id_list)) == top_k
+
+    with pytest.raises(ValueError):
+        bm25_instance._pure(queries, top_k=top_k, query_fusion="mean")
+
+
 def test_bm25_retrieval_ids(bm25_instance):
     input_ids = [["doc2", "doc3"], ["doc1"], ["doc3", "doc4"]]
     id_result, score_result = bm25_instance._pure(queries, top_k=3, ids=input_ids)
@@ -117,15 +143,27 @@ def test_bm25_node_ids():
 
 
 def test_bm25_ingest(ingested_bm25_path, bm25_instance):
-    with open(ingested_bm25_path, "rb") as r:
-        corpus = pickle.load(r)
-    assert set(corpus.keys()) == {"tokens", "passage_id", "tokenizer_name"}
-    assert isinstance(corpus["tokens"], list)
-    assert isinstance(corpus["passage_id"], list)
-    assert isinstance(corpus["tokenizer_name"], str)
-    assert corpus["tokenizer_name"] == "porter_stemmer"
-    assert len(corpus["tokens"]) == len(corpus["passage_id"]) == 5
-    assert set(corpus["passage_id"]) == {"doc1", "doc2", "doc3", "doc4", "doc5"}
+    meta = read_bm25_index_meta(ingested_bm25_path)
+    assert meta["format_version"] == SEGMENTED_BM25_INDEX_FORMAT_VERSION
+    assert meta["tokenizer_name"] == "porter_stemmer"
+    assert meta["corpus_size"] == 5
+    assert meta["segments"] == ["seg_000000"]
+    segment_dir = os.path.join(ingested_bm25_path, "segments", "seg_000000")
+    assert read_bm25_index_meta(segment_dir)["format_version"] == (
+        BM25_INDEX_FORMAT_VERSION
+    )
+    for filename in [
+        "vocab.arrow",
+        "passage_ids.arrow",
+        "indptr.npy",
+        "doc_indices.npy",
+        "term_freqs.npy",
+        "doc_len.npy",
+    ]:
+        assert os.path.exists(os.path.join(segment_dir, filename))
+    index = SegmentedBM25Index.load(ingested_bm25_path)
+    assert isinstance(index.segments[0].doc_len, np.memmap)
+    assert index.passage_ids.to_pylist() == ["doc1", "doc2", "doc3", "doc4", "doc5"]
 
     top_k = 2
     id_result, score_result = bm25_instance._pure(
@@ -155,9 +193,101 @@ def test_duplicate_id_bm25_ingest(ingested_bm25_path):
         {"doc_id": new_doc_id, "contents": new_contents, "metadata": new_metadata}
     )
     bm25_ingest(ingested_bm25_path, new_corpus_df)
-    with open(ingested_bm25_path, "rb") as r:
-        corpus = pickle.load(r)
-    assert len(corpus["tokens"]) == len(corpus["passage_id"]) == 8
+    index = SegmentedBM25Index.load(ingested_bm25_path)
+    # the new passages are appended as a new segment
+    assert len(index.segments) == 2
+    assert index.segments[1].corpus_size == 3
+    assert index.corpus_size == 8
+    assert index.passage_ids.to_pylist() == [f"doc{i}" for i in range(1, 9)]
+
+    expected = BM25Index.from_tokens(
+        tokenize_porter_stemmer(contents + new_contents[2:]),
+        index.passage_ids.to_pylist(),
+    )
+    tokenized_queries = tokenize_porter_stemmer(["test document 4", "document 8"])
+    assert np.allclose(
+        index.get_passage_scores(tokenized_queries),
+        expected.get_passage_scores(tokenized_queries),
+    )
+
+
+def test_legacy_pickle_bm25_ingest():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+        legacy_path = os.path.join(temp_dir, "bm25_porter_stemmer.pkl")
+        with open(legacy_path, "wb") as w:
+            pickle.dump(
+                {
+                    "tokens": tokenize_porter_stemmer(contents),
+                    "passage_id": doc_id,
+                    "tokenizer_name": "porter_stemmer",
+                },
+                w,
+            )
+        index = load_bm25_index(temp_dir, "porter_stemmer")
+        assert index.corpus_size == 5
+
+        index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+        bm25_ingest(index_dir, corpus_df)
+        assert SegmentedBM25Index.load(index_dir).passage_ids.to_pylist() == doc_id
+
+
+def test_bm25_delete_compact(ingested_bm25_path):
+    bm25_delete(ingested_bm25_path, ["doc2", "doc4", "not_exist"])
+    index = SegmentedBM25Index.load(ingested_bm25_path)
+    assert index.live_count == 3
+    assert index.live_passage_ids().to_pylist() == ["doc1", "doc3", "doc5"]
+    tokenized_queries = tokenize_porter_stemmer(["test document 2", "document 4"])
+    id_result, _ = index.top_k(tokenized_queries, top_k=5)
+    assert all(sorted(ids) == ["doc1", "doc3", "doc5"] for ids in id_result)
+
+    # the deleted passage can be ingested again
+    bm25_ingest(ingested_bm25_path, corpus_df)
+    index = SegmentedBM25Index.load(ingested_bm25_path)
+    assert index.live_count == 5
+    assert len(index.segments) == 2
+
+    bm25_compact(ingested_bm25_path)
+    meta = read_bm25_index_meta(ingested_bm25_path)
+    assert meta["tombstones"] is None
+    assert os.listdir(os.path.join(ingested_bm25_path, "segments")) == meta["segments"]
+    index = SegmentedBM25Index.load(ingested_bm25_path)
+    assert len(index.segments) == 1
+    assert index.corpus_size == 5
+    expected = BM25Index.from_tokens(
+        tokenize_porter_stemmer(
+            [contents[0], contents[2], contents[4], contents[1], contents[3]]
+        ),
+        index.passage_ids.to_pylist(),
+    )
+    assert np.allclose(
+        index.get_passage_scores(tokenized_queries),
+        expected.get_passage_scores(tokenized_queries),
+    )
+
+
+def test_bm25_tokenizer_service():
+    service = BM25TokenizerService("porter_stemmer", query_cache_size=2, chunk_size=2)
+    texts = contents + contents
+    expected = tokenize_porter_stemmer(texts)
+    assert service.tokenize_corpus(texts, num_workers=2) == expected
+    assert service.tokenize_corpus(texts, num_workers=1) == expected
+    stats = service.stats()
+    assert stats["corpus"]["texts"] == len(texts) * 2
+    assert stats["corpus"]["workers"] == 1
+
+    assert service.tokenize_queries(texts[:3]) == expected[:3]
+    assert service.tokenize_queries([texts[2], texts[2]]) == [expected[2]] * 2
+    stats = service.stats()["query"]
+    assert stats["texts"] == 5
+    assert stats["cache_hits"] == 2
+    assert stats["cache_misses"] == 3
+    # the least recently used query is evicted
+    assert len(service._query_cache) == 2
+    assert texts[0] not in service._query_cache
+
+    assert get_bm25_tokenizer_service("porter_stemmer") is get_bm25_tokenizer_service(
+        "porter_stemmer"
+    )
 
 
 def test_other_method_bm25():
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from rank_bm25 import BM25Okapi
+
+from autorag.nodes.lexicalretrieval.bm25_index import BM25Index, SegmentedBM25Index
+
+corpus_tokens = [
+    ["this", "is", "test", "document", "1"],
+    ["this", "is", "test", "document", "2", "test"],
+    ["this", "is", "test", "document", "3"],
+    ["this", "is", "test", "document", "4"],
+    ["this", "is", "test", "document", "5", "apple", "banana"],
+    ["complete", "different", "passage"],
+]
+passage_ids = ["doc1", "doc2", "doc3", "doc4", "doc5", "doc6"]
+tokenized_queries = [
+    ["test", "document"],
+    ["apple", "apple", "banana"],
+    ["complete", "test"],
+    ["unknown"],
+]
+
+
+def test_bm25_index_scores():
+    index = BM25Index.from_tokens(corpus_tokens, passage_ids)
+    okapi = BM25Okapi(corpus_tokens)
+    scores = index.get_passage_scores(tokenized_queries)
+    assert scores.shape == (len(tokenized_queries), len(passage_ids))
+    for query, score in zip(tokenized_queries, scores):
+        assert np.allclose(score, okapi.get_scores(query))
+
+    candidate_scores = index.get_passage_scores(
+        tokenized_queries, ["doc6", "doc2", "doc6"]
+    )
+    assert np.allclose(candidate_scores, scores[:, [5, 1, 5]])
+    assert index.get_passage_scores(tokenized_queries, []).shape == (
+        len(tokenized_queries),
+        0,
+    )
+    with pytest.raises(ValueError):
+        index.get_passage_scores(tokenized_queries, ["doc7"])
+
+
+def test_bm25_index_negative_idf():
+    tokens = [["a", "b"], ["a", "c"], ["a"]]
+    index = BM25Index.from_tokens(tokens, ["x", "y", "z"])
+    okapi = BM25Okapi(tokens)
+    assert np.allclose(
+        index.get_passage_scores([["a", "b"]])[0], okapi.get_scores(["a", "b"])
+    )
+    ids, scores = index.top_k([["a", "b"]], top_k=3)
+    assert ids == [["x", "y", "z"]]
+    assert scores[0] == sorted(scores[0], reverse=True)
+
+
+def test_bm25_index_top_k():
+    index = BM25Index.from_tokens(corpus_tokens, passage_ids)
+    okapi = BM25Okapi(corpus_tokens)
+    top_k = 3
+    ids, scores = index.top_k(tokenized_queries, top_k=top_k, batch_size=2)
+    assert len(ids) == len(scores) == len(tokenized_queries)
+    for query, id_list, score_list in zip(tokenized_queries, ids, scores):
+        assert len(id_list) == len(score_list) == top_k
+        expected = sorted(okapi.get_scores(query), reverse=True)[:top_k]
+        assert np.allclose(score_list, expected)
+    assert ids[1][0] == "doc5"
+    assert ids[2][0] == "doc6"
+    # no token matched, so every passage has zero score
+    assert scores[3] == [0.0, 0.0, 0.0]
+
+    ids, scores = index.top_k(tokenized_queries, top_k=10)
+    assert all(len(id_list) == len(passage_ids) for id_list in ids)
+
+
+def test_segmented_bm25_index():
+    index = BM25Index.from_tokens(corpus_tokens, passage_ids)
+    segmented = SegmentedBM25Index(
+        [BM25Index.from_tokens(corpus_tokens[:4], passage_ids[:4])]
+    ).append(BM25Index.from_tokens(corpus_tokens[4:], passage_ids[4:]))
+    assert segmented.segment_names == ["seg_000000", "seg_000001"]
+    assert np.isclose(segmented.average_idf, index.average_idf)
+    assert np.allclose(
+        segmented.get_passage_scores(tokenized_queries),
+        index.get_passage_scores(tokenized_queries),
+    )
+    assert segmented.top_k(tokenized_queries, top_k=4) == index.top_k(
+        tokenized_queries, top_k=4
+    )
+
+    deleted = segmented.delete(["doc5", "doc1"])
+    ids, scores = deleted.top_k(tokenized_queries, top_k=10)
+    assert all(len(id_list) == 4 for id_list in ids)
+    assert all("doc5" not in id_list and "doc1" not in id_list for id_list in ids)
+
+    candidates = ["doc6", "doc2", "doc4"]
+    assert np.allclose(
+        deleted.get_passage_scores(tokenized_queries, candidates),
+        deleted.get_passage_scores(tokenized_queries)[:, [5, 1, 3]],
+    )
+    with pytest.raises(ValueError):
+        deleted.get_passage_scores(tokenized_queries, ["doc5"])
+
+    compacted = deleted.compact()
+    assert len(compacted.segments) == 1
+    expected = BM25Index.from_tokens(
+        corpus_tokens[1:4] + corpus_tokens[5:], passage_ids[1:4] + passage_ids[5:]
+    )
+    assert compacted.top_k(tokenized_queries, top_k=3) == expected.top_k(
+        tokenized_queries, top_k=3
+    )
+
+
+def test_bm25_index_fused_top_k():
+    index = BM25Index.from_tokens(corpus_tokens, passage_ids)
+    query_lengths = [2, 1, 1]
+    scores = index.get_passage_scores(tokenized_queries)
+    for fusion in ["max", "sum"]:
+        ids, fused_scores = index.fused_top_k(
+            tokenized_queries, query_lengths, top_k=3, fusion=fusion, batch_size=2
+        )
+        assert len(ids) == len(fused_scores) == len(query_lengths)
+        expected = getattr(scores[:2], fusion)(axis=0)
+        assert np.allclose(fused_scores[0], np.sort(expected)[::-1][:3])
+        assert ids[1][0] == "doc6"
+
+    ids, fused_scores = index.fused_top_k(
+        tokenized_queries, query_lengths, top_k=3, fusion="rrf", rrf_k=60
+    )
+    top_ids, _ = index.top_k(tokenized_queries[:2], top_k=3)
+    expected = {}
+    for id_list in top_ids:
+        for rank, _id in enumerate(id_list, start=1):
+            expected[_id] = expected.get(_id, 0.0) + 1 / (60 + rank)
+    assert all(
+        np.isclose(score, expected[_id]) for _id, score in zip(ids[0], fused_scores[0])
+    )
+    assert fused_scores[0] == sorted(fused_scores[0], reverse=True)
+
+    # the negative score of a matched query is fused with zero of the unmatched query
+    tokens = [["a", "b"], ["a", "c"], ["a"]]
+    negative_index = BM25Index.from_tokens(tokens, ["x", "y", "z"])
+    ids, fused_scores = negative_index.fused_top_k(
+        [["a"], ["b"]], [2], top_k=3, fusion="max"
+    )
+    assert ids[0][0] == "x"
+    assert fused_scores[0][1:] == [0.0, 0.0]
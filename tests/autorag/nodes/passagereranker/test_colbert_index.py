@@ -0,0 +1,75 @@
+import tempfile
+
+import numpy as np
+import pytest
+
+from autorag.nodes.passagereranker.colbert_index import ColbertTokenIndex
+
+
+def brute_force_max_sim(query_embedding, content_embedding):
+    query_embedding = query_embedding / np.linalg.norm(
+        query_embedding, axis=1, keepdims=True
+    )
+    content_embedding = content_embedding / np.linalg.norm(
+        content_embedding, axis=1, keepdims=True
+    )
+    return float(np.mean(np.max(query_embedding @ content_embedding.T, axis=1)))
+
+
+def test_colbert_token_index():
+    rng = np.random.default_rng(0)
+    doc_ids = ["doc-0", "doc-1", "doc-2"]
+    contents = ["first passage", "second passage", "third passage"]
+    embeddings = [rng.normal(size=(length, 8)) for length in [3, 5, 1]]
+    query_embedding = rng.normal(size=(4, 8))
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = ColbertTokenIndex(index_dir)
+        assert index.missing(doc_ids, contents) == [0, 1, 2]
+        index.add(doc_ids[:2], contents[:2], embeddings[:2])
+        assert index.missing(doc_ids, contents) == [2]
+        index.add(doc_ids[2:], contents[2:], embeddings[2:])
+        assert len(index) == 3
+
+        # the index is loaded from the disk
+        index = ColbertTokenIndex(index_dir)
+        assert index.missing(doc_ids, contents) == []
+        # the changed passage is missing
+        assert index.missing(["doc-1"], ["changed passage"]) == [0]
+
+        scores = index.max_sim(query_embedding, ["doc-2", "doc-0", "doc-1"])
+        expected_scores = [
+            brute_force_max_sim(query_embedding, embeddings[i]) for i in [2, 0, 1]
+        ]
+        assert np.allclose(scores, expected_scores, atol=1e-3)
+        assert index.max_sim(query_embedding, []) == []
+
+        # the newer segment overrides the changed passage
+        new_embedding = rng.normal(size=(2, 8))
+        index.add(["doc-1"], ["changed passage"], [new_embedding])
+        assert index.max_sim(query_embedding, ["doc-1"]) == pytest.approx(
+            [brute_force_max_sim(query_embedding, new_embedding)], abs=1e-3
+        )
+        assert ColbertTokenIndex(index_dir).missing(["doc-1"], ["changed passage"]) == []
+
+        with pytest.raises(ValueError):
+            index.max_sim(query_embedding, ["doc-3"])
+        with pytest.raises(ValueError):
+            index.add(["doc-3"], [], embeddings[:1])
+
+
+def test_colbert_token_index_segment_order():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = ColbertTokenIndex(index_dir)
+        for i in range(12):
+            index.add(["doc-0"], [f"passage {i}"], [rng.normal(size=(2, 8))])
+        # two index instances of the same directory add the segments in turn
+        other_index = ColbertTokenIndex(index_dir)
+        index.add(["doc-0"], ["passage 12"], [rng.normal(size=(2, 8))])
+        other_index.add(["doc-0"], ["passage 13"], [rng.normal(size=(2, 8))])
+
+        # the latest segment wins after reloading
+        index = ColbertTokenIndex(index_dir)
+        assert index.missing(["doc-0"], ["passage 13"]) == []
+        assert index.missing(["doc-0"], ["passage 11"]) == [0]
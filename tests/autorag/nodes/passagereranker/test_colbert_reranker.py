@@ -1,5 +1,7 @@
 import itertools
+import tempfile
 
+import numpy as np
 import pytest
 import torch
 from transformers import AutoModel, AutoTokenizer
@@ -94,6 +96,56 @@ def test_colbert_embedding():
     assert colbert_embedding[0].shape == (1, 11, 768)
 
 
+@pytest.mark.skipif(
+    is_github_action(),
+    reason="Skipping this test on GitHub Actions because it uses local model.",
+)
+def test_colbert_reranker_onnx(colbert_reranker_instance):
+    top_k = 2
+    _, expected_ids, expected_scores = colbert_reranker_instance._pure(
+        queries_example, contents_example, ids_example, top_k
+    )
+    with tempfile.TemporaryDirectory() as onnx_project_dir:
+        onnx_instance = ColbertReranker(
+            onnx_project_dir, "colbert-ir/colbertv2.0", backend="onnx"
+        )
+        contents_result, id_result, score_result = onnx_instance._pure(
+            queries_example, contents_example, ids_example, top_k
+        )
+    base_reranker_test(contents_result, id_result, score_result, top_k)
+    # the onnx backend gives the same scores as the torch backend
+    assert id_result == expected_ids
+    assert np.allclose(score_result, expected_scores, atol=1e-4)
+
+
+@pytest.mark.skipif(
+    is_github_action(),
+    reason="Skipping this test on GitHub Actions because it uses local model.",
+)
+def test_colbert_reranker_index():
+    top_k = 2
+    with tempfile.TemporaryDirectory() as index_project_dir:
+        instance = ColbertReranker(index_project_dir, "colbert-ir/colbertv2.0")
+        contents_result, id_result, score_result = instance._pure(
+            queries_example, contents_example, ids_example, top_k, use_index=True
+        )
+        base_reranker_test(contents_result, id_result, score_result, top_k)
+        assert len(instance.get_token_index()) == len(
+            set(itertools.chain.from_iterable(ids_example))
+        )
+
+        # the new instance reuses the saved index
+        new_instance = ColbertReranker(index_project_dir, "colbert-ir/colbertv2.0")
+        assert len(new_instance.get_token_index()) == len(
+            instance.get_token_index()
+        )
+        _, new_id_result, new_score_result = new_instance._pure(
+            queries_example, contents_example, ids_example, top_k, use_index=True
+        )
+    assert new_id_result == id_result
+    assert np.allclose(new_score_result, score_result, atol=1e-6)
+
+
 def test_slice_tensor():
     original_tensor = torch.randn(14, 7)
     batch_size = 4
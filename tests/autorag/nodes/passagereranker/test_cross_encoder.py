@@ -0,0 +1,95 @@
+import contextlib
+import sys
+import threading
+import types
+from unittest.mock import patch
+
+import pytest
+
+from autorag.nodes.passagereranker.cross_encoder import (
+    get_token_lengths,
+    inference_context,
+    pack_length_batches,
+    run_cross_encoder,
+)
+from tests.autorag.nodes.passagereranker.test_passage_reranker_base import (
+    queries_example,
+    contents_example,
+)
+
+
+def test_pack_length_batches():
+    lengths = [3, 10, 1, 7, 7, 2]
+    batches = pack_length_batches(lengths, batch_size=2)
+    assert batches == [[1, 3], [4, 0], [5, 2]]
+
+    batches = pack_length_batches(lengths, batch_size=10, max_tokens=15)
+    assert sorted(sum(batches, [])) == list(range(len(lengths)))
+    for batch in batches:
+        padded_tokens = len(batch) * max(map(lambda x: lengths[x], batch))
+        assert padded_tokens <= 15 or len(batch) == 1
+    # the input longer than max_tokens is in its own batch
+    assert pack_length_batches([20, 1], batch_size=10, max_tokens=15) == [[0], [1]]
+    assert pack_length_batches([], batch_size=10) == []
+    with pytest.raises(ValueError):
+        pack_length_batches(lengths, batch_size=0)
+
+
+def test_run_cross_encoder():
+    input_texts = [
+        [query, content]
+        for query, contents in zip(queries_example, contents_example)
+        for content in contents
+    ]
+    lengths = get_token_lengths(input_texts)
+    assert len(lengths) == len(input_texts)
+    assert lengths[1] > lengths[0]
+
+    batch_sizes = []
+
+    def run_batch(batch_texts):
+        batch_sizes.append(len(batch_texts))
+        return list(map(lambda x: len(x[1]), batch_texts))
+
+    scores = run_cross_encoder(
+        input_texts, run_batch, batch_size=4, lengths=lengths, max_tokens=40
+    )
+    assert scores == list(map(lambda x: len(x[1]), input_texts))
+    assert sum(batch_sizes) == len(input_texts)
+    assert max(batch_sizes) <= 4
+
+    with pytest.raises(ValueError):
+        run_cross_encoder(input_texts, lambda x: x[:1], batch_size=4)
+
+
+def make_fake_torch():
+    fake_torch = types.ModuleType("torch")
+    fake_torch.num_threads = 8
+    fake_torch.get_num_threads = lambda: fake_torch.num_threads
+    fake_torch.set_num_threads = lambda x: setattr(fake_torch, "num_threads", x)
+    fake_torch.inference_mode = contextlib.nullcontext
+    return fake_torch
+
+
+def test_inference_context_num_threads():
+    fake_torch = make_fake_torch()
+    with patch.dict(sys.modules, {"torch": fake_torch}):
+        # the torch thread count is kept without num_threads
+        with inference_context("cpu"):
+            assert fake_torch.num_threads == 8
+        with inference_context("cpu", num_threads=2):
+            assert fake_torch.num_threads == 2
+        assert fake_torch.num_threads == 8
+
+        # the worker thread never changes the thread count of the process
+        thread_counts = []
+
+        def run_in_worker():
+            with inference_context("cpu", num_threads=2):
+                thread_counts.append(fake_torch.num_threads)
+
+        worker = threading.Thread(target=run_in_worker)
+        worker.start()
+        worker.join()
+        assert thread_counts == [8]
+        assert fake_torch.num_threads == 8
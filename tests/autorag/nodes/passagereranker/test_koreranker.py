@@ -1,3 +1,6 @@
+import tempfile
+
+import numpy as np
 import pytest
 
 from autorag.nodes.passagereranker.koreranker import KoReranker
@@ -48,3 +51,20 @@ def test_koreranker_node():
         project_dir=project_dir, previous_result=ko_previous_result, top_k=top_k
     )
     base_reranker_node_test(result_df, top_k, use_ko=True)
+
+
+@pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
+def test_koreranker_onnx(koreranker_instance):
+    top_k = 3
+    _, expected_ids, expected_scores = koreranker_instance._pure(
+        ko_queries_example, ko_contents_example, ids_example, top_k
+    )
+    with tempfile.TemporaryDirectory() as onnx_project_dir:
+        onnx_instance = KoReranker(onnx_project_dir, backend="onnx")
+        contents_result, id_result, score_result = onnx_instance._pure(
+            ko_queries_example, ko_contents_example, ids_example, top_k
+        )
+    base_reranker_test(contents_result, id_result, score_result, top_k, use_ko=True)
+    # the onnx backend gives the same scores as the torch backend
+    assert id_result == expected_ids
+    assert np.allclose(score_result, expected_scores, atol=1e-4)
@@ -5,8 +5,11 @@ import tempfile
 import pandas as pd
 import pytest
 
-from autorag.nodes.passagereranker import MonoT5
-from autorag.nodes.passagereranker.run import run_passage_reranker_node
+from autorag.nodes.passagereranker import MonoT5, PassReranker, TimeReranker
+from autorag.nodes.passagereranker.run import (
+    run_passage_reranker_node,
+    share_top_k_runs,
+)
 from autorag.utils.util import load_summary_file
 from tests.delete_tests import is_github_action
 
@@ -155,3 +158,46 @@ def test_run_passage_reranker_node(node_line_dir):
     assert os.path.exists(
         os.path.join(node_line_dir, "passage_reranker", f"best_{best_path}")
     )
+
+
+def test_share_top_k_runs():
+    modules = [MonoT5, MonoT5, PassReranker, MonoT5, TimeReranker]
+    module_params = [
+        {"top_k": 1, "batch": 4},
+        {"top_k": 3, "batch": 4},
+        {"top_k": 2},
+        {"top_k": 2, "batch": 8},
+        {"batch": 4},
+    ]
+    run_modules, run_params, run_indices = share_top_k_runs(modules, module_params)
+    assert run_modules == [MonoT5, PassReranker, MonoT5, TimeReranker]
+    assert run_params == [
+        {"top_k": 3, "batch": 4},
+        {"top_k": 2},
+        {"top_k": 2, "batch": 8},
+        {"batch": 4},
+    ]
+    assert run_indices == [0, 0, 1, 2, 3]
+    # the original parameters are not changed
+    assert module_params[0] == {"top_k": 1, "batch": 4}
+
+
+def test_run_passage_reranker_node_shared_top_k(node_line_dir):
+    modules = [PassReranker, PassReranker]
+    module_params = [{"top_k": 1}, {"top_k": 2}]
+    strategies = {"metrics": ["retrieval_f1", "retrieval_recall"]}
+    run_passage_reranker_node(
+        modules, module_params, previous_result, node_line_dir, strategies
+    )
+    save_dir = os.path.join(node_line_dir, "passage_reranker")
+    summary_df = load_summary_file(os.path.join(save_dir, "summary.csv"))
+    assert summary_df["module_params"].tolist() == module_params
+    # both combinations take the time of the one scoring run
+    assert summary_df["execution_time"][0] == summary_df["execution_time"][1]
+    top_1_df = pd.read_parquet(os.path.join(save_dir, "0.parquet"))
+    top_2_df = pd.read_parquet(os.path.join(save_dir, "1.parquet"))
+    assert top_1_df["retrieved_ids"].apply(len).tolist() == [1, 1, 1]
+    assert top_2_df["retrieved_ids"].apply(len).tolist() == [2, 2, 2]
+    assert top_1_df["retrieved_ids"].apply(list).tolist() == top_2_df[
+        "retrieved_ids"
+    ].apply(lambda x: list(x[:1])).tolist()
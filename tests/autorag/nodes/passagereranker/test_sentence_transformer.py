@@ -1,3 +1,6 @@
+import tempfile
+
+import numpy as np
 import pytest
 
 from autorag.nodes.passagereranker import SentenceTransformerReranker
@@ -46,3 +49,33 @@ def test_sentence_transformer_reranker_node():
         project_dir=project_dir, previous_result=previous_result, top_k=top_k
     )
     base_reranker_node_test(result_df, top_k)
+
+
+@pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
+def test_sentence_transformer_reranker_onnx(sentence_transformer_instance):
+    top_k = 3
+    _, expected_ids, expected_scores = sentence_transformer_instance._pure(
+        queries_example, contents_example, ids_example, top_k
+    )
+    with tempfile.TemporaryDirectory() as onnx_project_dir:
+        onnx_instance = SentenceTransformerReranker(
+            onnx_project_dir, "cross-encoder/ms-marco-MiniLM-L2-v2", backend="onnx"
+        )
+        contents_result, id_result, score_result = onnx_instance._pure(
+            queries_example, contents_example, ids_example, top_k
+        )
+        base_reranker_test(contents_result, id_result, score_result, top_k)
+        # the onnx backend gives the same scores as the torch backend
+        assert id_result == expected_ids
+        assert np.allclose(score_result, expected_scores, atol=1e-4)
+
+        quantized_instance = SentenceTransformerReranker(
+            onnx_project_dir,
+            "cross-encoder/ms-marco-MiniLM-L2-v2",
+            backend="onnx",
+            quantize=True,
+        )
+        contents_result, id_result, score_result = quantized_instance._pure(
+            queries_example, contents_example, ids_example, top_k
+        )
+        base_reranker_test(contents_result, id_result, score_result, top_k)
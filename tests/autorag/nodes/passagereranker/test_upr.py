@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from autorag.nodes.passagereranker import Upr
@@ -29,6 +30,19 @@ def test_upr(upr_reranker):
     )
 
 
+@pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
+def test_upr_compute_batch(upr_reranker):
+    scores = upr_reranker.scorer.compute_batch(
+        queries_example, contents_example, batch_size=4, max_tokens=256
+    )
+    assert len(scores) == len(queries_example)
+    for query, contents, score in zip(queries_example, contents_example, scores):
+        # the cross-query batches give the same scores as the per-query computation
+        assert np.allclose(
+            score, upr_reranker.scorer.compute(query, contents), atol=1e-4
+        )
+
+
 @pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
 def test_upr_node():
     top_k = 3
@@ -227,6 +227,126 @@ def test_start_trial(evaluator):
     assert trial_summary_df["best_execution_time"][0] > 0
 
 
+def test_start_trial_sharded(evaluator):
+    yaml_path = os.path.join(resource_dir, "simple_bm25.yaml")
+    evaluator.start_trial(yaml_path, skip_validation=True)
+    evaluator.start_trial(yaml_path, skip_validation=True, shard_size=3)
+    project_dir = evaluator.project_dir
+    assert not os.path.exists(os.path.join(project_dir, ".shards"))
+
+    node_dir = os.path.join("retrieve_node_line", "lexical_retrieval")
+    summary_df = load_summary_file(
+        os.path.join(project_dir, "0", node_dir, "summary.csv")
+    )
+    sharded_summary_df = load_summary_file(
+        os.path.join(project_dir, "1", node_dir, "summary.csv")
+    )
+    assert sharded_summary_df.columns.tolist() == summary_df.columns.tolist()
+    # the metrics of the shards are merged to the metrics of the whole QA data
+    columns = ["retrieval_f1", "retrieval_recall", "retrieval_precision", "is_best"]
+    pd.testing.assert_frame_equal(sharded_summary_df[columns], summary_df[columns])
+
+    best_filename = summary_df.loc[summary_df["is_best"]]["filename"].values[0]
+    for filename in summary_df["filename"].tolist() + [f"best_{best_filename}"]:
+        result_df = pd.read_parquet(os.path.join(project_dir, "0", node_dir, filename))
+        sharded_result_df = pd.read_parquet(
+            os.path.join(project_dir, "1", node_dir, filename)
+        )
+        assert len(sharded_result_df) == len(evaluator.qa_data)
+        ids_column = (
+            "retrieved_ids_lexical" if filename.startswith("best_") else "retrieved_ids"
+        )
+        assert (
+            sharded_result_df[ids_column].apply(list).tolist()
+            == result_df[ids_column].apply(list).tolist()
+        )
+
+
+def test_start_trial_without_result_cache(evaluator):
+    evaluator.start_trial(
+        os.path.join(resource_dir, "simple_bm25.yaml"),
+        skip_validation=True,
+        result_cache=False,
+    )
+    assert os.path.exists(os.path.join(evaluator.project_dir, "0", "summary.csv"))
+    assert not os.path.exists(evaluator.result_cache_dir)
+
+
+def test_start_trial_sharded_hybrid(evaluator):
+    # each shard would search its own fusion weight, so the hybrid node is rejected
+    with pytest.raises(ValueError):
+        evaluator.start_trial(
+            os.path.join(resource_dir, "simple_mock.yaml"),
+            skip_validation=True,
+            shard_size=3,
+        )
+    assert not os.path.exists(os.path.join(evaluator.project_dir, "0"))
+
+
+def test_start_trial_sharded_search(evaluator):
+    # each shard would prune its own combinations, so the search node is rejected
+    with pytest.raises(ValueError):
+        evaluator.start_trial(
+            os.path.join(resource_dir, "simple_bm25_search.yaml"),
+            skip_validation=True,
+            shard_size=3,
+        )
+    assert not os.path.exists(os.path.join(evaluator.project_dir, "0"))
+
+
+def test_start_trial_sharded_lazy_qa(evaluator):
+    # the sharded trial reads the QA data shard by shard, never as the whole
+    assert evaluator._qa_data is None
+    evaluator.start_trial(
+        os.path.join(resource_dir, "simple_bm25.yaml"),
+        skip_validation=True,
+        shard_size=3,
+    )
+    assert evaluator._qa_data is None
+    qa_df = pd.read_parquet(os.path.join(evaluator.project_dir, "data", "qa.parquet"))
+    assert len(qa_df) == len(evaluator.qa_data)
+    assert evaluator._qa_data is not None
+
+
+def test_start_trial_search(evaluator):
+    evaluator.start_trial(
+        os.path.join(resource_dir, "simple_bm25_search.yaml"), skip_validation=True
+    )
+    project_dir = evaluator.project_dir
+    assert not os.path.exists(os.path.join(project_dir, ".shards"))
+
+    node_dir = os.path.join(project_dir, "0", "retrieve_node_line", "lexical_retrieval")
+    # only the survivors are in the node summary, so every row has its result file
+    summary_df = load_summary_file(os.path.join(node_dir, "summary.csv"))
+    assert len(summary_df) == 1
+    assert "evaluated_fraction" not in summary_df.columns
+    for filename in summary_df["filename"].tolist():
+        assert os.path.exists(os.path.join(node_dir, filename))
+
+    # every combination is in the search summary
+    search_summary_df = load_summary_file(
+        os.path.join(node_dir, "search_summary.csv")
+    )
+    assert len(search_summary_df) == 6
+    # 6 combinations run on 3 rows, 2 of them on 9 rows, and 1 of them on all rows
+    assert sorted(search_summary_df["evaluated_fraction"].tolist()) == [
+        0.3,
+        0.3,
+        0.3,
+        0.3,
+        0.9,
+        1.0,
+    ]
+    survivors = search_summary_df.loc[search_summary_df["evaluated_fraction"] == 1.0]
+    assert survivors["is_best"].tolist() == [True]
+    assert search_summary_df["filename"].notna().sum() == 1
+    assert survivors["filename"].tolist() == summary_df["filename"].tolist()
+    best_df = pd.read_parquet(
+        os.path.join(node_dir, f"best_{survivors['filename'].values[0]}")
+    )
+    assert len(best_df) == len(evaluator.qa_data)
+
+
 @pytest.mark.skipif(
     is_github_action(),
     reason="This test needs milvus uri and token which is confidential.",
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from autorag.node_line import _merge_shard_summaries, select_top_modules
+
+
+def make_summary(rows):
+    return pd.DataFrame(
+        list(
+            map(
+                lambda x: {
+                    "filename": x[0],
+                    "module_name": x[1],
+                    "module_params": x[2],
+                    "execution_time": x[3],
+                    "retrieval_f1": x[4],
+                    "is_best": False,
+                },
+                rows,
+            )
+        )
+    )
+
+
+def test_merge_shard_summaries():
+    first_shard = make_summary(
+        [
+            ("0.parquet", "bm25", {"top_k": 3}, 1.0, 0.2),
+            ("1.parquet", "bm25", {"top_k": 5}, 2.0, 0.4),
+        ]
+    )
+    # the rows of the second shard are in the other order
+    second_shard = make_summary(
+        [
+            ("1.parquet", "bm25", {"top_k": 5}, 4.0, 0.1),
+            ("0.parquet", "bm25", {"top_k": 3}, 4.0, 0.8),
+        ]
+    )
+    summary_df, best_index = _merge_shard_summaries(
+        [first_shard, second_shard], [1, 3], {"strategy": "mean"}
+    )
+    assert summary_df["filename"].tolist() == ["0.parquet", "1.parquet"]
+    assert summary_df["execution_time"].tolist() == pytest.approx([3.25, 3.5])
+    assert summary_df["retrieval_f1"].tolist() == pytest.approx([0.65, 0.175])
+    assert best_index == 0
+    assert summary_df["is_best"].tolist() == [True, False]
+
+
+def test_merge_shard_summaries_different_modules():
+    first_shard = make_summary(
+        [
+            ("0.parquet", "bm25", {"top_k": 3}, 1.0, 0.2),
+            ("1.parquet", "bm25", {"top_k": 5}, 2.0, 0.4),
+        ]
+    )
+    second_shard = make_summary(
+        [
+            ("0.parquet", "bm25", {"top_k": 3}, 1.0, 0.2),
+            ("1.parquet", "bm25", {"top_k": 10}, 2.0, 0.4),
+        ]
+    )
+    with pytest.raises(ValueError):
+        _merge_shard_summaries(
+            [first_shard, second_shard], [1, 1], {"strategy": "mean"}
+        )
+
+
+def test_select_top_modules_over_threshold():
+    summary_df = make_summary(
+        [
+            ("0.parquet", "bm25", {"top_k": 3}, 1.0, 0.2),
+            ("1.parquet", "bm25", {"top_k": 5}, 2.0, 0.4),
+        ]
+    )
+    # every module is over the speed threshold, so every module is kept
+    strategies = {"strategy": "mean", "speed_threshold": 0.1}
+    assert select_top_modules(summary_df, strategies, 2) == [1, 0]
+    summary_df["average_output_token"] = [100.0, 200.0]
+    strategies["token_threshold"] = 10
+    assert select_top_modules(summary_df, strategies, 1) == [1]
+    _, best_index = _merge_shard_summaries([summary_df], [1], strategies)
+    assert best_index == 1
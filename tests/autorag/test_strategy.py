@@ -5,6 +5,7 @@ import pytest
 
 from autorag.strategy import (
     measure_speed,
+    run_modules,
     filter_by_threshold,
     select_best_average,
     select_best_rr,
@@ -43,6 +44,67 @@ def test_measure_speed():
     assert pytest.approx(2, 0.1) == five_seconds
 
 
+class SleepModule:
+    resource_tag = "api"
+
+    @classmethod
+    def run_evaluator(cls, project_dir, previous_result, seconds: float):
+        time.sleep(seconds)
+        return f"{project_dir}-{previous_result}-{seconds}"
+
+
+class GpuSleepModule(SleepModule):
+    resource_tag = "gpu"
+
+
+def test_run_modules():
+    module_params = [{"seconds": 0.5}, {"seconds": 0.3}, {"seconds": 0.4}]
+    modules = [SleepModule] * 3
+    results, times = run_modules(
+        modules, module_params, {}, project_dir="dir", previous_result="prev"
+    )
+    assert results == ["dir-prev-0.5", "dir-prev-0.3", "dir-prev-0.4"]
+    assert pytest.approx([0.5, 0.3, 0.4], abs=0.1) == times
+
+    start = time.time()
+    parallel_results, parallel_times = run_modules(
+        modules,
+        module_params,
+        {"max_workers": 3},
+        project_dir="dir",
+        previous_result="prev",
+    )
+    assert time.time() - start < 1.0
+    assert parallel_results == results
+    # the execution time is measured for each module, not the whole pool
+    assert pytest.approx([0.5, 0.3, 0.4], abs=0.1) == parallel_times
+
+    # only one gpu module runs at once
+    start = time.time()
+    gpu_results, _ = run_modules(
+        [GpuSleepModule] * 3,
+        module_params,
+        {"max_workers": 3},
+        project_dir="dir",
+        previous_result="prev",
+    )
+    assert time.time() - start >= 1.2
+    assert gpu_results == results
+
+    process_results, process_times = run_modules(
+        modules,
+        module_params,
+        {"max_workers": 2, "executor": "process"},
+        project_dir="dir",
+        previous_result="prev",
+    )
+    assert process_results == results
+    assert pytest.approx([0.5, 0.3, 0.4], abs=0.1) == process_times
+
+    with pytest.raises(ValueError):
+        run_modules(modules, module_params, {"max_workers": 2, "executor": "gpu"})
+
+
 def test_filter_by_threshold():
     results = [1, 2, 3, 4]
     values = [1, 2, 3, 4]
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+from autorag.utils import CorpusIndex, acquire_corpus, release_corpus, hold_corpus
+from autorag.utils.corpus import _corpus_registry
+
+corpus_df = pd.DataFrame(
+    {
+        "doc_id": ["doc1", "doc2", "doc3", "doc2"],
+        "contents": ["apple", "banana", "cherry", "duplicated banana"],
+        "metadata": [{"page": 1}, {"page": 2}, {"page": 3}, {"page": 4}],
+    }
+)
+
+
+def test_corpus_index_fetch():
+    corpus_index = CorpusIndex(corpus_df)
+    assert len(corpus_index) == 4
+    assert "doc3" in corpus_index
+    assert "doc4" not in corpus_index
+
+    result = corpus_index.fetch([["doc3", "doc1"], ["doc2"], [], ["", "doc1"]])
+    # the first row is used for the duplicated doc_id
+    assert result == [["cherry", "apple"], ["banana"], [None], [None, "apple"]]
+    assert corpus_index.fetch([["doc2"]], column_name="metadata") == [[{"page": 2}]]
+
+    assert corpus_index.fetch_one("doc1", "metadata") == {"page": 1}
+    assert corpus_index.fetch_one(None) is None
+
+
+def test_corpus_index_missing_id():
+    corpus_index = CorpusIndex(corpus_df)
+    with pytest.raises(ValueError):
+        corpus_index.fetch([["doc1", "doc4"]])
+    with pytest.raises(ValueError):
+        corpus_index.fetch_one("doc4")
+
+
+def registered_count(corpus_path: str) -> int:
+    # other tests can leave their corpus in the registry, so count only this path
+    real_path = os.path.realpath(corpus_path)
+    return len([key for key in _corpus_registry if key[0] == real_path])
+
+
+def test_corpus_registry():
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+        corpus_path = os.path.join(temp_dir, "corpus.parquet")
+        corpus_df.to_parquet(corpus_path, index=False)
+
+        first = acquire_corpus(corpus_path)
+        second = acquire_corpus(corpus_path)
+        assert first is second
+        assert first.fetch([["doc3"]]) == [["cherry"]]
+        release_corpus(first)
+        release_corpus(second)
+        assert registered_count(corpus_path) == 0
+
+        with hold_corpus(corpus_path):
+            corpus_index = acquire_corpus(corpus_path)
+            release_corpus(corpus_index)
+            # the held corpus is not loaded again
+            assert acquire_corpus(corpus_path) is corpus_index
+            release_corpus(corpus_index)
+            assert registered_count(corpus_path) == 1
+        assert registered_count(corpus_path) == 0
+
+        # the modified file is loaded again
+        corpus_index = acquire_corpus(corpus_path)
+        corpus_df.iloc[:2].to_parquet(corpus_path, index=False)
+        os.utime(corpus_path, ns=(0, 0))
+        new_corpus_index = acquire_corpus(corpus_path)
+        assert new_corpus_index is not corpus_index
+        assert len(new_corpus_index) == 2
+        release_corpus(corpus_index)
+        release_corpus(new_corpus_index)
+        assert registered_count(corpus_path) == 0
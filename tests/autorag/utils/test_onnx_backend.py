@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from onnxruntime.datasets import get_example
+
+from autorag.utils.onnx_backend import (
+    get_onnx_cache_dir,
+    get_session_pool,
+    validate_backend,
+)
+
+
+def test_validate_backend():
+    assert validate_backend("onnx")
+    assert not validate_backend("torch")
+    with pytest.raises(ValueError):
+        validate_backend("tensorrt")
+
+
+def test_get_onnx_cache_dir(monkeypatch):
+    assert get_onnx_cache_dir("project") == os.path.join(
+        "project", "resources", "onnx"
+    )
+    monkeypatch.setenv("AUTORAG_ONNX_CACHE_DIR", "onnx_cache")
+    assert get_onnx_cache_dir() == "onnx_cache"
+
+
+def test_session_pool():
+    model_path = get_example("sigmoid.onnx")
+    pool = get_session_pool(model_path, pool_size=2, num_threads=2)
+    assert get_session_pool(model_path, pool_size=2, num_threads=2) is pool
+    assert pool.input_names == ["x"]
+
+    inputs = [np.random.randn(3, 4, 5) for _ in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        outputs = list(executor.map(lambda x: pool.run({"x": x, "y": x}), inputs))
+    for x, output in zip(inputs, outputs):
+        assert np.allclose(output, 1 / (1 + np.exp(-x)), atol=1e-6)
+    assert pool.sessions.qsize() == 2
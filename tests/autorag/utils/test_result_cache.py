@@ -0,0 +1,161 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import pandas as pd
+
+from autorag.strategy import run_modules
+from autorag.utils import result_cache
+from autorag.utils.result_cache import ModuleResultCache, use_result_cache
+
+previous_result = pd.DataFrame(
+    {
+        "qid": ["q1", "q2"],
+        "query": ["What is apple?", "What is banana?"],
+        "retrieval_gt": [[["doc1"]], [["doc2", "doc3"]]],
+    }
+)
+
+
+class CountingModule:
+    call_count = 0
+
+    @classmethod
+    def run_evaluator(cls, project_dir, previous_result, top_k: int):
+        cls.call_count += 1
+        return pd.DataFrame(
+            {
+                "retrieved_ids": [["doc1", "doc2"][:top_k]] * len(previous_result),
+                "retrieve_scores": [[0.9, 0.5][:top_k]] * len(previous_result),
+            }
+        )
+
+
+def test_module_result_cache():
+    with tempfile.TemporaryDirectory() as project_dir:
+        os.makedirs(os.path.join(project_dir, "data"))
+        qa_path = os.path.join(project_dir, "data", "qa.parquet")
+        previous_result.to_parquet(qa_path, index=False)
+        cache = ModuleResultCache(os.path.join(project_dir, "resources", "cache"))
+
+        keys = cache.keys(
+            [CountingModule] * 3,
+            [{"top_k": 1}, {"top_k": 2}, {"top_k": 1}],
+            project_dir,
+            previous_result,
+        )
+        assert keys[0] == keys[2]
+        assert keys[0] != keys[1]
+        # the different input makes the different key
+        assert (
+            cache.keys(
+                [CountingModule], [{"top_k": 1}], project_dir, previous_result[:1]
+            )[0]
+            != keys[0]
+        )
+
+        assert cache.get(keys[0]) is None
+        result = CountingModule.run_evaluator(project_dir, previous_result, top_k=2)
+        cache.put(keys[0], result, 1.5)
+        cached_result, execution_time = cache.get(keys[0])
+        assert execution_time == 1.5
+        assert cached_result["retrieved_ids"].tolist() == [["doc1", "doc2"]] * 2
+        assert cached_result["retrieve_scores"].tolist() == [[0.9, 0.5]] * 2
+
+        # the different AutoRAG version makes the different key
+        with patch.object(result_cache, "AUTORAG_VERSION", "0.0.0-test"):
+            assert (
+                cache.keys(
+                    [CountingModule], [{"top_k": 1}], project_dir, previous_result
+                )[0]
+                != keys[0]
+            )
+
+        # the modified qa data makes the different key
+        previous_result[:1].to_parquet(qa_path, index=False)
+        assert (
+            cache.keys([CountingModule], [{"top_k": 1}], project_dir, previous_result)[
+                0
+            ]
+            != keys[0]
+        )
+
+
+def test_run_modules_result_cache():
+    CountingModule.call_count = 0
+    with tempfile.TemporaryDirectory() as project_dir:
+        cache_dir = os.path.join(project_dir, "resources", "cache")
+        with use_result_cache(cache_dir):
+            results, times = run_modules(
+                [CountingModule] * 2,
+                [{"top_k": 1}, {"top_k": 2}],
+                {},
+                project_dir=project_dir,
+                previous_result=previous_result,
+            )
+            assert CountingModule.call_count == 2
+            cached_results, cached_times = run_modules(
+                [CountingModule] * 3,
+                [{"top_k": 1}, {"top_k": 2}, {"top_k": 3}],
+                {"max_workers": 2},
+                project_dir=project_dir,
+                previous_result=previous_result,
+            )
+        # only the new combination runs
+        assert CountingModule.call_count == 3
+        assert cached_times[:2] == times
+        for result, cached_result in zip(results, cached_results[:2]):
+            pd.testing.assert_frame_equal(result, cached_result)
+
+        run_modules(
+            [CountingModule],
+            [{"top_k": 1}],
+            {},
+            project_dir=project_dir,
+            previous_result=previous_result,
+        )
+        assert CountingModule.call_count == 4
+
+
+class CountingApiModule(CountingModule):
+    resource_tag = "api"
+    call_count = 0
+
+
+def test_run_modules_result_cache_strategy():
+    CountingModule.call_count = 0
+    CountingApiModule.call_count = 0
+    with tempfile.TemporaryDirectory() as project_dir:
+        cache_dir = os.path.join(project_dir, "resources", "cache")
+        with use_result_cache(cache_dir):
+            for _ in range(2):
+                run_modules(
+                    [CountingModule, CountingApiModule],
+                    [{"top_k": 1}, {"top_k": 1}],
+                    {},
+                    project_dir=project_dir,
+                    previous_result=previous_result,
+                )
+            # the api module is not cached by default
+            assert CountingModule.call_count == 1
+            assert CountingApiModule.call_count == 2
+
+            for _ in range(2):
+                run_modules(
+                    [CountingApiModule],
+                    [{"top_k": 2}],
+                    {"cache": "all"},
+                    project_dir=project_dir,
+                    previous_result=previous_result,
+                )
+            assert CountingApiModule.call_count == 3
+
+            # the cache is not used at all
+            run_modules(
+                [CountingModule],
+                [{"top_k": 1}],
+                {"cache": False},
+                project_dir=project_dir,
+                previous_result=previous_result,
+            )
+            assert CountingModule.call_count == 2
@@ -39,7 +39,9 @@ from autorag.utils.util import (
     find_key_values,
     pop_params,
     apply_recursive,
+    embedding_query_content,
 )
+from autorag.vectordb.chroma import Chroma
 from tests.mock import MockLLM
 
 root_dir = pathlib.PurePath(os.path.dirname(os.path.realpath(__file__))).parent.parent
@@ -665,3 +667,26 @@ def test_apply_recursive():
     data = [(4, 5), (6, 7), [5, [6, 7]], np.array([4, 5]), pd.Series([4, 5])]
     result = apply_recursive(lambda x: x * 2, data)
     assert result == [[8, 10], [12, 14], [10, [12, 14]], [8, 10], [8, 10]]
+
+
+def test_embedding_query_content_vector_store():
+    vector_store = Chroma(
+        embedding_model="mock",
+        collection_name="test_embedding_query_content",
+        client_type="ephemeral",
+    )
+    vector_store.add_embedding(["vec1", "vec2"], [[0.1] * 768, [0.2] * 768])
+    query_embeddings, content_embeddings = embedding_query_content(
+        ["query1", "query2"],
+        [["content1", "content2"], ["content3"]],
+        batch=8,
+        ids_list=[["vec2", "vec1"], ["vec3"]],
+        vector_store=vector_store,
+    )
+    assert len(query_embeddings) == 2
+    assert len(query_embeddings[0]) == 768
+    assert [len(x) for x in content_embeddings] == [2, 1]
+    assert content_embeddings[0][0][0] == pytest.approx(0.2)
+    assert content_embeddings[0][1][0] == pytest.approx(0.1)
+    # the content that is not in the vector store is embedded
+    assert len(content_embeddings[1][0]) == 768
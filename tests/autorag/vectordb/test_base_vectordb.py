@@ -2,6 +2,7 @@ import os.path
 import pathlib
 import tempfile
 
+import pytest
 from llama_index.core import MockEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
@@ -10,6 +11,7 @@ from autorag.vectordb import (
     load_vectordb_from_yaml,
     load_all_vectordb_from_yaml,
 )
+from autorag.vectordb.base import BaseVectorStore
 from autorag.vectordb.chroma import Chroma
 
 
@@ -68,3 +70,27 @@ def test_load_all_vectordb_from_yaml():
         assert isinstance(chroma_large_vectordb, Chroma)
         assert chroma_large_vectordb.collection.name == "openai_embed_3_large"
         assert isinstance(chroma_large_vectordb.embedding, MockEmbedding)
+
+
+class SkipMissingVectorStore(BaseVectorStore):
+    # the fetch skips the missing ids instead of raising KeyError
+    def __init__(self, embeddings):
+        super().__init__("mock")
+        self.embeddings = embeddings
+
+    async def fetch(self, ids):
+        return [self.embeddings[_id] for _id in ids if _id in self.embeddings]
+
+    async def is_exist(self, ids):
+        return [_id in self.embeddings for _id in ids]
+
+
+@pytest.mark.asyncio
+async def test_fetch_embeddings_skip_missing():
+    db = SkipMissingVectorStore({"doc1": [0.1] * 4, "doc2": [0.2] * 4})
+    fetched, found = await db.fetch_embeddings(["doc2", "doc1"])
+    assert found.tolist() == [True, True]
+    assert fetched[:, 0] == pytest.approx([0.2, 0.1])
+    # the missing id does not shift the embeddings of the other ids
+    with pytest.raises(ValueError, match="one embedding per id"):
+        await db.fetch_embeddings(["doc3", "doc1"])
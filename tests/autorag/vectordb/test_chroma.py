@@ -66,3 +66,25 @@ async def test_delete_documents(chroma_ephemeral):
 
     assert len(contents[0]) == 1
     assert len(scores[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_embeddings(chroma_ephemeral):
+    ids = ["fetch1", "fetch2", "fetch3"]
+    embeddings = [[0.1] * 768, [0.2] * 768, [0.3] * 768]
+    chroma_ephemeral.add_embedding(ids, embeddings)
+
+    # the fetched embeddings keep the order of the ids
+    fetched = await chroma_ephemeral.fetch(["fetch3", "fetch1"])
+    assert fetched[0][0] == pytest.approx(0.3)
+    assert fetched[1][0] == pytest.approx(0.1)
+
+    fetched, found = await chroma_ephemeral.fetch_embeddings(
+        ["fetch2", "fetch4", "fetch2", "fetch1"]
+    )
+    assert fetched.shape == (4, 768)
+    assert found.tolist() == [True, False, True, True]
+    assert fetched[:, 0] == pytest.approx([0.2, 0.0, 0.2, 0.1])
+
+    fetched, found = await chroma_ephemeral.fetch_embeddings([])
+    assert len(fetched) == len(found) == 0
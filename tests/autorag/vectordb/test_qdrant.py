@@ -1,7 +1,9 @@
 import asyncio
 import uuid
+from unittest.mock import patch
 
 import pytest
+from qdrant_client import QdrantClient
 
 from autorag.vectordb.qdrant import Qdrant
 from tests.delete_tests import is_github_action
@@ -78,3 +80,34 @@ async def test_delete_documents(qdrant_instance):
 
     assert len(contents[0]) == 1
     assert len(scores[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_embeddings():
+    # the in-memory qdrant client, so it does not need the qdrant docker server
+    with patch(
+        "autorag.vectordb.qdrant.QdrantClient",
+        lambda *args, **kwargs: QdrantClient(":memory:"),
+    ):
+        qdrant = Qdrant(
+            embedding_model="mock",
+            collection_name="autorag_fetch",
+            similarity_metric="ip",
+            dimension=4,
+        )
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    qdrant.add_embedding(ids, [[0.1] * 4, [0.2] * 4, [0.3] * 4])
+
+    # the fetched embeddings keep the order of the ids
+    fetched = await qdrant.fetch([ids[2], ids[0]])
+    assert fetched[0][0] == pytest.approx(0.3)
+    assert fetched[1][0] == pytest.approx(0.1)
+    with pytest.raises(KeyError):
+        await qdrant.fetch([ids[0], str(uuid.uuid4())])
+
+    fetched, found = await qdrant.fetch_embeddings(
+        [ids[1], str(uuid.uuid4()), ids[1], ids[0]]
+    )
+    assert fetched.shape == (4, 4)
+    assert found.tolist() == [True, False, True, True]
+    assert fetched[:, 0] == pytest.approx([0.2, 0.0, 0.2, 0.1])